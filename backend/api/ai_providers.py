@@ -5,7 +5,7 @@ This module provides RESTful API endpoints for managing AI providers
 and handling AI communication within the AI Chat Assistant backend.
 """
 
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks
@@ -17,19 +17,14 @@ from ..models.ai_provider import (
     AIConversationResponse, ProviderType
 )
 from ..services.ai_provider_service import AIProviderService
+from ..services.registry import registry
 
 # Create the router
 router = APIRouter(prefix="/api/ai-providers", tags=["ai-providers"])
 
-# Global singleton instance of the AI provider service
-_ai_provider_service_instance: Optional[AIProviderService] = None
-
 def get_ai_provider_service() -> AIProviderService:
-    """Dependency to get the AI provider service instance (singleton pattern)."""
-    global _ai_provider_service_instance
-    if _ai_provider_service_instance is None:
-        _ai_provider_service_instance = AIProviderService()
-    return _ai_provider_service_instance
+    """Dependency to get the shared AI provider service instance."""
+    return registry.get("ai_providers")
 
 
 @router.post("/", response_model=AIProvider, status_code=201)
@@ -188,9 +183,9 @@ async def send_ai_request(
     - **function_call**: Optional function call specification
     """
     try:
-        async with service:
-            response = await service.send_request(provider_id, request)
-            return response
+        # The shared service keeps its connection pool open across requests
+        response = await service.send_request(provider_id, request)
+        return response
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -228,6 +223,26 @@ async def get_all_usage_stats(
         raise HTTPException(status_code=500, detail=f"Failed to get usage stats: {str(e)}")
 
 
+@router.get("/{provider_id}/rate-limit")
+async def get_provider_rate_limit(
+    provider_id: UUID,
+    service: AIProviderService = Depends(get_ai_provider_service)
+) -> Dict[str, Any]:
+    """
+    Get rate limiter metrics for a specific provider.
+
+    Includes current queue depth, wait times and remaining request/token budget.
+
+    - **provider_id**: UUID of the AI provider
+    """
+    try:
+        return service.get_rate_limit_stats(provider_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get rate limit stats: {str(e)}")
+
+
 @router.get("/{provider_id}/health", response_model=AIProviderHealth)
 async def get_provider_health(
     provider_id: UUID,
@@ -257,9 +272,8 @@ async def check_provider_health(
     - **provider_id**: UUID of the AI provider to check
     """
     try:
-        async with service:
-            health = await service.check_provider_health(provider_id)
-            return health
+        health = await service.check_provider_health(provider_id)
+        return health
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -12,6 +12,7 @@ API Structure:
 - DELETE /api/projects/{project_id}/sessions/{session_id} - Delete session
 - POST   /api/projects/{project_id}/sessions/{session_id}/messages - Add message
 - GET    /api/projects/{project_id}/sessions/{session_id}/messages - Get messages
+- GET    /api/projects/{project_id}/sessions/{session_id}/messages/page - Page back through messages by cursor
 """
 
 from typing import List, Optional
@@ -21,10 +22,12 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.responses import JSONResponse
 
 from ..models.chat_session import (
-    ChatSession, ChatSessionCreate, ChatSessionUpdate, Message, MessageCreate,
+    ChatSession, ChatSessionCreate, ChatSessionUpdate, Message, MessageCreate, MessagePage,
     ChatSessionSummary, ChatSessionWithMessages
 )
 from ..services.chat_session_service import ChatSessionService
+from ..services.chat_storage import decode_cursor
+from ..services.registry import registry
 
 # Create the router for project-nested sessions
 # This will be included with prefix /api/projects in main.py
@@ -32,8 +35,8 @@ router = APIRouter(tags=["chat-sessions"])
 
 # Dependency to get the chat session service
 def get_chat_session_service() -> ChatSessionService:
-    """Dependency to get the chat session service instance."""
-    return ChatSessionService()
+    """Dependency to get the shared chat session service instance."""
+    return registry.get("chat_sessions")
 
 
 @router.post("/{project_id}/sessions", response_model=ChatSession, status_code=201)
@@ -59,7 +62,7 @@ async def create_chat_session(
     try:
         # Ensure project_id is set in the session data
         session_data.project_id = project_id
-        session = service.create_session(session_data)
+        session = await service.create_session_async(session_data)
         return session
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -86,7 +89,7 @@ async def list_sessions_in_project(
     - List of ChatSessionSummary objects for the project
     """
     try:
-        sessions = service.list_sessions(project_id=project_id, include_inactive=include_inactive)
+        sessions = await service.list_sessions_async(project_id=project_id, include_inactive=include_inactive)
         return sessions
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list chat sessions: {str(e)}")
@@ -108,7 +111,7 @@ async def get_chat_session(
     **Returns:**
     - ChatSession object with full details
     """
-    session = service.get_session(session_id, str(project_id))
+    session = await service.get_session_async(session_id, str(project_id))
     if not session:
         raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found in project {project_id}")
     
@@ -143,7 +146,7 @@ async def update_chat_session(
     - Updated ChatSession object
     """
     try:
-        session = service.update_session(session_id, update_data, str(project_id))
+        session = await service.update_session_async(session_id, update_data, str(project_id))
         if not session:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found in project {project_id}")
         
@@ -182,14 +185,14 @@ async def delete_chat_session(
     """
     try:
         # First verify the session exists and belongs to this project
-        session = service.get_session(session_id, str(project_id))
+        session = await service.get_session_async(session_id, str(project_id))
         if not session:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found in project {project_id}")
         
         if session.project_id != project_id:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found in project {project_id}")
         
-        deleted = service.delete_session(session_id, force=force, project_id=str(project_id))
+        deleted = await service.delete_session_async(session_id, force=force, project_id=str(project_id))
         if not deleted:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found")
         
@@ -229,14 +232,14 @@ async def add_message_to_session(
     """
     try:
         # Verify session exists and belongs to this project
-        session = service.get_session(session_id, str(project_id))
+        session = await service.get_session_async(session_id, str(project_id))
         if not session:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found in project {project_id}")
         
         if session.project_id != project_id:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found in project {project_id}")
         
-        message = service.add_message(session_id, message_data, str(project_id))
+        message = await service.add_message_async(session_id, message_data, str(project_id))
         return message
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -270,14 +273,14 @@ async def get_session_messages(
     """
     try:
         # Verify session exists and belongs to this project
-        session = service.get_session(session_id, str(project_id))
+        session = await service.get_session_async(session_id, str(project_id))
         if not session:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found in project {project_id}")
         
         if session.project_id != project_id:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found in project {project_id}")
         
-        messages = service.get_messages(session_id, limit=limit, offset=offset, project_id=str(project_id))
+        messages = await service.get_messages_async(session_id, limit=limit, offset=offset, project_id=str(project_id))
         return messages
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -287,6 +290,42 @@ async def get_session_messages(
         raise HTTPException(status_code=500, detail=f"Failed to get messages: {str(e)}")
 
 
+@router.get("/{project_id}/sessions/{session_id}/messages/page", response_model=MessagePage)
+async def get_session_message_page(
+    project_id: UUID,
+    session_id: UUID,
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of messages to return"),
+    before: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    service: ChatSessionService = Depends(get_chat_session_service)
+) -> MessagePage:
+    """
+    Get a page of messages, newest page first, for lazily scrolling back through history.
+
+    **Path Parameters:**
+    - **project_id**: UUID of the parent project
+    - **session_id**: UUID of the chat session
+
+    **Query Parameters:**
+    - **limit**: Maximum number of messages in the page (1-1000, default 50)
+    - **before**: Cursor returned as next_cursor by the previous page; omit for the newest page
+
+    **Returns:**
+    - MessagePage with messages (oldest first), has_more and next_cursor
+    """
+    if before:
+        try:
+            decode_cursor(before)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        return await service.get_message_page_async(session_id, limit=limit, before=before, project_id=str(project_id))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get messages: {str(e)}")
+
+
 @router.get("/{project_id}/sessions/{session_id}/full", response_model=ChatSessionWithMessages)
 async def get_session_with_messages(
     project_id: UUID,
@@ -305,14 +344,14 @@ async def get_session_with_messages(
     """
     try:
         # Verify session exists and belongs to this project
-        session = service.get_session(session_id, str(project_id))
+        session = await service.get_session_async(session_id, str(project_id))
         if not session:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found in project {project_id}")
         
         if session.project_id != project_id:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found in project {project_id}")
         
-        session_with_messages = service.get_session_with_messages(session_id, str(project_id))
+        session_with_messages = await service.get_session_with_messages_async(session_id, str(project_id))
         if not session_with_messages:
             raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found")
         
@@ -5,8 +5,10 @@ This module provides REST API endpoints for conversation management,
 bridging chat sessions with AI providers for actual conversation flow.
 """
 
+import json
 from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional, Union
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional, Union
 from uuid import UUID
 
 from ..models.conversation import (
@@ -17,14 +19,17 @@ from ..models.conversation import (
     ConversationSettings,
     ConversationError
 )
+from ..models.ai_provider import AIStreamChunk
+from ..services.chat_storage import decode_cursor
 from ..services.conversation_service import ConversationService
+from ..services.registry import registry
 
 router = APIRouter()
 
 
 def get_conversation_service() -> ConversationService:
-    """Dependency to get conversation service instance."""
-    return ConversationService()
+    """Dependency to get the shared conversation service instance."""
+    return registry.get("conversations")
 
 
 @router.post("/send", response_model=Union[ConversationResponse, ConversationError])
@@ -68,11 +73,53 @@ async def send_message(
     return result
 
 
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a single Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/stream")
+async def stream_message(
+    request: ConversationRequest,
+    service: ConversationService = Depends(get_conversation_service)
+):
+    """
+    Send a message and stream the AI response as Server-Sent Events.
+
+    Events:
+    - ``delta``: ``{"content": ..., "index": ...}`` for each piece of generated text
+    - ``done``: the final ConversationResponse, sent after both messages are stored
+    - ``error``: a ConversationError; the stream ends after it
+
+    Args:
+        request: Conversation request with message and settings
+        service: Conversation service instance
+
+    Returns:
+        Streaming response with ``text/event-stream`` content
+    """
+    async def event_stream():
+        async for item in service.stream_message(request):
+            if isinstance(item, AIStreamChunk):
+                yield _format_sse("delta", item.model_dump(mode="json"))
+            elif isinstance(item, ConversationError):
+                yield _format_sse("error", item.model_dump(mode="json"))
+            else:
+                yield _format_sse("done", item.model_dump(mode="json"))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/history/{session_id}", response_model=ConversationHistory)
 async def get_conversation_history(
     session_id: UUID,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
+    before: Optional[str] = None,
     service: ConversationService = Depends(get_conversation_service)
 ):
     """
@@ -82,13 +129,20 @@ async def get_conversation_history(
         session_id: Chat session ID
         limit: Maximum number of messages to return
         offset: Number of messages to skip
+        before: Cursor paging: next_cursor of the previous page, or empty for the newest page
         service: Conversation service instance
 
     Returns:
         Conversation history with messages and context
     """
+    if before:
+        try:
+            decode_cursor(before)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        return service.get_conversation_history(session_id, limit, offset)
+        return service.get_conversation_history(session_id, limit, offset, before)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -28,13 +28,14 @@ from ..models.file_management import (
     FileError
 )
 from ..services.file_management_service import FileManagementService
+from ..services.registry import registry
 
 router = APIRouter()
 
 
 def get_file_service() -> FileManagementService:
-    """Dependency to get file management service instance."""
-    return FileManagementService()
+    """Dependency to get the shared file management service instance."""
+    return registry.get("files")
 
 
 @router.post("/upload", response_model=FileUploadResponse)
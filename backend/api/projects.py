@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
 from backend.services.project_service import ProjectService
+from backend.services.registry import registry
 from backend.models.project import (
     Project, ProjectCreate, ProjectUpdate,
     ProjectTree, ProjectSummary, ProjectStats
@@ -11,8 +12,8 @@ router = APIRouter(prefix="/api/projects", tags=["projects"])
 
 # Dependency to get project service
 def get_project_service() -> ProjectService:
-    """Dependency to get project service instance"""
-    return ProjectService()
+    """Dependency to get the shared project service instance"""
+    return registry.get("projects")
 
 
 @router.get("/", response_model=List[ProjectSummary])
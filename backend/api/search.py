@@ -7,6 +7,7 @@ REST API endpoints for advanced search across conversations, files, and notes.
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Optional
 from backend.services.search_service import SearchService
+from backend.services.registry import registry
 from backend.models.search import (
     SearchQuery, SearchResults, SearchResult, SearchIndex,
     SearchSuggestion, AdvancedSearchQuery, SearchAnalytics,
@@ -18,8 +19,8 @@ router = APIRouter(prefix="/api/search", tags=["search"])
 
 # Dependency to get search service
 def get_search_service() -> SearchService:
-    """Dependency to get search service instance"""
-    return SearchService()
+    """Dependency to get the shared search service instance"""
+    return registry.get("search")
 
 
 @router.post("/", response_model=SearchResults)
@@ -31,7 +32,7 @@ async def search(
     Perform search across conversations, files, and notes.
 
     - **query**: Search query string
-    - **search_type**: Type of search (exact, fuzzy, semantic, regex)
+    - **search_type**: Type of search (exact, fuzzy, semantic, regex, boolean)
     - **scope**: What to search (all, conversations, files, notes)
     - **filters**: Additional filter criteria
     - **limit**: Maximum number of results (default: 50)
@@ -41,6 +42,9 @@ async def search(
     """
     try:
         return search_service.search(search_query)
+    except ValueError as e:
+        # Malformed boolean query
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
@@ -53,15 +57,19 @@ async def advanced_search(
     """
     Perform advanced search with multiple criteria and exclusions.
 
-    - **queries**: Multiple search queries (AND logic)
+    - **queries**: Boolean queries (AND/OR/NOT, grouping, field:value), all of which must match
     - **exclude_terms**: Terms to exclude from results
     - **exact_phrases**: Exact phrases that must be present
+    - **near**: Terms that must occur within a given distance of each other
     - **filters**: Additional filter criteria
     - **limit**: Maximum number of results
     - **offset**: Results offset for pagination
     """
     try:
         return search_service.advanced_search(advanced_query)
+    except ValueError as e:
+        # Malformed boolean query
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Advanced search failed: {str(e)}")
 
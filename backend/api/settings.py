@@ -8,6 +8,7 @@ and system settings.
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from typing import List, Optional
 from backend.services.settings_service import SettingsService
+from backend.services.registry import registry
 from backend.models.settings import (
     Settings, SettingsCreate, SettingsUpdate, SettingsSummary,
     SettingsValidationResult, SettingsExport, SettingsImport,
@@ -19,8 +20,8 @@ router = APIRouter(prefix="/api/settings", tags=["settings"])
 
 # Dependency to get settings service
 def get_settings_service() -> SettingsService:
-    """Dependency to get settings service instance"""
-    return SettingsService()
+    """Dependency to get the shared settings service instance"""
+    return registry.get("settings")
 
 
 @router.get("/", response_model=List[SettingsSummary])
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional, Dict, Any
 from backend.services.message_template_service import MessageTemplateService
+from backend.services.registry import registry
 from backend.models.message_template import (
     MessageTemplate, MessageTemplateCreate, MessageTemplateUpdate,
     MessageTemplateSummary, TemplateCategory
@@ -11,8 +12,8 @@ router = APIRouter(prefix="/api/templates", tags=["templates"])
 
 # Dependency to get template service
 def get_template_service() -> MessageTemplateService:
-    """Dependency to get template service instance"""
-    return MessageTemplateService()
+    """Dependency to get the shared template service instance"""
+    return registry.get("templates")
 
 
 @router.get("/", response_model=List[MessageTemplateSummary])
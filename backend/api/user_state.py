@@ -15,12 +15,13 @@ from backend.models.user_state import (
     RecentActivity, Bookmark, UserStateBackup, UserStateAnalytics
 )
 from backend.services.user_state_service import UserStateService
+from backend.services.registry import registry
 
 
 # Dependency to get user state service
 def get_user_state_service() -> UserStateService:
-    """Get user state service instance"""
-    return UserStateService()
+    """Get the shared user state service instance"""
+    return registry.get("user_state")
 
 
 router = APIRouter(prefix="/user-state", tags=["user-state"])
@@ -52,6 +52,25 @@ class Settings:
     ]
     IGNORED_DIRS: list = [".git", ".venv", "venv", "node_modules", "__pycache__", ".env"]
     
+    # State file durability: "fsync" per write, "group" to batch fsyncs across
+    # concurrent writes (group commit), "none" for atomic renames without fsync
+    DURABLE_WRITE_MODE: str = os.getenv("DURABLE_WRITE_MODE", "fsync")
+    DURABLE_GROUP_COMMIT_MS: float = float(os.getenv("DURABLE_GROUP_COMMIT_MS", "5"))
+
+    # Chat Session Storage backend ("json" files per session, or "sqlite" in one WAL database)
+    CHAT_STORAGE_BACKEND: str = os.getenv("CHAT_STORAGE_BACKEND", "json")
+    CHAT_SQLITE_PATH: Optional[str] = os.getenv("CHAT_SQLITE_PATH")
+    # JSON backend messages ("json" rewrites messages.json, "jsonl" appends to an indexed log)
+    CHAT_MESSAGE_STORAGE: str = os.getenv("CHAT_MESSAGE_STORAGE", "json")
+    # Threads used for chat session disk I/O so handlers never block the event loop
+    CHAT_IO_WORKERS: int = int(os.getenv("CHAT_IO_WORKERS", "4"))
+    # Conversation contexts (token/cost counters) are written behind: at most this many
+    # seconds of updates can be lost in a crash; a clean shutdown writes everything
+    CONVERSATION_CONTEXT_FLUSH_SECONDS: float = float(os.getenv("CONVERSATION_CONTEXT_FLUSH_SECONDS", "1.0"))
+    CONVERSATION_CONTEXT_MAX_DIRTY: int = int(os.getenv("CONVERSATION_CONTEXT_MAX_DIRTY", "100"))
+    # Conversation contexts are loaded on first use; at most this many stay in memory
+    CONVERSATION_CONTEXT_CACHE_SIZE: int = int(os.getenv("CONVERSATION_CONTEXT_CACHE_SIZE", "1000"))
+    
     # Connector Configuration (for Notion, GitHub, etc.)
     NOTION_TOKEN: Optional[str] = os.getenv("NOTION_TOKEN")
     NOTION_ROOT_PAGE_ID: Optional[str] = os.getenv("NOTION_ROOT_PAGE_ID")
@@ -63,5 +82,26 @@ class Settings:
     # Server-Sent Events (for streaming responses)
     SSE_TIMEOUT: int = int(os.getenv("SSE_TIMEOUT", "300"))
 
+    # AI provider HTTP connection pools (one per provider endpoint)
+    HTTP_POOL_MAX_CONNECTIONS: int = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+    HTTP_POOL_MAX_CONNECTIONS_PER_HOST: int = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS_PER_HOST", "20"))
+    HTTP_KEEPALIVE_TIMEOUT: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60"))
+    HTTP_DNS_CACHE_TTL: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+    HTTP_WARM_UP_ON_STARTUP: bool = os.getenv("HTTP_WARM_UP_ON_STARTUP", "true").lower() == "true"
+
+    # Longest a request may queue for provider rate-limit budget (seconds)
+    RATE_LIMIT_MAX_WAIT: float = float(os.getenv("RATE_LIMIT_MAX_WAIT", "60"))
+
+    # Retry backoff for transient provider errors (seconds)
+    RETRY_BASE_DELAY: float = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+    RETRY_MAX_DELAY: float = float(os.getenv("RETRY_MAX_DELAY", "30"))
+
+    # Exact-match cache for deterministic AI requests
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    RESPONSE_CACHE_DISK: bool = os.getenv("RESPONSE_CACHE_DISK", "false").lower() == "true"
+    RESPONSE_CACHE_MAX_DISK_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_DISK_ENTRIES", "10000"))
+
 
 settings = Settings()
@@ -2,7 +2,9 @@
 FastAPI Application Entry Point
 Main server for AI Chat Assistant Backend
 """
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -11,16 +13,34 @@ from pathlib import Path
 
 from backend.config.settings import settings
 from backend.api import chat, files, workspace, projects, chat_sessions, ai_providers, conversations, file_management, settings as settings_api, search, user_state, templates
+from backend.services.registry import registry
 
 # Configure logging
 logging.basicConfig(level=settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared services on startup and release their resources on shutdown."""
+    registry.startup()
+    logger.info("Services initialized")
+    warm_up = None
+    if settings.HTTP_WARM_UP_ON_STARTUP:
+        # Establish provider connections (TCP + TLS) off the request path
+        warm_up = asyncio.create_task(registry.get("ai_providers").warm_up())
+    yield
+    if warm_up and not warm_up.done():
+        warm_up.cancel()
+    await registry.shutdown()
+    logger.info("Services shut down")
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
     description=settings.API_DESCRIPTION,
+    lifespan=lifespan,
 )
 
 # Add middleware
@@ -102,6 +102,10 @@ class AIRequest(BaseModel):
     stop: Optional[Union[str, List[str]]] = Field(None, description="Stop sequences")
     functions: Optional[List[Dict[str, Any]]] = Field(None, description="Function definitions for function calling")
     function_call: Optional[Union[str, Dict[str, Any]]] = Field(None, description="Function call specification")
+    use_cache: Optional[bool] = Field(
+        None,
+        description="Serve from / store in the response cache (default: only when temperature is 0); False bypasses it"
+    )
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional request metadata")
 
 
@@ -119,6 +123,15 @@ class AIResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional response metadata")
 
 
+class AIStreamChunk(BaseModel):
+    """Incremental piece of a streamed AI response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    content: str = Field(default="", description="Newly generated text")
+    index: int = Field(default=0, description="Position of this chunk in the stream")
+
+
 class AIError(BaseModel):
     """Model for AI API errors."""
 
@@ -155,6 +168,9 @@ class AIUsageStats(BaseModel):
     total_cost: float = Field(default=0.0, description="Total cost in USD")
     average_response_time: float = Field(default=0.0, description="Average response time in seconds")
     error_rate: float = Field(default=0.0, description="Error rate as percentage")
+    cache_hits: int = Field(default=0, description="Requests answered from the response cache")
+    cache_misses: int = Field(default=0, description="Cacheable requests that had to be sent upstream")
+    coalesced_requests: int = Field(default=0, description="Requests that shared an identical in-flight request")
     last_used: Optional[datetime] = Field(None, description="When the provider was last used")
 
 
@@ -26,6 +26,14 @@ class Message(BaseModel):
         return f"Message(id={self.id}, role={self.role}, content={self.content[:50]}...)"
 
 
+class MessagePage(BaseModel):
+    """A page of messages read backwards from a cursor."""
+
+    messages: List[Message] = Field(..., description="Messages in the page, oldest first")
+    has_more: bool = Field(default=False, description="Whether older messages exist before this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor to pass as 'before' to fetch the next older page")
+
+
 class ChatSession(BaseModel):
     """Represents a chat session within a project."""
 
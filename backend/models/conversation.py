@@ -48,6 +48,18 @@ class ConversationContext(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional context metadata")
 
 
+class ConversationSummary(BaseModel):
+    """Rolling summary of the messages that no longer fit a conversation's context window."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    session_id: UUID = Field(..., description="Chat session ID")
+    content: str = Field(default="", description="Summary text")
+    covered_count: int = Field(default=0, description="Number of messages, from the start, the summary covers")
+    token_count: int = Field(default=0, description="Tokens in the summary text")
+    updated_at: datetime = Field(default_factory=datetime.now, description="When the summary was last extended")
+
+
 class ConversationRequest(BaseModel):
     """Request model for sending a message in a conversation."""
 
@@ -89,6 +101,7 @@ class ConversationHistory(BaseModel):
     messages: List[ConversationMessage] = Field(..., description="Conversation messages")
     total_messages: int = Field(..., description="Total number of messages")
     has_more: bool = Field(default=False, description="Whether there are more messages available")
+    next_cursor: Optional[str] = Field(None, description="Cursor to pass as 'before' to fetch older messages")
 
 
 class ConversationStats(BaseModel):
@@ -116,6 +129,9 @@ class ConversationSettings(BaseModel):
     max_history_messages: int = Field(default=50, ge=1, le=100, description="Maximum history messages to include")
     enable_cost_tracking: bool = Field(default=True, description="Whether to track conversation costs")
     enable_usage_stats: bool = Field(default=True, description="Whether to collect usage statistics")
+    enable_failover: bool = Field(default=True, description="Whether to retry failed requests on other active providers")
+    enable_hedging: bool = Field(default=False, description="Whether to race a backup provider against a slow primary")
+    enable_summarization: bool = Field(default=True, description="Whether to summarize history that falls out of the context window")
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional settings")
 
 
@@ -17,6 +17,7 @@ class SearchType(str, Enum):
     FUZZY = "fuzzy"
     SEMANTIC = "semantic"
     REGEX = "regex"
+    BOOLEAN = "boolean"
 
 
 class SearchScope(str, Enum):
@@ -113,13 +114,22 @@ class SearchSuggestion(BaseModel):
     confidence: float = Field(..., description="Suggestion confidence score")
 
 
+class ProximityClause(BaseModel):
+    """Terms that must occur close to each other (NEAR/k)"""
+    model_config = ConfigDict(from_attributes=True)
+
+    terms: List[str] = Field(..., min_length=2, description="Terms that must appear near each other")
+    distance: int = Field(5, ge=0, description="Maximum token distance between the first and last term")
+
+
 class AdvancedSearchQuery(BaseModel):
     """Advanced search with multiple criteria"""
     model_config = ConfigDict(from_attributes=True)
 
-    queries: List[str] = Field(..., description="Multiple search queries (AND logic)")
+    queries: List[str] = Field(..., description="Boolean search queries, all of which must match")
     exclude_terms: Optional[List[str]] = Field(None, description="Terms to exclude")
     exact_phrases: Optional[List[str]] = Field(None, description="Exact phrases to match")
+    near: Optional[List[ProximityClause]] = Field(None, description="Proximity constraints")
     filters: Optional[SearchFilter] = Field(None, description="Additional filters")
     limit: int = Field(50, description="Maximum number of results")
     offset: int = Field(0, description="Results offset for pagination")
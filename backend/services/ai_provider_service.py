@@ -7,24 +7,63 @@ handling communication with external AI APIs.
 
 import asyncio
 import json
+import math
 import os
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Union
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
 from uuid import UUID
 
 import aiohttp
-from aiohttp import ClientTimeout
 from dotenv import load_dotenv, dotenv_values, set_key
 
+from ..config.settings import settings
+from . import durable_write
+from .http_client_pool import HTTPClientPool
+from .rate_limiter import ProviderRateLimiter, estimate_tokens, usage_tokens
+from .response_cache import ResponseCache, is_cacheable, request_key
+from .retry_policy import ProviderHTTPError, RetryPolicy, RETRYABLE_STATUS_CODES, parse_retry_after
+from .single_flight import SingleFlight
 from ..models.ai_provider import (
     AIProvider, AIProviderCreate, AIProviderUpdate, AIModel, AIRequest, AIResponse,
     AIError, AIProviderSummary, AIUsageStats, AIProviderHealth, AIConversationRequest,
-    AIConversationResponse, ProviderType
+    AIConversationResponse, AIStreamChunk, ProviderType
 )
 
 
+async def iter_sse_events(lines: AsyncIterator[bytes]) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Parse a Server-Sent Events stream incrementally.
+
+    Args:
+        lines: Raw lines of the response body (e.g. ``aiohttp`` ``resp.content``)
+
+    Yields:
+        Tuples of (event name, data) for each complete event; the event name
+        defaults to "message" when the stream does not name it
+    """
+    event = "message"
+    data: List[str] = []
+    async for raw in lines:
+        line = raw.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+        elif line.startswith(":"):
+            continue  # Comment / keep-alive
+        else:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+    if data:
+        yield event, "\n".join(data)
+
+
 class AIProviderService:
     """
     Service for managing AI providers and handling API communication.
@@ -53,9 +92,32 @@ class AIProviderService:
         self._models_cache: Dict[str, AIModel] = {}
         self._usage_stats: Dict[UUID, AIUsageStats] = {}
         self._health_status: Dict[UUID, AIProviderHealth] = {}
+        self._rate_limiters: Dict[UUID, ProviderRateLimiter] = {}
+
+        # Long-lived HTTP sessions, one per provider endpoint
+        self._http_pool = HTTPClientPool(
+            max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+            max_connections_per_host=settings.HTTP_POOL_MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+            dns_cache_ttl=settings.HTTP_DNS_CACHE_TTL,
+        )
+        self._retry_policy = RetryPolicy(
+            base_delay=settings.RETRY_BASE_DELAY,
+            max_delay=settings.RETRY_MAX_DELAY,
+        )
 
-        # HTTP client session
-        self._session: Optional[aiohttp.ClientSession] = None
+        # Concurrent identical requests share one upstream call
+        self._single_flight = SingleFlight()
+
+        # Exact-match cache for deterministic requests (None when disabled)
+        self._response_cache: Optional[ResponseCache] = None
+        if settings.RESPONSE_CACHE_ENABLED:
+            self._response_cache = ResponseCache(
+                max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.RESPONSE_CACHE_TTL,
+                disk_dir=self.data_dir / "response_cache" if settings.RESPONSE_CACHE_DISK else None,
+                max_disk_entries=settings.RESPONSE_CACHE_MAX_DISK_ENTRIES,
+            )
 
         # Load initial data
         self._load_providers()
@@ -64,23 +126,29 @@ class AIProviderService:
 
     async def __aenter__(self):
         """Async context manager entry."""
-        await self._ensure_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        await self._close_session()
+        await self.close()
 
-    async def _ensure_session(self):
-        """Ensure HTTP session is available."""
-        if self._session is None or self._session.closed:
-            timeout = ClientTimeout(total=30)
-            self._session = aiohttp.ClientSession(timeout=timeout)
+    async def warm_up(self) -> int:
+        """
+        Open connections to every active provider ahead of the first request.
+
+        Returns:
+            Number of providers that answered
+        """
+        providers = [p for p in self._providers_cache.values() if p.is_active]
+        results = await asyncio.gather(
+            *(self._http_pool.warm_up(provider) for provider in providers),
+            return_exceptions=True
+        )
+        return sum(1 for result in results if result is True)
 
-    async def _close_session(self):
-        """Close HTTP session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+    async def close(self):
+        """Release network resources held by the service."""
+        await self._http_pool.close()
 
     def _get_provider_file(self, provider_id: UUID) -> Path:
         """Get the file path for a provider configuration."""
@@ -119,8 +187,7 @@ class AIProviderService:
         data['created_at'] = data['created_at'].isoformat()
         data['updated_at'] = data['updated_at'].isoformat()
 
-        with open(provider_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        durable_write.write_json(provider_file, data)
         
         # Save API key to .env file (if present)
         if provider.api_key:
@@ -396,6 +463,11 @@ class AIProviderService:
         """
         Send a request to an AI provider.
 
+        Cacheable requests (see ``AIRequest.use_cache``) are answered from the
+        response cache when an identical request was answered before.  Identical
+        requests that arrive while one is already in flight wait for its result
+        instead of calling the provider again, unless ``use_cache`` is False.
+
         Args:
             provider_id: The provider to use
             request: The AI request to send
@@ -410,29 +482,118 @@ class AIProviderService:
         if not provider or not provider.is_active:
             raise ValueError(f"Provider {provider_id} not found or inactive")
 
-        await self._ensure_session()
-
-        # Check rate limits (simplified implementation)
-        if not self._check_rate_limits(provider):
+        if provider.provider_type not in (ProviderType.OPENAI, ProviderType.ANTHROPIC):
             return AIError(
-                type="rate_limit_exceeded",
-                message="Rate limit exceeded",
-                retry_after=60
+                type="unsupported_provider",
+                message=f"Provider type {provider.provider_type} not supported"
             )
 
-        # Prepare the request based on provider type
+        cache_key = None
+        if self._response_cache is not None and is_cacheable(request):
+            cache_key = request_key(provider_id, request)
+            cached = self._response_cache.get(cache_key)
+            stats = self._usage_stats.get(provider_id)
+            if cached is not None:
+                if stats:
+                    stats.cache_hits += 1
+                cached.metadata.pop("attempts", None)
+                cached.metadata["cached"] = True
+                return cached
+            if stats:
+                stats.cache_misses += 1
+
+        if request.use_cache is False:
+            return await self._send_uncached(provider, request, cache_key)
+
+        result, shared = await self._single_flight.do(
+            cache_key or request_key(provider_id, request),
+            lambda: self._send_uncached(provider, request, cache_key)
+        )
+        if shared:
+            # Every caller gets its own copy to annotate
+            result = result.model_copy(deep=True)
+            result.metadata = {**(result.metadata or {}), "coalesced": True}
+            stats = self._usage_stats.get(provider_id)
+            if stats:
+                stats.coalesced_requests += 1
+        return result
+
+    async def _send_uncached(
+        self,
+        provider: AIProvider,
+        request: AIRequest,
+        cache_key: Optional[str] = None
+    ) -> Union[AIResponse, AIError]:
+        """
+        Send a request upstream with rate limiting and retries.
+
+        Args:
+            provider: The provider to use
+            request: The AI request to send
+            cache_key: Response cache key to store a successful reply under
+
+        Returns:
+            AI response or error
+        """
+        provider_id = provider.id
         start_time = time.time()
+        attempts: List[Dict[str, Any]] = []
+
+        for attempt in range(1, provider.retry_attempts + 2):
+            # Every attempt queues for request and token budget
+            estimated_tokens = await self._acquire_rate_limit(provider, request)
+            if isinstance(estimated_tokens, AIError):
+                if attempts:
+                    estimated_tokens.metadata["attempts"] = attempts
+                return estimated_tokens
+
+            attempt_start = time.time()
+            try:
+                if provider.provider_type == ProviderType.OPENAI:
+                    response = await self._send_openai_request(provider, request)
+                else:
+                    response = await self._send_anthropic_request(provider, request)
+            except asyncio.CancelledError:
+                # Abandoned (e.g. a hedged request that lost the race)
+                self._reconcile_rate_limit(provider, request, estimated_tokens, None)
+                raise
+            except Exception as e:
+                self._reconcile_rate_limit(provider, request, estimated_tokens, None)
+                reason = self._retry_policy.classify(e)
+                retry_after = getattr(e, "retry_after", None)
+                attempts.append({
+                    "attempt": attempt,
+                    "latency": time.time() - attempt_start,
+                    "error": str(e),
+                    "status": getattr(e, "status", None),
+                    "reason": reason,
+                })
+
+                delay = None
+                if reason and attempt <= provider.retry_attempts:
+                    delay = self._retry_policy.backoff(attempt, retry_after)
+                if delay is None:
+                    response_time = time.time() - start_time
+                    self._update_health_status(provider_id, False, response_time, str(e))
+                    return AIError(
+                        type="request_failed",
+                        message=str(e),
+                        code=str(e.status) if isinstance(e, ProviderHTTPError) else None,
+                        retry_after=math.ceil(retry_after) if retry_after is not None else None,
+                        metadata={
+                            "response_time": response_time,
+                            "retryable": reason is not None,
+                            "attempts": attempts,
+                        }
+                    )
+                await asyncio.sleep(delay)
+                continue
 
-        try:
-            if provider.provider_type == ProviderType.OPENAI:
-                response = await self._send_openai_request(provider, request)
-            elif provider.provider_type == ProviderType.ANTHROPIC:
-                response = await self._send_anthropic_request(provider, request)
-            else:
-                return AIError(
-                    type="unsupported_provider",
-                    message=f"Provider type {provider.provider_type} not supported"
-                )
+            attempts.append({"attempt": attempt, "latency": time.time() - attempt_start})
+            response.metadata["attempts"] = attempts
+            if cache_key:
+                self._response_cache.put(cache_key, response)
+            self._reconcile_rate_limit(provider, request, estimated_tokens, response.usage)
 
             # Update usage statistics
             self._update_usage_stats(provider_id, response, time.time() - start_time)
@@ -442,21 +603,21 @@ class AIProviderService:
 
             return response
 
-        except Exception as e:
-            response_time = time.time() - start_time
-            error = AIError(
-                type="request_failed",
-                message=str(e),
-                metadata={"response_time": response_time}
-            )
-
-            # Update health status
-            self._update_health_status(provider_id, False, response_time, str(e))
-
-            return error
-
-    async def _send_openai_request(self, provider: AIProvider, request: AIRequest) -> AIResponse:
-        """Send request to OpenAI API."""
+    @staticmethod
+    async def _provider_error(resp: aiohttp.ClientResponse, label: str) -> ProviderHTTPError:
+        """Build the error for a non-200 provider response."""
+        try:
+            error_data = await resp.json()
+        except (aiohttp.ContentTypeError, json.JSONDecodeError, ValueError):
+            error_data = {}
+        message = error_data.get('error', {}).get('message', 'Unknown error')
+        retry_after = None
+        if resp.status in RETRYABLE_STATUS_CODES:
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+        return ProviderHTTPError(f"{label} API error: {message}", resp.status, retry_after)
+
+    def _build_openai_request(self, provider: AIProvider, request: AIRequest) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build the URL, headers and payload for an OpenAI chat completion."""
         url = f"{provider.base_url or 'https://api.openai.com'}/v1/chat/completions"
         headers = {
             "Authorization": f"Bearer {provider.api_key}",
@@ -478,10 +639,16 @@ class AIProviderService:
             payload["functions"] = request.functions
             payload["function_call"] = request.function_call
 
-        async with self._session.post(url, headers=headers, json=payload) as resp:
+        return url, headers, payload
+
+    async def _send_openai_request(self, provider: AIProvider, request: AIRequest) -> AIResponse:
+        """Send request to OpenAI API."""
+        url, headers, payload = self._build_openai_request(provider, request)
+        session = await self._http_pool.get(provider)
+
+        async with session.post(url, headers=headers, json=payload, timeout=self._http_pool.timeout_for(provider)) as resp:
             if resp.status != 200:
-                error_data = await resp.json()
-                raise Exception(f"OpenAI API error: {error_data.get('error', {}).get('message', 'Unknown error')}")
+                raise await self._provider_error(resp, "OpenAI")
 
             data = await resp.json()
             choice = data["choices"][0]
@@ -495,8 +662,8 @@ class AIProviderService:
                 metadata={"provider": "openai"}
             )
 
-    async def _send_anthropic_request(self, provider: AIProvider, request: AIRequest) -> AIResponse:
-        """Send request to Anthropic API."""
+    def _build_anthropic_request(self, provider: AIProvider, request: AIRequest) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build the URL, headers and payload for an Anthropic messages request."""
         url = f"{provider.base_url or 'https://api.anthropic.com'}/v1/messages"
         headers = {
             "x-api-key": provider.api_key,
@@ -522,10 +689,16 @@ class AIProviderService:
             "messages": anthropic_messages
         }
 
-        async with self._session.post(url, headers=headers, json=payload) as resp:
+        return url, headers, payload
+
+    async def _send_anthropic_request(self, provider: AIProvider, request: AIRequest) -> AIResponse:
+        """Send request to Anthropic API."""
+        url, headers, payload = self._build_anthropic_request(provider, request)
+        session = await self._http_pool.get(provider)
+
+        async with session.post(url, headers=headers, json=payload, timeout=self._http_pool.timeout_for(provider)) as resp:
             if resp.status != 200:
-                error_data = await resp.json()
-                raise Exception(f"Anthropic API error: {error_data.get('error', {}).get('message', 'Unknown error')}")
+                raise await self._provider_error(resp, "Anthropic")
 
             data = await resp.json()
 
@@ -538,11 +711,211 @@ class AIProviderService:
                 metadata={"provider": "anthropic"}
             )
 
-    def _check_rate_limits(self, provider: AIProvider) -> bool:
-        """Check if provider is within rate limits (simplified implementation)."""
-        # In a real implementation, this would track actual usage
-        # For now, just return True
-        return True
+    async def stream_request(
+        self,
+        provider_id: UUID,
+        request: AIRequest
+    ) -> AsyncIterator[Union[AIStreamChunk, AIResponse, AIError]]:
+        """
+        Stream a response from an AI provider as it is generated.
+
+        Args:
+            provider_id: The provider to use
+            request: The AI request to send
+
+        Yields:
+            AIStreamChunk for each piece of generated text, followed by exactly one
+            final AIResponse with the complete content and usage, or an AIError
+
+        Raises:
+            ValueError: If provider not found or invalid
+        """
+        provider = self._providers_cache.get(provider_id)
+        if not provider or not provider.is_active:
+            raise ValueError(f"Provider {provider_id} not found or inactive")
+
+        if provider.provider_type == ProviderType.OPENAI:
+            url, headers, payload = self._build_openai_request(provider, request)
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+            parse_event = self._parse_openai_stream_event
+        elif provider.provider_type == ProviderType.ANTHROPIC:
+            url, headers, payload = self._build_anthropic_request(provider, request)
+            payload["stream"] = True
+            parse_event = self._parse_anthropic_stream_event
+        else:
+            yield AIError(
+                type="unsupported_provider",
+                message=f"Provider type {provider.provider_type} not supported"
+            )
+            return
+
+        estimated_tokens = await self._acquire_rate_limit(provider, request)
+        if isinstance(estimated_tokens, AIError):
+            yield estimated_tokens
+            return
+
+        start_time = time.time()
+        state: Dict[str, Any] = {
+            "id": "", "model": request.model, "finish_reason": "stop", "usage": {}
+        }
+        parts: List[str] = []
+        # A client disconnect closes the generator at a yield (GeneratorExit or
+        # CancelledError); the finally block still returns the unused estimate
+        reconciled = False
+
+        try:
+            try:
+                # Streams stay open far longer than a regular request; the provider
+                # timeout bounds the wait for each chunk instead
+                session = await self._http_pool.get(provider)
+                timeout = self._http_pool.timeout_for(provider, total=settings.SSE_TIMEOUT)
+                async with session.post(url, headers=headers, json=payload, timeout=timeout) as resp:
+                    if resp.status != 200:
+                        raise await self._provider_error(resp, provider.provider_type.value)
+
+                    async for event, data in iter_sse_events(resp.content):
+                        if data == "[DONE]":
+                            break
+                        delta = parse_event(event, json.loads(data), state)
+                        if delta:
+                            parts.append(delta)
+                            yield AIStreamChunk(content=delta, index=len(parts) - 1)
+
+            except Exception as e:
+                reconciled = True
+                self._reconcile_rate_limit(provider, request, estimated_tokens, None)
+                response_time = time.time() - start_time
+                self._update_health_status(provider_id, False, response_time, str(e))
+                yield AIError(
+                    type="request_failed",
+                    message=str(e),
+                    metadata={"response_time": response_time, "partial_content": "".join(parts)}
+                )
+                return
+
+            response = AIResponse(
+                id=state["id"],
+                model=state["model"],
+                content="".join(parts),
+                finish_reason=state["finish_reason"] or "stop",
+                usage=state["usage"],
+                metadata={"provider": provider.provider_type.value, "streamed": True}
+            )
+            reconciled = True
+            self._reconcile_rate_limit(provider, request, estimated_tokens, response.usage)
+            response_time = time.time() - start_time
+            self._update_usage_stats(provider_id, response, response_time)
+            self._update_health_status(provider_id, True, response_time)
+            yield response
+        finally:
+            if not reconciled:
+                self._reconcile_rate_limit(provider, request, estimated_tokens, None)
+
+    @staticmethod
+    def _parse_openai_stream_event(event: str, data: Dict[str, Any], state: Dict[str, Any]) -> Optional[str]:
+        """Apply one OpenAI stream chunk to ``state`` and return its text delta."""
+        state["id"] = data.get("id") or state["id"]
+        state["model"] = data.get("model") or state["model"]
+        if data.get("usage"):
+            state["usage"] = data["usage"]
+
+        choices = data.get("choices") or []
+        if not choices:
+            return None
+        choice = choices[0]
+        if choice.get("finish_reason"):
+            state["finish_reason"] = choice["finish_reason"]
+        return (choice.get("delta") or {}).get("content")
+
+    @staticmethod
+    def _parse_anthropic_stream_event(event: str, data: Dict[str, Any], state: Dict[str, Any]) -> Optional[str]:
+        """Apply one Anthropic stream event to ``state`` and return its text delta."""
+        event_type = data.get("type", event)
+        if event_type == "message_start":
+            message = data.get("message", {})
+            state["id"] = message.get("id", state["id"])
+            state["model"] = message.get("model", state["model"])
+            input_tokens = message.get("usage", {}).get("input_tokens", 0)
+            state["usage"] = {"prompt_tokens": input_tokens, "completion_tokens": 0, "total_tokens": input_tokens}
+        elif event_type == "content_block_delta":
+            return data.get("delta", {}).get("text")
+        elif event_type == "message_delta":
+            if data.get("delta", {}).get("stop_reason"):
+                state["finish_reason"] = data["delta"]["stop_reason"]
+            output_tokens = data.get("usage", {}).get("output_tokens")
+            if output_tokens is not None:
+                usage = state["usage"] or {"prompt_tokens": 0}
+                usage["completion_tokens"] = output_tokens
+                usage["total_tokens"] = usage.get("prompt_tokens", 0) + output_tokens
+                state["usage"] = usage
+        elif event_type == "error":
+            raise Exception(f"Anthropic API error: {data.get('error', {}).get('message', 'Unknown error')}")
+        return None
+
+    def _get_rate_limiter(self, provider: AIProvider) -> ProviderRateLimiter:
+        """Get the provider's rate limiter, applying its current limits."""
+        limiter = self._rate_limiters.get(provider.id)
+        if limiter is None:
+            limiter = ProviderRateLimiter(provider.rate_limit_requests, provider.rate_limit_tokens)
+            self._rate_limiters[provider.id] = limiter
+        else:
+            limiter.configure(provider.rate_limit_requests, provider.rate_limit_tokens)
+        return limiter
+
+    async def _acquire_rate_limit(self, provider: AIProvider, request: AIRequest) -> Union[int, AIError]:
+        """
+        Wait in the provider's queue until the request fits its budgets.
+
+        Args:
+            provider: Provider being called
+            request: Request to budget for
+
+        Returns:
+            The estimated token cost charged, or an AIError if the wait would
+            exceed ``settings.RATE_LIMIT_MAX_WAIT``
+        """
+        limiter = self._get_rate_limiter(provider)
+        estimated_tokens = estimate_tokens(request.messages, request.max_tokens)
+        try:
+            await limiter.acquire(estimated_tokens, max_wait=settings.RATE_LIMIT_MAX_WAIT)
+        except asyncio.TimeoutError:
+            return AIError(
+                type="rate_limit_exceeded",
+                message="Rate limit exceeded",
+                retry_after=max(1, math.ceil(limiter.wait_time(estimated_tokens))),
+                metadata={"queue_depth": limiter.queue_depth}
+            )
+        return estimated_tokens
+
+    def _reconcile_rate_limit(self, provider: AIProvider, request: AIRequest, estimated_tokens: int,
+                              usage: Optional[Dict[str, Any]]) -> None:
+        """Correct the token budget with the usage the provider reported."""
+        actual_tokens = usage_tokens(usage) if usage else None
+        if actual_tokens is None:
+            # No usage reported: the reply budget was not spent
+            actual_tokens = max(0, estimated_tokens - (request.max_tokens or 0))
+        self._get_rate_limiter(provider).reconcile(estimated_tokens, actual_tokens)
+
+    def get_rate_limit_stats(self, provider_id: Optional[UUID] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Get rate limiter queue and wait-time metrics.
+
+        Args:
+            provider_id: Optional specific provider ID
+
+        Returns:
+            Metrics for the provider or all providers
+        """
+        if provider_id:
+            provider = self._providers_cache.get(provider_id)
+            if not provider:
+                raise ValueError(f"Provider {provider_id} not found")
+            return {"provider_id": str(provider_id), **self._get_rate_limiter(provider).get_metrics()}
+        return [
+            {"provider_id": str(provider.id), **self._get_rate_limiter(provider).get_metrics()}
+            for provider in self._providers_cache.values()
+        ]
 
     def _update_usage_stats(self, provider_id: UUID, response: AIResponse, response_time: float):
         """Update usage statistics."""
@@ -0,0 +1,333 @@
+"""
+Boolean Query Language
+
+This module parses search box queries with ``AND``, ``OR`` and ``NOT``
+operators, grouping with parentheses, quoted phrases and ``field:value``
+clauses, and evaluates them against sorted postings.
+
+Syntax::
+
+    budget review                 both terms (AND is implied)
+    budget OR forecast            either term
+    NOT draft, -draft             exclude a term
+    (budget OR forecast) -draft   grouping
+    "release notes"               exact phrase
+    type:file tag:"q3 plan"       field clauses (known fields only)
+
+Operators are upper case; lower-case ``or``/``not`` are ordinary words.
+
+Parsed queries are tuples, like trigram queries in ``regex_index``:
+``("term", text)``, ``("phrase", text)``, ``("near", text, distance)``,
+``("field", name, value)``, ``("not", query)`` and ``("and", (...))`` /
+``("or", (...))``.  The planner analyzes the text into index terms, then for
+each conjunction intersects the postings of its terms smallest-first with
+galloping search, stops as soon as nothing is left, and only then checks
+positions, fields and exclusions on the surviving documents.
+"""
+
+import heapq
+import re
+from bisect import bisect_left
+from typing import Callable, Collection, List, Optional, Sequence, Tuple, Union
+
+Query = Union[None, Tuple]
+
+_TOKEN_RE = re.compile(r'\(|\)|[^\s()"]*"[^"]*"?|[^\s()"]+')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when a boolean query cannot be parsed."""
+
+
+def _unquote(text: str) -> str:
+    if text.startswith('"'):
+        text = text[1:]
+        if text.endswith('"'):
+            text = text[:-1]
+    return text
+
+
+class _Parser:
+    """Recursive descent parser over query tokens."""
+
+    def __init__(self, tokens: List[str], fields: Collection[str]):
+        self.tokens = tokens
+        self.fields = fields
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def advance(self) -> str:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse_or(self) -> Query:
+        queries = [self.parse_and()]
+        while self.peek() == "OR":
+            self.advance()
+            queries.append(self.parse_and())
+        return queries[0] if len(queries) == 1 else ("or", tuple(queries))
+
+    def parse_and(self) -> Query:
+        queries = [self.parse_unary()]
+        while self.peek() not in (None, ")", "OR"):
+            if self.peek() == "AND":
+                self.advance()
+            queries.append(self.parse_unary())
+        return queries[0] if len(queries) == 1 else ("and", tuple(queries))
+
+    def parse_unary(self) -> Query:
+        token = self.peek()
+        if token == "NOT":
+            self.advance()
+            return ("not", self.parse_unary())
+        if token is not None and token.startswith("-") and len(token) > 1:
+            self.advance()
+            return ("not", self._atom(token[1:]))
+        return self.parse_primary()
+
+    def parse_primary(self) -> Query:
+        token = self.peek()
+        if token is None:
+            raise QuerySyntaxError("Unexpected end of query")
+        if token == "(":
+            self.advance()
+            query = self.parse_or()
+            if self.peek() != ")":
+                raise QuerySyntaxError("Missing ')'")
+            self.advance()
+            return query
+        if token == ")" or token in _OPERATORS:
+            raise QuerySyntaxError(f"Unexpected '{token}'")
+        return self._atom(self.advance())
+
+    def _atom(self, token: str) -> Query:
+        name, sep, value = token.partition(":")
+        if sep and name.lower() in self.fields and value:
+            return ("field", name.lower(), _unquote(value))
+        if token.startswith('"'):
+            return ("phrase", _unquote(token))
+        return ("term", token)
+
+
+def parse_query(text: str, fields: Collection[str] = ()) -> Query:
+    """
+    Parse a boolean query.
+
+    Args:
+        text: Query text
+        fields: Field names recognized in ``field:value`` clauses; any other
+            ``name:value`` is searched as text
+
+    Returns:
+        The parsed query, or None for an empty query
+
+    Raises:
+        QuerySyntaxError: If the query is malformed
+    """
+    tokens = _TOKEN_RE.findall(text or "")
+    if not tokens:
+        return None
+    parser = _Parser(tokens, fields)
+    query = parser.parse_or()
+    if parser.peek() is not None:
+        raise QuerySyntaxError(f"Unexpected '{parser.peek()}'")
+    return query
+
+
+def _gallop(values: Sequence[str], target: str, lo: int) -> int:
+    """Index of the first value >= target at or after ``lo``, probing 1, 2, 4, ... ahead."""
+    step = 1
+    hi = lo
+    while hi < len(values) and values[hi] < target:
+        lo = hi + 1
+        hi += step
+        step *= 2
+    return bisect_left(values, target, lo, min(hi, len(values)))
+
+
+def intersect_sorted(a: Sequence[str], b: Sequence[str]) -> List[str]:
+    """Intersection of two sorted ID lists, galloping through the longer one."""
+    if len(a) > len(b):
+        a, b = b, a
+    result = []
+    lo = 0
+    for value in a:
+        lo = _gallop(b, value, lo)
+        if lo == len(b):
+            break
+        if b[lo] == value:
+            result.append(value)
+            lo += 1
+    return result
+
+
+def difference_sorted(a: Sequence[str], b: Sequence[str]) -> List[str]:
+    """IDs of sorted list ``a`` that are not in sorted list ``b``."""
+    result = []
+    lo = 0
+    for value in a:
+        lo = _gallop(b, value, lo)
+        if lo < len(b) and b[lo] == value:
+            lo += 1
+        else:
+            result.append(value)
+    return result
+
+
+def union_sorted(lists: Sequence[Sequence[str]]) -> List[str]:
+    """Union of sorted ID lists."""
+    result: List[str] = []
+    for value in heapq.merge(*lists):
+        if not result or result[-1] != value:
+            result.append(value)
+    return result
+
+
+def positive_terms(query: Query) -> List[str]:
+    """Terms of an analyzed query outside ``NOT`` clauses (used for scoring)."""
+    if query is None or query[0] in ("not", "field"):
+        return []
+    if query[0] in ("and", "or"):
+        return [term for part in query[1] for term in positive_terms(part)]
+    return list(query[1])
+
+
+class QueryPlanner:
+    """Analyzes and evaluates boolean queries against sorted postings."""
+
+    def __init__(
+        self,
+        postings: Callable[[str], List[str]],
+        all_documents: Callable[[], List[str]],
+        analyze: Callable[[str], List[str]],
+        positional_filter: Callable[[List[str], Optional[int], List[str]], List[str]],
+        field_filter: Callable[[str, str, List[str]], List[str]],
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            postings: Sorted document IDs containing a term
+            all_documents: Sorted IDs of every document
+            analyze: Splits text into index terms
+            positional_filter: Keeps the documents where terms form a phrase
+                (distance None) or occur within a distance of each other
+            field_filter: Keeps the documents where a field has a value
+        """
+        self._postings = postings
+        self._all_documents = all_documents
+        self._analyze = analyze
+        self._positional_filter = positional_filter
+        self._field_filter = field_filter
+
+    def analyze(self, query: Query) -> Query:
+        """
+        Turn query text into index terms.
+
+        Terms become ``("term", (t,))``, or a phrase if the text analyzes to
+        several terms.  Phrases and proximity clauses carry their term tuple;
+        clauses that analyze to nothing (stop words) are dropped.
+        """
+        if query is None:
+            return None
+        kind = query[0]
+        if kind == "field":
+            return query
+        if kind in ("term", "phrase", "near"):
+            terms = tuple(self._analyze(query[1]))
+            if not terms:
+                return None
+            if kind == "near":
+                return ("near", terms, query[2])
+            if kind == "term" and len(terms) == 1:
+                return ("term", terms)
+            return ("phrase", terms)
+        if kind == "not":
+            inner = self.analyze(query[1])
+            return ("not", inner) if inner is not None else None
+
+        parts = []
+        for part in query[1]:
+            part = self.analyze(part)
+            if part is None:
+                continue
+            if part[0] == kind:
+                parts.extend(part[1])
+            else:
+                parts.append(part)
+        if not parts:
+            return None
+        return parts[0] if len(parts) == 1 else (kind, tuple(parts))
+
+    def execute(self, query: Query) -> List[str]:
+        """
+        Sorted IDs of the documents matching an analyzed query.
+
+        A query made only of exclusions matches nothing.
+        """
+        if not self._is_positive(query):
+            return []
+        return self._evaluate(query, None)
+
+    def _is_positive(self, query: Query) -> bool:
+        if query is None or query[0] == "not":
+            return False
+        if query[0] in ("and", "or"):
+            return any(self._is_positive(part) for part in query[1])
+        return True
+
+    def _evaluate(self, query: Query, within: Optional[List[str]]) -> List[str]:
+        kind = query[0]
+        if kind == "or":
+            return union_sorted([self._evaluate(part, within) for part in query[1]])
+        if kind == "not":
+            base = within if within is not None else self._all_documents()
+            return difference_sorted(base, self._evaluate(query[1], base))
+        parts = query[1] if kind == "and" else (query,)
+        return self._conjunction(parts, within)
+
+    def _conjunction(self, parts: Sequence[Tuple], within: Optional[List[str]]) -> List[str]:
+        """Evaluate ANDed clauses: postings first, then verification, then exclusions."""
+        lists: List[List[str]] = []
+        checks: List[Tuple] = []
+        exclusions: List[Tuple] = []
+        for part in parts:
+            kind = part[0]
+            if kind == "not":
+                exclusions.append(part[1])
+            elif kind == "field":
+                checks.append(part)
+            elif kind == "or":
+                lists.append(self._evaluate(part, within))
+            else:
+                lists.extend(self._postings(term) for term in part[1])
+                if kind != "term":
+                    checks.append(part)
+
+        # Smallest postings first, stopping as soon as nothing is left
+        lists.sort(key=len)
+        docs = within
+        for postings in lists:
+            docs = postings if docs is None else intersect_sorted(docs, postings)
+            if not docs:
+                return []
+        if docs is None:
+            docs = self._all_documents()
+
+        for part in checks:
+            if part[0] == "field":
+                docs = self._field_filter(part[1], part[2], docs)
+            else:
+                docs = self._positional_filter(list(part[1]), part[2] if part[0] == "near" else None, docs)
+            if not docs:
+                return []
+
+        for part in exclusions:
+            docs = difference_sorted(docs, self._evaluate(part, docs))
+            if not docs:
+                return []
+        return docs
@@ -5,132 +5,145 @@ This module provides the business logic for managing chat sessions and messages
 within the AI Chat Assistant backend.
 """
 
-import json
-import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, TypeVar
 from uuid import UUID
 
 from ..models.chat_session import (
-    ChatSession, ChatSessionCreate, ChatSessionUpdate, Message, MessageCreate,
+    ChatSession, ChatSessionCreate, ChatSessionUpdate, Message, MessageCreate, MessagePage,
     ChatSessionSummary, ChatSessionStats, ChatSessionWithMessages
 )
+from .chat_storage import (
+    DEFAULT_SQLITE_FILENAME, MESSAGE_STORAGE_JSON, MESSAGE_STORAGE_JSONL, STORAGE_BACKEND_JSON,
+    STORAGE_BACKEND_SQLITE, ChatSessionStore, JsonChatSessionStore, SqliteChatSessionStore,
+    decode_cursor, encode_cursor
+)
+
+T = TypeVar("T")
 
 
 class ChatSessionService:
     """
     Service for managing chat sessions and their message history.
 
-    Provides CRUD operations for chat sessions, message management,
-    and file-based persistence within project directories.
+    Provides CRUD operations for chat sessions and message management on top
+    of a pluggable storage backend: per-session JSON files within project
+    directories (the default) or a single SQLite database.
+
+    Every public operation has an ``*_async`` counterpart that runs it on a
+    small dedicated thread pool, so request handlers can await disk I/O
+    without blocking the event loop.
     """
 
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", message_storage: str = MESSAGE_STORAGE_JSON,
+                 io_workers: int = 4, storage_backend: str = STORAGE_BACKEND_JSON,
+                 sqlite_path: Optional[str] = None, store: Optional[ChatSessionStore] = None):
         """
         Initialize the chat session service.
 
         Args:
             data_dir: Base directory for storing chat session data
+            message_storage: How the JSON backend writes new messages: "json" rewrites
+                a single messages.json file, "jsonl" appends to an indexed message log.
+                Sessions already stored as a log are always read from the log.
+            io_workers: Threads available to the ``*_async`` methods
+            storage_backend: "json" (default) or "sqlite"
+            sqlite_path: Database file for the SQLite backend (``data_dir/chat_sessions.db`` if omitted)
+            store: Ready-made storage backend, overriding ``storage_backend``
         """
+        if message_storage not in (MESSAGE_STORAGE_JSON, MESSAGE_STORAGE_JSONL):
+            raise ValueError(f"Invalid message storage mode '{message_storage}'")
+        if storage_backend not in (STORAGE_BACKEND_JSON, STORAGE_BACKEND_SQLITE):
+            raise ValueError(f"Invalid storage backend '{storage_backend}'")
+
         self.data_dir = Path(data_dir)
+        self.message_storage = message_storage
         self.sessions_dir = self.data_dir / "chat_sessions"
         self.projects_dir = self.data_dir / "projects"
         self.sessions_dir.mkdir(parents=True, exist_ok=True)
         self.projects_dir.mkdir(parents=True, exist_ok=True)
 
-    def _get_session_dir(self, session_id: UUID, project_id: Optional[str] = None) -> Path:
+        if store is None:
+            if storage_backend == STORAGE_BACKEND_SQLITE:
+                store = SqliteChatSessionStore(Path(sqlite_path) if sqlite_path else self.data_dir / DEFAULT_SQLITE_FILENAME)
+            else:
+                store = JsonChatSessionStore(self.data_dir, message_storage)
+        self.store = store
+
+        self._listeners: List[Callable[..., None]] = []
+        self._executor = ThreadPoolExecutor(max_workers=max(1, io_workers), thread_name_prefix="chat-session-io")
+        # Serializes read-modify-write cycles on the same session across I/O threads
+        self._session_locks: Dict[str, threading.Lock] = {}
+        self._session_locks_guard = threading.Lock()
+
+    async def run_io(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
         """
-        Get the directory path for a specific chat session.
-        
-        If project_id is provided, returns nested path: data/projects/{project_id}/chat_sessions/{session_id}
-        Otherwise returns legacy flat path: data/chat_sessions/{session_id}
+        Run a blocking call on the service's I/O thread pool.
+
+        Args:
+            fn: Blocking callable
+            *args: Positional arguments for ``fn``
+            **kwargs: Keyword arguments for ``fn``
+
+        Returns:
+            Whatever ``fn`` returns
         """
-        if project_id:
-            return self.projects_dir / str(project_id) / "chat_sessions" / str(session_id)
-        return self.sessions_dir / str(session_id)
-
-    def _get_session_metadata_file(self, session_id: UUID, project_id: Optional[str] = None) -> Path:
-        """Get the metadata file path for a specific chat session."""
-        return self._get_session_dir(session_id, project_id) / "metadata.json"
-
-    def _get_messages_file(self, session_id: UUID, project_id: Optional[str] = None) -> Path:
-        """Get the messages file path for a specific chat session."""
-        return self._get_session_dir(session_id, project_id) / "messages.json"
-
-    def _load_session_metadata(self, session_id: UUID, project_id: Optional[str] = None) -> Optional[ChatSession]:
-        """Load session metadata from file."""
-        metadata_file = self._get_session_metadata_file(session_id, project_id)
-        if not metadata_file.exists():
-            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
 
-        try:
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Convert string timestamps back to datetime objects
-                data['created_at'] = datetime.fromisoformat(data['created_at'])
-                data['updated_at'] = datetime.fromisoformat(data['updated_at'])
-                # Convert string UUIDs back to UUID objects
-                data['id'] = UUID(data['id'])
-                # Only convert project_id to UUID if it's not None
-                data['project_id'] = UUID(data['project_id']) if data['project_id'] else None
-                return ChatSession(**data)
-        except (json.JSONDecodeError, KeyError, ValueError):
-            return None
+    def close(self) -> None:
+        """Wait for pending I/O, then release the thread pool and the storage backend."""
+        self._executor.shutdown(wait=True)
+        self.store.close()
 
-    def _save_session_metadata(self, session: ChatSession, project_id: Optional[str] = None) -> None:
-        """Save session metadata to file."""
-        session_dir = self._get_session_dir(session.id, project_id)
-        session_dir.mkdir(parents=True, exist_ok=True)
-
-        metadata_file = self._get_session_metadata_file(session.id, project_id)
-        data = session.model_dump()
-        # Convert datetime objects to ISO format strings and UUIDs to strings
-        data['created_at'] = data['created_at'].isoformat()
-        data['updated_at'] = data['updated_at'].isoformat()
-        data['id'] = str(data['id'])
-        # Only convert project_id to string if it's not None
-        data['project_id'] = str(data['project_id']) if data['project_id'] else None
-
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-
-    def _load_messages(self, session_id: UUID, project_id: Optional[str] = None) -> List[Message]:
-        """Load messages for a session from file."""
-        messages_file = self._get_messages_file(session_id, project_id)
-        if not messages_file.exists():
-            return []
-
-        try:
-            with open(messages_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                messages = []
-                for msg_data in data:
-                    # Convert string timestamps back to datetime objects
-                    msg_data['timestamp'] = datetime.fromisoformat(msg_data['timestamp'])
-                    # Convert string UUIDs back to UUID objects
-                    msg_data['id'] = UUID(msg_data['id'])
-                    messages.append(Message(**msg_data))
-                return messages
-        except (json.JSONDecodeError, KeyError, ValueError):
-            return []
-
-    def _save_messages(self, session_id: UUID, messages: List[Message], project_id: Optional[str] = None) -> None:
-        """Save messages for a session to file."""
-        session_dir = self._get_session_dir(session_id, project_id)
-        session_dir.mkdir(parents=True, exist_ok=True)
-
-        messages_file = self._get_messages_file(session_id, project_id)
-        data = []
-        for msg in messages:
-            msg_data = msg.model_dump()
-            # Convert datetime objects to ISO format strings and UUIDs to strings
-            msg_data['timestamp'] = msg_data['timestamp'].isoformat()
-            msg_data['id'] = str(msg_data['id'])
-            data.append(msg_data)
-
-        with open(messages_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    def _session_lock(self, session_id: UUID) -> threading.Lock:
+        """Get the lock guarding writes to a session."""
+        with self._session_locks_guard:
+            return self._session_locks.setdefault(str(session_id), threading.Lock())
+
+    def add_listener(self, listener: Callable[..., None]) -> None:
+        """
+        Register a callback for session changes.
+
+        The callback is invoked as ``listener(event, session, message=None)`` after
+        the change has been persisted, where ``event`` is one of "session_created",
+        "session_updated", "session_deleted" or "message_added".
+
+        Args:
+            listener: Callback to register
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, session: ChatSession, message: Optional[Message] = None) -> None:
+        """Invoke registered listeners; listener failures never fail the change itself."""
+        for listener in self._listeners:
+            try:
+                listener(event, session, message)
+            except Exception as e:
+                print(f"Error in chat session listener for {event}: {e}")
+
+    def _get_session_dir(self, session_id: UUID, project_id: Optional[str] = None) -> Path:
+        """Get the directory of a session in the JSON storage layout."""
+        return self.store.session_dir(session_id, project_id)
+
+    def rebuild_session_index(self, project_id: UUID) -> int:
+        """
+        Rebuild a project's session index from the session files (JSON backend only).
+
+        Args:
+            project_id: Project whose index to rebuild
+
+        Returns:
+            Number of sessions indexed
+        """
+        if not isinstance(self.store, JsonChatSessionStore):
+            return len(self.store.list_summaries(str(project_id)))
+        return self.store.rebuild_index(str(project_id))
 
     def create_session(self, session_data: ChatSessionCreate) -> ChatSession:
         """
@@ -159,7 +172,8 @@ class ChatSessionService:
             metadata=session_data.metadata or {}
         )
 
-        self._save_session_metadata(session, project_id_str)
+        self.store.save_session(session, project_id_str)
+        self._notify("session_created", session)
         return session
 
     def get_session(self, session_id: UUID, project_id: Optional[str] = None) -> Optional[ChatSession]:
@@ -178,7 +192,7 @@ class ChatSessionService:
             raise ValueError("project_id is required to get a session (per BACKEND_SERVICES_PLAN.md nested structure)")
 
         # Load directly from nested structure
-        return self._load_session_metadata(session_id, project_id)
+        return self.store.load_session(session_id, project_id)
 
     def list_sessions(self, project_id: Optional[UUID] = None, include_inactive: bool = False) -> List[ChatSessionSummary]:
         """
@@ -197,42 +211,11 @@ class ChatSessionService:
         if not project_id:
             raise ValueError("project_id is required to list sessions (per BACKEND_SERVICES_PLAN.md nested structure)")
 
-        summaries = []
-        project_id_str = str(project_id)
-
-        # Only look in nested structure: data/projects/{project_id}/chat_sessions/
-        project_sessions_dir = self.projects_dir / project_id_str / "chat_sessions"
-        if project_sessions_dir.exists():
-            for session_dir in project_sessions_dir.iterdir():
-                if session_dir.is_dir():
-                    try:
-                        session_id = UUID(session_dir.name)
-                        session = self._load_session_metadata(session_id, project_id_str)
-                        if session:
-                            # Apply filters
-                            if not include_inactive and not session.is_active:
-                                continue
-
-                            # Get message count and last message preview
-                            messages = self._load_messages(session_id, project_id_str)
-                            last_message_preview = None
-                            if messages:
-                                last_msg = messages[-1]
-                                last_message_preview = last_msg.content[:100] + "..." if len(last_msg.content) > 100 else last_msg.content
-
-                            summary = ChatSessionSummary(
-                                id=session.id,
-                                project_id=session.project_id,
-                                title=session.title,
-                                created_at=session.created_at,
-                                updated_at=session.updated_at,
-                                is_active=session.is_active,
-                                message_count=len(messages),
-                                last_message_preview=last_message_preview
-                            )
-                            summaries.append(summary)
-                    except (ValueError, OSError):
-                        continue
+        # The store answers from its index instead of reading every session
+        summaries = [
+            summary for summary in self.store.list_summaries(str(project_id))
+            if include_inactive or summary.is_active
+        ]
 
         # Sort by updated_at descending (most recent first)
         summaries.sort(key=lambda s: s.updated_at, reverse=True)
@@ -257,22 +240,24 @@ class ChatSessionService:
         if not project_id:
             raise ValueError("project_id is required to update a session (per BACKEND_SERVICES_PLAN.md nested structure)")
 
-        session = self._load_session_metadata(session_id, project_id)
-        if not session:
-            return None
-
-        # Update fields if provided
-        if update_data.title is not None:
-            session.title = update_data.title
-        if update_data.description is not None:
-            session.description = update_data.description
-        if update_data.is_active is not None:
-            session.is_active = update_data.is_active
-        if update_data.metadata is not None:
-            session.metadata = update_data.metadata
-
-        session.updated_at = datetime.now()
-        self._save_session_metadata(session, project_id)
+        with self._session_lock(session_id):
+            session = self.store.load_session(session_id, project_id)
+            if not session:
+                return None
+
+            # Update fields if provided
+            if update_data.title is not None:
+                session.title = update_data.title
+            if update_data.description is not None:
+                session.description = update_data.description
+            if update_data.is_active is not None:
+                session.is_active = update_data.is_active
+            if update_data.metadata is not None:
+                session.metadata = update_data.metadata
+
+            session.updated_at = datetime.now()
+            self.store.save_session(session, project_id)
+        self._notify("session_updated", session)
         return session
 
     def delete_session(self, session_id: UUID, force: bool = False, project_id: Optional[str] = None) -> bool:
@@ -294,21 +279,21 @@ class ChatSessionService:
         if not project_id:
             raise ValueError("project_id is required to delete a session (per BACKEND_SERVICES_PLAN.md nested structure)")
 
-        session = self._load_session_metadata(session_id, project_id)
-        if not session:
-            return False
+        with self._session_lock(session_id):
+            session = self.store.load_session(session_id, project_id)
+            if not session:
+                return False
 
-        # Check if session has messages and force is not set
-        messages = self._load_messages(session_id, project_id)
-        if messages and not force:
-            raise ValueError(f"Cannot delete session {session_id} with {len(messages)} messages. Use force=True to override.")
+            # Checked under the lock so a message added concurrently is counted
+            message_count = self.store.count_messages(session_id, project_id)
+            if message_count and not force:
+                raise ValueError(f"Cannot delete session {session_id} with {message_count} messages. Use force=True to override.")
 
-        # Delete the session directory
-        session_dir = self._get_session_dir(session_id, project_id)
-        if session_dir.exists():
-            import shutil
-            shutil.rmtree(session_dir)
+            self.store.delete_session(session_id, project_id)
+        with self._session_locks_guard:
+            self._session_locks.pop(str(session_id), None)
 
+        self._notify("session_deleted", session)
         return True
 
     def add_message(self, session_id: UUID, message_data: MessageCreate, project_id: Optional[str] = None) -> Optional[Message]:
@@ -330,7 +315,7 @@ class ChatSessionService:
         if not project_id:
             raise ValueError("project_id is required to add a message (per BACKEND_SERVICES_PLAN.md nested structure)")
 
-        session = self._load_session_metadata(session_id, project_id)
+        session = self.store.load_session(session_id, project_id)
         if not session:
             raise ValueError(f"Chat session {session_id} not found in project {project_id}")
 
@@ -339,22 +324,28 @@ class ChatSessionService:
         if message_data.role not in valid_roles:
             raise ValueError(f"Invalid message role '{message_data.role}'. Must be one of: {valid_roles}")
 
-        # Create the message
-        message = Message(
-            role=message_data.role,
-            content=message_data.content,
-            metadata=message_data.metadata or {}
-        )
-
-        # Load existing messages, add new one, and save
-        messages = self._load_messages(session_id, project_id)
-        messages.append(message)
-        self._save_messages(session_id, messages, project_id)
-
-        # Update session metadata
-        session.message_count = len(messages)
-        session.updated_at = datetime.now()
-        self._save_session_metadata(session, project_id)
+        with self._session_lock(session_id):
+            # Re-read under the lock so concurrent writers don't lose updates
+            session = self.store.load_session(session_id, project_id)
+            if not session:
+                raise ValueError(f"Chat session {session_id} not found in project {project_id}")
+
+            # Created under the lock so timestamps follow append order, which
+            # cursor pagination relies on
+            message = Message(
+                role=message_data.role,
+                content=message_data.content,
+                metadata=message_data.metadata or {}
+            )
+
+            # Persist the new message
+            message_count = self.store.append_message(session_id, message, project_id)
+
+            # Update session metadata
+            session.message_count = message_count
+            session.updated_at = datetime.now()
+            self.store.save_session(session, project_id, last_message=message)
+        self._notify("message_added", session, message)
 
         return message
 
@@ -378,19 +369,82 @@ class ChatSessionService:
         if not project_id:
             raise ValueError("project_id is required to get messages (per BACKEND_SERVICES_PLAN.md nested structure)")
 
-        session = self._load_session_metadata(session_id, project_id)
+        session = self.store.load_session(session_id, project_id)
         if not session:
             raise ValueError(f"Chat session {session_id} not found in project {project_id}")
 
-        messages = self._load_messages(session_id, project_id)
+        # Pagination is applied by the storage layer so append-only logs and
+        # the SQLite backend only read the requested slice
+        return self.store.load_messages(session_id, project_id, offset=offset or 0, limit=limit)
 
-        # Apply pagination
-        if offset > 0:
-            messages = messages[offset:]
-        if limit is not None:
-            messages = messages[:limit]
+    def get_message_page(self, session_id: UUID, limit: int = 50, before: Optional[str] = None,
+                         project_id: Optional[str] = None) -> MessagePage:
+        """
+        Get a page of messages, walking back from the newest message.
 
-        return messages
+        Pages are keyed on (timestamp, message id) rather than an offset, so the
+        storage backend reads only the requested page and pages stay stable
+        while new messages are appended.
+
+        Args:
+            session_id: The session ID to get messages for
+            limit: Maximum number of messages in the page
+            before: Cursor from a previous page's ``next_cursor``; the newest page if omitted
+            project_id: The project ID (REQUIRED per BACKEND_SERVICES_PLAN.md)
+
+        Returns:
+            The page of messages, oldest first
+
+        Raises:
+            ValueError: If session doesn't exist, the cursor is invalid or project_id is missing
+        """
+        if not project_id:
+            raise ValueError("project_id is required to get messages (per BACKEND_SERVICES_PLAN.md nested structure)")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+
+        session = self.store.load_session(session_id, project_id)
+        if not session:
+            raise ValueError(f"Chat session {session_id} not found in project {project_id}")
+
+        key = decode_cursor(before) if before else None
+        # One extra message tells whether an older page exists
+        messages = self.store.load_messages_before(session_id, project_id, key, limit + 1)
+        has_more = len(messages) > limit
+        if has_more:
+            messages = messages[1:]
+        return MessagePage(
+            messages=messages,
+            has_more=has_more,
+            next_cursor=encode_cursor(messages[0]) if has_more else None
+        )
+
+    def get_recent_messages(self, session_id: UUID, limit: Optional[int] = None, project_id: Optional[str] = None) -> List[Message]:
+        """
+        Get the most recent messages of a chat session.
+
+        Args:
+            session_id: The session ID to get messages for
+            limit: Optional number of messages to return, counted back from the newest
+            project_id: The project ID (REQUIRED per BACKEND_SERVICES_PLAN.md)
+
+        Returns:
+            List of messages, oldest first
+
+        Raises:
+            ValueError: If session doesn't exist or project_id is missing
+        """
+        if not project_id:
+            raise ValueError("project_id is required to get messages (per BACKEND_SERVICES_PLAN.md nested structure)")
+
+        session = self.store.load_session(session_id, project_id)
+        if not session:
+            raise ValueError(f"Chat session {session_id} not found in project {project_id}")
+
+        if limit is None:
+            return self.store.load_messages(session_id, project_id)
+        total = self.store.count_messages(session_id, project_id)
+        return self.store.load_messages(session_id, project_id, offset=max(0, total - limit), limit=limit)
 
     def get_session_with_messages(self, session_id: UUID, project_id: Optional[str] = None) -> Optional[ChatSessionWithMessages]:
         """
@@ -410,11 +464,11 @@ class ChatSessionService:
         if not project_id:
             raise ValueError("project_id is required to get session with messages (per BACKEND_SERVICES_PLAN.md nested structure)")
 
-        session = self._load_session_metadata(session_id, project_id)
+        session = self.store.load_session(session_id, project_id)
         if not session:
             return None
 
-        messages = self._load_messages(session_id, project_id)
+        messages = self.store.load_messages(session_id, project_id)
         return ChatSessionWithMessages(session=session, messages=messages)
 
     def get_session_stats(self, project_id: Optional[UUID] = None) -> ChatSessionStats:
@@ -445,4 +499,56 @@ class ChatSessionService:
             total_messages=total_messages,
             average_messages_per_session=average_messages_per_session,
             sessions_by_project={str(project_id): total_sessions}
-        )
\ No newline at end of file
+        )
+
+    async def create_session_async(self, session_data: ChatSessionCreate) -> ChatSession:
+        """Async version of :meth:`create_session`."""
+        return await self.run_io(self.create_session, session_data)
+
+    async def get_session_async(self, session_id: UUID, project_id: Optional[str] = None) -> Optional[ChatSession]:
+        """Async version of :meth:`get_session`."""
+        return await self.run_io(self.get_session, session_id, project_id)
+
+    async def list_sessions_async(self, project_id: Optional[UUID] = None,
+                                  include_inactive: bool = False) -> List[ChatSessionSummary]:
+        """Async version of :meth:`list_sessions`."""
+        return await self.run_io(self.list_sessions, project_id, include_inactive)
+
+    async def update_session_async(self, session_id: UUID, update_data: ChatSessionUpdate,
+                                   project_id: Optional[str] = None) -> Optional[ChatSession]:
+        """Async version of :meth:`update_session`."""
+        return await self.run_io(self.update_session, session_id, update_data, project_id)
+
+    async def delete_session_async(self, session_id: UUID, force: bool = False,
+                                   project_id: Optional[str] = None) -> bool:
+        """Async version of :meth:`delete_session`."""
+        return await self.run_io(self.delete_session, session_id, force, project_id)
+
+    async def add_message_async(self, session_id: UUID, message_data: MessageCreate,
+                                project_id: Optional[str] = None) -> Optional[Message]:
+        """Async version of :meth:`add_message`."""
+        return await self.run_io(self.add_message, session_id, message_data, project_id)
+
+    async def get_messages_async(self, session_id: UUID, limit: Optional[int] = None, offset: int = 0,
+                                 project_id: Optional[str] = None) -> List[Message]:
+        """Async version of :meth:`get_messages`."""
+        return await self.run_io(self.get_messages, session_id, limit, offset, project_id)
+
+    async def get_message_page_async(self, session_id: UUID, limit: int = 50, before: Optional[str] = None,
+                                     project_id: Optional[str] = None) -> MessagePage:
+        """Async version of :meth:`get_message_page`."""
+        return await self.run_io(self.get_message_page, session_id, limit, before, project_id)
+
+    async def get_recent_messages_async(self, session_id: UUID, limit: Optional[int] = None,
+                                        project_id: Optional[str] = None) -> List[Message]:
+        """Async version of :meth:`get_recent_messages`."""
+        return await self.run_io(self.get_recent_messages, session_id, limit, project_id)
+
+    async def get_session_with_messages_async(self, session_id: UUID,
+                                              project_id: Optional[str] = None) -> Optional[ChatSessionWithMessages]:
+        """Async version of :meth:`get_session_with_messages`."""
+        return await self.run_io(self.get_session_with_messages, session_id, project_id)
+
+    async def get_session_stats_async(self, project_id: Optional[UUID] = None) -> ChatSessionStats:
+        """Async version of :meth:`get_session_stats`."""
+        return await self.run_io(self.get_session_stats, project_id)
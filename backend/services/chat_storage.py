@@ -0,0 +1,730 @@
+"""
+Chat Session Storage Backends
+
+This module defines the storage interface behind ChatSessionService and its
+two implementations:
+
+- ``JsonChatSessionStore`` (default) keeps one directory per session under
+  ``data/projects/{project_id}/chat_sessions/{session_id}`` with a
+  ``metadata.json`` file, the messages (``messages.json`` or an append-only
+  log) and a per-project ``index.json`` of session summaries.
+- ``SqliteChatSessionStore`` keeps every session and message in a single
+  SQLite database in WAL mode, with indexes on project, session and
+  timestamp and keyset (position-based) reads of message pages.
+
+The module can also be run as a script to copy the JSON layout into SQLite:
+
+    python -m backend.services.chat_storage --data-dir data
+    python -m backend.services.chat_storage --data-dir data --db data/chat_sessions.db
+"""
+
+import argparse
+import base64
+import bisect
+import json
+import shutil
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from ..models.chat_session import ChatSession, ChatSessionSummary, Message
+from . import durable_write
+from .message_log import MessageLog, migrate_messages_json
+
+# Supported message storage modes of the JSON backend
+MESSAGE_STORAGE_JSON = "json"
+MESSAGE_STORAGE_JSONL = "jsonl"
+
+# Supported storage backends
+STORAGE_BACKEND_JSON = "json"
+STORAGE_BACKEND_SQLITE = "sqlite"
+
+# Per-project file holding a summary of every session, kept current on each write
+SESSION_INDEX_FILE = "index.json"
+
+DEFAULT_SQLITE_FILENAME = "chat_sessions.db"
+
+
+def preview(content: str) -> str:
+    """Shorten message content for a session listing."""
+    return content[:100] + "..." if len(content) > 100 else content
+
+
+# Sort key of a message in history order: (timestamp, message id)
+MessageKey = Tuple[datetime, str]
+
+
+def message_key(message: Message) -> MessageKey:
+    """Return the keyset pagination key of a message."""
+    return message.timestamp, str(message.id)
+
+
+def encode_cursor(message: Message) -> str:
+    """Encode an opaque cursor pointing at a message."""
+    raw = f"{message.timestamp.isoformat(timespec='microseconds')}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> MessageKey:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        timestamp, message_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(timestamp), str(UUID(message_id))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}'") from e
+
+
+class _PositionKeys:
+    """Read-only sequence of message keys by position, computed on access, for bisecting."""
+
+    def __init__(self, length: int, key_at: Callable[[int], MessageKey]):
+        self._length = length
+        self._key_at = key_at
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, position: int) -> MessageKey:
+        return self._key_at(position)
+
+
+def to_summary(session: ChatSession, last_message_preview: Optional[str]) -> ChatSessionSummary:
+    """Build the listing summary of a session."""
+    return ChatSessionSummary(
+        id=session.id,
+        project_id=session.project_id,
+        title=session.title,
+        created_at=session.created_at,
+        updated_at=session.updated_at,
+        is_active=session.is_active,
+        message_count=session.message_count,
+        last_message_preview=last_message_preview
+    )
+
+
+class ChatSessionStore(ABC):
+    """
+    Persistence interface for chat sessions and their messages.
+
+    Implementations must be safe to call from several threads.  Callers
+    serialize writes to the same session; stores only need to keep their own
+    shared structures (such as per-project indexes) consistent.
+    """
+
+    @abstractmethod
+    def load_session(self, session_id: UUID, project_id: str) -> Optional[ChatSession]:
+        """Load a session, or None if it does not exist in the project."""
+
+    @abstractmethod
+    def save_session(self, session: ChatSession, project_id: str, last_message: Optional[Message] = None) -> None:
+        """
+        Create or update a session.
+
+        Args:
+            session: Session to persist
+            project_id: Project owning the session
+            last_message: Newest message when one was just added; otherwise the
+                stored last-message preview is kept
+        """
+
+    @abstractmethod
+    def delete_session(self, session_id: UUID, project_id: str) -> None:
+        """Delete a session and all of its messages."""
+
+    @abstractmethod
+    def list_summaries(self, project_id: str) -> List[ChatSessionSummary]:
+        """Return the summaries of every session in a project, in no particular order."""
+
+    @abstractmethod
+    def append_message(self, session_id: UUID, message: Message, project_id: str) -> int:
+        """
+        Persist a new message at the end of a session.
+
+        Returns:
+            The number of messages in the session after the append
+        """
+
+    @abstractmethod
+    def load_messages(self, session_id: UUID, project_id: str,
+                      offset: int = 0, limit: Optional[int] = None) -> List[Message]:
+        """Load the messages of a session, optionally a slice, oldest first."""
+
+    @abstractmethod
+    def count_messages(self, session_id: UUID, project_id: str) -> int:
+        """Count the messages stored for a session."""
+
+    @abstractmethod
+    def load_messages_before(self, session_id: UUID, project_id: str,
+                             before: Optional[MessageKey], limit: Optional[int]) -> List[Message]:
+        """
+        Load the newest messages that sort strictly before a key.
+
+        Args:
+            session_id: Session to read
+            project_id: Project owning the session
+            before: Key from :func:`decode_cursor`, or None to read from the newest message
+            limit: Maximum number of messages, or None for all
+
+        Returns:
+            Messages oldest first
+        """
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class JsonChatSessionStore(ChatSessionStore):
+    """File-per-session JSON storage (the original on-disk layout)."""
+
+    def __init__(self, data_dir: Path, message_storage: str = MESSAGE_STORAGE_JSON):
+        """
+        Initialize the store.
+
+        Args:
+            data_dir: Base data directory
+            message_storage: How new messages are written: "json" rewrites a single
+                messages.json file, "jsonl" appends to an indexed message log.
+                Sessions already stored as a log are always read from the log.
+        """
+        if message_storage not in (MESSAGE_STORAGE_JSON, MESSAGE_STORAGE_JSONL):
+            raise ValueError(f"Invalid message storage mode '{message_storage}'")
+
+        self.data_dir = Path(data_dir)
+        self.message_storage = message_storage
+        self.sessions_dir = self.data_dir / "chat_sessions"
+        self.projects_dir = self.data_dir / "projects"
+        self._project_locks: Dict[str, threading.Lock] = {}
+        self._project_locks_guard = threading.Lock()
+
+    def _project_lock(self, project_id: str) -> threading.Lock:
+        """Get the lock guarding a project's session index."""
+        with self._project_locks_guard:
+            return self._project_locks.setdefault(str(project_id), threading.Lock())
+
+    def session_dir(self, session_id: UUID, project_id: Optional[str] = None) -> Path:
+        """
+        Get the directory path for a specific chat session.
+
+        If project_id is provided, returns nested path: data/projects/{project_id}/chat_sessions/{session_id}
+        Otherwise returns legacy flat path: data/chat_sessions/{session_id}
+        """
+        if project_id:
+            return self.projects_dir / str(project_id) / "chat_sessions" / str(session_id)
+        return self.sessions_dir / str(session_id)
+
+    def _metadata_file(self, session_id: UUID, project_id: Optional[str] = None) -> Path:
+        """Get the metadata file path for a specific chat session."""
+        return self.session_dir(session_id, project_id) / "metadata.json"
+
+    def _messages_file(self, session_id: UUID, project_id: Optional[str] = None) -> Path:
+        """Get the messages file path for a specific chat session."""
+        return self.session_dir(session_id, project_id) / "messages.json"
+
+    def _message_log(self, session_id: UUID, project_id: Optional[str] = None) -> MessageLog:
+        """Get the append-only message log for a specific chat session."""
+        return MessageLog(self.session_dir(session_id, project_id))
+
+    def index_file(self, project_id: str) -> Path:
+        """Get the session index file path for a project."""
+        return self.projects_dir / str(project_id) / "chat_sessions" / SESSION_INDEX_FILE
+
+    @staticmethod
+    def _message_to_record(message: Message) -> Dict[str, Any]:
+        """Convert a message to its JSON-serializable record."""
+        msg_data = message.model_dump()
+        # Convert datetime objects to ISO format strings and UUIDs to strings
+        msg_data['timestamp'] = msg_data['timestamp'].isoformat()
+        msg_data['id'] = str(msg_data['id'])
+        return msg_data
+
+    @staticmethod
+    def _record_to_message(msg_data: Dict[str, Any]) -> Message:
+        """Convert a stored message record back to a message."""
+        # Convert string timestamps back to datetime objects
+        msg_data['timestamp'] = datetime.fromisoformat(msg_data['timestamp'])
+        # Convert string UUIDs back to UUID objects
+        msg_data['id'] = UUID(msg_data['id'])
+        return Message(**msg_data)
+
+    def load_session(self, session_id: UUID, project_id: Optional[str] = None) -> Optional[ChatSession]:
+        """Load session metadata from file."""
+        metadata_file = self._metadata_file(session_id, project_id)
+        if not metadata_file.exists():
+            return None
+
+        try:
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                # Convert string timestamps back to datetime objects
+                data['created_at'] = datetime.fromisoformat(data['created_at'])
+                data['updated_at'] = datetime.fromisoformat(data['updated_at'])
+                # Convert string UUIDs back to UUID objects
+                data['id'] = UUID(data['id'])
+                # Only convert project_id to UUID if it's not None
+                data['project_id'] = UUID(data['project_id']) if data['project_id'] else None
+                return ChatSession(**data)
+        except (json.JSONDecodeError, KeyError, ValueError):
+            return None
+
+    def _save_metadata(self, session: ChatSession, project_id: Optional[str] = None) -> None:
+        """Save session metadata to file."""
+        session_dir = self.session_dir(session.id, project_id)
+        session_dir.mkdir(parents=True, exist_ok=True)
+
+        data = session.model_dump()
+        # Convert datetime objects to ISO format strings and UUIDs to strings
+        data['created_at'] = data['created_at'].isoformat()
+        data['updated_at'] = data['updated_at'].isoformat()
+        data['id'] = str(data['id'])
+        # Only convert project_id to string if it's not None
+        data['project_id'] = str(data['project_id']) if data['project_id'] else None
+
+        durable_write.write_json(self._metadata_file(session.id, project_id), data)
+
+    def save_session(self, session: ChatSession, project_id: str, last_message: Optional[Message] = None) -> None:
+        """Save session metadata and bring its entry in the project index up to date."""
+        self._save_metadata(session, project_id)
+        with self._project_lock(project_id):
+            index = self._read_index(project_id)
+            previous = index.get(str(session.id), {})
+            last_preview = preview(last_message.content) if last_message else previous.get("last_message_preview")
+            index[str(session.id)] = to_summary(session, last_preview).model_dump(mode="json")
+            self._save_index(project_id, index)
+
+    def delete_session(self, session_id: UUID, project_id: str) -> None:
+        """Delete the session directory and its index entry."""
+        session_dir = self.session_dir(session_id, project_id)
+        if session_dir.exists():
+            shutil.rmtree(session_dir)
+        with self._project_lock(project_id):
+            index = self._read_index(project_id)
+            if index.pop(str(session_id), None) is not None:
+                self._save_index(project_id, index)
+
+    def load_messages(self, session_id: UUID, project_id: Optional[str] = None,
+                      offset: int = 0, limit: Optional[int] = None) -> List[Message]:
+        """Load messages (optionally a slice) for a session from file."""
+        log = self._message_log(session_id, project_id)
+        try:
+            if log.exists():
+                return [self._record_to_message(record) for record in log.read(offset, limit)]
+        except (json.JSONDecodeError, KeyError, ValueError, OSError):
+            return []
+
+        messages_file = self._messages_file(session_id, project_id)
+        if not messages_file.exists():
+            return []
+
+        try:
+            with open(messages_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                if offset > 0:
+                    data = data[offset:]
+                if limit is not None:
+                    data = data[:limit]
+                return [self._record_to_message(msg_data) for msg_data in data]
+        except (json.JSONDecodeError, KeyError, ValueError):
+            return []
+
+    def count_messages(self, session_id: UUID, project_id: Optional[str] = None) -> int:
+        """Count the messages stored for a session."""
+        log = self._message_log(session_id, project_id)
+        if log.exists():
+            return log.count()
+        return len(self.load_messages(session_id, project_id))
+
+    def load_messages_before(self, session_id: UUID, project_id: Optional[str],
+                             before: Optional[MessageKey], limit: Optional[int]) -> List[Message]:
+        """
+        Find the cursor position by bisecting message keys, then read only the page.
+
+        Messages are appended in timestamp order, so positions are sorted by
+        key.  With an append-only log each probe reads a single line.
+        """
+        log = self._message_log(session_id, project_id)
+        try:
+            if log.exists():
+                messages = None
+                total = log.count()
+                key_at = lambda i: message_key(self._record_to_message(log.read(i, 1)[0]))
+            else:
+                messages = self.load_messages(session_id, project_id)
+                total = len(messages)
+                key_at = lambda i: message_key(messages[i])
+
+            end = total if before is None else bisect.bisect_left(_PositionKeys(total, key_at), before)
+            start = 0 if limit is None else max(0, end - limit)
+            if messages is not None:
+                return messages[start:end]
+            return self.load_messages(session_id, project_id, offset=start, limit=end - start)
+        except (json.JSONDecodeError, KeyError, ValueError, OSError):
+            return []
+
+    def _save_messages(self, session_id: UUID, messages: List[Message], project_id: Optional[str] = None) -> None:
+        """Save messages for a session to file."""
+        session_dir = self.session_dir(session_id, project_id)
+        session_dir.mkdir(parents=True, exist_ok=True)
+
+        records = [self._message_to_record(msg) for msg in messages]
+
+        log = self._message_log(session_id, project_id)
+        if log.exists():
+            log.rewrite(records)
+            return
+
+        durable_write.write_json(self._messages_file(session_id, project_id), records)
+
+    def append_message(self, session_id: UUID, message: Message, project_id: Optional[str] = None) -> int:
+        """
+        Persist a single new message.
+
+        Returns:
+            The number of messages in the session after the append
+        """
+        log = self._message_log(session_id, project_id)
+        if self.message_storage == MESSAGE_STORAGE_JSONL or log.exists():
+            # One-time upgrade of sessions written before the log was enabled
+            migrate_messages_json(log.session_dir)
+            return log.append(self._message_to_record(message)) + 1
+
+        messages = self.load_messages(session_id, project_id)
+        messages.append(message)
+        self._save_messages(session_id, messages, project_id)
+        return len(messages)
+
+    def _save_index(self, project_id: str, index: Dict[str, Dict[str, Any]]) -> None:
+        """Write a project's session index atomically."""
+        index_file = self.index_file(project_id)
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        durable_write.write_json(index_file, index, indent=None)
+
+    def _scan_index(self, project_id: str) -> Dict[str, Dict[str, Any]]:
+        """Build a project's session index by reading every session on disk."""
+        index: Dict[str, Dict[str, Any]] = {}
+        for session in self.iter_sessions(project_id):
+            message_count = self.count_messages(session.id, project_id)
+            last_preview = None
+            if message_count:
+                last_messages = self.load_messages(session.id, project_id, offset=message_count - 1)
+                last_preview = preview(last_messages[-1].content) if last_messages else None
+            session.message_count = message_count
+            index[str(session.id)] = to_summary(session, last_preview).model_dump(mode="json")
+        return index
+
+    def _read_index(self, project_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Load a project's session index, rebuilding it from disk if it is missing or unreadable.
+
+        The caller holds the project lock.
+        """
+        index_file = self.index_file(project_id)
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        index = self._scan_index(project_id)
+        if index_file.parent.exists():
+            self._save_index(project_id, index)
+        return index
+
+    def rebuild_index(self, project_id: str) -> int:
+        """
+        Rebuild a project's session index from the session files.
+
+        Returns:
+            Number of sessions indexed
+        """
+        with self._project_lock(project_id):
+            index = self._scan_index(project_id)
+            self._save_index(project_id, index)
+        return len(index)
+
+    def list_summaries(self, project_id: str) -> List[ChatSessionSummary]:
+        """Return the project's session summaries from its index file."""
+        with self._project_lock(project_id):
+            index = self._read_index(project_id)
+
+        summaries = []
+        for entry in index.values():
+            try:
+                summaries.append(ChatSessionSummary(**entry))
+            except ValueError:
+                continue
+        return summaries
+
+    def iter_sessions(self, project_id: str) -> Iterator[ChatSession]:
+        """Yield every readable session stored for a project."""
+        project_sessions_dir = self.projects_dir / str(project_id) / "chat_sessions"
+        if not project_sessions_dir.exists():
+            return
+        for session_dir in project_sessions_dir.iterdir():
+            if not session_dir.is_dir():
+                continue
+            try:
+                session = self.load_session(UUID(session_dir.name), project_id)
+            except (ValueError, OSError):
+                continue
+            if session:
+                yield session
+
+    def iter_project_ids(self) -> Iterator[str]:
+        """Yield the id of every project with a chat session directory."""
+        if not self.projects_dir.exists():
+            return
+        for project_dir in self.projects_dir.iterdir():
+            if (project_dir / "chat_sessions").is_dir():
+                yield project_dir.name
+
+
+class SqliteChatSessionStore(ChatSessionStore):
+    """
+    Single-database SQLite storage in WAL mode.
+
+    Each thread gets its own connection so readers never wait on the writer.
+    Messages carry their position within the session, so a page of messages
+    is a range scan on the ``(session_id, position)`` primary key rather than
+    an ``OFFSET`` that walks every earlier row.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            project_id TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            last_message_preview TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_project_updated ON sessions (project_id, updated_at);
+        CREATE TABLE IF NOT EXISTS messages (
+            session_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            id TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (session_id, position)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_messages_session_timestamp ON messages (session_id, timestamp, id);
+    """
+
+    def __init__(self, db_path: Path, busy_timeout: float = 5.0):
+        """
+        Initialize the store and create the schema if needed.
+
+        Args:
+            db_path: Path of the SQLite database file
+            busy_timeout: Seconds a writer waits for a lock held by another connection
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close every connection opened by the store."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    @staticmethod
+    def _timestamp(message: Message) -> str:
+        """Fixed-width timestamp so text order matches time order."""
+        return message.timestamp.isoformat(timespec="microseconds")
+
+    @staticmethod
+    def _to_message(row: Tuple[str]) -> Message:
+        return Message.model_validate_json(row[0])
+
+    def load_session(self, session_id: UUID, project_id: str) -> Optional[ChatSession]:
+        """Load a session row."""
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE id = ? AND project_id = ?", (str(session_id), str(project_id))
+        ).fetchone()
+        return ChatSession.model_validate_json(row[0]) if row else None
+
+    def save_session(self, session: ChatSession, project_id: str, last_message: Optional[Message] = None) -> None:
+        """Insert or update a session row."""
+        last_preview = preview(last_message.content) if last_message else None
+        with self._connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO sessions (id, project_id, updated_at, message_count, last_message_preview, data)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    project_id = excluded.project_id,
+                    updated_at = excluded.updated_at,
+                    message_count = excluded.message_count,
+                    last_message_preview = COALESCE(excluded.last_message_preview, sessions.last_message_preview),
+                    data = excluded.data
+                """,
+                (str(session.id), str(project_id), session.updated_at.isoformat(), session.message_count,
+                 last_preview, session.model_dump_json())
+            )
+
+    def delete_session(self, session_id: UUID, project_id: str) -> None:
+        """Delete a session row and its messages in one transaction."""
+        with self._connection() as conn:
+            deleted = conn.execute(
+                "DELETE FROM sessions WHERE id = ? AND project_id = ?", (str(session_id), str(project_id))
+            ).rowcount
+            if deleted:
+                conn.execute("DELETE FROM messages WHERE session_id = ?", (str(session_id),))
+
+    def list_summaries(self, project_id: str) -> List[ChatSessionSummary]:
+        """Return the project's session summaries with one indexed query."""
+        rows = self._connection().execute(
+            "SELECT data, last_message_preview FROM sessions WHERE project_id = ? ORDER BY updated_at DESC",
+            (str(project_id),)
+        ).fetchall()
+        return [to_summary(ChatSession.model_validate_json(data), last_preview) for data, last_preview in rows]
+
+    def append_message(self, session_id: UUID, message: Message, project_id: str) -> int:
+        """Insert a message after the session's last position."""
+        conn = self._connection()
+        with conn:
+            # Take the write lock before reading the last position
+            conn.execute("BEGIN IMMEDIATE")
+            position = conn.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM messages WHERE session_id = ?", (str(session_id),)
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO messages (session_id, position, id, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+                (str(session_id), position, str(message.id), self._timestamp(message), message.model_dump_json())
+            )
+        return position + 1
+
+    def load_messages(self, session_id: UUID, project_id: str,
+                      offset: int = 0, limit: Optional[int] = None) -> List[Message]:
+        """Read a page of messages as a range scan from position ``offset``."""
+        rows = self._connection().execute(
+            "SELECT data FROM messages WHERE session_id = ? AND position >= ? ORDER BY position LIMIT ?",
+            (str(session_id), max(0, offset), -1 if limit is None else limit)
+        ).fetchall()
+        return [self._to_message(row) for row in rows]
+
+    def count_messages(self, session_id: UUID, project_id: str) -> int:
+        """Count messages from the highest stored position."""
+        return self._connection().execute(
+            "SELECT COALESCE(MAX(position) + 1, 0) FROM messages WHERE session_id = ?", (str(session_id),)
+        ).fetchone()[0]
+
+    def load_messages_before(self, session_id: UUID, project_id: str,
+                             before: Optional[MessageKey], limit: Optional[int]) -> List[Message]:
+        """Read a page as a descending range scan on the (session_id, timestamp, id) index."""
+        query = "SELECT data FROM messages WHERE session_id = ?"
+        params: List[Any] = [str(session_id)]
+        if before is not None:
+            query += " AND (timestamp, id) < (?, ?)"
+            params += [before[0].isoformat(timespec="microseconds"), before[1]]
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        rows = self._connection().execute(query, params).fetchall()
+        return [self._to_message(row) for row in reversed(rows)]
+
+    def import_session(self, session: ChatSession, project_id: str, messages: List[Message]) -> bool:
+        """
+        Copy a session and its messages into the database in one transaction.
+
+        Returns:
+            False if the session was already present
+        """
+        last_preview = preview(messages[-1].content) if messages else None
+        session.message_count = len(messages)
+        with self._connection() as conn:
+            inserted = conn.execute(
+                """
+                INSERT OR IGNORE INTO sessions (id, project_id, updated_at, message_count, last_message_preview, data)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (str(session.id), str(project_id), session.updated_at.isoformat(), session.message_count,
+                 last_preview, session.model_dump_json())
+            ).rowcount
+            if not inserted:
+                return False
+            conn.executemany(
+                "INSERT INTO messages (session_id, position, id, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+                [(str(session.id), position, str(message.id), self._timestamp(message), message.model_dump_json())
+                 for position, message in enumerate(messages)]
+            )
+        return True
+
+
+def migrate_json_to_sqlite(data_dir: Path, db_path: Optional[Path] = None) -> Tuple[int, int]:
+    """
+    Copy every chat session in the JSON layout into an SQLite database.
+
+    Sessions already present in the database are skipped, so the migration
+    can be re-run safely.  The JSON files are left untouched.
+
+    Args:
+        data_dir: Base data directory of the JSON layout
+        db_path: Database to fill (defaults to ``data_dir/chat_sessions.db``)
+
+    Returns:
+        Tuple of (sessions migrated, sessions skipped)
+    """
+    data_dir = Path(data_dir)
+    source = JsonChatSessionStore(data_dir)
+    target = SqliteChatSessionStore(db_path or data_dir / DEFAULT_SQLITE_FILENAME)
+    migrated = skipped = 0
+    try:
+        for project_id in source.iter_project_ids():
+            for session in source.iter_sessions(project_id):
+                messages = source.load_messages(session.id, project_id)
+                if target.import_session(session, project_id, messages):
+                    migrated += 1
+                else:
+                    skipped += 1
+    finally:
+        target.close()
+    return migrated, skipped
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Migrate chat sessions from the JSON layout into SQLite."""
+    parser = argparse.ArgumentParser(description="Copy chat sessions from JSON files into an SQLite database")
+    parser.add_argument("--data-dir", default="data", help="Base data directory (default: data)")
+    parser.add_argument("--db", default=None, help=f"SQLite database path (default: <data-dir>/{DEFAULT_SQLITE_FILENAME})")
+    args = parser.parse_args(argv)
+
+    try:
+        migrated, skipped = migrate_json_to_sqlite(Path(args.data_dir), Path(args.db) if args.db else None)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error migrating chat sessions: {e}")
+        return 1
+
+    print(f"Migrated {migrated} session(s), skipped {skipped} already present")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+"""
+Context Builder
+
+This module assembles the message list sent to an AI model under a token
+budget.  History is added from the most recent message backward until the
+model's context window, less the room reserved for the reply, is full.
+
+Tokens are counted with ``tiktoken`` when it is installed and estimated from
+character counts otherwise.  Counts are cached in each message's metadata
+(``token_count`` / ``token_counter``) when messages are stored, so history
+is not re-tokenized on every turn.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency
+    tiktoken = None
+
+# Roughly four characters per token for English text
+CHARS_PER_TOKEN = 4
+# Tokens added per message for role and formatting
+MESSAGE_OVERHEAD = 4
+# Context window assumed for models without a known AIModel entry
+DEFAULT_CONTEXT_WINDOW = 8192
+
+
+def format_summary(summary: str) -> Dict[str, Any]:
+    """System message carrying the summary of earlier conversation."""
+    return {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken, or estimates them from character counts."""
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        """
+        Initialize the counter.
+
+        Args:
+            encoding_name: tiktoken encoding to use when tiktoken is available
+        """
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.get_encoding(encoding_name)
+            except Exception:
+                self._encoding = None
+        self.name = encoding_name if self._encoding is not None else "chars"
+
+    def count(self, text: str) -> int:
+        """Count the tokens in a piece of text."""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    def metadata(self, text: str) -> Dict[str, Any]:
+        """Metadata entries caching the token count of a message's content."""
+        return {"token_count": self.count(text), "token_counter": self.name}
+
+
+class ContextBuilder:
+    """Builds token-budgeted message lists for AI requests."""
+
+    def __init__(self, counter: Optional[TokenCounter] = None, cache_size: int = 10000):
+        """
+        Initialize the builder.
+
+        Args:
+            counter: Token counter to use (a default counter if omitted)
+            cache_size: Number of per-message counts kept for messages stored
+                without a cached count
+        """
+        self.counter = counter or TokenCounter()
+        self.cache_size = cache_size
+        self._counts: "OrderedDict[Any, int]" = OrderedDict()
+
+    def message_tokens(self, message: Any) -> int:
+        """
+        Count the tokens a stored message adds to a request.
+
+        Uses the count cached in the message's metadata when it was made by the
+        same counter, then the in-memory cache, and tokenizes only as a last resort.
+
+        Args:
+            message: Stored chat message
+
+        Returns:
+            Token count including per-message overhead
+        """
+        metadata = message.metadata if isinstance(message.metadata, dict) else {}
+        if metadata.get("token_counter") == self.counter.name and isinstance(metadata.get("token_count"), int):
+            return metadata["token_count"] + MESSAGE_OVERHEAD
+
+        key = (message.id, len(message.content))
+        count = self._counts.get(key)
+        if count is None:
+            count = self.counter.count(message.content)
+            self._counts[key] = count
+            if len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+        else:
+            self._counts.move_to_end(key)
+        return count + MESSAGE_OVERHEAD
+
+    def build(
+        self,
+        history: List[Any],
+        user_message: str,
+        system_prompt: Optional[str] = None,
+        context_window: Optional[int] = None,
+        reserve_tokens: int = 0,
+        summary: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Assemble the messages for a request within the model's context window.
+
+        Args:
+            history: Stored messages, oldest first
+            user_message: The new user message
+            system_prompt: System prompt to put first, if any
+            context_window: Model context window in tokens
+            reserve_tokens: Tokens kept free for the reply (the request's max_tokens)
+            summary: Summary of earlier history, sent as a system message
+
+        Returns:
+            Messages in AI API format: system prompt, summary, the most recent
+            history that fits, then the user message
+        """
+        budget = (context_window or DEFAULT_CONTEXT_WINDOW) - reserve_tokens
+        budget -= self.counter.count(user_message) + MESSAGE_OVERHEAD
+        if system_prompt:
+            budget -= self.counter.count(system_prompt) + MESSAGE_OVERHEAD
+        summary_message = format_summary(summary) if summary else None
+        if summary_message:
+            budget -= self.counter.count(summary_message["content"]) + MESSAGE_OVERHEAD
+
+        included: List[Dict[str, Any]] = []
+        for message in reversed(history):
+            budget -= self.message_tokens(message)
+            if budget < 0:
+                break
+            included.append({"role": message.role, "content": message.content})
+        included.reverse()
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        if summary_message:
+            messages.append(summary_message)
+        messages.extend(included)
+        messages.append({"role": "user", "content": user_message})
+        return messages
@@ -0,0 +1,225 @@
+"""
+Conversation Context Cache
+
+This module keeps conversation contexts in a bounded LRU cache that loads
+contexts from disk on first access, so startup cost and memory no longer grow
+with every conversation ever held.  The cache also maintains running totals
+(messages, tokens, cost, ...) over all known conversations, including those
+not currently in memory, so statistics never need to visit every context.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+
+from ..models.conversation import ConversationContext
+
+# (message_count, tokens_input, tokens_output, cost, provider key, model, last active day)
+Contribution = Tuple[int, int, int, float, Optional[str], Optional[str], Optional[str]]
+
+
+def contribution(context: ConversationContext) -> Contribution:
+    """Return what one context adds to the conversation totals."""
+    return (
+        context.message_count,
+        context.total_tokens_input,
+        context.total_tokens_output,
+        context.total_cost,
+        str(context.preferred_provider_id) if context.preferred_provider_id else None,
+        context.preferred_model,
+        context.last_message_at.date().isoformat() if context.last_message_at else None,
+    )
+
+
+class ConversationTotals:
+    """Running totals over every known conversation context."""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the totals.
+
+        Args:
+            data: Totals previously returned by ``to_dict`` (empty if omitted)
+        """
+        data = data or {}
+        self.conversations: int = data.get("conversations", 0)
+        self.messages: int = data.get("messages", 0)
+        self.tokens_input: int = data.get("tokens_input", 0)
+        self.tokens_output: int = data.get("tokens_output", 0)
+        self.cost: float = data.get("cost", 0.0)
+        self.by_provider: Dict[str, int] = dict(data.get("by_provider", {}))
+        self.messages_by_model: Dict[str, int] = dict(data.get("messages_by_model", {}))
+        # Conversations per day of their last message, for the active count
+        self.by_last_day: Dict[str, int] = dict(data.get("by_last_day", {}))
+        self._lock = threading.Lock()
+
+    def apply(self, item: Contribution, sign: int = 1) -> None:
+        """Add (sign=1) or remove (sign=-1) one context's contribution."""
+        messages, tokens_input, tokens_output, cost, provider, model, last_day = item
+        with self._lock:
+            self.conversations += sign
+            self.messages += sign * messages
+            self.tokens_input += sign * tokens_input
+            self.tokens_output += sign * tokens_output
+            self.cost += sign * cost
+            for counts, key, amount in (
+                (self.by_provider, provider, 1),
+                (self.messages_by_model, model, messages),
+                (self.by_last_day, last_day, 1),
+            ):
+                if key is None:
+                    continue
+                counts[key] = counts.get(key, 0) + sign * amount
+                if counts[key] == 0:
+                    del counts[key]
+
+    def active(self, days: int = 30, now: Optional[datetime] = None) -> int:
+        """Number of conversations with a message in the last ``days`` days."""
+        cutoff = ((now or datetime.now()) - timedelta(days=days)).date()
+        with self._lock:
+            days_active = list(self.by_last_day.items())
+        return sum(n for day, n in days_active if date.fromisoformat(day) > cutoff)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the totals in a JSON-serializable form."""
+        with self._lock:
+            return {
+                "conversations": self.conversations,
+                "messages": self.messages,
+                "tokens_input": self.tokens_input,
+                "tokens_output": self.tokens_output,
+                "cost": self.cost,
+                "by_provider": dict(self.by_provider),
+                "messages_by_model": dict(self.messages_by_model),
+                "by_last_day": dict(self.by_last_day),
+            }
+
+
+class ContextCache(MutableMapping):
+    """
+    Bounded LRU mapping of session ID to conversation context.
+
+    Lookups that miss memory fall through to ``load``; assigning or deleting
+    a context updates ``totals``.  Iteration and ``len`` cover only the
+    contexts currently in memory, and ``clear`` evicts them without touching
+    the totals.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[UUID], Optional[ConversationContext]],
+        max_size: int = 1000,
+        totals: Optional[ConversationTotals] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            load: Returns the stored context for a session, or None
+            max_size: Most contexts kept in memory
+            totals: Totals for contexts already stored (empty if omitted)
+        """
+        self.load = load
+        self.max_size = max_size
+        self.totals = totals or ConversationTotals()
+        self._entries: "OrderedDict[UUID, ConversationContext]" = OrderedDict()
+        # What each cached context last contributed to the totals
+        self._contributions: Dict[UUID, Contribution] = {}
+        # Contributions of recently evicted contexts (bounded like the cache)
+        self._retired: "OrderedDict[UUID, Contribution]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getitem__(self, session_id: UUID) -> ConversationContext:
+        with self._lock:
+            context = self._entries.get(session_id)
+            if context is not None:
+                self.hits += 1
+                self._entries.move_to_end(session_id)
+                return context
+            self.misses += 1
+            context = self.load(session_id)
+            if context is None:
+                raise KeyError(session_id)
+            accounted = self._retired.pop(session_id, None)
+            self._insert(session_id, context, accounted if accounted is not None else contribution(context))
+            return context
+
+    def __setitem__(self, session_id: UUID, context: ConversationContext) -> None:
+        with self._lock:
+            previous = self._accounted(session_id)
+            if previous is not None:
+                self.totals.apply(previous, -1)
+            current = contribution(context)
+            self.totals.apply(current)
+            self._insert(session_id, context, current)
+
+    def __delitem__(self, session_id: UUID) -> None:
+        with self._lock:
+            if session_id not in self._entries:
+                self[session_id]
+            del self._entries[session_id]
+            self.totals.apply(self._contributions.pop(session_id), -1)
+
+    def __iter__(self) -> Iterator[UUID]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Evict every context from memory; stored contexts and totals are kept."""
+        with self._lock:
+            for session_id in list(self._entries):
+                self._evict(session_id)
+
+    def refresh(self, context: ConversationContext) -> None:
+        """Fold changes made to a context in place into the totals."""
+        with self._lock:
+            if context.session_id not in self._entries:
+                self[context.session_id] = context
+                return
+            current = contribution(context)
+            previous = self._contributions[context.session_id]
+            if previous != current:
+                self.totals.apply(previous, -1)
+                self.totals.apply(current)
+                self._contributions[context.session_id] = current
+
+    def _accounted(self, session_id: UUID) -> Optional[Contribution]:
+        """What a session currently contributes to the totals, if anything."""
+        if session_id in self._contributions:
+            return self._contributions[session_id]
+        if session_id in self._retired:
+            return self._retired.pop(session_id)
+        stored = self.load(session_id)
+        return contribution(stored) if stored is not None else None
+
+    def _insert(self, session_id: UUID, context: ConversationContext, accounted: Contribution) -> None:
+        """Cache a context, evicting the least recently used beyond ``max_size``."""
+        self._entries[session_id] = context
+        self._entries.move_to_end(session_id)
+        self._contributions[session_id] = accounted
+        while len(self._entries) > self.max_size:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, session_id: UUID) -> None:
+        """
+        Drop a context from memory.
+
+        Its contribution is remembered for a while: the caller that evicted it
+        may still be changing the context and refresh it afterwards.
+        """
+        del self._entries[session_id]
+        self._retired[session_id] = self._contributions.pop(session_id)
+        while len(self._retired) > self.max_size:
+            self._retired.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return cache size, capacity, hits and misses."""
+        return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
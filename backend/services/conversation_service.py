@@ -5,10 +5,13 @@ This module provides the business logic for managing conversations between
 users and AI providers within chat sessions.
 """
 
+import asyncio
+import contextlib
+import json
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Union
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
 from uuid import UUID
 
 from ..models.conversation import (
@@ -21,10 +24,17 @@ from ..models.conversation import (
     ConversationSettings,
     ConversationError
 )
-from ..models.chat_session import Message, MessageCreate
-from ..models.ai_provider import AIRequest, AIResponse, AIError
+from ..models.chat_session import ChatSession, Message, MessageCreate
+from ..models.ai_provider import AIRequest, AIResponse, AIError, AIStreamChunk
 from ..services.chat_session_service import ChatSessionService
 from ..services.ai_provider_service import AIProviderService
+from ..services import durable_write
+from ..services.context_builder import ContextBuilder
+from ..services.context_cache import ContextCache, ConversationTotals
+from ..services.conversation_summarizer import ConversationSummarizer
+from ..services.provider_router import Candidate, ProviderRouter
+from ..services.settings_service import SettingsService
+from ..services.write_behind import WriteBehindBuffer
 
 
 class ConversationService:
@@ -36,32 +46,90 @@ class ConversationService:
     AI communication.
     """
 
-    def __init__(self, data_dir: Path = Path("data")):
+    def __init__(
+        self,
+        data_dir: Path = Path("data"),
+        chat_session_service: Optional[ChatSessionService] = None,
+        ai_provider_service: Optional[AIProviderService] = None,
+        settings_service: Optional[SettingsService] = None,
+        context_flush_interval: float = 1.0,
+        max_dirty_contexts: int = 100,
+        context_cache_size: int = 1000
+    ):
         """
         Initialize the conversation service.
 
         Args:
             data_dir: Directory for storing conversation data
+            chat_session_service: Shared chat session service (built from data_dir if omitted)
+            ai_provider_service: Shared AI provider service (built from data_dir if omitted)
+            settings_service: Settings service supplying provider priorities (optional)
+            context_flush_interval: Longest a context update waits before it is
+                written to disk (seconds); 0 writes every update immediately
+            max_dirty_contexts: Unwritten contexts that trigger an early flush
+            context_cache_size: Most conversation contexts kept in memory
         """
         self.data_dir = data_dir
         self.conversations_dir = data_dir / "conversations"
         self.conversations_dir.mkdir(parents=True, exist_ok=True)
 
         # Initialize dependent services
-        self.chat_session_service = ChatSessionService(data_dir)
-        self.ai_provider_service = AIProviderService(data_dir)
+        self.chat_session_service = chat_session_service or ChatSessionService(data_dir)
+        self.ai_provider_service = ai_provider_service or AIProviderService(data_dir)
+        self.settings_service = settings_service
+
+        # Failover ordering, latency tracking and hedging across providers
+        self._router = ProviderRouter()
+
+        # Token-budgeted history assembly
+        self._context_builder = ContextBuilder()
+
+        # Rolling summaries of history that no longer fits the context window
+        self._summarizer = ConversationSummarizer(
+            self.conversations_dir / "summaries", self._context_builder.counter,
+            cache_size=context_cache_size
+        )
+        self._summary_backlog: Dict[UUID, Tuple[Optional[str], int]] = {}
+        self._summary_tasks: Dict[UUID, asyncio.Task] = {}
+        self.chat_session_service.add_listener(self._on_chat_session_event)
 
-        # In-memory caches
-        self._context_cache: Dict[UUID, ConversationContext] = {}
         self._settings = ConversationSettings()
 
-        # Load existing conversation contexts
-        self._load_conversation_contexts()
+        # Context updates are written behind, in batches, instead of per exchange
+        self._context_writer = WriteBehindBuffer(
+            self._persist,
+            interval=context_flush_interval,
+            max_pending=max_dirty_contexts,
+            name="conversation-contexts"
+        )
+
+        # Contexts are loaded on first use into a bounded LRU cache; running
+        # totals over all of them are kept on disk next to the contexts
+        self.context_cache_size = context_cache_size
+        self._contexts = ContextCache(
+            self._load_conversation_context, context_cache_size, self._load_totals()
+        )
+
+    @property
+    def _context_cache(self) -> ContextCache:
+        """Conversation contexts by session ID (loaded on demand)."""
+        return self._contexts
+
+    @_context_cache.setter
+    def _context_cache(self, contexts: Dict[UUID, ConversationContext]) -> None:
+        """Replace every known context, recomputing the totals from ``contexts``."""
+        self._contexts = ContextCache(self._load_conversation_context, self.context_cache_size)
+        for session_id, context in contexts.items():
+            self._contexts[session_id] = context
 
     def _get_conversation_file(self, session_id: UUID) -> Path:
         """Get the file path for a conversation's context."""
         return self.conversations_dir / f"{session_id}.json"
 
+    def _get_totals_file(self) -> Path:
+        """Get the file path for the running conversation totals."""
+        return self.conversations_dir / "totals.json"
+
     def _find_session_project_id(self, session_id: UUID) -> Optional[str]:
         """
         Find a session and return its project_id.
@@ -77,22 +145,57 @@ class ConversationService:
         # For now, rely on the flat structure fallback in ChatSessionService
         return None
 
-    def _load_conversation_contexts(self):
-        """Load all conversation contexts from disk."""
-        if self.conversations_dir.exists():
-            for context_file in self.conversations_dir.glob("*.json"):
-                try:
-                    import json
-                    with open(context_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        # Convert string UUIDs and timestamps
-                        data['session_id'] = UUID(data['session_id'])
-                        if data.get('last_message_at'):
-                            data['last_message_at'] = datetime.fromisoformat(data['last_message_at'])
-                        context = ConversationContext(**data)
-                        self._context_cache[context.session_id] = context
-                except (json.JSONDecodeError, OSError, ValueError):
-                    continue
+    def _read_conversation_context(self, context_file: Path) -> Optional[ConversationContext]:
+        """Read a conversation context file, or None if it is missing or unreadable."""
+        try:
+            with open(context_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # Convert string UUIDs and timestamps
+            data['session_id'] = UUID(data['session_id'])
+            if data.get('last_message_at'):
+                data['last_message_at'] = datetime.fromisoformat(data['last_message_at'])
+            return ConversationContext(**data)
+        except (json.JSONDecodeError, OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _load_conversation_context(self, session_id: UUID) -> Optional[ConversationContext]:
+        """Load one context, preferring an update that has not been written yet."""
+        pending = self._context_writer.get(session_id)
+        if pending is not None:
+            return pending
+        return self._read_conversation_context(self._get_conversation_file(session_id))
+
+    def _load_totals(self) -> ConversationTotals:
+        """
+        Load the running totals over all stored contexts.
+
+        Data written before totals were kept has no totals file; it is built
+        once from the context files and saved.
+        """
+        try:
+            with open(self._get_totals_file(), 'r', encoding='utf-8') as f:
+                return ConversationTotals(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, OSError, ValueError) as e:
+            print(f"Error loading conversation totals, rebuilding: {e}")
+
+        totals = ConversationTotals()
+        contexts = ContextCache(lambda session_id: None, max_size=0, totals=totals)
+        for context_file in self.conversations_dir.glob("*.json"):
+            context = self._read_conversation_context(context_file)
+            if context is not None:
+                contexts[context.session_id] = context
+        if totals.conversations:
+            durable_write.write_json(self._get_totals_file(), totals.to_dict())
+        return totals
+
+    def _persist(self, item: Union[ConversationContext, ConversationTotals]) -> None:
+        """Write one buffered update: a context or the running totals."""
+        if isinstance(item, ConversationTotals):
+            durable_write.write_json(self._get_totals_file(), item.to_dict())
+        else:
+            self._save_conversation_context(item)
 
     def _save_conversation_context(self, context: ConversationContext):
         """Save a conversation context to disk."""
@@ -103,9 +206,22 @@ class ConversationService:
         if data.get('last_message_at'):
             data['last_message_at'] = data['last_message_at'].isoformat()
 
-        import json
-        with open(context_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        durable_write.write_json(context_file, data)
+
+    def _mark_context_dirty(self, context: ConversationContext) -> None:
+        """Update the totals for a changed context and schedule both to be written."""
+        self._contexts.refresh(context)
+        self._context_writer.mark_dirty(context.session_id, context)
+        self._context_writer.mark_dirty("totals", self._contexts.totals)
+
+    def flush_contexts(self) -> int:
+        """
+        Write every changed conversation context to disk now.
+
+        Returns:
+            Number of contexts written
+        """
+        return self._context_writer.flush()
 
     def _get_or_create_context(self, session_id: UUID) -> ConversationContext:
         """Get existing context or create new one for a session."""
@@ -121,7 +237,7 @@ class ConversationService:
                 message_count=session.message_count
             )
             self._context_cache[session_id] = context
-            self._save_conversation_context(context)
+            self._mark_context_dirty(context)
 
         return self._context_cache[session_id]
 
@@ -131,49 +247,119 @@ class ConversationService:
         user_message: str,
         include_history: bool = True,
         max_history_messages: Optional[int] = None,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Prepare messages for AI request including history and system prompt.
 
+        History is filled from the most recent message backward until the
+        model's context window, less ``max_tokens`` for the reply, is used up.
+
         Args:
             session_id: Chat session ID
             user_message: The user's message
             include_history: Whether to include conversation history
             max_history_messages: Maximum number of history messages to include
             system_prompt: System prompt to use
+            model: Model the request is for (sets the context window)
+            max_tokens: Tokens to reserve for the reply
 
         Returns:
             List of messages in AI API format
         """
-        messages = []
-
-        # Add system prompt if provided
         effective_system_prompt = system_prompt or self._settings.default_system_prompt
-        if effective_system_prompt:
-            messages.append({"role": "system", "content": effective_system_prompt})
+        summarize = include_history and self._settings.enable_summarization
 
-        # Add conversation history if requested
+        history_messages: List[Message] = []
+        summary = None
         if include_history:
             # Find project_id for the session
             project_id = self._find_session_project_id(session_id)
-            history_messages = self.chat_session_service.get_messages(
+            limit = max_history_messages or self._settings.max_history_messages
+            history_messages = self.chat_session_service.get_recent_messages(
                 session_id,
-                limit=max_history_messages or self._settings.max_history_messages,
+                limit=limit,
                 project_id=project_id
             )
 
-            for msg in history_messages:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
+            if summarize:
+                # Absolute position of the first history message in the session
+                total = len(history_messages)
+                if total >= limit:
+                    session = self.chat_session_service.get_session(session_id, project_id)
+                    total = max(total, session.message_count if session else 0)
+                first_index = total - len(history_messages)
+
+                # Messages already folded into the summary are not repeated
+                summary = self._summarizer.get(session_id)
+                covered = summary.covered_count if summary else 0
+                if covered > first_index:
+                    history_messages = history_messages[covered - first_index:]
+
+        summary_text = summary.content if summary and summary.content else None
+        messages = self._context_builder.build(
+            history_messages,
+            user_message,
+            system_prompt=effective_system_prompt,
+            context_window=self._get_context_window(model),
+            reserve_tokens=max_tokens or self._settings.default_max_tokens,
+            summary=summary_text
+        )
 
-        # Add the current user message
-        messages.append({"role": "user", "content": user_message})
+        if summarize:
+            included = len(messages) - 1 - bool(effective_system_prompt) - bool(summary_text)
+            window_start = total - included
+            if window_start > covered:
+                # Evicted messages are not summarized yet.  Summarize half the
+                # window beyond them too, so the next few turns need no update.
+                self._summary_backlog[session_id] = (project_id, window_start + included // 2)
+            else:
+                self._summary_backlog.pop(session_id, None)
 
         return messages
 
+    def _schedule_summary_update(self, session_id: UUID, provider_id: UUID, model: str) -> None:
+        """Extend the session's summary in the background if messages fell out of the window."""
+        backlog = self._summary_backlog.pop(session_id, None)
+        if not backlog or session_id in self._summary_tasks:
+            return
+        project_id, upto = backlog
+        task = asyncio.create_task(self._update_summary(session_id, project_id, upto, provider_id, model))
+        self._summary_tasks[session_id] = task
+        task.add_done_callback(lambda _: self._summary_tasks.pop(session_id, None))
+
+    async def _update_summary(
+        self,
+        session_id: UUID,
+        project_id: Optional[str],
+        upto: int,
+        provider_id: UUID,
+        model: str
+    ) -> None:
+        """Fold messages up to position ``upto`` into the session's summary."""
+        try:
+            summary = self._summarizer.get(session_id)
+            covered = summary.covered_count if summary else 0
+            if upto <= covered:
+                return
+            messages = self.chat_session_service.get_messages(
+                session_id, limit=upto - covered, offset=covered, project_id=project_id
+            )
+            await self._summarizer.extend(session_id, messages, self.ai_provider_service, provider_id, model)
+        except Exception as e:
+            print(f"ERROR: Could not update summary for session {session_id}: {e}")
+
+    def _get_context_window(self, model: Optional[str]) -> Optional[int]:
+        """Return the context window of a known model, or None."""
+        if not model:
+            return None
+        for m in self.ai_provider_service.get_available_models():
+            if m.id == model:
+                return m.context_window
+        return None
+
     def _select_provider_and_model(
         self,
         context: ConversationContext,
@@ -217,6 +403,232 @@ class ConversationService:
 
         return provider_id, model
 
+    def _provider_priorities(self) -> Dict[str, Any]:
+        """Map lower-cased provider names to their APIProviderSettings."""
+        if not self.settings_service:
+            return {}
+        return {
+            p.provider_name.lower(): p
+            for p in self.settings_service.get_default_settings().api_providers
+        }
+
+    def _model_for_provider(self, provider_type: Any, model: str, requested_model: Optional[str]) -> Optional[str]:
+        """Pick the model to use when failing over to a provider of another type."""
+        model_ids = [m.id for m in self.ai_provider_service.get_available_models(provider_type)]
+        if model in model_ids:
+            return model
+        if requested_model or not model_ids:
+            # An explicitly requested model cannot be swapped for another
+            return None
+        return model_ids[0]
+
+    def _route_candidates(
+        self,
+        provider_id: UUID,
+        model: str,
+        request: ConversationRequest
+    ) -> List[Candidate]:
+        """
+        Build the ordered list of providers to try for a request.
+
+        The selected provider is joined by every other active provider that
+        serves a suitable model, unless the request named a provider or
+        failover is disabled.  Candidates are ranked by health, configured
+        priority and observed latency.
+
+        Args:
+            provider_id: Provider chosen by _select_provider_and_model
+            model: Model chosen by _select_provider_and_model
+            request: The conversation request
+
+        Returns:
+            Ordered (provider_id, model) candidates, starting with the best
+        """
+        if request.provider_id or not self._settings.enable_failover:
+            return [(provider_id, model)]
+
+        provider_settings = self._provider_priorities()
+        candidates: List[Candidate] = [(provider_id, model)]
+        priority: Dict[UUID, int] = {}
+        for provider in self.ai_provider_service.list_providers(include_inactive=False):
+            configured = (provider_settings.get(provider.name.lower())
+                          or provider_settings.get(provider.provider_type.value))
+            if configured:
+                priority[provider.id] = configured.priority
+            if provider.id == provider_id or (configured and not configured.enabled):
+                continue
+            fallback_model = self._model_for_provider(provider.provider_type, model, request.model)
+            if fallback_model:
+                candidates.append((provider.id, fallback_model))
+
+        if len(candidates) == 1:
+            return candidates
+
+        health = {
+            candidate_id: self.ai_provider_service.get_health_status(candidate_id).status
+            for candidate_id, _ in candidates
+        }
+        return self._router.rank(candidates, health, priority, preferred=provider_id)
+
+    def _prepare_exchange(
+        self,
+        request: ConversationRequest
+    ) -> Union[ConversationError, Tuple[Optional[str], ConversationContext, List[Candidate], AIRequest]]:
+        """
+        Validate a conversation request and build the AI request for it.
+
+        Args:
+            request: Conversation request with message and settings
+
+        Returns:
+            Tuple of (project_id, context, candidates, ai_request), where
+            candidates are the ranked (provider_id, model) pairs to try, or a
+            ConversationError if the session does not exist
+        """
+        # Validate session exists
+        session = self.chat_session_service.get_session(request.session_id)
+        if not session:
+            return ConversationError(
+                type="session_not_found",
+                message=f"Chat session {request.session_id} not found",
+                session_id=request.session_id
+            )
+
+        # Get project_id for nested structure
+        project_id = str(session.project_id) if session.project_id else None
+
+        # Get or create conversation context
+        context = self._get_or_create_context(request.session_id)
+
+        # Select provider and model
+        provider_id, model = self._select_provider_and_model(
+            context,
+            request.model,
+            request.provider_id
+        )
+
+        # Prepare messages for AI request
+        messages = self._prepare_conversation_messages(
+            request.session_id,
+            request.message,
+            request.include_history,
+            request.max_history_messages,
+            request.system_prompt,
+            model=model,
+            max_tokens=request.max_tokens or self._settings.default_max_tokens
+        )
+
+        # Create AI request
+        ai_request = AIRequest(
+            model=model,
+            messages=messages,
+            max_tokens=request.max_tokens or self._settings.default_max_tokens,
+            temperature=request.temperature or self._settings.default_temperature
+        )
+
+        candidates = self._route_candidates(provider_id, model, request)
+
+        return project_id, context, candidates, ai_request
+
+    def _handle_ai_error(
+        self,
+        request: ConversationRequest,
+        context: ConversationContext,
+        provider_id: UUID,
+        ai_error: AIError
+    ) -> ConversationError:
+        """Record a failed exchange on the context and convert the provider error."""
+        context.last_message_at = datetime.now()
+        self._mark_context_dirty(context)
+
+        return ConversationError(
+            type=ai_error.type,
+            message=ai_error.message,
+            session_id=request.session_id,
+            provider_id=provider_id,
+            retry_after=ai_error.retry_after,
+            metadata=ai_error.metadata
+        )
+
+    def _record_exchange(
+        self,
+        request: ConversationRequest,
+        project_id: Optional[str],
+        context: ConversationContext,
+        provider_id: UUID,
+        ai_response: AIResponse
+    ) -> ConversationResponse:
+        """
+        Persist the user message and AI reply and update the conversation context.
+
+        Args:
+            request: The original conversation request
+            project_id: Project owning the chat session
+            context: Conversation context to update
+            provider_id: Provider that produced the reply
+            ai_response: The complete AI reply
+
+        Returns:
+            Conversation response for the exchange
+        """
+        # Create user message in chat session
+        user_message_data = MessageCreate(
+            role="user",
+            content=request.message,
+            metadata={"conversation": True, **self._context_builder.counter.metadata(request.message)}
+        )
+        user_message = self.chat_session_service.add_message(request.session_id, user_message_data, project_id)
+
+        # Create AI response message in chat session
+        ai_message_data = MessageCreate(
+            role="assistant",
+            content=ai_response.content,
+            metadata={
+                "conversation": True,
+                "model": ai_response.model,
+                "provider_id": str(provider_id),
+                "usage": ai_response.usage,
+                "finish_reason": ai_response.finish_reason,
+                **self._context_builder.counter.metadata(ai_response.content)
+            }
+        )
+        ai_message = self.chat_session_service.add_message(request.session_id, ai_message_data, project_id)
+
+        # Update conversation context
+        context.message_count += 2  # user + assistant
+        context.last_message_at = datetime.now()
+        context.total_tokens_input += ai_response.usage.get("prompt_tokens", 0)
+        context.total_tokens_output += ai_response.usage.get("completion_tokens", 0)
+
+        # Calculate cost (simplified)
+        if self._settings.enable_cost_tracking:
+            model_info = None
+            for m in self.ai_provider_service.get_available_models():
+                if m.id == ai_response.model:
+                    model_info = m
+                    break
+
+            if model_info:
+                input_cost = (ai_response.usage.get("prompt_tokens", 0) / 1000) * model_info.input_pricing
+                output_cost = (ai_response.usage.get("completion_tokens", 0) / 1000) * model_info.output_pricing
+                context.total_cost += input_cost + output_cost
+
+        self._mark_context_dirty(context)
+
+        # Create conversation response
+        return ConversationResponse(
+            session_id=request.session_id,
+            user_message_id=user_message.id,
+            ai_message_id=ai_message.id,
+            content=ai_response.content,
+            model=ai_response.model,
+            provider_id=provider_id,
+            usage=ai_response.usage,
+            finish_reason=ai_response.finish_reason,
+            created_at=ai_response.created_at,
+            conversation_context=context
+        )
+
     async def send_message(self, request: ConversationRequest) -> Union[ConversationResponse, ConversationError]:
         """
         Send a message in a conversation and get AI response.
@@ -228,125 +640,98 @@ class ConversationService:
             Conversation response or error
         """
         try:
-            # Validate session exists
-            session = self.chat_session_service.get_session(request.session_id)
-            if not session:
-                return ConversationError(
-                    type="session_not_found",
-                    message=f"Chat session {request.session_id} not found",
-                    session_id=request.session_id
+            prepared = self._prepare_exchange(request)
+            if isinstance(prepared, ConversationError):
+                return prepared
+            project_id, context, candidates, ai_request = prepared
+
+            async def send(provider_id: UUID, model: str) -> Union[AIResponse, AIError]:
+                return await self.ai_provider_service.send_request(
+                    provider_id, ai_request.model_copy(update={"model": model})
                 )
 
-            # Get project_id for nested structure
-            project_id = str(session.project_id) if session.project_id else None
+            # Send request to AI provider, failing over (or hedging) across candidates
+            provider_id, ai_response = await self._router.execute(
+                candidates, send, hedge=self._settings.enable_hedging
+            )
 
-            # Get or create conversation context
-            context = self._get_or_create_context(request.session_id)
+            if isinstance(ai_response, AIError):
+                return self._handle_ai_error(request, context, provider_id, ai_response)
 
-            # Select provider and model
-            provider_id, model = self._select_provider_and_model(
-                context,
-                request.model,
-                request.provider_id
+            # Persist off the event loop; disk writes must not stall other requests
+            response = await asyncio.to_thread(
+                self._record_exchange, request, project_id, context, provider_id, ai_response
             )
+            self._schedule_summary_update(request.session_id, provider_id, dict(candidates)[provider_id])
+            return response
 
-            # Prepare messages for AI request
-            messages = self._prepare_conversation_messages(
-                request.session_id,
-                request.message,
-                request.include_history,
-                request.max_history_messages,
-                request.system_prompt
+        except Exception as e:
+            return ConversationError(
+                type="internal_error",
+                message=f"Internal error: {str(e)}",
+                session_id=request.session_id
             )
 
-            # Create AI request
-            ai_request = AIRequest(
-                model=model,
-                messages=messages,
-                max_tokens=request.max_tokens or self._settings.default_max_tokens,
-                temperature=request.temperature or self._settings.default_temperature
-            )
+    async def stream_message(
+        self,
+        request: ConversationRequest
+    ) -> AsyncIterator[Union[AIStreamChunk, ConversationResponse, ConversationError]]:
+        """
+        Send a message and stream the AI response as it is generated.
 
-            # Send request to AI provider
-            start_time = time.time()
-            ai_response = await self.ai_provider_service.send_request(provider_id, ai_request)
+        Both messages are persisted once, after the provider finishes the reply.
+        A provider that fails before sending any text is replaced by the next
+        routing candidate.
 
-            if isinstance(ai_response, AIError):
-                # Update context with error
-                context.last_message_at = datetime.now()
-                self._save_conversation_context(context)
-
-                return ConversationError(
-                    type=ai_response.type,
-                    message=ai_response.message,
-                    session_id=request.session_id,
-                    provider_id=provider_id,
-                    retry_after=ai_response.retry_after,
-                    metadata=ai_response.metadata
-                )
+        Args:
+            request: Conversation request with message and settings
 
-            # Create user message in chat session
-            user_message_data = MessageCreate(
-                role="user",
-                content=request.message,
-                metadata={"conversation": True}
-            )
-            user_message = self.chat_session_service.add_message(request.session_id, user_message_data, project_id)
-
-            # Create AI response message in chat session
-            ai_message_data = MessageCreate(
-                role="assistant",
-                content=ai_response.content,
-                metadata={
-                    "conversation": True,
-                    "model": ai_response.model,
-                    "provider_id": str(provider_id),
-                    "usage": ai_response.usage,
-                    "finish_reason": ai_response.finish_reason
-                }
-            )
-            ai_message = self.chat_session_service.add_message(request.session_id, ai_message_data, project_id)
-
-            # Update conversation context
-            response_time = time.time() - start_time
-            context.message_count += 2  # user + assistant
-            context.last_message_at = datetime.now()
-            context.total_tokens_input += ai_response.usage.get("prompt_tokens", 0)
-            context.total_tokens_output += ai_response.usage.get("completion_tokens", 0)
-
-            # Calculate cost (simplified)
-            if self._settings.enable_cost_tracking:
-                model_info = None
-                for m in self.ai_provider_service.get_available_models():
-                    if m.id == ai_response.model:
-                        model_info = m
-                        break
-
-                if model_info:
-                    input_cost = (ai_response.usage.get("prompt_tokens", 0) / 1000) * model_info.input_pricing
-                    output_cost = (ai_response.usage.get("completion_tokens", 0) / 1000) * model_info.output_pricing
-                    context.total_cost += input_cost + output_cost
-
-            self._save_conversation_context(context)
-
-            # Create conversation response
-            conversation_response = ConversationResponse(
-                session_id=request.session_id,
-                user_message_id=user_message.id,
-                ai_message_id=ai_message.id,
-                content=ai_response.content,
-                model=ai_response.model,
-                provider_id=provider_id,
-                usage=ai_response.usage,
-                finish_reason=ai_response.finish_reason,
-                created_at=ai_response.created_at,
-                conversation_context=context
+        Yields:
+            AIStreamChunk for each piece of generated text, then a final
+            ConversationResponse, or a ConversationError
+        """
+        try:
+            prepared = self._prepare_exchange(request)
+            if isinstance(prepared, ConversationError):
+                yield prepared
+                return
+            project_id, context, candidates, ai_request = prepared
+
+            for position, (provider_id, model) in enumerate(candidates):
+                streamed = False
+                provider_request = ai_request.model_copy(update={"model": model})
+                # Close each attempt's stream as soon as it is left, so failing over
+                # releases its connection and rate-limit reservation right away
+                async with contextlib.aclosing(
+                    self.ai_provider_service.stream_request(provider_id, provider_request)
+                ) as stream:
+                    async for item in stream:
+                        if isinstance(item, AIStreamChunk):
+                            streamed = True
+                            yield item
+                        elif isinstance(item, AIError):
+                            # Fail over only while nothing has reached the client
+                            if not streamed and position + 1 < len(candidates):
+                                break
+                            yield self._handle_ai_error(request, context, provider_id, item)
+                            return
+                        else:
+                            response = await asyncio.to_thread(
+                                self._record_exchange, request, project_id, context, provider_id, item
+                            )
+                            self._schedule_summary_update(request.session_id, provider_id, model)
+                            yield response
+                            return
+
+            # Every stream ended without a final response or error
+            yield ConversationError(
+                type="stream_incomplete",
+                message="The AI provider stream ended without a response",
+                session_id=request.session_id
             )
 
-            return conversation_response
-
         except Exception as e:
-            return ConversationError(
+            yield ConversationError(
                 type="internal_error",
                 message=f"Internal error: {str(e)}",
                 session_id=request.session_id
@@ -356,15 +741,21 @@ class ConversationService:
         self,
         session_id: UUID,
         limit: Optional[int] = None,
-        offset: Optional[int] = None
+        offset: Optional[int] = None,
+        before: Optional[str] = None
     ) -> ConversationHistory:
         """
         Get the conversation history for a session.
 
+        Passing ``before`` switches from offset paging to cursor paging: the
+        page holds the ``limit`` messages preceding the cursor (the newest
+        messages for an empty cursor) and ``next_cursor`` continues further back.
+
         Args:
             session_id: Chat session ID
             limit: Maximum number of messages to return
-            offset: Number of messages to skip
+            offset: Number of messages to skip (ignored with ``before``)
+            before: Cursor from a previous ``next_cursor``, or "" for the newest page
 
         Returns:
             Conversation history
@@ -376,12 +767,22 @@ class ConversationService:
         project_id = self._find_session_project_id(session_id)
 
         # Get messages from chat session service
-        messages = self.chat_session_service.get_messages(
-            session_id,
-            limit=limit,
-            offset=offset,
-            project_id=project_id
-        )
+        page = None
+        if before is not None:
+            page = self.chat_session_service.get_message_page(
+                session_id,
+                limit=limit or self._settings.max_history_messages,
+                before=before or None,
+                project_id=project_id
+            )
+            messages = page.messages
+        else:
+            messages = self.chat_session_service.get_messages(
+                session_id,
+                limit=limit,
+                offset=offset,
+                project_id=project_id
+            )
 
         # Convert to conversation messages
         conversation_messages = []
@@ -408,14 +809,18 @@ class ConversationService:
         # Check if there are more messages
         session = self.chat_session_service.get_session(session_id, project_id)
         total_messages = session.message_count if session else 0
-        has_more = (offset or 0) + len(messages) < total_messages
+        if page is not None:
+            has_more = page.has_more
+        else:
+            has_more = (offset or 0) + len(messages) < total_messages
 
         return ConversationHistory(
             session_id=session_id,
             context=context,
             messages=conversation_messages,
             total_messages=total_messages,
-            has_more=has_more
+            has_more=has_more,
+            next_cursor=page.next_cursor if page is not None else None
         )
 
     def update_conversation_settings(self, settings: ConversationSettings):
@@ -443,42 +848,38 @@ class ConversationService:
         Returns:
             Conversation statistics
         """
-        total_conversations = len(self._context_cache)
-        active_conversations = sum(1 for ctx in self._context_cache.values()
-                                 if ctx.last_message_at and
-                                 (datetime.now() - ctx.last_message_at).days < 30)  # Active in last 30 days
-
-        total_messages = sum(ctx.message_count for ctx in self._context_cache.values())
-        total_tokens_input = sum(ctx.total_tokens_input for ctx in self._context_cache.values())
-        total_tokens_output = sum(ctx.total_tokens_output for ctx in self._context_cache.values())
-        total_cost = sum(ctx.total_cost for ctx in self._context_cache.values())
+        # Read from running totals; contexts themselves are loaded lazily
+        totals = self._contexts.totals.to_dict()
 
         # Calculate average response time (simplified - would need to track individual response times)
         average_response_time = 2.0  # placeholder
 
-        conversations_by_provider = {}
-        messages_by_model = {}
-
-        for ctx in self._context_cache.values():
-            if ctx.preferred_provider_id:
-                provider_key = str(ctx.preferred_provider_id)
-                conversations_by_provider[provider_key] = conversations_by_provider.get(provider_key, 0) + 1
-
-            if ctx.preferred_model:
-                messages_by_model[ctx.preferred_model] = messages_by_model.get(ctx.preferred_model, 0) + ctx.message_count
-
         return ConversationStats(
-            total_conversations=total_conversations,
-            active_conversations=active_conversations,
-            total_messages=total_messages,
-            total_tokens_input=total_tokens_input,
-            total_tokens_output=total_tokens_output,
-            total_cost=total_cost,
+            total_conversations=totals["conversations"],
+            active_conversations=self._contexts.totals.active(days=30),  # Active in last 30 days
+            total_messages=totals["messages"],
+            total_tokens_input=totals["tokens_input"],
+            total_tokens_output=totals["tokens_output"],
+            total_cost=totals["cost"],
             average_response_time=average_response_time,
-            conversations_by_provider=conversations_by_provider,
-            messages_by_model=messages_by_model
+            conversations_by_provider=totals["by_provider"],
+            messages_by_model=totals["messages_by_model"]
         )
 
+    def _drop_summary(self, session_id: UUID) -> None:
+        """Delete a session's summary and cancel any update still running for it."""
+        self._summarizer.delete(session_id)
+        self._summary_backlog.pop(session_id, None)
+        task = self._summary_tasks.get(session_id)
+        if task and not task.done():
+            # Listeners may run on a worker thread, so cancel via the task's loop
+            task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def _on_chat_session_event(self, event: str, session: ChatSession, message: Optional[Message] = None) -> None:
+        """Drop the summary of a deleted chat session."""
+        if event == "session_deleted":
+            self._drop_summary(session.id)
+
     def clear_conversation_context(self, session_id: UUID) -> bool:
         """
         Clear the conversation context for a session.
@@ -489,8 +890,12 @@ class ConversationService:
         Returns:
             True if cleared, False if not found
         """
+        self._drop_summary(session_id)
+
         if session_id in self._context_cache:
             del self._context_cache[session_id]
+            self._context_writer.discard(session_id)
+            self._context_writer.mark_dirty("totals", self._contexts.totals)
 
             # Remove from disk
             context_file = self._get_conversation_file(session_id)
@@ -498,4 +903,13 @@ class ConversationService:
                 context_file.unlink()
 
             return True
-        return False
\ No newline at end of file
+        return False
+
+    async def close(self) -> None:
+        """Cancel background summary updates and write out pending contexts."""
+        tasks = list(self._summary_tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.to_thread(self._context_writer.close)
@@ -0,0 +1,215 @@
+"""
+Conversation Summarizer
+
+This module maintains a rolling summary of the part of a conversation that
+no longer fits the model's context window.  The summary covers a prefix of
+the session's messages and is extended incrementally: each update folds the
+newly evicted messages into the previous summary with one bounded request
+to the conversation's AI provider, so the prompt for a long session stays
+at roughly "summary + recent window" no matter how many turns it has.
+
+Summaries are stored as JSON in ``conversations/summaries`` next to the
+conversation contexts; recently used ones are kept in a bounded LRU cache.
+"""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from ..models.ai_provider import AIError, AIRequest
+from ..models.chat_session import Message
+from ..models.conversation import ConversationSummary
+from .ai_provider_service import AIProviderService
+from .context_builder import TokenCounter
+from . import durable_write
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an AI assistant. "
+    "Merge the new messages into the existing summary. Keep facts, decisions, names, open "
+    "questions and user preferences; drop pleasantries. Reply with the updated summary only."
+)
+
+
+class ConversationSummarizer:
+    """Stores and incrementally extends per-session conversation summaries."""
+
+    def __init__(
+        self,
+        summaries_dir: Path,
+        counter: Optional[TokenCounter] = None,
+        summary_max_tokens: int = 512,
+        chunk_tokens: int = 3000,
+        cache_size: int = 1000
+    ):
+        """
+        Initialize the summarizer.
+
+        Args:
+            summaries_dir: Directory holding summary files
+            counter: Token counter for summaries and chunking
+            summary_max_tokens: Upper bound on the length of a summary
+            chunk_tokens: Maximum message tokens folded in by a single request
+            cache_size: Most summaries kept in memory
+        """
+        self.summaries_dir = Path(summaries_dir)
+        self.summaries_dir.mkdir(parents=True, exist_ok=True)
+        self.counter = counter or TokenCounter()
+        self.summary_max_tokens = summary_max_tokens
+        self.chunk_tokens = chunk_tokens
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[UUID, Optional[ConversationSummary]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Extends in flight, revoked by delete(); the file lock orders a
+        # revocation check and its write against the file's removal
+        self._writers: Dict[UUID, object] = {}
+        self._file_lock = threading.Lock()
+
+    def _get_summary_file(self, session_id: UUID) -> Path:
+        """Get the file path for a session's summary."""
+        return self.summaries_dir / f"{session_id}.json"
+
+    def get(self, session_id: UUID) -> Optional[ConversationSummary]:
+        """
+        Get the stored summary for a session.
+
+        Args:
+            session_id: Chat session ID
+
+        Returns:
+            The summary, or None if nothing has been summarized yet
+        """
+        with self._lock:
+            if session_id in self._cache:
+                self._cache.move_to_end(session_id)
+                return self._cache[session_id]
+
+        summary = None
+        summary_file = self._get_summary_file(session_id)
+        if summary_file.exists():
+            try:
+                with open(summary_file, 'r', encoding='utf-8') as f:
+                    summary = ConversationSummary(**json.load(f))
+            except (json.JSONDecodeError, OSError, ValueError):
+                summary = None
+        self._remember(session_id, summary)
+        return summary
+
+    def _remember(self, session_id: UUID, summary: Optional[ConversationSummary]) -> None:
+        """Cache a summary, evicting the least recently used beyond ``cache_size``."""
+        with self._lock:
+            self._cache[session_id] = summary
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _save(self, summary: ConversationSummary) -> None:
+        """Save a summary to disk."""
+        self._remember(summary.session_id, summary)
+        durable_write.write_json(self._get_summary_file(summary.session_id), summary.model_dump(mode="json"))
+
+    def _save_if_current(self, summary: ConversationSummary, writer: object) -> bool:
+        """Save a summary unless the session was deleted since ``writer`` started."""
+        with self._file_lock:
+            with self._lock:
+                if self._writers.get(summary.session_id) is not writer:
+                    return False
+            self._save(summary)
+        return True
+
+    def delete(self, session_id: UUID) -> None:
+        """Remove a session's summary; an extend in flight for it stops saving."""
+        with self._file_lock:
+            with self._lock:
+                self._cache.pop(session_id, None)
+                self._writers.pop(session_id, None)
+            summary_file = self._get_summary_file(session_id)
+            if summary_file.exists():
+                summary_file.unlink()
+
+    def _chunks(self, messages: List[Message]) -> List[List[Message]]:
+        """Split messages into runs of at most ``chunk_tokens`` tokens (at least one message each)."""
+        chunks: List[List[Message]] = []
+        current: List[Message] = []
+        tokens = 0
+        for message in messages:
+            message_tokens = self.counter.count(message.content)
+            if current and tokens + message_tokens > self.chunk_tokens:
+                chunks.append(current)
+                current, tokens = [], 0
+            current.append(message)
+            tokens += message_tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _build_request(self, previous: str, messages: List[Message], model: str) -> AIRequest:
+        """Build the request that folds ``messages`` into the previous summary."""
+        transcript = "\n\n".join(f"{m.role}: {m.content}" for m in messages)
+        return AIRequest(
+            model=model,
+            messages=[
+                {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                {"role": "user", "content": (
+                    f"Existing summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"
+                )},
+            ],
+            max_tokens=self.summary_max_tokens,
+            temperature=0.2,
+        )
+
+    async def extend(
+        self,
+        session_id: UUID,
+        messages: List[Message],
+        ai_provider_service: AIProviderService,
+        provider_id: UUID,
+        model: str
+    ) -> Optional[ConversationSummary]:
+        """
+        Fold messages that follow the current summary into it.
+
+        Messages are processed in token-bounded chunks and progress is saved
+        after each one, so a failed request only loses the chunk in flight.
+        Saving stops once the session's summary is deleted.
+
+        Args:
+            session_id: Chat session ID
+            messages: Messages immediately after those already covered, oldest first
+            ai_provider_service: Service used to generate the summary
+            provider_id: Provider used to generate the summary
+            model: Model used to generate the summary
+
+        Returns:
+            The updated summary (unchanged if the provider failed), or None
+            if the session was deleted meanwhile
+        """
+        writer = object()
+        with self._lock:
+            self._writers[session_id] = writer
+        try:
+            summary = self.get(session_id) or ConversationSummary(session_id=session_id)
+            for chunk in self._chunks(messages):
+                result = await ai_provider_service.send_request(
+                    provider_id, self._build_request(summary.content, chunk, model)
+                )
+                if isinstance(result, AIError):
+                    break
+                summary = ConversationSummary(
+                    session_id=session_id,
+                    content=result.content.strip(),
+                    covered_count=summary.covered_count + len(chunk),
+                    token_count=self.counter.count(result.content),
+                    updated_at=datetime.now(),
+                )
+                if not await asyncio.to_thread(self._save_if_current, summary, writer):
+                    return None
+        finally:
+            with self._lock:
+                if self._writers.get(session_id) is writer:
+                    del self._writers[session_id]
+        return self.get(session_id)
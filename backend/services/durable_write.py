@@ -0,0 +1,254 @@
+"""
+Durable File Writes
+
+This module is the single path through which backend services persist state
+files.  Every write goes to a temporary file in the target directory that is
+then renamed over the target, so readers and crashes only ever observe the old
+or the new content, never a truncated file.
+
+How hard the write is pushed to disk is set by the ``DURABLE_WRITE_MODE``
+setting:
+
+- ``fsync``: the temporary file is fsynced before the rename and the directory
+  after it.  Each write pays its own fsync.
+- ``group``: group commit.  Writers hand their temporary file to a committer
+  thread and wait.  The committer collects writes for a short window, drops
+  versions superseded by a later write to the same file, fsyncs the rest,
+  renames them and fsyncs each directory once.  Under heavy write load many
+  updates share one commit instead of paying one fsync each.
+- ``none``: atomic rename without fsync (fast; for tests and throwaway data).
+
+Append-only files (the chat message log) are not replaced; they are written
+in place and flushed with ``sync``, which fsyncs in every mode but "none".
+
+A crash can leave stray ``.<name>.<id>.tmp`` files next to their targets;
+they are never read and are safe to delete.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from ..config.settings import settings
+
+MODE_FSYNC = "fsync"
+MODE_GROUP = "group"
+MODE_NONE = "none"
+MODES = (MODE_FSYNC, MODE_GROUP, MODE_NONE)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist a rename by fsyncing the directory entry (not supported on Windows)."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_file(path: Path) -> None:
+    """Flush a written file's data to disk."""
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+class _Batch:
+    """Writes committed together by one group commit."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+        # Target path -> temporary file holding its newest content
+        self.files: Dict[Path, Path] = {}
+
+
+class DurableWriter:
+    """Writes files atomically, with per-write or group-committed fsyncs."""
+
+    def __init__(self, mode: str = MODE_FSYNC, group_commit_interval: float = 0.005):
+        """
+        Initialize the writer.
+
+        Args:
+            mode: "fsync", "group" or "none" (see module docstring)
+            group_commit_interval: Seconds the committer waits to collect a batch
+        """
+        if mode not in MODES:
+            raise ValueError(f"Invalid durable write mode '{mode}'")
+        self.mode = mode
+        self.group_commit_interval = group_commit_interval
+        self._condition = threading.Condition()
+        self._batch: Optional[_Batch] = None
+        self._committer: Optional[threading.Thread] = None
+        self._closed = False
+        self.commits = 0
+        self.fsyncs = 0
+
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        """
+        Atomically replace ``path`` with ``data``.
+
+        Returns once the new content is visible (and, unless the mode is
+        "none", on disk).
+        """
+        path = Path(path)
+        temp_path = path.with_name(f".{path.name}.{uuid4().hex[:12]}.tmp")
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+                if self.mode == MODE_FSYNC:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self.fsyncs += 1
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        if self.mode == MODE_GROUP:
+            if self._commit_in_group(path, temp_path):
+                return
+            # The committer has been stopped: commit this write on its own
+            _fsync_file(temp_path)
+        os.replace(temp_path, path)
+        if self.mode != MODE_NONE:
+            _fsync_directory(path.parent)
+
+    def write_text(self, path: Path, text: str) -> None:
+        """Atomically replace ``path`` with UTF-8 ``text``."""
+        self.write_bytes(path, text.encode("utf-8"))
+
+    def sync(self, path: Path) -> None:
+        """Flush a file written by other means, unless the mode is "none"."""
+        if self.mode != MODE_NONE:
+            _fsync_file(Path(path))
+            self.fsyncs += 1
+
+    def _commit_in_group(self, path: Path, temp_path: Path) -> bool:
+        """
+        Queue a write for the next group commit and wait for it.
+
+        Returns:
+            False if the writer is closed and the write was not queued
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            if self._committer is None:
+                self._committer = threading.Thread(target=self._run_committer, name="durable-write", daemon=True)
+                self._committer.start()
+            if self._batch is None:
+                self._batch = _Batch()
+                self._condition.notify()
+            batch = self._batch
+            superseded = batch.files.get(path)
+            batch.files[path] = temp_path
+        if superseded is not None:
+            superseded.unlink(missing_ok=True)
+
+        batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+        return True
+
+    def _run_committer(self) -> None:
+        """Commit queued batches until the writer is closed."""
+        while True:
+            with self._condition:
+                while self._batch is None and not self._closed:
+                    self._condition.wait()
+                if self._batch is None:
+                    return
+            # Let concurrent writers join the batch before committing it
+            time.sleep(self.group_commit_interval)
+            with self._condition:
+                batch, self._batch = self._batch, None
+            self._commit(batch)
+
+    def _commit(self, batch: _Batch) -> None:
+        """fsync, rename and persist the directory entries of one batch."""
+        try:
+            directories = set()
+            for path, temp_path in batch.files.items():
+                _fsync_file(temp_path)
+                os.replace(temp_path, path)
+                directories.add(path.parent)
+            for directory in directories:
+                _fsync_directory(directory)
+            self.fsyncs += len(batch.files) + len(directories)
+            self.commits += 1
+        except BaseException as e:
+            batch.error = e
+            for temp_path in batch.files.values():
+                temp_path.unlink(missing_ok=True)
+        finally:
+            batch.done.set()
+
+    def close(self) -> None:
+        """Commit anything queued and stop the committer thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            committer = self._committer
+        if committer is not None:
+            committer.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the mode and how many commits and fsyncs were made."""
+        return {"mode": self.mode, "commits": self.commits, "fsyncs": self.fsyncs}
+
+
+_writer: Optional[DurableWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> DurableWriter:
+    """Get the process-wide writer, configured from settings on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = DurableWriter(settings.DURABLE_WRITE_MODE, settings.DURABLE_GROUP_COMMIT_MS / 1000)
+        return _writer
+
+
+def set_writer(writer: DurableWriter) -> Optional[DurableWriter]:
+    """Replace the process-wide writer and return the previous one."""
+    global _writer
+    with _writer_lock:
+        previous, _writer = _writer, writer
+        return previous
+
+
+def write_bytes(path: Path, data: bytes) -> None:
+    """Atomically and durably replace ``path`` with ``data``."""
+    get_writer().write_bytes(path, data)
+
+
+def write_text(path: Path, text: str) -> None:
+    """Atomically and durably replace ``path`` with UTF-8 ``text``."""
+    get_writer().write_text(path, text)
+
+
+def write_json(path: Path, data: Any, indent: Optional[int] = 2, ensure_ascii: bool = False,
+               default: Any = None) -> None:
+    """
+    Atomically and durably replace ``path`` with ``data`` as JSON.
+
+    Args:
+        path: File to write
+        data: JSON-serializable data
+        indent: Indentation passed to ``json.dumps``
+        ensure_ascii: Escape non-ASCII characters
+        default: Fallback serializer passed to ``json.dumps``
+    """
+    get_writer().write_text(path, json.dumps(data, indent=indent, ensure_ascii=ensure_ascii, default=default))
+
+
+def sync(path: Path) -> None:
+    """Flush a file written by other means according to the configured mode."""
+    get_writer().sync(path)
@@ -0,0 +1,242 @@
+"""
+Facet Bitmap Index
+
+This module answers search filters and facet counts with bitmaps instead of
+walking documents.  Every document gets a small integer ordinal, and for
+every facet value (type, project, file extension, tag, ...) the index keeps a
+bitmap of the documents having it, computed once when the document is
+indexed.  A filter is then an AND/OR of bitmaps, and a facet count is the
+popcount of a value's bitmap ANDed with the result set.
+
+Bitmaps are plain Python integers: bitwise operators and ``int.bit_count``
+run in C over machine words, which suits the dense, small ordinal space.
+Ordinals of removed documents are reused so bitmaps stay compact.
+
+Creation dates are bucketed by UTC day.  Date ranges combine the bitmaps of
+the days they fully cover and check timestamps only for the (at most two)
+days at their edges, so relative buckets like "this week" stay exact as time
+passes.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_DAY = 86400
+
+
+def _bitmap(ordinals: Iterable[int], size: int) -> int:
+    """Bitmap with the given bits set, built in one pass."""
+    bits = bytearray((size + 7) // 8)
+    for ordinal in ordinals:
+        bits[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _ordinals(bitmap: int) -> List[int]:
+    """Positions of the set bits of a bitmap, in ascending order."""
+    bits = bin(bitmap)[:1:-1]
+    positions = []
+    position = bits.find("1")
+    while position != -1:
+        positions.append(position)
+        position = bits.find("1", position + 1)
+    return positions
+
+
+class FacetIndex:
+    """Per-value document bitmaps for filtering and facet counting."""
+
+    def __init__(self, documents: Iterable[Tuple[str, Iterable[Tuple[str, str]], Optional[float]]] = ()):
+        """
+        Initialize the index.
+
+        Args:
+            documents: Initial (doc_id, values, created_ts) entries, as for ``add``
+        """
+        self._ordinals: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._all = 0
+        self._dated = 0
+        # facet -> value -> bitmap
+        self._bitmaps: Dict[str, Dict[str, int]] = {}
+        # ordinal -> (facet, value) pairs, for removal
+        self._values: Dict[int, List[Tuple[str, str]]] = {}
+        # Creation times: day number -> bitmap, ordinal -> timestamp
+        self._days: Dict[int, int] = {}
+        self._created: Dict[int, float] = {}
+        self._lock = threading.RLock()
+        self._load(documents)
+
+    def _load(self, documents) -> None:
+        """Index documents into an empty index, building each bitmap once."""
+        members: Dict[Tuple[str, str], List[int]] = {}
+        days: Dict[int, List[int]] = {}
+        for doc_id, values, created_ts in documents:
+            if doc_id in self._ordinals:
+                continue
+            ordinal = len(self._ids)
+            self._ids.append(doc_id)
+            self._ordinals[doc_id] = ordinal
+            pairs = list(dict.fromkeys(values))
+            for pair in pairs:
+                members.setdefault(pair, []).append(ordinal)
+            self._values[ordinal] = pairs
+            if created_ts is not None:
+                days.setdefault(math.floor(created_ts / _DAY), []).append(ordinal)
+                self._created[ordinal] = created_ts
+
+        size = len(self._ids)
+        self._all = (1 << size) - 1
+        self._dated = _bitmap(self._created, size)
+        for (facet, value), ordinals in members.items():
+            self._bitmaps.setdefault(facet, {})[value] = _bitmap(ordinals, size)
+        for day, ordinals in days.items():
+            self._days[day] = _bitmap(ordinals, size)
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._ordinals
+
+    def add(self, doc_id: str, values: Iterable[Tuple[str, str]], created_ts: Optional[float] = None) -> None:
+        """
+        Index a document, replacing its previous values.
+
+        Args:
+            doc_id: Document ID
+            values: (facet, value) pairs of the document
+            created_ts: Creation timestamp, if known
+        """
+        with self._lock:
+            self.discard(doc_id)
+            ordinal = self._free.pop() if self._free else len(self._ids)
+            if ordinal == len(self._ids):
+                self._ids.append(doc_id)
+            else:
+                self._ids[ordinal] = doc_id
+            self._ordinals[doc_id] = ordinal
+            bit = 1 << ordinal
+            self._all |= bit
+
+            pairs = list(dict.fromkeys(values))
+            for facet, value in pairs:
+                by_value = self._bitmaps.setdefault(facet, {})
+                by_value[value] = by_value.get(value, 0) | bit
+            self._values[ordinal] = pairs
+
+            if created_ts is not None:
+                day = math.floor(created_ts / _DAY)
+                self._days[day] = self._days.get(day, 0) | bit
+                self._created[ordinal] = created_ts
+                self._dated |= bit
+
+    def discard(self, doc_id: str) -> None:
+        """Remove a document if present."""
+        with self._lock:
+            ordinal = self._ordinals.pop(doc_id, None)
+            if ordinal is None:
+                return
+            mask = ~(1 << ordinal)
+            self._all &= mask
+            self._dated &= mask
+            for facet, value in self._values.pop(ordinal, ()):
+                by_value = self._bitmaps[facet]
+                by_value[value] &= mask
+                if not by_value[value]:
+                    del by_value[value]
+            created_ts = self._created.pop(ordinal, None)
+            if created_ts is not None:
+                day = math.floor(created_ts / _DAY)
+                self._days[day] &= mask
+                if not self._days[day]:
+                    del self._days[day]
+            self._ids[ordinal] = None
+            self._free.append(ordinal)
+
+    def clear(self) -> None:
+        """Remove every document."""
+        with self._lock:
+            self._ordinals.clear()
+            self._ids.clear()
+            self._free.clear()
+            self._all = 0
+            self._dated = 0
+            self._bitmaps.clear()
+            self._values.clear()
+            self._days.clear()
+            self._created.clear()
+
+    def bitmap_of(self, doc_ids: Iterable[str]) -> Tuple[int, List[str]]:
+        """
+        Bitmap of a set of documents.
+
+        Returns:
+            The bitmap of the indexed documents and the IDs that are not indexed
+        """
+        with self._lock:
+            ordinals = []
+            missing = []
+            for doc_id in doc_ids:
+                ordinal = self._ordinals.get(doc_id)
+                if ordinal is None:
+                    missing.append(doc_id)
+                else:
+                    ordinals.append(ordinal)
+            return _bitmap(ordinals, len(self._ids)), missing
+
+    def ids(self, bitmap: int) -> List[str]:
+        """Document IDs of a bitmap."""
+        with self._lock:
+            return [self._ids[ordinal] for ordinal in _ordinals(bitmap & self._all)]
+
+    @property
+    def all(self) -> int:
+        """Bitmap of every indexed document."""
+        return self._all
+
+    def value(self, facet: str, value: str) -> int:
+        """Bitmap of the documents with a facet value."""
+        return self._bitmaps.get(facet, {}).get(value, 0)
+
+    def any_value(self, facet: str, values: Iterable[str]) -> int:
+        """Bitmap of the documents with any of the facet values."""
+        by_value = self._bitmaps.get(facet, {})
+        bitmap = 0
+        for value in values:
+            bitmap |= by_value.get(value, 0)
+        return bitmap
+
+    def counts(self, facet: str, within: int) -> Dict[str, int]:
+        """Number of documents of ``within`` per value of a facet."""
+        with self._lock:
+            counts = {}
+            for value, bitmap in self._bitmaps.get(facet, {}).items():
+                count = (bitmap & within).bit_count()
+                if count:
+                    counts[value] = count
+            return counts
+
+    def created_between(self, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        """Bitmap of the documents created within ``start..end`` (inclusive, either may be open)."""
+        with self._lock:
+            first = math.floor(start / _DAY) if start is not None else None
+            last = math.floor(end / _DAY) if end is not None else None
+            bitmap = 0
+            for day, members in self._days.items():
+                if (first is not None and day < first) or (last is not None and day > last):
+                    continue
+                if day == first or day == last:
+                    for ordinal in _ordinals(members):
+                        created_ts = self._created[ordinal]
+                        if (start is None or created_ts >= start) and (end is None or created_ts <= end):
+                            bitmap |= 1 << ordinal
+                else:
+                    bitmap |= members
+            return bitmap
+
+    def undated(self) -> int:
+        """Bitmap of the documents without a creation time."""
+        return self._all & ~self._dated
@@ -10,7 +10,7 @@ import hashlib
 import mimetypes
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any, BinaryIO, Union
+from typing import List, Optional, Dict, Any, BinaryIO, Callable, Union
 from uuid import UUID, uuid4
 
 from ..models.file_management import (
@@ -74,9 +74,31 @@ class FileManagementService:
         self._files: Dict[UUID, File] = {}
         self._file_contents: Dict[UUID, str] = {}
 
+        self._listeners: List[Callable[[str, File], None]] = []
+
         # Load existing files
         self._load_files()
 
+    def add_listener(self, listener: Callable[[str, File], None]) -> None:
+        """
+        Register a callback for file changes.
+
+        The callback is invoked as ``listener(event, file)`` where ``event`` is one
+        of "file_uploaded", "file_processed", "file_updated" or "file_deleted".
+
+        Args:
+            listener: Callback to register
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, file_obj: File) -> None:
+        """Invoke registered listeners; listener failures never fail the change itself."""
+        for listener in self._listeners:
+            try:
+                listener(event, file_obj)
+            except Exception as e:
+                print(f"Error in file listener for {event}: {e}")
+
     def _get_file_path(self, file_id: UUID, filename: str) -> Path:
         """Get the storage path for a file."""
         # Create subdirectory based on first 2 chars of UUID for organization
@@ -258,6 +280,7 @@ class FileManagementService:
             # Store file
             self._files[file_id] = file_obj
             self._save_file_metadata(file_obj)
+            self._notify("file_uploaded", file_obj)
 
             # Process file if requested
             if upload_request.auto_process:
@@ -327,6 +350,7 @@ class FileManagementService:
             file_obj.metadata = file_obj.metadata.model_copy(update=metadata_updates)
 
             self._save_file_metadata(file_obj)
+            self._notify("file_processed", file_obj)
 
             processing_time = (datetime.now() - start_time).total_seconds()
 
@@ -408,6 +432,7 @@ class FileManagementService:
 
         file_obj.updated_at = datetime.now()
         self._save_file_metadata(file_obj)
+        self._notify("file_updated", file_obj)
 
         return file_obj
 
@@ -436,6 +461,7 @@ class FileManagementService:
 
         # Mark as deleted (in production, update database)
         file_obj.status = FileStatus.DELETED
+        self._notify("file_deleted", file_obj)
 
         return True
 
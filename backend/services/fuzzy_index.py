@@ -0,0 +1,184 @@
+"""
+Fuzzy Term Index
+
+This module finds indexed terms within a small Levenshtein distance of a query
+term without comparing the query against the whole vocabulary.  Each term is
+indexed by its character trigrams (padded with ``$`` so word boundaries count).
+One edit changes at most three trigrams, so a term within ``k`` edits of the
+query shares at least ``len(query trigrams) - 3k`` of them.  Candidates are
+collected from the rarest trigram postings only (any term meeting the bound
+must appear in one of them), counted against the rest, filtered by length and
+verified with a banded edit distance.
+
+Query terms too short for the trigram bound to prune anything fall back to
+the terms of compatible length.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Largest edit distance supported by the index
+MAX_EDITS = 2
+
+_PAD = "$$"
+
+
+def trigrams(term: str) -> Set[str]:
+    """Distinct padded character trigrams of a term."""
+    padded = f"{_PAD}{term}{_PAD}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def auto_max_edits(term: str) -> int:
+    """Default edit budget for a term: 0 up to 2 characters, 1 up to 5, then 2."""
+    if len(term) <= 2:
+        return 0
+    if len(term) <= 5:
+        return 1
+    return MAX_EDITS
+
+
+def levenshtein(a: str, b: str, max_distance: int) -> int:
+    """
+    Edit distance between two strings, bounded by ``max_distance``.
+
+    Only the diagonal band of width ``2 * max_distance + 1`` is computed.
+
+    Returns:
+        The distance, or ``max_distance + 1`` if it is larger
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+    limit = max_distance + 1
+    previous = [j if j <= max_distance else limit for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        current = [limit] * (len(b) + 1)
+        current[0] = i if i <= max_distance else limit
+        row_min = current[0]
+        char = a[i - 1]
+        for j in range(low, high + 1):
+            cost = 0 if b[j - 1] == char else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current[j] = value if value < limit else limit
+            if current[j] < row_min:
+                row_min = current[j]
+        if row_min >= limit:
+            return limit
+        previous = current
+    return previous[len(b)]
+
+
+class FuzzyTermIndex:
+    """Trigram postings over a term vocabulary for edit-distance lookups."""
+
+    def __init__(self, terms: Iterable[str] = ()):
+        """
+        Initialize the index.
+
+        Args:
+            terms: Initial vocabulary
+        """
+        self._postings: Dict[str, Set[str]] = {}
+        self._by_length: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        for term in terms:
+            self.add(term)
+
+    def __len__(self) -> int:
+        return sum(len(terms) for terms in self._by_length.values())
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._by_length.get(len(term), ())
+
+    def add(self, term: str) -> None:
+        """Add a term to the vocabulary."""
+        with self._lock:
+            same_length = self._by_length.setdefault(len(term), set())
+            if term in same_length:
+                return
+            same_length.add(term)
+            for gram in trigrams(term):
+                self._postings.setdefault(gram, set()).add(term)
+
+    def discard(self, term: str) -> None:
+        """Remove a term from the vocabulary if present."""
+        with self._lock:
+            same_length = self._by_length.get(len(term))
+            if not same_length or term not in same_length:
+                return
+            same_length.discard(term)
+            for gram in trigrams(term):
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(term)
+                    if not postings:
+                        del self._postings[gram]
+
+    def clear(self) -> None:
+        """Remove every term."""
+        with self._lock:
+            self._postings.clear()
+            self._by_length.clear()
+
+    def search(self, term: str, max_edits: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Find indexed terms within ``max_edits`` edits of ``term``.
+
+        Args:
+            term: Query term
+            max_edits: Edit budget, at most ``MAX_EDITS`` (chosen from the term
+                length if omitted)
+
+        Returns:
+            (term, distance) pairs, closest first
+        """
+        k = auto_max_edits(term) if max_edits is None else max(0, min(max_edits, MAX_EDITS))
+        if k == 0:
+            return [(term, 0)] if term in self else []
+
+        with self._lock:
+            candidates = self._candidates(term, k)
+
+        matches = []
+        for candidate in candidates:
+            distance = levenshtein(term, candidate, k)
+            if distance <= k:
+                matches.append((candidate, distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+    def _candidates(self, term: str, k: int) -> Set[str]:
+        """Terms that pass the trigram count and length filters."""
+        grams = trigrams(term)
+        required = len(grams) - 3 * k
+        lengths = range(max(1, len(term) - k), len(term) + k + 1)
+
+        if required <= 0:
+            candidates: Set[str] = set()
+            for length in lengths:
+                candidates.update(self._by_length.get(length, ()))
+            return candidates
+
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        # A term sharing `required` of the grams must occur in one of the
+        # len(grams) - required + 1 rarest postings lists
+        prefix = len(postings) - required + 1
+        seeds: Set[str] = set()
+        for terms in postings[:prefix]:
+            seeds.update(terms)
+
+        candidates = set()
+        for candidate in seeds:
+            if len(candidate) not in lengths:
+                continue
+            shared = 0
+            for terms in postings:
+                if candidate in terms:
+                    shared += 1
+            if shared >= required:
+                candidates.add(candidate)
+        return candidates
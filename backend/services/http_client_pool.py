@@ -0,0 +1,186 @@
+"""
+HTTP Client Pool
+
+This module provides long-lived, connection-pooled ``aiohttp`` sessions for
+talking to AI provider APIs.  One session (with its own ``TCPConnector``) is
+kept per provider endpoint and connector limits so keep-alive connections,
+TLS sessions and DNS lookups are reused across requests instead of being
+re-established for each conversation turn.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+from aiohttp import ClientTimeout
+
+from ..models.ai_provider import AIProvider
+
+# Default base URLs used when a provider does not override ``base_url``
+DEFAULT_BASE_URLS = {
+    "openai": "https://api.openai.com",
+    "anthropic": "https://api.anthropic.com",
+}
+
+
+class HTTPClientPool:
+    """
+    Pool of ``aiohttp.ClientSession`` objects keyed by provider endpoint.
+
+    Connector limits can be overridden per provider through the
+    ``max_connections`` and ``max_connections_per_host`` metadata keys.
+    The limits are part of the pool key, so providers on one endpoint share a
+    session only when their limits agree.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_connections_per_host: int = 20,
+        keepalive_timeout: float = 60.0,
+        dns_cache_ttl: int = 300
+    ):
+        """
+        Initialize the client pool.
+
+        Args:
+            max_connections: Default total connection limit per endpoint
+            max_connections_per_host: Default connection limit per host
+            keepalive_timeout: Seconds idle connections are kept open
+            dns_cache_ttl: Seconds DNS lookups are cached
+        """
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+
+        self._sessions: Dict[Tuple[str, str, int, int], Tuple[aiohttp.ClientSession, asyncio.AbstractEventLoop]] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def base_url(provider: AIProvider) -> str:
+        """Return the API base URL used for a provider."""
+        return provider.base_url or DEFAULT_BASE_URLS.get(provider.provider_type.value, "")
+
+    def limits(self, provider: AIProvider) -> Tuple[int, int]:
+        """Return the (total, per host) connection limits for a provider."""
+        metadata = provider.metadata or {}
+        return (
+            int(metadata.get("max_connections", self.max_connections)),
+            int(metadata.get("max_connections_per_host", self.max_connections_per_host)),
+        )
+
+    def key(self, provider: AIProvider) -> Tuple[str, str, int, int]:
+        """Return the pool key (provider type, base URL, limit, limit per host) for a provider."""
+        return (provider.provider_type.value, self.base_url(provider)) + self.limits(provider)
+
+    @staticmethod
+    def timeout_for(provider: AIProvider, total: Optional[float] = None) -> ClientTimeout:
+        """
+        Build the request timeout for a provider.
+
+        Args:
+            provider: Provider being called
+            total: Overall deadline; defaults to ``provider.timeout_seconds``.  When
+                given (e.g. for streams), ``timeout_seconds`` bounds each read instead.
+
+        Returns:
+            Client timeout for the request
+        """
+        if total is None:
+            return ClientTimeout(total=provider.timeout_seconds)
+        return ClientTimeout(total=total, sock_read=provider.timeout_seconds)
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _create_session(self, provider: AIProvider) -> aiohttp.ClientSession:
+        limit, limit_per_host = self.limits(provider)
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=ClientTimeout(total=provider.timeout_seconds),
+        )
+
+    async def get(self, provider: AIProvider) -> aiohttp.ClientSession:
+        """
+        Get the shared session for a provider's endpoint and limits, creating it on first use.
+
+        Args:
+            provider: Provider to get a session for
+
+        Returns:
+            A long-lived client session
+        """
+        key = self.key(provider)
+        loop = asyncio.get_running_loop()
+        entry = self._sessions.get(key)
+        if entry and not entry[0].closed and entry[1] is loop:
+            return entry[0]
+
+        async with self._get_lock():
+            entry = self._sessions.get(key)
+            if entry and not entry[0].closed and entry[1] is loop:
+                return entry[0]
+            if entry and not entry[0].closed and not entry[1].is_closed():
+                # Sessions are bound to the loop that created them
+                entry[1].call_soon_threadsafe(lambda s=entry[0]: asyncio.ensure_future(s.close()))
+            session = self._create_session(provider)
+            self._sessions[key] = (session, loop)
+            return session
+
+    async def warm_up(self, provider: AIProvider, timeout: float = 5.0) -> bool:
+        """
+        Open a keep-alive connection to a provider ahead of the first request.
+
+        Args:
+            provider: Provider to connect to
+            timeout: Seconds to wait for the connection
+
+        Returns:
+            True if the endpoint answered (any HTTP status counts)
+        """
+        base_url = self.base_url(provider)
+        if not base_url:
+            return False
+        session = await self.get(provider)
+        try:
+            async with session.head(base_url, timeout=ClientTimeout(total=timeout)):
+                return True
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return connection usage per pooled session."""
+        stats = {}
+        for (provider_type, base_url, limit, limit_per_host), (session, _) in self._sessions.items():
+            connector = session.connector
+            stats[f"{provider_type}:{base_url}:{limit}/{limit_per_host}"] = {
+                "closed": session.closed,
+                "limit": connector.limit if connector else 0,
+                "limit_per_host": connector.limit_per_host if connector else 0,
+            }
+        return stats
+
+    async def close(self) -> None:
+        """Close every pooled session."""
+        sessions, self._sessions = self._sessions, {}
+        loop = asyncio.get_running_loop()
+        for session, session_loop in sessions.values():
+            if session.closed:
+                continue
+            if session_loop is loop:
+                await session.close()
+            elif not session_loop.is_closed():
+                session_loop.call_soon_threadsafe(lambda s=session: asyncio.ensure_future(s.close()))
@@ -0,0 +1,280 @@
+"""
+Append-Only Message Log
+
+This module provides the append-only storage mode for chat session messages.
+Messages are written as one JSON document per line to ``messages.jsonl`` and a
+compact binary offset index (``messages.idx``, one little-endian uint64 per
+message) records where each line starts.  Appending a message is O(1) and a
+``(offset, limit)`` slice is served with two seeks instead of parsing the whole
+history.
+
+The module can also be run as a script to migrate legacy ``messages.json``
+files and compact existing logs:
+
+    python -m backend.services.message_log --data-dir data
+    python -m backend.services.message_log --data-dir data --compact
+"""
+
+import argparse
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import durable_write
+
+
+LOG_FILENAME = "messages.jsonl"
+INDEX_FILENAME = "messages.idx"
+LEGACY_FILENAME = "messages.json"
+
+_OFFSET = struct.Struct("<Q")
+
+# Bytes read at a time when looking for the end of a line
+_CHUNK_SIZE = 64 * 1024
+
+
+class MessageLog:
+    """
+    Append-only JSONL message log with a fixed-width offset index.
+
+    The log is written before the index, so the index normally only points at
+    complete lines.  A crash between the two writes leaves an orphaned tail in
+    the log that is never read and is dropped by :meth:`compact`.  If the log
+    lost data the index already points at (a torn last line), or the index
+    ends in a partial entry, those trailing entries are ignored by readers and
+    cut off by the next append.
+    """
+
+    def __init__(self, session_dir: Path):
+        """
+        Initialize the message log for a session directory.
+
+        Args:
+            session_dir: Directory holding the session's files
+        """
+        self.session_dir = Path(session_dir)
+        self.log_file = self.session_dir / LOG_FILENAME
+        self.index_file = self.session_dir / INDEX_FILENAME
+
+    def exists(self) -> bool:
+        """Return True if the log has been created for this session."""
+        return self.log_file.exists()
+
+    def _line_complete(self, start: int, log_size: int) -> bool:
+        """Return True if a newline-terminated line starts at ``start``."""
+        if start >= log_size:
+            return False
+        with open(self.log_file, "rb") as log:
+            log.seek(start)
+            while True:
+                chunk = log.read(_CHUNK_SIZE)
+                if not chunk:
+                    return False
+                if b"\n" in chunk:
+                    return True
+
+    def count(self) -> int:
+        """
+        Return the number of readable messages.
+
+        Reads the index size and checks only the last indexed line against the
+        log, dropping trailing entries whose line is incomplete.
+        """
+        try:
+            entries = self.index_file.stat().st_size // _OFFSET.size
+            log_size = self.log_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+        while entries and not self._line_complete(self._read_offsets(entries - 1, 1)[0], log_size):
+            entries -= 1
+        return entries
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        Append a single message record.
+
+        The log line and then the index entry are fsynced unless the durable
+        write mode is "none".
+
+        Args:
+            record: JSON-serializable message record
+
+        Returns:
+            The zero-based position of the appended message
+        """
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+        # Cut index entries that point past the complete lines of the log (or
+        # a partial entry) so the new entry lands at the right position
+        entries = self.count()
+        if self.index_file.exists() and self.index_file.stat().st_size != entries * _OFFSET.size:
+            os.truncate(self.index_file, entries * _OFFSET.size)
+
+        with open(self.log_file, "ab") as log:
+            log.seek(0, os.SEEK_END)
+            start = log.tell()
+            log.write(line)
+        # The line must be on disk before an index entry can point at it
+        durable_write.sync(self.log_file)
+
+        with open(self.index_file, "ab") as index:
+            index.write(_OFFSET.pack(start))
+            position = index.tell() // _OFFSET.size - 1
+        durable_write.sync(self.index_file)
+
+        return position
+
+    def _read_offsets(self, first: int, count: int) -> List[int]:
+        """Read ``count`` consecutive offsets starting at index entry ``first``."""
+        with open(self.index_file, "rb") as index:
+            index.seek(first * _OFFSET.size)
+            raw = index.read(count * _OFFSET.size)
+        return [value for (value,) in _OFFSET.iter_unpack(raw)]
+
+    def read(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Read a contiguous slice of message records.
+
+        Args:
+            offset: Number of messages to skip from the beginning
+            limit: Maximum number of messages to return (None for all)
+
+        Returns:
+            List of message records in insertion order
+        """
+        total = self.count()
+        offset = max(0, offset)
+        if offset >= total:
+            return []
+
+        end = total if limit is None else min(total, offset + max(0, limit))
+        if end <= offset:
+            return []
+
+        # One extra offset (when available) marks where the slice ends; otherwise
+        # the slice runs to the end of the log.
+        offsets = self._read_offsets(offset, end - offset + (1 if end < total else 0))
+        start = offsets[0]
+
+        with open(self.log_file, "rb") as log:
+            log.seek(start)
+            if end < total:
+                data = log.read(offsets[-1] - start)
+            else:
+                data = log.read()
+
+        # Decode each record from its own offset so orphaned bytes between
+        # indexed lines are skipped.
+        records = []
+        for position in offsets[:end - offset]:
+            rel = position - start
+            records.append(json.loads(data[rel:data.index(b"\n", rel)]))
+        return records
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over every indexed record in order."""
+        return iter(self.read())
+
+    def rewrite(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Replace the log contents with ``records``.
+
+        The new log and index are written to temporary files and renamed into
+        place so readers never observe a half-written log.
+
+        Args:
+            records: Message records to store, in order
+        """
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        log = bytearray()
+        index = bytearray()
+        for record in records:
+            index += _OFFSET.pack(len(log))
+            log += (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+        durable_write.write_bytes(self.log_file, bytes(log))
+        durable_write.write_bytes(self.index_file, bytes(index))
+
+    def compact(self) -> int:
+        """
+        Rewrite the log keeping only indexed records.
+
+        Drops orphaned tails left by interrupted appends.
+
+        Returns:
+            Number of records kept
+        """
+        records = self.read()
+        self.rewrite(records)
+        return len(records)
+
+    def delete(self) -> None:
+        """Remove the log and its index."""
+        for path in (self.log_file, self.index_file):
+            if path.exists():
+                path.unlink()
+
+
+def migrate_messages_json(session_dir: Path) -> Optional[int]:
+    """
+    Convert a legacy ``messages.json`` file into an append-only log.
+
+    Args:
+        session_dir: Session directory to migrate
+
+    Returns:
+        Number of migrated messages, or None if there was nothing to migrate
+    """
+    session_dir = Path(session_dir)
+    legacy_file = session_dir / LEGACY_FILENAME
+    if not legacy_file.exists():
+        return None
+
+    with open(legacy_file, "r", encoding="utf-8") as f:
+        records = json.load(f)
+
+    log = MessageLog(session_dir)
+    if log.exists():
+        # Legacy messages predate anything appended to the log.
+        records = records + log.read()
+    log.rewrite(records)
+    legacy_file.unlink()
+    return len(records)
+
+
+def iter_session_dirs(data_dir: Path) -> Iterator[Path]:
+    """Yield every chat session directory under ``data_dir`` (nested and flat layouts)."""
+    data_dir = Path(data_dir)
+    for pattern in ("projects/*/chat_sessions/*", "chat_sessions/*"):
+        for session_dir in data_dir.glob(pattern):
+            if session_dir.is_dir():
+                yield session_dir
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Migrate legacy message files and optionally compact existing logs."""
+    parser = argparse.ArgumentParser(description="Migrate chat messages to the append-only log format")
+    parser.add_argument("--data-dir", default="data", help="Base data directory (default: data)")
+    parser.add_argument("--compact", action="store_true", help="Also compact existing message logs")
+    args = parser.parse_args(argv)
+
+    migrated = compacted = 0
+    for session_dir in iter_session_dirs(Path(args.data_dir)):
+        try:
+            if migrate_messages_json(session_dir) is not None:
+                migrated += 1
+            elif args.compact and MessageLog(session_dir).exists():
+                MessageLog(session_dir).compact()
+                compacted += 1
+        except (OSError, ValueError) as e:
+            print(f"Error migrating {session_dir}: {e}")
+
+    print(f"Migrated {migrated} session(s), compacted {compacted} log(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
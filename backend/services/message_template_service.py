@@ -10,6 +10,7 @@ from backend.models.message_template import (
     MessageTemplate, MessageTemplateCreate, MessageTemplateUpdate,
     MessageTemplateSummary, TemplateCategory
 )
+from backend.services.durable_write import write_json
 
 
 class MessageTemplateService:
@@ -43,8 +44,7 @@ class MessageTemplateService:
     def _save_template_metadata(self, template: MessageTemplate):
         """Save template metadata to JSON file"""
         metadata_path = self._get_template_metadata_path(template.id)
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(template.model_dump(), f, indent=2, default=str)
+        write_json(metadata_path, template.model_dump(), ensure_ascii=True, default=str)
 
     def _load_template_metadata(self, template_id: str) -> Optional[MessageTemplate]:
         """Load template metadata from JSON file"""
@@ -0,0 +1,77 @@
+"""
+Positional Matching
+
+Helpers for phrase and proximity matching over term positions.  A document's
+positions map each term to the sorted token offsets where it occurs, as
+stored in the search index alongside the term frequencies.  Offsets count
+indexed tokens only, so stop words and single characters dropped by the
+tokenizer do not separate the words of a phrase.
+"""
+
+import heapq
+from typing import Dict, List, Sequence
+
+
+def term_positions(tokens: Sequence[str]) -> Dict[str, List[int]]:
+    """Map each term to the sorted offsets where it occurs in ``tokens``."""
+    positions: Dict[str, List[int]] = {}
+    for offset, token in enumerate(tokens):
+        positions.setdefault(token, []).append(offset)
+    return positions
+
+
+def phrase_match(positions: Dict[str, List[int]], terms: Sequence[str]) -> bool:
+    """
+    Whether ``terms`` occur consecutively, in order.
+
+    Starts from the rarest term and checks the others at their offsets from it.
+    """
+    if not terms:
+        return True
+    lists = []
+    for index, term in enumerate(terms):
+        occurrences = positions.get(term)
+        if not occurrences:
+            return False
+        lists.append((len(occurrences), index, occurrences))
+    lists.sort()
+    _, anchor_index, anchor = lists[0]
+    others = [(index, set(occurrences)) for _, index, occurrences in lists[1:]]
+    for position in anchor:
+        start = position - anchor_index
+        if all(start + index in occurrences for index, occurrences in others):
+            return True
+    return False
+
+
+def near_match(positions: Dict[str, List[int]], terms: Sequence[str], distance: int) -> bool:
+    """
+    Whether every term occurs within a span of ``distance`` tokens.
+
+    The span is measured from the first to the last term of the window, so
+    ``a NEAR/1 b`` means adjacent in either order.
+    """
+    lists = []
+    for term in dict.fromkeys(terms):
+        occurrences = positions.get(term)
+        if not occurrences:
+            return False
+        lists.append(occurrences)
+    if len(lists) < 2:
+        return bool(lists)
+
+    # Sliding window over the merged occurrences: keep the earliest next
+    # occurrence of every term and advance whichever is furthest behind
+    heap = [(occurrences[0], index, 0) for index, occurrences in enumerate(lists)]
+    heapq.heapify(heap)
+    high = max(position for position, _, _ in heap)
+    while True:
+        low, index, cursor = heapq.heappop(heap)
+        if high - low <= distance:
+            return True
+        cursor += 1
+        if cursor == len(lists[index]):
+            return False
+        position = lists[index][cursor]
+        high = max(high, position)
+        heapq.heappush(heap, (position, index, cursor))
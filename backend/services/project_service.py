@@ -10,6 +10,7 @@ from backend.models.project import (
     Project, ProjectCreate, ProjectUpdate,
     ProjectTree, ProjectSummary, ProjectStats
 )
+from backend.services.durable_write import write_json
 
 
 class ProjectService:
@@ -68,8 +69,7 @@ class ProjectService:
     def _save_project_metadata(self, project: Project):
         """Save project metadata to JSON file"""
         metadata_path = self._get_project_metadata_path(project.id)
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(project.model_dump(), f, indent=2, default=str)
+        write_json(metadata_path, project.model_dump(), ensure_ascii=True, default=str)
 
     def _load_project_metadata(self, project_id: str) -> Optional[Project]:
         """Load project metadata from JSON file"""
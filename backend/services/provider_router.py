@@ -0,0 +1,200 @@
+"""
+Provider Router
+
+This module orders candidate AI providers for a conversation turn and runs
+the request against them.  Candidates are ranked by health, configured
+priority and observed latency; a failed provider is skipped in favour of
+the next one, and an optional hedging mode sends a backup request when the
+primary is slower than its own 95th-percentile latency, keeping whichever
+answer arrives first.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Union
+from uuid import UUID
+
+from ..models.ai_provider import AIError, AIResponse
+
+# Lower rank is preferred; providers without health data sit between healthy and degraded
+HEALTH_RANK = {"healthy": 0, "unknown": 1, "degraded": 2, "unhealthy": 3}
+
+# (provider_id, model) pair the router may send a request to
+Candidate = Tuple[UUID, str]
+SendFunc = Callable[[UUID, str], Awaitable[Union[AIResponse, AIError]]]
+
+
+class ProviderRouter:
+    """Ranks providers and executes requests with failover and optional hedging."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20, default_hedge_delay: float = 2.0):
+        """
+        Initialize the router.
+
+        Args:
+            window: Number of recent latencies kept per provider
+            min_samples: Samples needed before the p95 is trusted for hedging
+            default_hedge_delay: Hedge delay used until enough samples exist
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self.default_hedge_delay = default_hedge_delay
+        self._latencies: Dict[UUID, Deque[float]] = {}
+
+    def record(self, provider_id: UUID, latency: float) -> None:
+        """Record the latency of a successful request."""
+        samples = self._latencies.get(provider_id)
+        if samples is None:
+            samples = self._latencies[provider_id] = deque(maxlen=self.window)
+        samples.append(latency)
+
+    def average_latency(self, provider_id: UUID) -> Optional[float]:
+        """Mean recent latency for a provider, or None without samples."""
+        samples = self._latencies.get(provider_id)
+        if not samples:
+            return None
+        return sum(samples) / len(samples)
+
+    def percentile(self, provider_id: UUID, q: float = 0.95) -> Optional[float]:
+        """Nearest-rank percentile of recent latency, or None without samples."""
+        samples = self._latencies.get(provider_id)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    def hedge_delay(self, provider_id: UUID) -> float:
+        """Seconds to wait for a provider before sending a hedged backup request."""
+        samples = self._latencies.get(provider_id)
+        if not samples or len(samples) < self.min_samples:
+            return self.default_hedge_delay
+        return self.percentile(provider_id)
+
+    def rank(
+        self,
+        candidates: List[Candidate],
+        health: Dict[UUID, str],
+        priority: Dict[UUID, int],
+        preferred: Optional[UUID] = None
+    ) -> List[Candidate]:
+        """
+        Order candidates for routing.
+
+        Providers sort by health first, then the preferred provider wins among
+        equally healthy ones, then configured priority (lower first), then
+        observed mean latency (unmeasured providers first, so they get sampled).
+
+        Args:
+            candidates: Provider/model pairs to order
+            health: Health status per provider
+            priority: Configured priority per provider
+            preferred: Provider chosen for this conversation, if any
+
+        Returns:
+            Candidates in the order they should be tried
+        """
+        def key(candidate: Candidate):
+            provider_id = candidate[0]
+            return (
+                HEALTH_RANK.get(health.get(provider_id), HEALTH_RANK["unknown"]),
+                provider_id != preferred,
+                priority.get(provider_id, 1),
+                self.average_latency(provider_id) or 0.0,
+            )
+        return sorted(candidates, key=key)
+
+    async def _attempt(
+        self,
+        candidate: Candidate,
+        send: SendFunc,
+        attempted: List[str]
+    ) -> Tuple[UUID, Union[AIResponse, AIError]]:
+        provider_id, model = candidate
+        attempted.append(str(provider_id))
+        start = time.monotonic()
+        try:
+            result = await send(provider_id, model)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result = AIError(type="request_failed", message=str(e))
+        if isinstance(result, AIResponse):
+            self.record(provider_id, time.monotonic() - start)
+        return provider_id, result
+
+    async def _hedged(
+        self,
+        primary: Candidate,
+        backup: Candidate,
+        send: SendFunc,
+        attempted: List[str]
+    ) -> Tuple[UUID, Union[AIResponse, AIError], bool]:
+        first = asyncio.ensure_future(self._attempt(primary, send, attempted))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(primary[0]))
+            if done:
+                provider_id, result = first.result()
+                if isinstance(result, AIResponse):
+                    return provider_id, result, False
+                # Primary failed before the hedge fired; plain failover
+                return (*await self._attempt(backup, send, attempted), False)
+
+            tasks.append(asyncio.ensure_future(self._attempt(backup, send, attempted)))
+            pending = set(tasks)
+            last = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider_id, result = task.result()
+                    if isinstance(result, AIResponse):
+                        return provider_id, result, True
+                    last = (provider_id, result)
+            return (*last, True)
+        finally:
+            # Cancel the losing request
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def execute(
+        self,
+        candidates: List[Candidate],
+        send: SendFunc,
+        hedge: bool = False
+    ) -> Tuple[UUID, Union[AIResponse, AIError]]:
+        """
+        Send a request, failing over through the candidates until one succeeds.
+
+        Args:
+            candidates: Ranked provider/model pairs (at least one)
+            send: Coroutine function performing the request for a provider and model
+            hedge: Whether to race a backup request against a slow primary
+
+        Returns:
+            Tuple of (provider_id, result) for the first successful response,
+            or for the last error if every candidate failed
+        """
+        attempted: List[str] = []
+        hedged = False
+        provider_id, result = candidates[0][0], None
+        index = 0
+        while index < len(candidates):
+            if hedge and index + 1 < len(candidates):
+                provider_id, result, fired = await self._hedged(
+                    candidates[index], candidates[index + 1], send, attempted
+                )
+                hedged = hedged or fired
+                index += 2
+            else:
+                provider_id, result = await self._attempt(candidates[index], send, attempted)
+                index += 1
+            if isinstance(result, AIResponse):
+                break
+
+        if len(attempted) > 1 or hedged:
+            result.metadata = result.metadata or {}
+            result.metadata["routing"] = {"attempted_providers": attempted, "hedged": hedged}
+        return provider_id, result
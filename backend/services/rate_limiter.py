@@ -0,0 +1,208 @@
+"""
+Provider Rate Limiting
+
+This module provides async token-bucket rate limiting for AI provider
+requests.  Each provider gets a request bucket and a token bucket refilled
+continuously from its per-minute limits.  Callers wait in FIFO order for
+capacity instead of sending requests that the provider would reject with a
+429, and token estimates made before a call are reconciled with the usage
+reported afterwards.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+
+class TokenBucket:
+    """Continuously refilled token bucket."""
+
+    def __init__(self, capacity: float, per_minute: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            capacity: Maximum number of units the bucket holds
+            per_minute: Units added per minute
+        """
+        self.capacity = float(capacity)
+        self.rate = per_minute / 60.0
+        self.level = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate > 0 else float("inf")
+
+    def consume(self, amount: float) -> None:
+        """Take ``amount`` units; the level may go negative (debt) after reconciliation."""
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        """Return ``amount`` units (negative to charge more)."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def reconfigure(self, capacity: float, per_minute: float) -> None:
+        """Change the limits, keeping the current fill ratio."""
+        self._refill()
+        ratio = self.level / self.capacity if self.capacity else 1.0
+        self.capacity = float(capacity)
+        self.rate = per_minute / 60.0
+        self.level = ratio * self.capacity
+
+
+class ProviderRateLimiter:
+    """
+    Request and token budgets for one provider.
+
+    Waiters are served strictly in arrival order: the request at the head of
+    the queue holds the queue lock while it waits for capacity, so a large
+    request is never starved by a stream of small ones.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request budget per minute
+            tokens_per_minute: Token budget per minute
+        """
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute)
+        self._limits = (requests_per_minute, tokens_per_minute)
+        self._queue_lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Metrics
+        self.queue_depth = 0
+        self.total_acquired = 0
+        self.total_rejected = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.last_wait_time = 0.0
+
+    def configure(self, requests_per_minute: int, tokens_per_minute: int) -> None:
+        """Apply changed provider limits."""
+        if (requests_per_minute, tokens_per_minute) != self._limits:
+            self.requests.reconfigure(requests_per_minute, requests_per_minute)
+            self.tokens.reconfigure(tokens_per_minute, tokens_per_minute)
+            self._limits = (requests_per_minute, tokens_per_minute)
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._queue_lock is None or self._lock_loop is not loop:
+            self._queue_lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._queue_lock
+
+    def wait_time(self, tokens: int = 0) -> float:
+        """Seconds a request for ``tokens`` would wait if nobody else were queued."""
+        return max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+
+    async def acquire(self, tokens: int, max_wait: Optional[float] = None) -> float:
+        """
+        Wait for budget for one request of ``tokens`` estimated tokens.
+
+        Args:
+            tokens: Estimated tokens the request will use
+            max_wait: Give up if the budget cannot be granted within this many seconds
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            asyncio.TimeoutError: If ``max_wait`` would be exceeded
+        """
+        start = time.monotonic()
+        deadline = start + max_wait if max_wait is not None else None
+        self.queue_depth += 1
+        try:
+            async with self._get_lock():
+                while True:
+                    wait = self.wait_time(tokens)
+                    if wait <= 0:
+                        break
+                    if deadline is not None and time.monotonic() + wait > deadline:
+                        self.total_rejected += 1
+                        raise asyncio.TimeoutError(f"Rate limit wait of {wait:.1f}s exceeds {max_wait}s")
+                    await asyncio.sleep(wait)
+
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - start
+        self.total_acquired += 1
+        self.total_wait_time += waited
+        self.max_wait_time = max(self.max_wait_time, waited)
+        self.last_wait_time = waited
+        return waited
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token budget once actual usage is known."""
+        self.tokens.refund(estimated_tokens - actual_tokens)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return queue depth, wait-time and remaining-budget metrics."""
+        self.requests._refill()
+        self.tokens._refill()
+        return {
+            "queue_depth": self.queue_depth,
+            "total_acquired": self.total_acquired,
+            "total_rejected": self.total_rejected,
+            "average_wait_time": self.total_wait_time / self.total_acquired if self.total_acquired else 0.0,
+            "max_wait_time": self.max_wait_time,
+            "last_wait_time": self.last_wait_time,
+            "requests_available": max(0.0, self.requests.level),
+            "tokens_available": max(0.0, self.tokens.level),
+            "requests_per_minute": self._limits[0],
+            "tokens_per_minute": self._limits[1],
+        }
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_output_tokens: Optional[int] = None) -> int:
+    """
+    Estimate the tokens a chat request will consume.
+
+    Uses roughly four characters per token for the prompt plus a small
+    per-message overhead, and adds the requested output budget.
+
+    Args:
+        messages: Chat messages in API format
+        max_output_tokens: Maximum tokens the reply may use
+
+    Returns:
+        Estimated total tokens
+    """
+    prompt_chars = 0
+    for message in messages:
+        content = message.get("content") or ""
+        prompt_chars += len(content) if isinstance(content, str) else len(str(content))
+    prompt_tokens = prompt_chars // 4 + 4 * len(messages)
+    return prompt_tokens + (max_output_tokens or 0)
+
+
+def usage_tokens(usage: Dict[str, Any]) -> Optional[int]:
+    """Total tokens reported in a provider ``usage`` block (OpenAI or Anthropic keys)."""
+    if not usage:
+        return None
+    if "total_tokens" in usage:
+        return int(usage["total_tokens"])
+    input_tokens = usage.get("prompt_tokens", usage.get("input_tokens"))
+    output_tokens = usage.get("completion_tokens", usage.get("output_tokens"))
+    if input_tokens is None and output_tokens is None:
+        return None
+    return int(input_tokens or 0) + int(output_tokens or 0)
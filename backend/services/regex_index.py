@@ -0,0 +1,248 @@
+"""
+Regex Trigram Index
+
+This module narrows regular-expression search to documents that can possibly
+match, in the style of Google Code Search.  Every document's text is indexed
+by its character trigrams.  A regex is parsed and turned into a boolean query
+over trigrams that any match must satisfy (``abc|xyz`` needs trigram ``abc``
+or ``xyz``, ``foo.*bar`` needs ``foo`` and ``bar``).  Evaluating that
+query against the postings gives the candidate documents; the regex itself is
+then run only on those.
+
+Queries are conservative: anything the analysis does not understand (classes
+of many characters, back-references, non-ASCII literals, ...) just stops
+constraining, so a document is never dropped that the regex would match.
+Text is case-folded for the index because regex search is case-insensitive.
+"""
+
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+# A trigram query: None matches every document, a string is one trigram,
+# ("and", (...)) / ("or", (...)) combine sub-queries
+TrigramQuery = Union[None, str, Tuple[str, tuple]]
+
+# Alternatives tracked exactly before a sub-expression is reduced to a query
+MAX_EXACT = 16
+
+# Non-ASCII characters that case-insensitive regexes match to ASCII letters
+_FOLD = str.maketrans({"İ": "i", "ı": "i", "K": "k", "ſ": "s"})
+
+
+def normalize(text: str) -> str:
+    """Fold text the way the index stores it."""
+    return text.translate(_FOLD).lower()
+
+
+def text_trigrams(text: str) -> Set[str]:
+    """Distinct trigrams of normalized text."""
+    text = normalize(text)
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _and(*queries: TrigramQuery) -> TrigramQuery:
+    parts: List[TrigramQuery] = []
+    for query in queries:
+        if query is None:
+            continue
+        if isinstance(query, tuple) and query[0] == "and":
+            parts.extend(query[1])
+        elif query not in parts:
+            parts.append(query)
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else ("and", tuple(parts))
+
+
+def _or(*queries: TrigramQuery) -> TrigramQuery:
+    parts: List[TrigramQuery] = []
+    for query in queries:
+        if query is None:
+            return None
+        if isinstance(query, tuple) and query[0] == "or":
+            parts.extend(query[1])
+        elif query not in parts:
+            parts.append(query)
+    return parts[0] if len(parts) == 1 else ("or", tuple(parts))
+
+
+def _exact_query(strings: Set[str]) -> TrigramQuery:
+    """Query satisfied by text containing any of ``strings``."""
+    if any(len(s) < 3 for s in strings):
+        return None
+    return _or(*(_and(*sorted({s[i:i + 3] for i in range(len(s) - 2)})) for s in sorted(strings)))
+
+
+class _Info:
+    """What is known about the strings a regex node matches."""
+
+    def __init__(self, exact: Optional[Set[str]] = None, query: TrigramQuery = None):
+        # Every string the node can match, when there are few enough
+        self.exact = exact
+        # Trigram query any match must satisfy (implied by ``exact`` when set)
+        self.query = query
+
+    def to_query(self) -> TrigramQuery:
+        return _exact_query(self.exact) if self.exact is not None else self.query
+
+
+_UNKNOWN = _Info()
+
+
+def _literal(code: int) -> _Info:
+    char = chr(code)
+    if not char.isascii():
+        return _UNKNOWN
+    return _Info(exact={char.lower()})
+
+
+def _char_class(items: List[Tuple[Any, Any]]) -> _Info:
+    chars: Set[str] = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            chars.add(chr(av))
+        elif op is sre_constants.RANGE and av[1] - av[0] < MAX_EXACT:
+            chars.update(chr(c) for c in range(av[0], av[1] + 1))
+        else:
+            return _UNKNOWN
+    if not chars or not all(c.isascii() for c in chars):
+        return _UNKNOWN
+    return _Info(exact={c.lower() for c in chars})
+
+
+def _concat(infos: Iterable[_Info]) -> _Info:
+    query: TrigramQuery = None
+    exact: Optional[Set[str]] = {""}
+    reduced = False
+    for info in infos:
+        if info.exact is not None and len(exact) * len(info.exact) <= MAX_EXACT:
+            exact = {a + b for a in exact for b in info.exact}
+            continue
+        reduced = True
+        query = _and(query, _exact_query(exact))
+        if info.exact is not None:
+            exact = set(info.exact)
+        else:
+            query = _and(query, info.query)
+            exact = {""}
+    if not reduced:
+        return _Info(exact=exact)
+    return _Info(query=_and(query, _exact_query(exact)))
+
+
+def _analyze(pattern) -> _Info:
+    """Analyze a parsed pattern (a sequence of regex nodes)."""
+    return _concat(_analyze_node(op, av) for op, av in pattern)
+
+
+def _analyze_node(op, av) -> _Info:
+    if op is sre_constants.LITERAL:
+        return _literal(av)
+    if op is sre_constants.IN:
+        return _char_class(av)
+    if op is sre_constants.SUBPATTERN:
+        return _analyze(av[-1])
+    if op is getattr(sre_constants, "ATOMIC_GROUP", None):
+        return _analyze(av)
+    if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        # Zero-width: matches the empty string wherever it applies
+        return _Info(exact={""})
+    if op is sre_constants.BRANCH:
+        branches = [_analyze(p) for p in av[1]]
+        if all(b.exact is not None for b in branches):
+            union = set().union(*(b.exact for b in branches))
+            if len(union) <= MAX_EXACT:
+                return _Info(exact=union)
+        return _Info(query=_or(*(b.to_query() for b in branches)))
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+              getattr(sre_constants, "POSSESSIVE_REPEAT", None)):
+        low, high, sub = av
+        inner = _analyze(sub)
+        if low == 0:
+            if high == 1 and inner.exact is not None:
+                return _Info(exact=inner.exact | {""})
+            return _UNKNOWN
+        if low == high and inner.exact is not None:
+            return _concat([inner] * low)
+        return _Info(query=inner.to_query())
+    return _UNKNOWN
+
+
+def regex_query(pattern: str, flags: int = re.IGNORECASE) -> TrigramQuery:
+    """
+    Trigram query that every match of ``pattern`` satisfies.
+
+    Returns:
+        The query, or None if the pattern does not constrain trigrams
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, RecursionError, OverflowError):
+        return None
+    return _analyze(parsed).to_query()
+
+
+class RegexTrigramIndex:
+    """Trigram postings over document text for regex candidate selection."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._postings: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index (more) text of a document."""
+        grams = text_trigrams(text)
+        with self._lock:
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(doc_id)
+
+    def discard(self, doc_id: str, text: str) -> None:
+        """Remove a document, given the text it was indexed with."""
+        grams = text_trigrams(text)
+        with self._lock:
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(doc_id)
+                    if not postings:
+                        del self._postings[gram]
+
+    def clear(self) -> None:
+        """Remove every document."""
+        with self._lock:
+            self._postings.clear()
+
+    def candidates(self, query: TrigramQuery) -> Optional[Set[str]]:
+        """
+        Documents that satisfy a trigram query.
+
+        Returns:
+            Set of document IDs, or None if the query does not narrow anything
+        """
+        with self._lock:
+            result = self._evaluate(query)
+            return set(result) if result is not None else None
+
+    def _evaluate(self, query: TrigramQuery) -> Optional[Set[str]]:
+        if query is None:
+            return None
+        if isinstance(query, str):
+            return self._postings.get(query, set())
+        op, parts = query
+        results = [self._evaluate(part) for part in parts]
+        if op == "or":
+            if any(r is None for r in results):
+                return None
+            return set().union(*results)
+        known = sorted((r for r in results if r is not None), key=len)
+        if not known:
+            return None
+        return known[0].intersection(*known[1:])
@@ -0,0 +1,157 @@
+"""
+Service Registry
+
+This module provides the application-scoped registry that builds each backend
+service once and shares it across all API routers.  Services are created
+eagerly during application startup (see ``backend/main.py``) and lazily on
+first use otherwise, so routers work the same with or without the lifespan
+hooks running (e.g. under a bare ``TestClient``).
+"""
+
+import inspect
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+from ..config.settings import settings
+from .ai_provider_service import AIProviderService
+from .chat_session_service import ChatSessionService
+from .conversation_service import ConversationService
+from .file_management_service import FileManagementService
+from .message_template_service import MessageTemplateService
+from .project_service import ProjectService
+from .search_service import SearchService
+from .settings_service import SettingsService
+from .user_state_service import UserStateService
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """
+    Application-scoped container for backend services.
+
+    Each service is registered with a factory that receives the registry, so
+    services can share their dependencies (e.g. one AIProviderService used by
+    both the provider API and the ConversationService).
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._factories: Dict[str, Callable[["ServiceRegistry"], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._build_order: List[str] = []
+        # FastAPI runs sync dependencies in a thread pool; re-entrant because
+        # factories resolve their own dependencies through the registry.
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[["ServiceRegistry"], Any]) -> None:
+        """
+        Register a service factory.
+
+        Args:
+            name: Service name used with :meth:`get`
+            factory: Callable that builds the service from the registry
+        """
+        with self._lock:
+            self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        """
+        Get a service, building it on first use.
+
+        Args:
+            name: Registered service name
+
+        Returns:
+            The shared service instance
+
+        Raises:
+            KeyError: If no factory is registered under ``name``
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise KeyError(f"Service '{name}' is not registered")
+                self._instances[name] = self._factories[name](self)
+                self._build_order.append(name)
+            return self._instances[name]
+
+    def is_built(self, name: str) -> bool:
+        """Return True if the named service has been built."""
+        return name in self._instances
+
+    def startup(self) -> None:
+        """Build every registered service up front, off the request path."""
+        for name in list(self._factories):
+            try:
+                self.get(name)
+            except Exception as e:
+                # Leave it to be retried lazily on first request
+                logger.error(f"Failed to initialize service '{name}': {e}")
+
+    async def shutdown(self) -> None:
+        """Close services in reverse build order and forget them."""
+        with self._lock:
+            names = list(reversed(self._build_order))
+            instances = [(name, self._instances[name]) for name in names]
+            self._instances.clear()
+            self._build_order.clear()
+
+        for name, instance in instances:
+            close = getattr(instance, "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Failed to close service '{name}': {e}")
+
+
+def _build_conversation_service(registry: ServiceRegistry) -> ConversationService:
+    return ConversationService(
+        chat_session_service=registry.get("chat_sessions"),
+        ai_provider_service=registry.get("ai_providers"),
+        settings_service=registry.get("settings"),
+        context_flush_interval=settings.CONVERSATION_CONTEXT_FLUSH_SECONDS,
+        max_dirty_contexts=settings.CONVERSATION_CONTEXT_MAX_DIRTY,
+        context_cache_size=settings.CONVERSATION_CONTEXT_CACHE_SIZE,
+    )
+
+
+def _build_search_service(registry: ServiceRegistry) -> SearchService:
+    return SearchService(
+        conversation_service=registry.get("conversations"),
+        file_service=registry.get("files"),
+        chat_session_service=registry.get("chat_sessions"),
+    )
+
+
+def create_registry() -> ServiceRegistry:
+    """Create a registry with all backend services registered."""
+    registry = ServiceRegistry()
+    registry.register("ai_providers", lambda r: AIProviderService())
+    registry.register("chat_sessions", lambda r: ChatSessionService(
+        message_storage=settings.CHAT_MESSAGE_STORAGE,
+        io_workers=settings.CHAT_IO_WORKERS,
+        storage_backend=settings.CHAT_STORAGE_BACKEND,
+        sqlite_path=settings.CHAT_SQLITE_PATH
+    ))
+    registry.register("conversations", _build_conversation_service)
+    registry.register("files", lambda r: FileManagementService())
+    registry.register("search", _build_search_service)
+    registry.register("settings", lambda r: SettingsService())
+    registry.register("user_state", lambda r: UserStateService())
+    registry.register("projects", lambda r: ProjectService())
+    registry.register("templates", lambda r: MessageTemplateService())
+    return registry
+
+
+# Process-wide registry shared by the API routers
+registry = create_registry()
@@ -0,0 +1,229 @@
+"""
+AI Response Cache
+
+This module provides an exact-match cache for AI provider responses.
+Entries are content-addressed by a SHA-256 hash of the canonical JSON form
+of the request (provider, model, messages and sampling parameters), kept in
+an in-memory LRU with a TTL and optionally mirrored to disk so they survive
+restarts.
+
+The disk tier is bounded too: it keeps at most ``max_disk_entries`` files,
+removing the oldest writes first, and expired files are swept periodically
+rather than only when they are next read.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from ..models.ai_provider import AIRequest, AIResponse
+from . import durable_write
+
+# AIRequest fields that do not affect the generated reply
+NON_KEY_FIELDS = {"metadata", "use_cache"}
+
+
+def request_key(provider_id: UUID, request: AIRequest) -> str:
+    """
+    Compute the cache key for a request.
+
+    Args:
+        provider_id: Provider the request is sent to
+        request: The AI request
+
+    Returns:
+        Hex SHA-256 digest of the canonical request
+    """
+    canonical = json.dumps(
+        {"provider_id": str(provider_id), "request": request.model_dump(mode="json", exclude=NON_KEY_FIELDS)},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(request: AIRequest) -> bool:
+    """
+    Decide whether a request's response may be served from the cache.
+
+    ``use_cache`` forces the decision either way; by default only
+    deterministic (temperature 0) requests are cached.
+    """
+    if request.use_cache is not None:
+        return request.use_cache
+    return request.temperature == 0
+
+
+class ResponseCache:
+    """LRU + TTL response cache with an optional on-disk tier."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        disk_dir: Optional[Path] = None,
+        max_disk_entries: int = 10000,
+        sweep_interval: float = 300
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum responses kept in memory
+            ttl_seconds: Seconds a response stays valid
+            disk_dir: Directory for the on-disk tier (memory only if omitted)
+            max_disk_entries: Maximum responses kept on disk
+            sweep_interval: Seconds between sweeps of expired files on disk
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_entries = max_disk_entries
+        self.sweep_interval = sweep_interval
+        self._entries: "OrderedDict[str, Tuple[float, AIResponse]]" = OrderedDict()
+        # Disk entries in write order with their expiry; since the TTL is
+        # fixed, expiries only grow along this order
+        self._disk_entries: "OrderedDict[str, float]" = OrderedDict()
+        self._next_sweep = 0.0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_entries()
+            self.sweep()
+
+    def _disk_file(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _load_disk_entries(self) -> None:
+        """Index files left by earlier runs, oldest first, without reading them."""
+        files = []
+        for path in self.disk_dir.glob("*/*.json"):
+            try:
+                files.append((path.stat().st_mtime, path.stem))
+            except OSError:
+                continue
+        for mtime, key in sorted(files):
+            self._disk_entries[key] = mtime + self.ttl_seconds
+
+    def _remove_from_disk(self, key: str) -> None:
+        self._disk_entries.pop(key, None)
+        self._disk_file(key).unlink(missing_ok=True)
+
+    def sweep(self) -> int:
+        """
+        Remove expired responses from disk.
+
+        Returns:
+            Number of responses removed
+        """
+        if not self.disk_dir:
+            return 0
+        now = time.time()
+        self._next_sweep = now + self.sweep_interval
+        removed = 0
+        while self._disk_entries:
+            key, expires_at = next(iter(self._disk_entries.items()))
+            if expires_at > now:
+                break
+            self._remove_from_disk(key)
+            self._entries.pop(key, None)
+            removed += 1
+        return removed
+
+    def _load_from_disk(self, key: str) -> Optional[Tuple[float, AIResponse]]:
+        path = self._disk_file(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data["expires_at"], AIResponse(**data["response"])
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, KeyError, ValueError, OSError):
+            self._remove_from_disk(key)
+            return None
+
+    def _store(self, key: str, entry: Tuple[float, AIResponse]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[AIResponse]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Request key from :func:`request_key`
+
+        Returns:
+            A copy of the cached response, or None on a miss or expired entry
+        """
+        entry = self._entries.get(key)
+        if entry is None and self.disk_dir:
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                self._store(key, entry)
+        if entry is None:
+            return None
+
+        expires_at, response = entry
+        if expires_at <= time.time():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return response.model_copy(deep=True)
+
+    def put(self, key: str, response: AIResponse) -> None:
+        """
+        Cache a response.
+
+        Args:
+            key: Request key from :func:`request_key`
+            response: Response to cache
+        """
+        entry = (time.time() + self.ttl_seconds, response.model_copy(deep=True))
+        self._store(key, entry)
+        if self.disk_dir:
+            path = self._disk_file(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            durable_write.write_json(
+                path, {"expires_at": entry[0], "response": response.model_dump(mode="json")}, indent=None, ensure_ascii=True
+            )
+            self._disk_entries[key] = entry[0]
+            self._disk_entries.move_to_end(key)
+            while len(self._disk_entries) > self.max_disk_entries:
+                self._remove_from_disk(next(iter(self._disk_entries)))
+            if time.time() >= self._next_sweep:
+                self.sweep()
+
+    def delete(self, key: str) -> None:
+        """Remove a response from both tiers."""
+        self._entries.pop(key, None)
+        if self.disk_dir:
+            self._remove_from_disk(key)
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        self._entries.clear()
+        self._disk_entries.clear()
+        if self.disk_dir:
+            for path in self.disk_dir.glob("*/*.json"):
+                path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the cache size and configuration."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "disk": bool(self.disk_dir),
+            "disk_entries": len(self._disk_entries),
+            "max_disk_entries": self.max_disk_entries,
+        }
@@ -0,0 +1,122 @@
+"""
+Provider Retry Policy
+
+This module decides whether a failed AI provider call should be retried and
+how long to wait first.  Rate limiting (429), server errors (5xx), timeouts
+and dropped connections are treated as transient; everything else (bad
+requests, authentication failures, malformed responses) fails immediately.
+Delays use capped exponential backoff with full jitter, and a server's
+``Retry-After`` header takes precedence when present.
+"""
+
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import aiohttp
+
+# HTTP status codes worth retrying (529 is Anthropic's "overloaded")
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504, 529}
+
+
+class ProviderHTTPError(Exception):
+    """Non-200 response from a provider API."""
+
+    def __init__(self, message: str, status: int, retry_after: Optional[float] = None):
+        """
+        Initialize the error.
+
+        Args:
+            message: Human-readable error message
+            status: HTTP status code returned by the provider
+            retry_after: Seconds the provider asked us to wait, if it said
+        """
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Classification and backoff rules for provider requests."""
+
+    def __init__(self, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        Initialize the policy.
+
+        Args:
+            base_delay: Backoff ceiling for the first retry, in seconds
+            max_delay: Cap on any single wait, including ``Retry-After``
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def classify(error: BaseException) -> Optional[str]:
+        """
+        Classify a failure.
+
+        Args:
+            error: Exception raised by the request
+
+        Returns:
+            "rate_limited", "server_error", "timeout" or "connection_error" for
+            transient failures, None if the request should not be retried
+        """
+        if isinstance(error, ProviderHTTPError):
+            if error.status == 429:
+                return "rate_limited"
+            if error.status in RETRYABLE_STATUS_CODES:
+                return "server_error"
+            return None
+        if isinstance(error, asyncio.TimeoutError):
+            return "timeout"
+        if isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, ConnectionError)):
+            return "connection_error"
+        return None
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Compute the wait before the next attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            retry_after: Delay requested by the server, if any
+
+        Returns:
+            Seconds to wait, or None if the server asked for longer than
+            ``max_delay`` and the caller should give up instead
+        """
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            return retry_after
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
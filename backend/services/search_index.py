@@ -0,0 +1,593 @@
+"""
+Persistent Search Index Storage
+
+On-disk format and incremental update journal for the SearchService inverted
+index.  An index generation is stored as:
+
+- ``meta.json``            generation number, journal position, document id table
+- ``terms.<gen>.json``     term dictionary: term -> [postings offset, postings count]
+- ``postings.<gen>.bin``   sorted uint32 document numbers for every term
+- ``docs.<gen>.jsonl``     document store, one JSON document per line
+- ``docs.<gen>.idx``       uint64 byte offset of each document line
+
+Postings and the document store are memory-mapped when a generation is opened
+and decoded lazily on first access, so startup cost does not depend on corpus
+size.  Changes made after a generation was written are appended to
+``journal.jsonl`` and replayed on startup; :meth:`SearchIndexStore.write` folds
+them into a new generation.
+
+A new generation is streamed from the current one: entries still on disk are
+copied from the memory-mapped segment without being decoded, and only the
+in-memory overlay is encoded.  Writing is split into :meth:`snapshot` (cheap,
+under the caller's lock), :meth:`write_snapshot` (the slow part, while the
+index keeps changing) and :meth:`rebind`, which points the lazy maps at the
+new generation so changes made meanwhile can be replayed from the journal.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections.abc import ItemsView, KeysView, ValuesView
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from . import durable_write
+
+
+FORMAT_VERSION = 1
+
+_OFFSET = struct.Struct("<Q")
+
+
+class LazyIndexMap(dict):
+    """
+    dict whose values are decoded from a memory-mapped segment on first access.
+
+    Keys known to be on disk are tracked separately until they are loaded, so
+    membership tests, ``len()`` and iteration see the full index without
+    decoding it.  With a ``default_factory`` it behaves like ``defaultdict`` for
+    keys that are neither loaded nor on disk.
+
+    An ``observer`` (any object with ``add(key)`` and ``discard(key)``) is told
+    when keys are added or removed, so derived structures such as the fuzzy
+    term index stay in step with the key set.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[Any], Any]] = None,
+        keys: Iterable[Any] = (),
+        default_factory: Optional[Callable[[], Any]] = None
+    ):
+        super().__init__()
+        self._loader = loader
+        self._pending: Set[Any] = set(keys)
+        self.default_factory = default_factory
+        self.observer: Optional[Any] = None
+
+    def _materialize(self, key):
+        value = self._loader(key)
+        self._pending.discard(key)
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __missing__(self, key):
+        if key in self._pending:
+            return self._materialize(key)
+        if self.default_factory is None:
+            raise KeyError(key)
+        value = self.default_factory()
+        dict.__setitem__(self, key, value)
+        if self.observer is not None:
+            self.observer.add(key)
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._pending
+
+    def __setitem__(self, key, value):
+        if self.observer is not None and key not in self:
+            self.observer.add(key)
+        self._pending.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if key in self._pending:
+            self._pending.discard(key)
+        else:
+            dict.__delitem__(self, key)
+        if self.observer is not None:
+            self.observer.discard(key)
+
+    def __len__(self):
+        return dict.__len__(self) + len(self._pending)
+
+    def __iter__(self):
+        yield from list(dict.__iter__(self))
+        yield from list(self._pending)
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        if key in self._pending:
+            return self._materialize(key)
+        return default
+
+    def pop(self, key, *default):
+        if key in self._pending:
+            self._materialize(key)
+        if self.observer is not None:
+            self.observer.discard(key)
+        return dict.pop(self, key, *default)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def keys(self):
+        return KeysView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    def clear(self):
+        self._pending.clear()
+        dict.clear(self)
+        if self.observer is not None:
+            self.observer.clear()
+
+    def materialize_all(self) -> None:
+        """Decode every pending value."""
+        for key in list(self._pending):
+            self._materialize(key)
+
+    def loaded(self) -> Dict[Any, Any]:
+        """Values held in memory (decoded or set since the segment was opened)."""
+        return dict(dict.items(self))
+
+    def rebind(self, loader: Callable[[Any], Any], keys: Iterable[Any]) -> None:
+        """Drop every value in memory and load lazily from another segment holding ``keys``."""
+        keys = set(keys)
+        if self.observer is not None:
+            for key in self:
+                if key not in keys:
+                    self.observer.discard(key)
+        dict.clear(self)
+        self._loader = loader
+        self._pending = keys
+
+
+class _Segment:
+    """A memory-mapped, read-only index generation."""
+
+    def __init__(self, index_path: Path, meta: Dict[str, Any]):
+        self.generation: int = meta["generation"]
+        self.doc_ids: List[str] = meta["doc_ids"]
+        self.stored_count: int = meta["stored_count"]
+        self._files = []
+        self._maps: List[mmap.mmap] = []
+
+        with open(index_path / f"terms.{self.generation}.json", "r", encoding="utf-8") as f:
+            self.terms: Dict[str, List[int]] = json.load(f)
+
+        self._postings = self._map(index_path / f"postings.{self.generation}.bin")
+        self._docs = self._map(index_path / f"docs.{self.generation}.jsonl")
+        self._doc_offsets = self._map(index_path / f"docs.{self.generation}.idx")
+        self._doc_positions = {doc_id: i for i, doc_id in enumerate(self.doc_ids[:self.stored_count])}
+
+    def _map(self, path: Path) -> Optional[mmap.mmap]:
+        if path.stat().st_size == 0:
+            return None
+        f = open(path, "rb")
+        self._files.append(f)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def stored_ids(self) -> List[str]:
+        return self.doc_ids[:self.stored_count]
+
+    def load_postings(self, term: str) -> Set[str]:
+        doc_ids = self.doc_ids
+        return {doc_ids[n] for n in self.raw_postings(term)}
+
+    def raw_postings(self, term: str) -> array:
+        offset, count = self.terms[term]
+        numbers = array("I")
+        numbers.frombytes(self._postings[offset * 4:(offset + count) * 4])
+        return numbers
+
+    def raw_document(self, doc_id: str) -> bytes:
+        """Encoded document line, including its newline."""
+        position = self._doc_positions[doc_id]
+        (start,) = _OFFSET.unpack_from(self._doc_offsets, position * _OFFSET.size)
+        end = self._docs.find(b"\n", start)
+        return self._docs[start:end + 1]
+
+    def load_document(self, doc_id: str) -> Dict[str, Any]:
+        return json.loads(self.raw_document(doc_id))
+
+    def close(self) -> None:
+        for mapped in self._maps:
+            mapped.close()
+        for f in self._files:
+            f.close()
+        self._maps.clear()
+        self._files.clear()
+
+
+class _Snapshot:
+    """Index state captured for writing a generation while the index keeps changing."""
+
+    def __init__(self, journal_seq: int, segment: Optional[_Segment], doc_ids: List[str],
+                 documents: Dict[str, bytes], terms: List[Tuple[str, Optional[List[str]]]]):
+        self.journal_seq = journal_seq
+        self.segment = segment
+        # Stored document ids; encoded lines for documents in memory (others are copied from the segment)
+        self.doc_ids = doc_ids
+        self.documents = documents
+        # (term, ids) in term order; ids is None for postings copied from the segment
+        self.terms = terms
+
+
+class SearchIndexStore:
+    """
+    Persistent storage for the search index.
+
+    Loads the current generation as lazily-decoded maps, journals incremental
+    changes and writes new generations.
+    """
+
+    def __init__(self, index_path: Path, compact_threshold: int = 500):
+        """
+        Initialize the index store.
+
+        Args:
+            index_path: Directory holding the index files
+            compact_threshold: Journal entries after which callers should write a new generation
+        """
+        self.index_path = Path(index_path)
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        self.meta_file = self.index_path / "meta.json"
+        self.journal_file = self.index_path / "journal.jsonl"
+        self.compact_threshold = compact_threshold
+
+        self._segment: Optional[_Segment] = None
+        self._meta: Dict[str, Any] = {}
+        self._journal_seq = 0
+        self._journal_entries = 0
+        # Generations replaced on disk but possibly still read through lazy maps
+        self._retired: List[int] = []
+        self._lock = threading.Lock()
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        if not self.meta_file.exists():
+            return None
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != FORMAT_VERSION:
+                return None
+            return meta
+        except (json.JSONDecodeError, OSError):
+            return None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Corpus statistics saved with the current generation."""
+        return dict(self._meta.get("stats", {}))
+
+    def load(self) -> Tuple[LazyIndexMap, LazyIndexMap, List[Dict[str, Any]]]:
+        """
+        Open the current generation.
+
+        Returns:
+            Tuple of (document store, term index, saved index descriptors)
+        """
+        self.close()
+        meta = self._read_meta()
+        if meta is None:
+            self._meta = {}
+            self._journal_seq = 0
+            return (
+                LazyIndexMap(),
+                LazyIndexMap(default_factory=set),
+                [],
+            )
+
+        try:
+            self._segment = _Segment(self.index_path, meta)
+        except (OSError, ValueError) as e:
+            print(f"Error opening search index generation {meta.get('generation')}: {e}")
+            self._meta = {}
+            self._journal_seq = meta.get("journal_seq", 0)
+            return LazyIndexMap(), LazyIndexMap(default_factory=set), []
+
+        self._meta = meta
+        self._journal_seq = meta.get("journal_seq", 0)
+        document_store = LazyIndexMap(self._segment.load_document, self._segment.stored_ids())
+        term_index = LazyIndexMap(self._segment.load_postings, self._segment.terms.keys(), default_factory=set)
+        return document_store, term_index, meta.get("indices", [])
+
+    def replay(self, apply: Callable[[Dict[str, Any]], None]) -> int:
+        """
+        Replay journal entries written after the current generation.
+
+        Args:
+            apply: Callback receiving each journal entry
+
+        Returns:
+            Number of entries replayed
+        """
+        self._journal_entries = 0
+        if not self.journal_file.exists():
+            return 0
+
+        base_seq = self._meta.get("journal_seq", 0)
+        replayed = 0
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Torn write at the tail of the journal
+                self._journal_seq = max(self._journal_seq, entry.get("seq", 0))
+                if entry.get("seq", 0) <= base_seq:
+                    continue
+                apply(entry)
+                replayed += 1
+
+        self._journal_entries = replayed
+        return replayed
+
+    def record(self, op: str, **fields) -> bool:
+        """
+        Append an operation to the journal.
+
+        Args:
+            op: Operation name
+            **fields: JSON-serializable operation payload
+
+        Returns:
+            True if the journal has grown past the compaction threshold
+        """
+        with self._lock:
+            self._journal_seq += 1
+            entry = {"seq": self._journal_seq, "op": op, **fields}
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self._journal_entries += 1
+            return self._journal_entries >= self.compact_threshold
+
+    @property
+    def pending_entries(self) -> int:
+        """Number of journal entries not yet folded into a generation."""
+        return self._journal_entries
+
+    def write(
+        self,
+        document_store: Dict[str, Dict[str, Any]],
+        term_index: Dict[str, Set[str]],
+        indices: Optional[List[Dict[str, Any]]] = None,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Write the given index state as a new generation and truncate the journal.
+
+        Args:
+            document_store: Document id -> document
+            term_index: Term -> set of document ids
+            indices: Index descriptors to keep with the generation
+            stats: Corpus statistics to keep with the generation
+
+        Returns:
+            The new generation number
+        """
+        generation = self.write_snapshot(self.snapshot(document_store, term_index), indices, stats)
+        self.rebind(document_store, term_index)
+        return generation
+
+    def snapshot(self, document_store: Dict[str, Dict[str, Any]], term_index: Dict[str, Set[str]]) -> _Snapshot:
+        """
+        Capture the index state to write, without decoding entries still on disk.
+
+        Only values held in memory are encoded or copied, so this is cheap; the
+        caller must keep the maps from changing while it runs.
+
+        Args:
+            document_store: Document id -> document
+            term_index: Term -> set of document ids
+
+        Returns:
+            Snapshot for :meth:`write_snapshot`
+        """
+        def overlay(mapping):
+            return mapping.loaded() if isinstance(mapping, LazyIndexMap) else mapping
+
+        documents = {
+            doc_id: (json.dumps(doc, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+            for doc_id, doc in overlay(document_store).items()
+        }
+        loaded_terms = overlay(term_index)
+        terms = [
+            (term, list(loaded_terms[term]) if term in loaded_terms else None)
+            for term in sorted(term_index.keys())
+        ]
+        with self._lock:
+            journal_seq = self._journal_seq
+        return _Snapshot(journal_seq, self._segment, list(document_store.keys()), documents, terms)
+
+    def write_snapshot(
+        self,
+        snapshot: _Snapshot,
+        indices: Optional[List[Dict[str, Any]]] = None,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Stream a snapshot to disk as a new generation and make it current.
+
+        Entries the snapshot left on disk are copied from its segment, which
+        stays open until :meth:`rebind`.
+
+        Args:
+            snapshot: State from :meth:`snapshot`
+            indices: Index descriptors to keep with the generation
+            stats: Corpus statistics to keep with the generation
+
+        Returns:
+            The new generation number
+        """
+        generation = self._meta.get("generation", 0) + 1
+        segment = snapshot.segment
+
+        # Stored documents take the first document numbers so their position
+        # in docs.idx equals their number.
+        doc_ids = list(snapshot.doc_ids)
+        doc_numbers = {doc_id: n for n, doc_id in enumerate(doc_ids)}
+        stored_count = len(doc_ids)
+
+        def number(doc_id: str) -> int:
+            if doc_id not in doc_numbers:
+                doc_numbers[doc_id] = len(doc_ids)
+                doc_ids.append(doc_id)
+            return doc_numbers[doc_id]
+
+        with open(self.index_path / f"docs.{generation}.jsonl", "wb") as docs, \
+                open(self.index_path / f"docs.{generation}.idx", "wb") as offsets:
+            for doc_id in snapshot.doc_ids:
+                offsets.write(_OFFSET.pack(docs.tell()))
+                line = snapshot.documents.get(doc_id)
+                docs.write(line if line is not None else segment.raw_document(doc_id))
+
+        terms: Dict[str, List[int]] = {}
+        # Segment document number -> new document number, filled on first use
+        renumbered: Dict[int, int] = {}
+        with open(self.index_path / f"postings.{generation}.bin", "wb") as postings:
+            offset = 0
+            for term, ids in snapshot.terms:
+                if ids is None:
+                    numbers = []
+                    for n in segment.raw_postings(term):
+                        if n not in renumbered:
+                            renumbered[n] = number(segment.doc_ids[n])
+                        numbers.append(renumbered[n])
+                else:
+                    numbers = [number(doc_id) for doc_id in ids]
+                if not numbers:
+                    continue
+                numbers.sort()
+                array("I", numbers).tofile(postings)
+                terms[term] = [offset, len(numbers)]
+                offset += len(numbers)
+
+        # Segment files must be on disk before meta.json points at them
+        for name in (f"docs.{generation}.jsonl", f"docs.{generation}.idx", f"postings.{generation}.bin"):
+            durable_write.sync(self.index_path / name)
+        durable_write.write_json(self.index_path / f"terms.{generation}.json", terms, indent=None)
+
+        meta = {
+            "version": FORMAT_VERSION,
+            "generation": generation,
+            "journal_seq": snapshot.journal_seq,
+            "doc_ids": doc_ids,
+            "stored_count": stored_count,
+            "indices": indices or [],
+            "stats": stats or {},
+        }
+        durable_write.write_json(self.meta_file, meta, indent=None, default=str)
+
+        # The new generation is live on disk; the previous one is removed once
+        # nothing reads from it any more
+        previous = self._meta.get("generation")
+        if previous is not None:
+            self._retired.append(previous)
+        self._meta = meta
+        return generation
+
+    def rebind(self, document_store: Dict[str, Dict[str, Any]], term_index: Dict[str, Set[str]]) -> None:
+        """
+        Point lazy maps at the current generation and drop folded journal entries.
+
+        Values in memory are discarded, so the caller must hold its lock and then
+        :meth:`replay` the journal to reapply changes made after the snapshot.
+
+        Args:
+            document_store: Document map returned by :meth:`load`
+            term_index: Term map returned by :meth:`load`
+        """
+        with self._lock:
+            self.close()
+            self._segment = _Segment(self.index_path, self._meta)
+            for generation in self._retired:
+                self._remove_generation(generation)
+            self._retired.clear()
+            if isinstance(document_store, LazyIndexMap):
+                document_store.rebind(self._segment.load_document, self._segment.stored_ids())
+            if isinstance(term_index, LazyIndexMap):
+                term_index.rebind(self._segment.load_postings, self._segment.terms.keys())
+            self._truncate_journal(self._meta["journal_seq"])
+
+    def _truncate_journal(self, seq: int) -> None:
+        """Remove journal entries up to ``seq``, keeping later ones."""
+        if not self.journal_file.exists():
+            self._journal_entries = 0
+            return
+        kept = []
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Torn write at the tail of the journal
+                if entry.get("seq", 0) > seq:
+                    kept.append(line)
+        if not kept:
+            self.journal_file.unlink()
+        else:
+            tmp = self.journal_file.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(kept)
+            os.replace(tmp, self.journal_file)
+        self._journal_entries = len(kept)
+
+    def _remove_generation(self, generation: int) -> None:
+        for name in (f"terms.{generation}.json", f"postings.{generation}.bin",
+                     f"docs.{generation}.jsonl", f"docs.{generation}.idx"):
+            path = self.index_path / name
+            try:
+                if path.exists():
+                    path.unlink()
+            except OSError:
+                continue
+
+    def reset(self) -> None:
+        """Delete every persisted generation and the journal."""
+        with self._lock:
+            generation = self._meta.get("generation")
+            self.close()
+            for retired in self._retired + ([generation] if generation is not None else []):
+                self._remove_generation(retired)
+            self._retired.clear()
+            for path in (self.meta_file, self.journal_file):
+                if path.exists():
+                    path.unlink()
+            self._meta = {}
+            self._journal_entries = 0
+
+    def close(self) -> None:
+        """Release memory maps held by the current generation."""
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
@@ -15,6 +15,8 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 import math
 import hashlib
+import heapq
+import threading
 
 from backend.models.search import (
     SearchQuery, SearchResults, SearchResult, SearchResultType,
@@ -27,17 +29,57 @@ from backend.models.file_management import File, FileSummary, FileSearchRequest
 from backend.services.conversation_service import ConversationService
 from backend.services.file_management_service import FileManagementService
 from backend.services.chat_session_service import ChatSessionService
+from backend.services.search_index import SearchIndexStore
+from backend.services.fuzzy_index import FuzzyTermIndex
+from backend.services.regex_index import RegexTrigramIndex, regex_query
+from backend.services.positional import term_positions, phrase_match, near_match
+from backend.services.boolean_query import QueryPlanner, QuerySyntaxError, parse_query, positive_terms
+from backend.services.facet_index import FacetIndex
+from backend.services.durable_write import write_json
+
+# BM25F parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 2.0
+
+# Fields accepted in field:value clauses of boolean queries
+QUERY_FIELDS = ('type', 'project', 'user', 'provider', 'tag', 'ext', 'title')
+
+# Facets kept as bitmaps, and their keys in search results
+FACET_NAMES = {
+    'type': 'types',
+    'user': 'users',
+    'project': 'projects',
+    'provider': 'ai_providers',
+    'ext': 'file_types',
+    'tag': 'tags',
+}
+
+# Appended text parts kept per document before they are folded into its content
+APPEND_FOLD_PARTS = 64
+
+# Creation date facet buckets: (name, maximum age in seconds)
+DATE_RANGES = (('today', 86400), ('this_week', 7 * 86400), ('this_month', 30 * 86400))
 
 
 class SearchService:
     """Advanced search service for AI Chat Assistant"""
 
-    def __init__(self, base_path: str = None):
+    def __init__(
+        self,
+        base_path: str = None,
+        conversation_service: Optional[ConversationService] = None,
+        file_service: Optional[FileManagementService] = None,
+        chat_session_service: Optional[ChatSessionService] = None
+    ):
         """
         Initialize search service
 
         Args:
             base_path: Base directory for storing search indices. Defaults to user data directory.
+            conversation_service: Shared conversation service (created if omitted)
+            file_service: Shared file management service (created if omitted)
+            chat_session_service: Shared chat session service (created if omitted)
         """
         if base_path is None:
             # Use platform-appropriate data directory
@@ -55,18 +97,51 @@ class SearchService:
         self.analytics_path.mkdir(parents=True, exist_ok=True)
 
         # Initialize services
-        self.conversation_service = ConversationService()
-        self.file_service = FileManagementService()
-        self.chat_session_service = ChatSessionService()
+        self.conversation_service = conversation_service or ConversationService()
+        self.file_service = file_service or FileManagementService()
+        self.chat_session_service = chat_session_service or ChatSessionService()
 
         # Search analytics
         self.analytics_file = self.analytics_path / "analytics.json"
         self._load_analytics()
 
-        # In-memory index for faster searching (in production, use a proper search engine)
+        # Persistent inverted index, memory-mapped from the last written
+        # generation and brought up to date by replaying the change journal
+        self._index_lock = threading.RLock()
+        # Serializes writing generations (always taken before _index_lock)
+        self._compaction_lock = threading.Lock()
+        self._compaction: Optional[threading.Thread] = None
+        self._index_store = SearchIndexStore(self.index_path)
+        self.document_store, self.term_index, saved_indices = self._index_store.load()  # term -> document_ids
         self.indices: Dict[str, SearchIndex] = {}
-        self.document_store: Dict[str, Dict[str, Any]] = {}
-        self.term_index: Dict[str, Set[str]] = defaultdict(set)  # term -> document_ids
+        for index_data in saved_indices:
+            try:
+                index = SearchIndex(**index_data)
+                self.indices[index.id] = index
+            except Exception:
+                continue
+        # Corpus length totals for BM25 length normalization
+        self._corpus_stats: Dict[str, int] = {'documents': 0, 'total_length': 0, 'total_title_length': 0}
+        self._corpus_stats.update(self._index_store.stats)
+
+        # Trigram indexes for fuzzy (vocabulary) and regex (document text)
+        # search, built on first use
+        self._fuzzy_terms: Optional[FuzzyTermIndex] = None
+        self._regex_index: Optional[RegexTrigramIndex] = None
+        # Sorted copies of term postings for the boolean query planner,
+        # dropped whenever a term's postings change
+        self._sorted_postings: Dict[str, List[str]] = {}
+        # Facet bitmaps for filters and facet counts, built on first use
+        self._facets: Optional[FacetIndex] = None
+        self._planner = QueryPlanner(
+            self._postings_sorted, self._all_document_ids, self._tokenize,
+            self._positional_filter, self._field_filter
+        )
+        self._index_store.replay(self._apply_journal_entry)
+
+        # Keep the index current as sessions, messages and files change
+        self.chat_session_service.add_listener(self._on_chat_session_event)
+        self.file_service.add_listener(self._on_file_event)
 
     def _load_analytics(self):
         """Load search analytics from file"""
@@ -95,8 +170,7 @@ class SearchService:
     def _save_analytics(self):
         """Save search analytics to file"""
         try:
-            with open(self.analytics_file, 'w', encoding='utf-8') as f:
-                json.dump(self.analytics.model_dump(), f, indent=2, default=str)
+            write_json(self.analytics_file, self.analytics.model_dump(), ensure_ascii=True, default=str)
         except Exception:
             pass  # Don't fail search operations due to analytics save issues
 
@@ -146,39 +220,239 @@ class SearchService:
                      'to', 'was', 'will', 'with', 'would'}
         return [token for token in tokens if token not in stop_words and len(token) > 1]
 
-    def _calculate_relevance_score(self, query_terms: List[str], document_terms: List[str],
-                                 document: Dict[str, Any]) -> float:
-        """Calculate relevance score using TF-IDF like scoring"""
-        if not query_terms or not document_terms:
-            return 0.0
+    def _add_scoring_fields(self, doc: Dict[str, Any], document_terms: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Store the per-document statistics used by BM25F scoring.
 
-        # Term frequency in document
-        doc_term_freq = defaultdict(int)
-        for term in document_terms:
-            doc_term_freq[term] += 1
+        Computed once at index time so queries never re-count tokens or parse dates.
+        """
+        tokens = document_terms if document_terms is not None else doc.get('tokens', [])
+        term_freqs: Dict[str, int] = defaultdict(int)
+        for token in tokens:
+            term_freqs[token] += 1
+        title_freqs: Dict[str, int] = defaultdict(int)
+        title_tokens = self._tokenize(doc.get('title', ''))
+        for token in title_tokens:
+            title_freqs[token] += 1
+
+        created_ts = self._parse_timestamp(doc.get('created_at'))
+
+        doc['term_freqs'] = dict(term_freqs)
+        doc['positions'] = term_positions(tokens)
+        doc['length'] = len(tokens)
+        doc['title_freqs'] = dict(title_freqs)
+        doc['title_length'] = len(title_tokens)
+        doc['created_ts'] = created_ts
+        return doc
+
+    @staticmethod
+    def _parse_timestamp(value: Any) -> Optional[float]:
+        """POSIX timestamp of an ISO date string, or None"""
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(str(value)).timestamp()
+        except (TypeError, ValueError):
+            return None
+
+    def _created_ts(self, doc: Dict[str, Any]) -> Optional[float]:
+        """Creation timestamp of a document, as stored at index time when available"""
+        if doc.get('created_ts') is not None:
+            return doc['created_ts']
+        return self._parse_timestamp(doc.get('created_at'))
+
+    @staticmethod
+    def _facet_values(doc: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """(facet, value) pairs of a document for the facet bitmaps"""
+        metadata = doc.get('metadata') or {}
+        values = [('type', doc.get('type'))]
+        for facet, key in (('user', 'user_id'), ('project', 'project_id'), ('provider', 'ai_provider')):
+            if metadata.get(key):
+                values.append((facet, str(metadata[key])))
+        if doc.get('type') == 'file':
+            filename = metadata.get('filename', '')
+            if '.' in filename:
+                values.append(('ext', filename.split('.')[-1].lower()))
+        values.extend(('tag', str(tag)) for tag in metadata.get('tags') or [])
+        return values
+
+    def _facet_index(self) -> FacetIndex:
+        """Facet bitmaps over the current documents, built on first use"""
+        with self._index_lock:
+            if self._facets is None:
+                self._facets = FacetIndex(
+                    (doc_id, self._facet_values(doc), self._created_ts(doc))
+                    for doc_id, doc in self.document_store.items()
+                )
+            return self._facets
+
+    def _track_length(self, doc: Dict[str, Any], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a document from the corpus length totals"""
+        if 'length' not in doc:
+            return
+        self._corpus_stats['documents'] += sign
+        self._corpus_stats['total_length'] += sign * doc['length']
+        self._corpus_stats['total_title_length'] += sign * doc.get('title_length', 0)
+
+    def _average_lengths(self, doc: Dict[str, Any]) -> Tuple[float, float]:
+        """Average content and title lengths (the document's own when no totals are known)"""
+        documents = self._corpus_stats['documents']
+        if documents > 0:
+            return (
+                max(1.0, self._corpus_stats['total_length'] / documents),
+                max(1.0, self._corpus_stats['total_title_length'] / documents),
+            )
+        return max(1.0, doc['length']), max(1.0, doc['title_length'])
+
+    def _fuzzy_index(self) -> FuzzyTermIndex:
+        """Trigram index over the current vocabulary, kept in step with term_index"""
+        with self._index_lock:
+            if self._fuzzy_terms is None or self.term_index.observer is not self._fuzzy_terms:
+                self._fuzzy_terms = FuzzyTermIndex(self.term_index.keys())
+                self.term_index.observer = self._fuzzy_terms
+            return self._fuzzy_terms
+
+    @staticmethod
+    def _document_content(doc: Dict[str, Any]) -> str:
+        """Full content of a document, including text appended but not yet folded in (read-only)"""
+        appended = doc.get('content_appended')
+        if appended:
+            return doc.get('content', '') + "".join(appended)
+        return doc.get('content', '')
+
+    @staticmethod
+    def _fold_appended(doc: Dict[str, Any]) -> None:
+        """Join appended text into a document's content (writers only, under the index lock)"""
+        appended = doc.pop('content_appended', None)
+        if appended:
+            doc['content'] = doc.get('content', '') + "".join(appended)
+
+    def _searchable_text(self, doc: Dict[str, Any]) -> str:
+        """Text a regex search runs against (title and full content)"""
+        return f"{doc.get('title', '')}\n{self._document_content(doc)}"
+
+    def _regex_candidates(self, pattern: str) -> Set[str]:
+        """Documents whose trigrams admit a match of ``pattern``"""
+        with self._index_lock:
+            if self._regex_index is None:
+                self._regex_index = RegexTrigramIndex()
+                for doc_id, doc in self.document_store.items():
+                    self._regex_index.add(doc_id, self._searchable_text(doc))
+            candidates = self._regex_index.candidates(regex_query(pattern))
+            return candidates if candidates is not None else set(self.document_store.keys())
+
+    @staticmethod
+    def _document_positions(doc: Dict[str, Any]) -> Dict[str, List[int]]:
+        """Term positions of a document's content, computed for documents indexed without them"""
+        if 'positions' not in doc:
+            doc['positions'] = term_positions(doc.get('tokens', []))
+        return doc['positions']
+
+    def _positional_match(self, doc: Dict[str, Any], terms: List[str], distance: Optional[int] = None) -> bool:
+        """Whether ``terms`` form a phrase (or occur within ``distance`` tokens) in the content or title"""
+        def matches(positions: Dict[str, List[int]]) -> bool:
+            if distance is None:
+                return phrase_match(positions, terms)
+            return near_match(positions, terms, distance)
+
+        return (matches(self._document_positions(doc))
+                or matches(term_positions(self._tokenize(doc.get('title', '')))))
+
+    def _postings_sorted(self, term: str) -> List[str]:
+        """Sorted IDs of the documents containing a term"""
+        with self._index_lock:
+            postings = self._sorted_postings.get(term)
+            if postings is None:
+                postings = sorted(self.term_index.get(term, ()))
+                self._sorted_postings[term] = postings
+            return postings
+
+    def _all_document_ids(self) -> List[str]:
+        """Sorted IDs of every indexed document"""
+        return sorted(self.document_store.keys())
+
+    def _positional_filter(self, terms: List[str], distance: Optional[int], doc_ids: List[str]) -> List[str]:
+        """Documents of ``doc_ids`` matching a phrase or proximity clause"""
+        matched = []
+        for doc_id in doc_ids:
+            doc = self.document_store.get(doc_id)
+            if doc is not None and self._positional_match(doc, terms, distance):
+                matched.append(doc_id)
+        return matched
+
+    def _field_matches(self, doc: Dict[str, Any], field: str, value: str) -> bool:
+        """Whether a document matches a field:value clause"""
+        if field == 'title':
+            return phrase_match(term_positions(self._tokenize(doc.get('title', ''))), self._tokenize(value))
+        return (field, self._facet_value(field, value)) in self._facet_values(doc)
+
+    @staticmethod
+    def _facet_value(field: str, value: str) -> str:
+        """Facet value a field:value clause looks up"""
+        if field == 'type':
+            return value.lower()
+        if field == 'ext':
+            return value.lower().lstrip('.')
+        return value
+
+    def _field_filter(self, field: str, value: str, doc_ids: List[str]) -> List[str]:
+        """Documents of ``doc_ids`` matching a field:value clause"""
+        if field in FACET_NAMES:
+            facets = self._facet_index()
+            bitmap, unindexed = facets.bitmap_of(doc_ids)
+            matched = facets.ids(bitmap & facets.value(field, self._facet_value(field, value)))
+        else:
+            matched, unindexed = [], doc_ids
+        for doc_id in unindexed:
+            doc = self.document_store.get(doc_id)
+            if doc is not None and self._field_matches(doc, field, value):
+                matched.append(doc_id)
+        return sorted(matched)
+
+    def _query_weights(self, query_terms: List[str]) -> Dict[str, float]:
+        """BM25 inverse document frequency of each distinct query term"""
+        total_docs = max(1, len(self.document_store))
+        weights = {}
+        for term in set(query_terms):
+            df = len(self.term_index.get(term, ()))
+            weights[term] = math.log(1.0 + (total_docs - df + 0.5) / (df + 0.5))
+        return weights
+
+    def _score_document(self, query_weights: Dict[str, float], document: Dict[str, Any], now_ts: float) -> float:
+        """BM25F score over title and content, with a recency boost, mapped into 0..1"""
+        if 'term_freqs' not in document:
+            self._add_scoring_fields(document)
+
+        term_freqs = document['term_freqs']
+        title_freqs = document['title_freqs']
+        avg_length, avg_title_length = self._average_lengths(document)
+        content_norm = 1.0 - BM25_B + BM25_B * document['length'] / avg_length
+        title_norm = 1.0 - BM25_B + BM25_B * document['title_length'] / avg_title_length
 
-        # Calculate score
         score = 0.0
-        for query_term in query_terms:
-            if query_term in doc_term_freq:
-                # TF * IDF approximation (simplified)
-                tf = doc_term_freq[query_term] / len(document_terms)
-                # Simple IDF approximation based on document frequency
-                df = len(self.term_index.get(query_term, set()))
-                idf = math.log(max(1, len(self.document_store) / max(1, df))) + 1  # Add 1 to avoid zero
-                score += tf * idf
+        for term, idf in query_weights.items():
+            tf = term_freqs.get(term, 0) / content_norm
+            tf += TITLE_WEIGHT * title_freqs.get(term, 0) / title_norm
+            if tf:
+                score += idf * tf / (BM25_K1 + tf)
 
         # Boost recent documents
-        if 'created_at' in document and document['created_at']:
-            try:
-                created_date = datetime.fromisoformat(document['created_at'])
-                days_old = (datetime.now() - created_date).days
-                recency_boost = max(0.1, 1.0 / (1.0 + days_old / 30.0))  # Boost recent content
-                score *= recency_boost
-            except:
-                pass
+        created_ts = document.get('created_ts')
+        if created_ts is not None:
+            days_old = max(0.0, (now_ts - created_ts) / 86400.0)
+            score *= max(0.1, 1.0 / (1.0 + days_old / 30.0))
+
+        return score / (1.0 + score)
+
+    def _calculate_relevance_score(self, query_terms: List[str], document_terms: List[str],
+                                 document: Dict[str, Any]) -> float:
+        """Calculate relevance score using BM25F over title and content"""
+        if not query_terms or not document_terms:
+            return 0.0
 
-        return min(1.0, score)  # Cap at 1.0
+        if 'term_freqs' not in document:
+            self._add_scoring_fields(document, document_terms)
+        return self._score_document(self._query_weights(query_terms), document, time.time())
 
     def _extract_highlights(self, text: str, query_terms: List[str], max_length: int = 200) -> List[str]:
         """Extract highlighted snippets from text"""
@@ -235,10 +509,11 @@ class SearchService:
             'id': f"session_{chat_session.id}",
             'type': 'conversation',
             'title': chat_session.title or "Untitled Session",
-            'content': full_content[:1000],  # Limit content for storage
+            'content': full_content,
             'tokens': tokens,
             'metadata': {
                 'session_id': str(chat_session.id),
+                'description': chat_session.description or "",
                 'project_id': str(chat_session.project_id),
                 'message_count': chat_session.message_count,
                 'is_active': chat_session.is_active,
@@ -258,7 +533,7 @@ class SearchService:
             'id': f"file_{file_obj.id}",
             'type': 'file',
             'title': file_obj.filename,
-            'content': content[:1000],  # Limit content for storage
+            'content': content,
             'tokens': tokens,
             'metadata': {
                 'file_id': str(file_obj.id),
@@ -283,7 +558,7 @@ class SearchService:
             'id': f"note_{note_id}",
             'type': 'note',
             'title': title,
-            'content': content[:1000],  # Limit content for storage
+            'content': content,
             'tokens': tokens,
             'metadata': {
                 'note_id': note_id,
@@ -294,6 +569,268 @@ class SearchService:
 
         return doc
 
+    def _read_file_content(self, file_obj: File) -> str:
+        """Read a file's text content for indexing"""
+        content = ""
+        if file_obj.file_path and Path(file_obj.file_path).exists():
+            try:
+                with open(file_obj.file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
+            except:
+                pass  # Skip files that can't be read
+        return content
+
+    def _iter_chat_sessions(self):
+        """Yield every chat session across all projects"""
+        projects_dir = self.chat_session_service.projects_dir
+        if not projects_dir.exists():
+            return
+        for project_dir in projects_dir.iterdir():
+            if not project_dir.is_dir():
+                continue
+            try:
+                summaries = self.chat_session_service.list_sessions(project_id=project_dir.name, include_inactive=True)
+            except Exception as e:
+                print(f"Error listing chat sessions for project {project_dir.name}: {e}")
+                continue
+            for summary in summaries:
+                session = self.chat_session_service.get_session(summary.id, project_id=project_dir.name)
+                if session:
+                    yield session
+
+    def _index_chat_session_from_storage(self, session: ChatSession) -> Dict[str, Any]:
+        """Index a chat session together with its stored messages"""
+        messages = self.chat_session_service.get_messages(session.id, project_id=str(session.project_id))
+        return self._index_chat_session(session, messages)
+
+    # Index maintenance
+
+    @staticmethod
+    def _posted_terms(doc: Dict[str, Any]) -> Set[str]:
+        """Terms whose postings list a document: content tokens and title terms"""
+        return set(doc.get('tokens', [])) | set(doc.get('title_freqs', ()))
+
+    def _unindex_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a document and its postings from the in-memory index"""
+        doc = self.document_store.pop(doc_id, None)
+        if doc is None:
+            return None
+        self._track_length(doc, -1)
+        if self._regex_index is not None:
+            self._regex_index.discard(doc_id, self._searchable_text(doc))
+        if self._facets is not None:
+            self._facets.discard(doc_id)
+        for token in self._posted_terms(doc):
+            self._sorted_postings.pop(token, None)
+            postings = self.term_index.get(token)
+            if postings is None:
+                continue
+            postings.discard(doc_id)
+            if not postings:
+                del self.term_index[token]
+        return doc
+
+    def _apply_upsert(self, doc: Dict[str, Any]) -> None:
+        """Insert or replace a document in the in-memory index"""
+        self._unindex_document(doc['id'])
+        if 'term_freqs' not in doc:
+            self._add_scoring_fields(doc)
+        self._track_length(doc, 1)
+        self.document_store[doc['id']] = doc
+        for token in self._posted_terms(doc):
+            self.term_index[token].add(doc['id'])
+            self._sorted_postings.pop(token, None)
+        if self._regex_index is not None:
+            self._regex_index.add(doc['id'], self._searchable_text(doc))
+        if self._facets is not None:
+            self._facets.add(doc['id'], self._facet_values(doc), doc.get('created_ts'))
+
+    def _apply_append(self, doc_id: str, text: str, updated_at: Optional[str] = None,
+                      metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Append text (e.g. a new chat message) to an indexed document"""
+        doc = self.document_store.get(doc_id)
+        if doc is None:
+            return
+        tokens = self._tokenize(text)
+        if 'term_freqs' not in doc:
+            self._add_scoring_fields(doc)
+            self._track_length(doc, 1)
+        positions = self._document_positions(doc)
+        offset = len(doc.get('tokens', []))
+        doc.setdefault('tokens', []).extend(tokens)
+        doc['length'] += len(tokens)
+        self._corpus_stats['total_length'] += len(tokens)
+        for i, token in enumerate(tokens):
+            self.term_index[token].add(doc_id)
+            self._sorted_postings.pop(token, None)
+            doc['term_freqs'][token] = doc['term_freqs'].get(token, 0) + 1
+            positions.setdefault(token, []).append(offset + i)
+        if text:
+            # Appended parts are kept aside and folded into the content in
+            # batches, so each message does not copy the whole content
+            appended = doc.setdefault('content_appended', [])
+            tail = (appended[-1] if appended else doc.get('content', ''))[-2:]
+            appended.append(f" {text}")
+            if self._regex_index is not None:
+                # Include the join so matches spanning it are not filtered out
+                self._regex_index.add(doc_id, f"{tail} {text}")
+            if len(appended) >= APPEND_FOLD_PARTS:
+                self._fold_appended(doc)
+        if updated_at:
+            doc['updated_at'] = updated_at
+        if metadata:
+            doc['metadata'].update(metadata)
+            if self._facets is not None:
+                self._facets.add(doc_id, self._facet_values(doc), doc.get('created_ts'))
+
+    def _apply_journal_entry(self, entry: Dict[str, Any]) -> None:
+        """Apply a replayed journal entry"""
+        op = entry.get('op')
+        if op == 'upsert':
+            self._apply_upsert(entry['doc'])
+        elif op == 'delete':
+            self._unindex_document(entry['id'])
+        elif op == 'append':
+            self._apply_append(entry['id'], entry['text'], entry.get('updated_at'), entry.get('metadata'))
+
+    def _record(self, op: str, **fields) -> None:
+        """Journal an index change, compacting in the background once the journal is large"""
+        try:
+            if self._index_store.record(op, **fields):
+                self._schedule_compaction()
+        except OSError as e:
+            print(f"Error persisting search index change: {e}")
+
+    def _schedule_compaction(self) -> None:
+        """Start writing a new generation on a background thread unless one is running"""
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        self._compaction = threading.Thread(target=self._compact, name="search-index-compaction", daemon=True)
+        self._compaction.start()
+
+    def _compact(self) -> None:
+        """Fold the journal into a new generation (background thread)"""
+        try:
+            with self._compaction_lock:
+                if self._index_store.pending_entries >= self._index_store.compact_threshold:
+                    self._write_generation()
+        except Exception as e:
+            print(f"Error compacting search index: {e}")
+
+    def _write_generation(self) -> None:
+        """
+        Write a new generation while the index stays available.
+
+        Only capturing the state and switching to the new generation hold the
+        index lock; changes made while the files are written are journaled and
+        replayed on top of the new generation.  Callers hold _compaction_lock.
+        """
+        with self._index_lock:
+            snapshot = self._index_store.snapshot(self.document_store, self.term_index)
+            indices = [index.model_dump(mode='json') for index in self.indices.values()]
+            stats = dict(self._corpus_stats)
+        self._index_store.write_snapshot(snapshot, indices, stats)
+        with self._index_lock:
+            self._index_store.rebind(self.document_store, self.term_index)
+            # The in-memory state already includes the replayed changes; replaying
+            # only rebuilds the documents dropped by the rebind
+            stats = dict(self._corpus_stats)
+            self._index_store.replay(self._apply_journal_entry)
+            self._corpus_stats.update(stats)
+
+    def index_document(self, doc: Dict[str, Any]) -> None:
+        """
+        Add or replace a single document in the persistent index.
+
+        Args:
+            doc: Document as produced by the ``_index_*`` helpers
+        """
+        with self._index_lock:
+            self._apply_upsert(doc)
+            self._record('upsert', doc=doc)
+
+    def remove_document(self, doc_id: str) -> bool:
+        """
+        Remove a single document from the persistent index.
+
+        Args:
+            doc_id: Document ID (e.g. ``session_<uuid>`` or ``file_<uuid>``)
+
+        Returns:
+            True if the document was indexed
+        """
+        with self._index_lock:
+            if doc_id not in self.document_store:
+                return False
+            self._unindex_document(doc_id)
+            self._record('delete', id=doc_id)
+            return True
+
+    def save_index(self) -> None:
+        """Write the current index as a new on-disk generation"""
+        with self._compaction_lock:
+            self._write_generation()
+
+    def close(self) -> None:
+        """Fold pending journal entries into the on-disk index and release it"""
+        with self._compaction_lock:
+            if self._index_store.pending_entries:
+                try:
+                    self._write_generation()
+                except OSError as e:
+                    print(f"Error saving search index: {e}")
+            with self._index_lock:
+                self._index_store.close()
+
+    def _on_chat_session_event(self, event: str, session: ChatSession, message: Optional[Message] = None) -> None:
+        """Update the index when a chat session or its messages change"""
+        doc_id = f"session_{session.id}"
+        with self._index_lock:
+            if event == 'session_deleted':
+                self.remove_document(doc_id)
+            elif event == 'message_added' and message is not None and doc_id in self.document_store:
+                text = f"{message.content or ''} {message.role or ''}"
+                updated_at = session.updated_at.isoformat() if session.updated_at else None
+                metadata = {'message_count': session.message_count}
+                self._apply_append(doc_id, text, updated_at, metadata)
+                self._record('append', id=doc_id, text=text, updated_at=updated_at, metadata=metadata)
+            elif event == 'session_updated' and self._session_text_unchanged(doc_id, session):
+                self._append_new_messages(doc_id, session)
+            else:
+                self.index_document(self._index_chat_session_from_storage(session))
+
+    def _session_text_unchanged(self, doc_id: str, session: ChatSession) -> bool:
+        """Whether an indexed session still has the title and description it was indexed with"""
+        doc = self.document_store.get(doc_id)
+        if doc is None or doc.get('title') != (session.title or "Untitled Session"):
+            return False
+        return doc['metadata'].get('description') == (session.description or "")
+
+    def _append_new_messages(self, doc_id: str, session: ChatSession) -> None:
+        """Bring an indexed session up to date by appending only messages it does not contain yet"""
+        doc = self.document_store[doc_id]
+        indexed = doc['metadata'].get('message_count') or 0
+        messages = self.chat_session_service.get_messages(
+            session.id, offset=indexed, project_id=str(session.project_id)
+        )
+        text = " ".join(f"{message.content or ''} {message.role or ''}" for message in messages)
+        updated_at = session.updated_at.isoformat() if session.updated_at else None
+        metadata = {
+            'message_count': indexed + len(messages),
+            'is_active': session.is_active,
+            'tags': getattr(session, 'tags', []),
+        }
+        self._apply_append(doc_id, text, updated_at, metadata)
+        self._record('append', id=doc_id, text=text, updated_at=updated_at, metadata=metadata)
+
+    def _on_file_event(self, event: str, file_obj: File) -> None:
+        """Update the index when a file is uploaded, changed or deleted"""
+        doc_id = f"file_{file_obj.id}"
+        if event == 'file_deleted':
+            self.remove_document(doc_id)
+        else:
+            self.index_document(self._index_file(file_obj, self._read_file_content(file_obj)))
+
     def build_index(self, scope: SearchScope = SearchScope.ALL) -> SearchIndex:
         """Build search index for specified scope"""
         start_time = time.time()
@@ -304,12 +841,9 @@ class SearchService:
         try:
             if scope in [SearchScope.ALL, SearchScope.CONVERSATIONS]:
                 # Index chat sessions
-                chat_sessions = self.chat_session_service.list_sessions()
-                for session in chat_sessions:
+                for session in self._iter_chat_sessions():
                     try:
-                        # Get messages for this session
-                        messages = self.chat_session_service.get_session_messages(session.id)
-                        doc = self._index_chat_session(session, messages)
+                        doc = self._index_chat_session_from_storage(session)
                         documents.append(doc)
                     except Exception as e:
                         print(f"Error indexing chat session {session.id}: {e}")
@@ -325,16 +859,7 @@ class SearchService:
                         if not file_obj:
                             continue
 
-                        # Try to read file content for indexing
-                        content = ""
-                        if file_obj.file_path and Path(file_obj.file_path).exists():
-                            try:
-                                with open(file_obj.file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                    content = f.read()
-                            except:
-                                pass  # Skip files that can't be read
-
-                        doc = self._index_file(file_obj, content)
+                        doc = self._index_file(file_obj, self._read_file_content(file_obj))
                         documents.append(doc)
                     except Exception as e:
                         print(f"Error indexing file {file_summary.id}: {e}")
@@ -356,11 +881,19 @@ class SearchService:
                         except Exception as e:
                             print(f"Error indexing note {note_file}: {e}")
 
-            # Update in-memory index
-            for doc in documents:
-                self.document_store[doc['id']] = doc
-                for token in doc['tokens']:
-                    self.term_index[token].add(doc['id'])
+            # Replace the rebuilt document types in the index
+            rebuilt_types = {
+                SearchScope.CONVERSATIONS: {'conversation'},
+                SearchScope.FILES: {'file'},
+                SearchScope.NOTES: {'note'},
+            }.get(scope, {'conversation', 'file', 'note'})
+            rebuilt_ids = {doc['id'] for doc in documents}
+            with self._index_lock:
+                for doc_id in list(self.document_store.keys()):
+                    if doc_id not in rebuilt_ids and self.document_store[doc_id].get('type') in rebuilt_types:
+                        self._unindex_document(doc_id)
+                for doc in documents:
+                    self._apply_upsert(doc)
 
             # Create index metadata
             index = SearchIndex(
@@ -377,6 +910,7 @@ class SearchService:
             )
 
             self.indices[index_id] = index
+            self.save_index()
             return index
 
         except Exception as e:
@@ -398,117 +932,184 @@ class SearchService:
                     search_time=time.time() - start_time
                 )
 
-            # Find candidate documents
-            candidate_docs = set()
-
-            if search_query.search_type == SearchType.EXACT:
-                # Exact term matching
-                for term in query_terms:
-                    candidate_docs.update(self.term_index.get(term, set()))
-
-            elif search_query.search_type == SearchType.FUZZY:
-                # Fuzzy matching (simple implementation)
-                for term in query_terms:
-                    # Check exact matches
-                    candidate_docs.update(self.term_index.get(term, set()))
-                    # Check similar terms (simple edit distance approximation)
-                    for indexed_term in self.term_index.keys():
-                        if len(indexed_term) == len(term) and sum(1 for a, b in zip(indexed_term, term) if a != b) <= 1:
-                            candidate_docs.update(self.term_index[indexed_term])
-
-            elif search_query.search_type == SearchType.REGEX:
-                # Regex matching
-                try:
-                    pattern = re.compile(search_query.query, re.IGNORECASE)
-                    for doc_id, doc in self.document_store.items():
-                        if pattern.search(doc.get('content', '')) or pattern.search(doc.get('title', '')):
-                            candidate_docs.add(doc_id)
-                except:
-                    return SearchResults(
-                        query=search_query.query,
-                        total_results=0,
-                        results=[],
-                        search_time=time.time() - start_time
-                    )
-
-            else:  # SEMANTIC (default)
-                # For semantic search, use term overlap as approximation
-                for term in query_terms:
-                    candidate_docs.update(self.term_index.get(term, set()))
-
-            # Filter and score results
-            scored_results = []
-
-            for doc_id in candidate_docs:
+            # Writers update the index from the chat I/O threads; candidates are
+            # collected and ranked under the index lock
+            with self._index_lock:
+                # Find candidate documents
+                candidate_docs = set()
+                # Indexed terms matched by fuzzy query terms, with a weight penalty per edit
+                expansions: Dict[str, float] = {}
+
+                if search_query.search_type == SearchType.EXACT:
+                    # Exact term matching
+                    for term in query_terms:
+                        candidate_docs.update(self.term_index.get(term, set()))
+
+                elif search_query.search_type == SearchType.FUZZY:
+                    # Terms within edit distance 1-2 (by term length), found via trigram postings
+                    fuzzy_terms = self._fuzzy_index()
+                    for term in query_terms:
+                        for match, distance in fuzzy_terms.search(term):
+                            candidate_docs.update(self.term_index.get(match, set()))
+                            if match not in query_terms:
+                                expansions[match] = max(expansions.get(match, 0.0), 1.0 / (1 + distance))
+
+                elif search_query.search_type == SearchType.BOOLEAN:
+                    # AND/OR/NOT query, planned over sorted postings; a malformed
+                    # query raises QuerySyntaxError (a ValueError) to the caller
+                    plan = self._planner.analyze(parse_query(search_query.query, QUERY_FIELDS))
+                    candidate_docs = set(self._planner.execute(plan))
+                    query_terms = positive_terms(plan)
+
+                elif search_query.search_type == SearchType.REGEX:
+                    # Regex matching, run only on documents passing the trigram prefilter
+                    try:
+                        pattern = re.compile(search_query.query, re.IGNORECASE)
+                        for doc_id in self._regex_candidates(search_query.query):
+                            doc = self.document_store.get(doc_id)
+                            if doc and (pattern.search(self._document_content(doc)) or pattern.search(doc.get('title', ''))):
+                                candidate_docs.add(doc_id)
+                    except:
+                        return SearchResults(
+                            query=search_query.query,
+                            total_results=0,
+                            results=[],
+                            search_time=time.time() - start_time
+                        )
+
+                else:  # SEMANTIC (default)
+                    # For semantic search, use term overlap as approximation
+                    for term in query_terms:
+                        candidate_docs.update(self.term_index.get(term, set()))
+
+                # Query term weights are computed once
+                query_weights = self._query_weights(query_terms)
+                for match, idf in self._query_weights(list(expansions)).items():
+                    query_weights[match] = idf * expansions[match]
+
+                return self._rank_candidates(
+                    search_query, candidate_docs, query_weights, query_terms + list(expansions), start_time
+                )
+
+        except QuerySyntaxError:
+            raise
+        except Exception as e:
+            raise Exception(f"Search failed: {str(e)}")
+
+    def _rank_candidates(self, search_query: SearchQuery, candidate_docs: Set[str],
+                         query_weights: Dict[str, float], highlight_terms: List[str],
+                         start_time: float) -> SearchResults:
+        """Filter, score and paginate matching documents and record the search"""
+        with self._index_lock:
+            now_ts = time.time()
+            min_score = search_query.filters.min_score if search_query.filters else None
+            scored_docs = []
+
+            # Apply filters as bitmap intersections; documents missing from the
+            # facet bitmaps are checked one by one
+            facets = self._facet_index()
+            candidate_bitmap, unindexed = facets.bitmap_of(candidate_docs)
+            unindexed = [doc_id for doc_id in unindexed if doc_id in self.document_store]
+            matching_bitmap = candidate_bitmap
+            if search_query.filters:
+                matching_bitmap &= self._filter_bitmap(facets, search_query.filters)
+            matching_docs = facets.ids(matching_bitmap)
+            for doc_id in unindexed:
+                if self._matches_filters(self.document_store[doc_id], search_query.filters):
+                    matching_docs.append(doc_id)
+
+            for doc_id in matching_docs:
                 doc = self.document_store.get(doc_id)
                 if not doc:
                     continue
 
-                # Apply filters
-                if not self._matches_filters(doc, search_query.filters):
-                    continue
-
                 # Calculate relevance score
-                score = self._calculate_relevance_score(query_terms, doc.get('tokens', []), doc)
+                score = self._score_document(query_weights, doc, now_ts) if doc.get('tokens') else 0.0
 
-                if search_query.filters and search_query.filters.min_score and score < search_query.filters.min_score:
+                if min_score and score < min_score:
                     continue
 
-                # Create result
+                scored_docs.append((score, doc_id, doc))
+
+            # Select only the requested page with a bounded heap instead of sorting every match
+            total_results = len(scored_docs)
+            page_size = search_query.offset + search_query.limit
+            if search_query.sort_by == "date":
+                sort_key = lambda item: item[2].get('created_ts') or float('-inf')
+            else:
+                sort_key = lambda item: item[0]
+            if search_query.sort_order == "desc":
+                top_docs = heapq.nlargest(page_size, scored_docs, key=sort_key)
+            else:
+                top_docs = heapq.nsmallest(page_size, scored_docs, key=sort_key)
+
+            paginated_results = []
+            for score, doc_id, doc in top_docs[search_query.offset:]:
+                content = self._document_content(doc)
                 result = SearchResult(
                     id=doc_id,
                     type=SearchResultType(doc['type']),
                     title=doc['title'],
-                    content=doc['content'][:200] + "..." if len(doc['content']) > 200 else doc['content'],
+                    content=content[:200] + "..." if len(content) > 200 else content,
                     relevance_score=score,
                     metadata=doc['metadata'],
                     created_at=doc.get('created_at'),
                     updated_at=doc.get('updated_at'),
                     source_id=doc['metadata'].get(f"{doc['type']}_id", doc_id),
                     source_type=doc['type'],
-                    highlights=self._extract_highlights(doc['content'], query_terms)
+                    highlights=self._extract_highlights(content, highlight_terms)
                 )
 
-                scored_results.append((score, result))
+                paginated_results.append(result)
 
-            # Sort results
-            if search_query.sort_by == "relevance":
-                scored_results.sort(key=lambda x: x[0], reverse=search_query.sort_order == "desc")
-            elif search_query.sort_by == "date":
-                scored_results.sort(
-                    key=lambda x: x[1].created_at or datetime.min,
-                    reverse=search_query.sort_order == "desc"
-                )
+            # Calculate facets
+            facet_counts = self._facet_counts(facets, candidate_bitmap, unindexed)
 
-            # Apply pagination
-            total_results = len(scored_results)
-            start_idx = search_query.offset
-            end_idx = start_idx + search_query.limit
-            paginated_results = [result for _, result in scored_results[start_idx:end_idx]]
+        search_time = time.time() - start_time
 
-            # Calculate facets
-            facets = self._calculate_facets([doc_id for doc_id in candidate_docs if doc_id in self.document_store])
+        # Update analytics
+        self._update_analytics(
+            search_query.query,
+            search_query.search_type.value,
+            total_results,
+            search_time
+        )
 
-            search_time = time.time() - start_time
+        return SearchResults(
+            query=search_query.query,
+            total_results=total_results,
+            results=paginated_results,
+            search_time=search_time,
+            facets=facet_counts
+        )
 
-            # Update analytics
-            self._update_analytics(
-                search_query.query,
-                search_query.search_type.value,
-                total_results,
-                search_time
-            )
+    def _filter_bitmap(self, facets: FacetIndex, filters: SearchFilter) -> int:
+        """Bitmap of the indexed documents matching search filters"""
+        bitmap = facets.all
 
-            return SearchResults(
-                query=search_query.query,
-                total_results=total_results,
-                results=paginated_results,
-                search_time=search_time,
-                facets=facets
-            )
+        # Date filters (documents without a creation date pass)
+        if filters.date_from or filters.date_to:
+            bitmap &= facets.created_between(
+                filters.date_from.timestamp() if filters.date_from else None,
+                filters.date_to.timestamp() if filters.date_to else None
+            ) | facets.undated()
 
-        except Exception as e:
-            raise Exception(f"Search failed: {str(e)}")
+        if filters.user_id:
+            bitmap &= facets.value('user', filters.user_id)
+        if filters.project_id:
+            bitmap &= facets.value('project', filters.project_id)
+        if filters.ai_provider:
+            bitmap &= facets.value('provider', filters.ai_provider)
+
+        # File type filter only applies to files
+        if filters.file_types:
+            extensions = {ft.lower() for ft in filters.file_types}
+            bitmap &= (facets.all & ~facets.value('type', 'file')) | facets.any_value('ext', extensions)
+
+        for tag in set(filters.tags or ()):
+            bitmap &= facets.value('tag', tag)
+
+        return bitmap
 
     def _matches_filters(self, doc: Dict[str, Any], filters: Optional[SearchFilter]) -> bool:
         """Check if document matches search filters"""
@@ -518,17 +1119,11 @@ class SearchService:
         try:
             # Date filters
             if filters.date_from or filters.date_to:
-                doc_date = None
-                if doc.get('created_at'):
-                    try:
-                        doc_date = datetime.fromisoformat(doc['created_at'])
-                    except:
-                        pass
-
-                if doc_date:
-                    if filters.date_from and doc_date < filters.date_from:
+                created_ts = self._created_ts(doc)
+                if created_ts is not None:
+                    if filters.date_from and created_ts < filters.date_from.timestamp():
                         return False
-                    if filters.date_to and doc_date > filters.date_to:
+                    if filters.date_to and created_ts > filters.date_to.timestamp():
                         return False
 
             # User filter
@@ -546,7 +1141,7 @@ class SearchService:
             # File type filter
             if filters.file_types and doc['type'] == 'file':
                 file_ext = doc['metadata'].get('filename', '').split('.')[-1].lower()
-                if file_ext not in [ft.lower() for ft in filters.file_types]:
+                if file_ext not in {ft.lower() for ft in filters.file_types}:
                     return False
 
             # Tags filter
@@ -563,62 +1158,53 @@ class SearchService:
 
     def _calculate_facets(self, doc_ids: List[str]) -> Dict[str, Any]:
         """Calculate search facets from result set"""
-        facets = {
-            'types': defaultdict(int),
-            'users': defaultdict(int),
-            'projects': defaultdict(int),
-            'ai_providers': defaultdict(int),
-            'file_types': defaultdict(int),
-            'date_ranges': defaultdict(int)
-        }
-
-        for doc_id in doc_ids:
-            doc = self.document_store.get(doc_id)
-            if not doc:
-                continue
+        facets = self._facet_index()
+        bitmap, unindexed = facets.bitmap_of(doc_ids)
+        return self._facet_counts(facets, bitmap, [doc_id for doc_id in unindexed if doc_id in self.document_store])
+
+    @staticmethod
+    def _date_range(created_ts: Optional[float], now_ts: float) -> Optional[str]:
+        """Creation date facet bucket of a timestamp"""
+        if created_ts is None:
+            return None
+        for name, max_age in DATE_RANGES:
+            if now_ts - created_ts <= max_age:
+                return name
+        return 'older'
+
+    def _facet_counts(self, facets: FacetIndex, bitmap: int, unindexed: List[str]) -> Dict[str, Any]:
+        """
+        Facet counts of a result set.
 
-            # Type facet
-            facets['types'][doc['type']] += 1
-
-            # User facet
-            user_id = doc['metadata'].get('user_id')
-            if user_id:
-                facets['users'][user_id] += 1
-
-            # Project facet
-            project_id = doc['metadata'].get('project_id')
-            if project_id:
-                facets['projects'][project_id] += 1
-
-            # AI provider facet
-            ai_provider = doc['metadata'].get('ai_provider')
-            if ai_provider:
-                facets['ai_providers'][ai_provider] += 1
-
-            # File type facet
-            if doc['type'] == 'file':
-                filename = doc['metadata'].get('filename', '')
-                if '.' in filename:
-                    ext = filename.split('.')[-1].lower()
-                    facets['file_types'][ext] += 1
-
-            # Date range facet
-            if doc.get('created_at'):
-                try:
-                    created_date = datetime.fromisoformat(doc['created_at'])
-                    if created_date > datetime.now() - timedelta(days=1):
-                        facets['date_ranges']['today'] += 1
-                    elif created_date > datetime.now() - timedelta(days=7):
-                        facets['date_ranges']['this_week'] += 1
-                    elif created_date > datetime.now() - timedelta(days=30):
-                        facets['date_ranges']['this_month'] += 1
-                    else:
-                        facets['date_ranges']['older'] += 1
-                except:
-                    pass
-
-        # Convert defaultdicts to regular dicts
-        return {k: dict(v) for k, v in facets.items()}
+        Counts are popcounts of each value's bitmap within ``bitmap``; the
+        ``unindexed`` documents (not in the bitmaps) are counted one by one.
+        """
+        counts = {name: facets.counts(facet, bitmap) for facet, name in FACET_NAMES.items()}
+
+        # Date range facet: each bucket excludes the newer ones
+        now_ts = time.time()
+        date_ranges = {}
+        newer = 0
+        for name, max_age in DATE_RANGES:
+            members = facets.created_between(now_ts - max_age) & bitmap
+            if members & ~newer:
+                date_ranges[name] = (members & ~newer).bit_count()
+            newer |= members
+        older = (bitmap & ~facets.undated() & ~newer).bit_count()
+        if older:
+            date_ranges['older'] = older
+        counts['date_ranges'] = date_ranges
+
+        for doc_id in unindexed:
+            doc = self.document_store[doc_id]
+            for facet, value in self._facet_values(doc):
+                facet_counts = counts[FACET_NAMES[facet]]
+                facet_counts[value] = facet_counts.get(value, 0) + 1
+            date_range = self._date_range(self._created_ts(doc), now_ts)
+            if date_range:
+                date_ranges[date_range] = date_ranges.get(date_range, 0) + 1
+
+        return counts
 
     def get_search_suggestions(self, partial_query: str, limit: int = 5) -> List[SearchSuggestion]:
         """Get search suggestions based on partial query"""
@@ -640,57 +1226,58 @@ class SearchService:
                 ))
 
         # Get terms from index that start with partial query
-        matching_terms = [term for term in self.term_index.keys() if term.startswith(partial_lower)]
-        for term in matching_terms[:limit]:
-            if term != partial_query:
-                # Calculate confidence based on document frequency
-                confidence = len(self.term_index[term]) / max(1, len(self.document_store))
-                suggestions.append(SearchSuggestion(
-                    text=term,
-                    type="term",
-                    confidence=min(1.0, confidence)
-                ))
+        with self._index_lock:
+            matching_terms = [term for term in self.term_index.keys() if term.startswith(partial_lower)]
+            for term in matching_terms[:limit]:
+                if term != partial_query:
+                    # Calculate confidence based on document frequency
+                    confidence = len(self.term_index[term]) / max(1, len(self.document_store))
+                    suggestions.append(SearchSuggestion(
+                        text=term,
+                        type="term",
+                        confidence=min(1.0, confidence)
+                    ))
 
         # Sort by confidence and limit
         suggestions.sort(key=lambda x: x.confidence, reverse=True)
         return suggestions[:limit]
 
     def advanced_search(self, advanced_query: AdvancedSearchQuery) -> SearchResults:
-        """Perform advanced search with multiple criteria"""
-        # Convert to basic search query
-        basic_query = SearchQuery(
-            query=" ".join(advanced_query.queries),
-            filters=advanced_query.filters,
-            limit=advanced_query.limit,
-            offset=advanced_query.offset
-        )
+        """
+        Perform advanced search with multiple criteria.
+
+        Each entry of ``queries`` is a boolean query (see ``boolean_query``)
+        and all of them must match, together with the exact phrases and NEAR
+        clauses; excluded terms or phrases remove documents.  The whole
+        combination is evaluated by the query planner before scoring, so
+        totals and pages only ever contain matching documents.  A query that
+        cannot be parsed raises ``QuerySyntaxError``, a ``ValueError``.
+        """
+        start_time = time.time()
 
-        results = self.search(basic_query)
-
-        # Apply additional filtering for advanced criteria
-        if advanced_query.exclude_terms:
-            exclude_set = set(term.lower() for term in advanced_query.exclude_terms)
-            filtered_results = []
-            for result in results.results:
-                content_lower = result.content.lower()
-                title_lower = result.title.lower()
-                if not any(term in content_lower or term in title_lower for term in exclude_set):
-                    filtered_results.append(result)
-            results.results = filtered_results
-            results.total_results = len(filtered_results)
-
-        if advanced_query.exact_phrases:
-            filtered_results = []
-            for result in results.results:
-                content_lower = result.content.lower()
-                title_lower = result.title.lower()
-                full_text = f"{title_lower} {content_lower}"
-                if all(phrase.lower() in full_text for phrase in advanced_query.exact_phrases):
-                    filtered_results.append(result)
-            results.results = filtered_results
-            results.total_results = len(filtered_results)
-
-        return results
+        # A malformed query raises QuerySyntaxError (a ValueError) to the caller
+        clauses = [parse_query(query, QUERY_FIELDS) for query in advanced_query.queries]
+        clauses += [("phrase", phrase) for phrase in advanced_query.exact_phrases or []]
+        clauses += [("near", " ".join(clause.terms), clause.distance) for clause in advanced_query.near or []]
+        clauses += [("not", ("phrase", term)) for term in advanced_query.exclude_terms or []]
+        plan = self._planner.analyze(("and", tuple(clauses)))
+
+        try:
+            basic_query = SearchQuery(
+                query=" ".join(advanced_query.queries),
+                filters=advanced_query.filters,
+                limit=advanced_query.limit,
+                offset=advanced_query.offset
+            )
+            with self._index_lock:
+                candidate_docs = set(self._planner.execute(plan))
+                query_terms = positive_terms(plan)
+                return self._rank_candidates(
+                    basic_query, candidate_docs, self._query_weights(query_terms), query_terms, start_time
+                )
+
+        except Exception as e:
+            raise Exception(f"Search failed: {str(e)}")
 
     def get_analytics(self) -> SearchAnalytics:
         """Get search analytics"""
@@ -698,13 +1285,19 @@ class SearchService:
 
     def clear_index(self, index_id: Optional[str] = None):
         """Clear search index"""
-        if index_id:
-            if index_id in self.indices:
-                del self.indices[index_id]
-        else:
-            self.indices.clear()
-            self.document_store.clear()
-            self.term_index.clear()
+        with self._compaction_lock, self._index_lock:
+            if index_id:
+                if index_id in self.indices:
+                    del self.indices[index_id]
+            else:
+                self.indices.clear()
+                self.document_store.clear()
+                self.term_index.clear()
+                self._regex_index = None
+                self._sorted_postings.clear()
+                self._facets = None
+                self._corpus_stats.update(documents=0, total_length=0, total_title_length=0)
+                self._index_store.reset()
 
     def list_indices(self) -> List[SearchIndex]:
         """List all search indices"""
@@ -22,6 +22,7 @@ from backend.models.settings import (
     APIProviderSettings, FileProcessingSettings,
     PrivacySettings, SystemSettings
 )
+from backend.services.durable_write import write_json
 
 
 class SettingsService:
@@ -119,8 +120,7 @@ class SettingsService:
     def _save_settings_to_file(self, settings: Settings, file_path: Path):
         """Save settings to JSON file"""
         data = settings.model_dump()
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, default=str)
+        write_json(file_path, data, ensure_ascii=True, default=str)
 
     def _calculate_checksum(self, data: Dict[str, Any]) -> str:
         """Calculate checksum for settings data"""
@@ -138,8 +138,7 @@ class SettingsService:
         # Create filename-safe timestamp (replace colons and other invalid chars)
         timestamp = datetime.now().isoformat().replace(':', '-').replace('.', '-')
         backup_file = self.backups_path / f"backup_{settings.id}_{timestamp}.json"
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(backup.model_dump(), f, indent=2, default=str)
+        write_json(backup_file, backup.model_dump(), ensure_ascii=True, default=str)
 
         # Clean up old backups (keep last 10)
         backup_files = sorted(self.backups_path.glob(f"backup_{settings.id}_*.json"))
@@ -0,0 +1,72 @@
+"""
+Single-Flight Request Coalescing
+
+This module lets concurrent callers asking for the same thing share one
+in-flight operation.  The first caller for a key starts the work in its own
+task; later callers with the same key wait on that task instead of starting
+another.  Each caller waits through ``asyncio.shield`` so cancelling one
+caller never cancels the shared work for the others, and the work itself is
+cancelled once every caller waiting on it has gone away.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class _Flight:
+    """An in-flight operation and the number of callers waiting on it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._flights: Dict[Tuple[int, str], _Flight] = {}
+
+    def in_flight(self) -> int:
+        """Number of distinct operations currently running."""
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` unless a call with the same key is already running, then wait for it.
+
+        Args:
+            key: Identity of the operation
+            fn: Coroutine function performing the operation
+
+        Returns:
+            Tuple of (result, shared) where ``shared`` is True if this caller
+            joined an operation started by another caller
+
+        Raises:
+            Whatever the shared operation raised; asyncio.CancelledError if
+            this caller was cancelled
+        """
+        # Tasks belong to one event loop, so flights are never shared across loops
+        flight_key = (id(asyncio.get_running_loop()), key)
+        flight = self._flights.get(flight_key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[flight_key] = flight
+            flight.task.add_done_callback(
+                lambda _: self._flights.pop(flight_key, None) if self._flights.get(flight_key) is flight else None
+            )
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                # Last interested caller left: stop the work and forget it
+                self._flights.pop(flight_key, None)
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
@@ -19,6 +19,7 @@ from backend.models.user_state import (
     UserStateType, UserPreferences, UIState, SessionState,
     RecentActivity, Bookmark, UserStateBackup, UserStateAnalytics
 )
+from backend.services.durable_write import write_json
 
 
 class UserStateService:
@@ -120,8 +121,7 @@ class UserStateService:
 
         data['data'] = serialize_datetimes(data['data'])
 
-        with open(state_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json(state_file, data)
 
     def _calculate_state_size(self, data: Dict[str, Any]) -> int:
         """Calculate the size of state data in bytes"""
@@ -595,8 +595,7 @@ class UserStateService:
         backup_filename = f"{user_id}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         backup_file = self.backups_path / backup_filename
 
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(backup.model_dump(), f, indent=2, default=str)
+        write_json(backup_file, backup.model_dump(), ensure_ascii=True, default=str)
 
         return backup
 
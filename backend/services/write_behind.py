@@ -0,0 +1,142 @@
+"""
+Write-Behind Buffering
+
+This module lets a service keep frequently updated objects in memory and
+persist them in batches.  Updates only mark an object dirty; a background
+thread writes every dirty object at most ``interval`` seconds later (sooner
+once ``max_pending`` objects are waiting), so repeated updates to the same
+object between flushes cost one write.  Closing the buffer writes whatever is
+still pending, and a crash loses at most the last ``interval`` seconds of
+updates.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class WriteBehindBuffer:
+    """Collects dirty objects and writes them in periodic batches."""
+
+    def __init__(
+        self,
+        write: Callable[[Any], None],
+        interval: float = 1.0,
+        max_pending: int = 100,
+        name: str = "write-behind"
+    ):
+        """
+        Initialize the buffer.
+
+        Args:
+            write: Persists one object; called from the flush thread
+            interval: Longest an update may wait before it is written (seconds);
+                0 or less writes every update immediately
+            max_pending: Number of dirty objects that triggers an early flush
+            name: Name of the background flush thread
+        """
+        self.write = write
+        self.interval = interval
+        self.max_pending = max_pending
+        self.name = name
+        self._dirty: Dict[Hashable, Any] = {}
+        self._condition = threading.Condition()
+        # Held while writing so discard() never races an in-progress write
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.updates = 0
+        self.writes = 0
+        self.flushes = 0
+
+    def mark_dirty(self, key: Hashable, item: Any) -> None:
+        """
+        Record that ``item`` changed and must be written.
+
+        Args:
+            key: Identity of the item; later updates replace earlier ones
+            item: Object handed to ``write`` at the next flush
+        """
+        if self.interval <= 0 or self._closed:
+            with self._flush_lock:
+                self.updates += 1
+                self._write(item)
+            return
+
+        with self._condition:
+            self.updates += 1
+            self._dirty[key] = item
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            if len(self._dirty) >= self.max_pending:
+                self._condition.notify()
+
+    def discard(self, key: Hashable) -> None:
+        """Drop a pending update, waiting for any flush already writing it."""
+        with self._flush_lock, self._condition:
+            self._dirty.pop(key, None)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the pending update for ``key``, waiting for any flush in progress."""
+        with self._flush_lock, self._condition:
+            return self._dirty.get(key)
+
+    def pending(self) -> int:
+        """Number of objects waiting to be written."""
+        with self._condition:
+            return len(self._dirty)
+
+    def flush(self) -> int:
+        """
+        Write every dirty object now.
+
+        Returns:
+            Number of objects written
+        """
+        with self._flush_lock:
+            with self._condition:
+                batch, self._dirty = self._dirty, {}
+            if not batch:
+                return 0
+            for item in batch.values():
+                self._write(item)
+            self.flushes += 1
+            return len(batch)
+
+    def _write(self, item: Any) -> None:
+        """Write one object, reporting rather than raising failures."""
+        try:
+            self.write(item)
+            self.writes += 1
+        except Exception as e:
+            print(f"ERROR: {self.name} failed to persist an update: {e}")
+
+    def _run(self) -> None:
+        """Flush on the interval, early when enough is pending, and once more on close."""
+        while True:
+            with self._condition:
+                if not self._closed and len(self._dirty) < self.max_pending:
+                    self._condition.wait(self.interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def close(self) -> None:
+        """Write everything still pending and stop the flush thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return update, write and flush counts and the number pending."""
+        return {
+            "updates": self.updates,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "pending": self.pending(),
+        }
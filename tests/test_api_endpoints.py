@@ -5,6 +5,7 @@ Comprehensive functional tests for API endpoints covering message history,
 error handling, message retry, file operations, and settings.
 """
 
+import asyncio
 import pytest
 import tempfile
 import shutil
@@ -55,6 +56,7 @@ class TestAPIEndpoints:
 
     def teardown_method(self):
         """Clean up test environment after each test."""
+        asyncio.run(self.conversation_service.close())
         if self.temp_dir.exists():
             shutil.rmtree(self.temp_dir)
 
@@ -0,0 +1,145 @@
+"""
+Unit Tests for the Boolean Query Language
+
+Covers query parsing, sorted-postings set operations against Python sets,
+and planned boolean search in SearchService.
+"""
+
+import random
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api import search as search_api
+from backend.models.search import AdvancedSearchQuery, SearchQuery, SearchType
+from backend.services.boolean_query import (
+    QuerySyntaxError, difference_sorted, intersect_sorted, parse_query, union_sorted
+)
+from backend.services.search_service import SearchService
+
+
+class TestParseQuery:
+    """Test suite for the query parser."""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("budget", ("term", "budget")),
+        ("budget review", ("and", (("term", "budget"), ("term", "review")))),
+        ("a OR b c", ("or", (("term", "a"), ("and", (("term", "b"), ("term", "c")))))),
+        ("(a OR b) AND -c", ("and", (("or", (("term", "a"), ("term", "b"))), ("not", ("term", "c"))))),
+        ('NOT "release notes"', ("not", ("phrase", "release notes"))),
+        ('type:file tag:"q3 plan"', ("and", (("field", "type", "file"), ("field", "tag", "q3 plan")))),
+        ("http://example", ("term", "http://example")),
+        ("", None),
+    ])
+    def test_parse(self, text, expected):
+        """Operators, grouping, phrases and known fields produce the expected tree."""
+        assert parse_query(text, fields=("type", "tag")) == expected
+
+    @pytest.mark.parametrize("text", ["(a OR b", "a AND", "OR a", "a )", "NOT"])
+    def test_syntax_errors(self, text):
+        """Malformed queries are rejected."""
+        with pytest.raises(QuerySyntaxError):
+            parse_query(text)
+
+
+class TestSortedSetOperations:
+    """Test suite for galloping set operations."""
+
+    def test_match_python_sets(self):
+        """Intersection, difference and union agree with set arithmetic."""
+        rng = random.Random(11)
+        for _ in range(200):
+            a = sorted({f"d{rng.randint(0, 300):04d}" for _ in range(rng.randint(0, 40))})
+            b = sorted({f"d{rng.randint(0, 300):04d}" for _ in range(rng.randint(0, 200))})
+            assert intersect_sorted(a, b) == sorted(set(a) & set(b))
+            assert difference_sorted(a, b) == sorted(set(a) - set(b))
+            assert union_sorted([a, b, a[:3]]) == sorted(set(a) | set(b))
+
+
+class TestBooleanSearch:
+    """Test suite for boolean queries in SearchService."""
+
+    @pytest.fixture
+    def search_service(self):
+        """Create search service instance with temp directory"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            service = SearchService(base_path=str(Path(temp_dir)))
+            documents = {
+                "plan": ("conversation", "quarterly budget plan for marketing", ["finance"]),
+                "review": ("conversation", "budget review with the finance team", ["finance", "q3"]),
+                "forecast": ("note", "sales forecast and marketing notes", []),
+                "draft": ("note", "draft budget forecast", ["q3"]),
+            }
+            for doc_id, (doc_type, text, tags) in documents.items():
+                service.index_document({
+                    'id': doc_id,
+                    'type': doc_type,
+                    'title': doc_id,
+                    'content': text,
+                    'tokens': service._tokenize(text),
+                    'metadata': {'tags': tags},
+                    'created_at': datetime.now().isoformat()
+                })
+            yield service
+
+    def _search(self, service, query):
+        results = service.search(SearchQuery(query=query, search_type=SearchType.BOOLEAN))
+        return sorted(r.id for r in results.results)
+
+    @pytest.mark.parametrize("query,expected", [
+        ("budget", ["draft", "plan", "review"]),
+        ("budget marketing", ["plan"]),
+        ("budget AND forecast", ["draft"]),
+        ("(review OR forecast) -draft", ["forecast", "review"]),
+        ("budget NOT \"budget plan\"", ["draft", "review"]),
+        ("type:note", ["draft", "forecast"]),
+        ("tag:q3 budget", ["draft", "review"]),
+        ("title:plan OR title:draft", ["draft", "plan"]),
+        ("NOT budget", []),
+    ])
+    def test_queries(self, search_service, query, expected):
+        """Boolean operators, grouping, phrases and fields select the expected documents."""
+        assert self._search(search_service, query) == expected
+
+    def test_malformed_queries_are_rejected(self, search_service):
+        """Unparseable boolean queries raise instead of returning no results."""
+        with pytest.raises(QuerySyntaxError):
+            self._search(search_service, "budget AND (")
+        with pytest.raises(ValueError):
+            search_service.advanced_search(AdvancedSearchQuery(queries=["budget", "(forecast"]))
+
+    def test_malformed_queries_are_bad_requests(self, search_service):
+        """The search endpoints answer unparseable queries with 400."""
+        app = FastAPI()
+        app.include_router(search_api.router)
+        app.dependency_overrides[search_api.get_search_service] = lambda: search_service
+        client = TestClient(app)
+
+        response = client.post("/api/search/", json={"query": "budget AND (", "search_type": "boolean"})
+        assert response.status_code == 400
+        assert client.post("/api/search/advanced", json={"queries": ["(forecast"]}).status_code == 400
+        assert client.post("/api/search/", json={"query": "budget", "search_type": "boolean"}).status_code == 200
+
+    def test_empty_intersection_short_circuits(self, search_service):
+        """No document is loaded for verification when the postings do not intersect."""
+        checked = []
+        original = search_service._positional_match
+        search_service._positional_match = lambda doc, *args: checked.append(doc['id']) or original(doc, *args)
+
+        assert self._search(search_service, 'sales review "budget review"') == []
+        assert checked == []
+
+        assert self._search(search_service, 'finance "budget review"') == ["review"]
+        assert checked == ["review"]
+
+    def test_advanced_queries_are_anded(self, search_service):
+        """Each advanced query must match; postings are kept in step with index changes."""
+        query = AdvancedSearchQuery(queries=["budget", "forecast OR marketing"], exclude_terms=["quarterly"])
+        assert sorted(r.id for r in search_service.advanced_search(query).results) == ["draft"]
+
+        search_service.remove_document("draft")
+        assert search_service.advanced_search(query).total_results == 0
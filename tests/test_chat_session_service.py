@@ -12,6 +12,7 @@ import shutil
 from datetime import datetime, timedelta
 from pathlib import Path
 from uuid import UUID, uuid4
+from unittest.mock import patch
 
 from backend.models.chat_session import (
     ChatSession, ChatSessionCreate, ChatSessionUpdate, Message, MessageCreate,
@@ -217,6 +218,18 @@ class TestChatSessionService:
         deleted = self.service.delete_session(session.id, force=True, project_id=str(project_id))
         assert deleted is True
 
+    def test_delete_session_counts_messages_under_lock(self):
+        """The message count guarding deletion is read while the session is locked."""
+        project_id = str(uuid4())
+        session = self.service.create_session(ChatSessionCreate(project_id=project_id, title="Test Session"))
+        lock = self.service._session_lock(session.id)
+        held = []
+        count_messages = self.service.store.count_messages
+        self.service.store.count_messages = lambda *args: held.append(lock.locked()) or count_messages(*args)
+
+        assert self.service.delete_session(session.id, project_id=project_id) is True
+        assert held == [True]
+
     def test_add_message(self):
         """Test adding a message to a chat session."""
         # Create a session
@@ -577,4 +590,119 @@ class TestChatSessionService:
 
         # Verify listing includes all sessions
         all_sessions = self.service.list_sessions()
-        assert len(all_sessions) == 3
\ No newline at end of file
+        assert len(all_sessions) == 3
+
+class TestChatSessionServiceAsync:
+    """Test suite for the thread-pool backed async API of ChatSessionService."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = ChatSessionService(data_dir=str(self.temp_dir), io_workers=4)
+        self.project_id = uuid4()
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        self.service.close()
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    @pytest.mark.asyncio
+    async def test_async_round_trip(self):
+        """The async methods read and write the same storage as the sync ones."""
+        session = await self.service.create_session_async(
+            ChatSessionCreate(project_id=self.project_id, title="Async")
+        )
+        await self.service.add_message_async(session.id, MessageCreate(role="user", content="hi"), str(self.project_id))
+        await self.service.update_session_async(session.id, ChatSessionUpdate(title="Renamed"), str(self.project_id))
+
+        loaded = self.service.get_session(session.id, str(self.project_id))
+        assert loaded.title == "Renamed" and loaded.message_count == 1
+        messages = await self.service.get_messages_async(session.id, project_id=str(self.project_id))
+        assert [m.content for m in messages] == ["hi"]
+        assert len(await self.service.list_sessions_async(self.project_id)) == 1
+        assert await self.service.delete_session_async(session.id, force=True, project_id=str(self.project_id))
+        assert await self.service.get_session_async(session.id, str(self.project_id)) is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_appends_are_not_lost(self):
+        """Concurrent writers to one session are serialized by the session lock."""
+        import asyncio
+
+        session = await self.service.create_session_async(
+            ChatSessionCreate(project_id=self.project_id, title="Busy")
+        )
+        await asyncio.gather(*[
+            self.service.add_message_async(session.id, MessageCreate(role="user", content=f"m{i}"), str(self.project_id))
+            for i in range(20)
+        ])
+
+        loaded = await self.service.get_session_async(session.id, str(self.project_id))
+        messages = await self.service.get_messages_async(session.id, project_id=str(self.project_id))
+        assert loaded.message_count == 20
+        assert sorted(m.content for m in messages) == sorted(f"m{i}" for i in range(20))
+
+    @pytest.mark.asyncio
+    async def test_add_message_to_missing_session_raises(self):
+        """Errors from the worker thread surface in the awaiting coroutine."""
+        with pytest.raises(ValueError):
+            await self.service.add_message_async(uuid4(), MessageCreate(role="user", content="x"), str(self.project_id))
+
+
+class TestChatSessionIndex:
+    """Test suite for the per-project session index."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = ChatSessionService(data_dir=str(self.temp_dir))
+        self.project_id = uuid4()
+        self.pid = str(self.project_id)
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        self.service.close()
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def _index(self):
+        with open(self.service.store.index_file(self.pid), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_writes_keep_index_current(self):
+        """Creating, updating, messaging and deleting sessions update the index entry."""
+        session = self.service.create_session(ChatSessionCreate(project_id=self.project_id, title="Indexed"))
+        other = self.service.create_session(ChatSessionCreate(project_id=self.project_id, title="Other"))
+        self.service.add_message(session.id, MessageCreate(role="user", content="z" * 150), self.pid)
+        self.service.update_session(session.id, ChatSessionUpdate(title="Renamed"), self.pid)
+
+        entry = self._index()[str(session.id)]
+        assert entry["title"] == "Renamed"
+        assert entry["message_count"] == 1
+        assert entry["last_message_preview"] == "z" * 100 + "..."
+
+        self.service.delete_session(other.id, project_id=self.pid)
+        assert set(self._index()) == {str(session.id)}
+
+    def test_list_reads_only_the_index(self):
+        """Listing does not open session metadata or messages."""
+        session = self.service.create_session(ChatSessionCreate(project_id=self.project_id, title="Fast"))
+        self.service.add_message(session.id, MessageCreate(role="user", content="hello"), self.pid)
+
+        with patch.object(self.service.store, 'load_session', side_effect=AssertionError), \
+                patch.object(self.service.store, 'load_messages', side_effect=AssertionError):
+            summaries = self.service.list_sessions(self.project_id)
+
+        assert [(s.title, s.message_count, s.last_message_preview) for s in summaries] == [("Fast", 1, "hello")]
+
+    def test_missing_index_is_rebuilt(self):
+        """Projects written before the index existed get one on first listing."""
+        session = self.service.create_session(ChatSessionCreate(project_id=self.project_id, title="Legacy"))
+        self.service.add_message(session.id, MessageCreate(role="user", content="old"), self.pid)
+        self.service.store.index_file(self.pid).unlink()
+
+        summaries = self.service.list_sessions(self.project_id)
+
+        assert summaries[0].last_message_preview == "old"
+        assert str(session.id) in self._index()
+        assert self.service.rebuild_session_index(self.project_id) == 1
@@ -0,0 +1,209 @@
+"""
+Unit Tests for Chat Session Storage Backends
+
+Covers ChatSessionService on the SQLite backend, the SQLite schema and
+paging, cursor pagination on every backend and migrating the JSON layout
+into SQLite.
+"""
+
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from backend.api.conversations import get_conversation_history
+from backend.models.chat_session import ChatSessionCreate, ChatSessionUpdate, MessageCreate
+from backend.models.conversation import ConversationContext
+from backend.services.chat_session_service import ChatSessionService
+from backend.services.chat_storage import SqliteChatSessionStore, main, migrate_json_to_sqlite
+from backend.services.conversation_service import ConversationService
+
+
+class TestSqliteChatSessionStore:
+    """Test suite for ChatSessionService backed by SQLite."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = ChatSessionService(data_dir=str(self.temp_dir), storage_backend="sqlite")
+        self.project_id = uuid4()
+        self.pid = str(self.project_id)
+        self.session = self.service.create_session(ChatSessionCreate(project_id=self.project_id, title="SQL"))
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        self.service.close()
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_session_lifecycle(self):
+        """Sessions and messages round-trip without touching the JSON layout."""
+        for i in range(5):
+            self.service.add_message(self.session.id, MessageCreate(role="user", content=f"m{i}"), self.pid)
+        self.service.update_session(self.session.id, ChatSessionUpdate(title="Renamed"), self.pid)
+
+        loaded = self.service.get_session(self.session.id, self.pid)
+        assert (loaded.title, loaded.message_count) == ("Renamed", 5)
+        assert self.service.get_session(self.session.id, str(uuid4())) is None
+        assert not (self.temp_dir / "projects" / self.pid).exists()
+
+        summary = self.service.list_sessions(self.project_id)[0]
+        assert (summary.message_count, summary.last_message_preview) == (5, "m4")
+
+        assert self.service.delete_session(self.session.id, force=True, project_id=self.pid)
+        assert self.service.list_sessions(self.project_id) == []
+        assert self.service.store.count_messages(self.session.id, self.pid) == 0
+
+    def test_paging_and_recent_messages(self):
+        """Offset pages and the recent tail are served from message positions."""
+        for i in range(10):
+            self.service.add_message(self.session.id, MessageCreate(role="user", content=f"m{i}"), self.pid)
+
+        page = self.service.get_messages(self.session.id, limit=3, offset=4, project_id=self.pid)
+        recent = self.service.get_recent_messages(self.session.id, limit=2, project_id=self.pid)
+
+        assert [m.content for m in page] == ["m4", "m5", "m6"]
+        assert [m.content for m in recent] == ["m8", "m9"]
+
+    def test_database_uses_wal_and_indexes(self):
+        """The database runs in WAL mode with indexes for project and timestamp lookups."""
+        conn = sqlite3.connect(self.temp_dir / "chat_sessions.db")
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        finally:
+            conn.close()
+        assert {"idx_sessions_project_updated", "idx_messages_session_timestamp"} <= indexes
+
+    def test_invalid_backend(self):
+        """Unknown backends are rejected."""
+        with pytest.raises(ValueError):
+            ChatSessionService(data_dir=str(self.temp_dir), storage_backend="csv")
+
+
+@pytest.mark.parametrize("backend,message_storage", [("json", "json"), ("json", "jsonl"), ("sqlite", "json")])
+class TestCursorPagination:
+    """Test suite for keyset pagination of message history."""
+
+    @pytest.fixture(autouse=True)
+    def service(self, backend, message_storage):
+        """Create a session with seven messages on the backend under test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = ChatSessionService(
+            data_dir=str(self.temp_dir), storage_backend=backend, message_storage=message_storage
+        )
+        self.project_id = uuid4()
+        self.pid = str(self.project_id)
+        self.session = self.service.create_session(ChatSessionCreate(project_id=self.project_id, title="Paged"))
+        for i in range(7):
+            self._add(f"m{i}")
+        yield
+        self.service.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _add(self, content):
+        self.service.add_message(self.session.id, MessageCreate(role="user", content=content), self.pid)
+
+    def test_pages_walk_back_from_newest(self):
+        """Pages run newest first, each oldest-first, and end without a cursor."""
+        pages = []
+        cursor = None
+        while True:
+            page = self.service.get_message_page(self.session.id, limit=3, before=cursor, project_id=self.pid)
+            pages.append([m.content for m in page.messages])
+            if not page.has_more:
+                assert page.next_cursor is None
+                break
+            cursor = page.next_cursor
+
+        assert pages == [["m4", "m5", "m6"], ["m1", "m2", "m3"], ["m0"]]
+
+    def test_pages_are_stable_under_appends(self):
+        """New messages do not shift pages that are already being walked."""
+        first = self.service.get_message_page(self.session.id, limit=3, project_id=self.pid)
+        self._add("m7")
+        second = self.service.get_message_page(self.session.id, limit=3, before=first.next_cursor, project_id=self.pid)
+
+        assert [m.content for m in second.messages] == ["m1", "m2", "m3"]
+
+    def test_invalid_cursor(self):
+        """Malformed cursors are rejected."""
+        with pytest.raises(ValueError):
+            self.service.get_message_page(self.session.id, before="not-a-cursor", project_id=self.pid)
+
+    def test_conversation_history_cursor(self):
+        """Conversation history pages by cursor when 'before' is given."""
+        conversations = ConversationService(self.temp_dir, chat_session_service=self.service)
+        conversations._context_cache[self.session.id] = ConversationContext(session_id=self.session.id)
+        with patch.object(conversations, '_find_session_project_id', return_value=self.pid):
+            newest = conversations.get_conversation_history(self.session.id, limit=4, before="")
+            older = conversations.get_conversation_history(self.session.id, limit=4, before=newest.next_cursor)
+
+        assert [m.content for m in newest.messages] == ["m3", "m4", "m5", "m6"]
+        assert newest.has_more and newest.total_messages == 7
+        assert [m.content for m in older.messages] == ["m0", "m1", "m2"]
+        assert not older.has_more and older.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_conversation_history_bad_cursor_is_400(self):
+        """A malformed cursor is a bad request; an unknown session is still not found."""
+        conversations = ConversationService(self.temp_dir, chat_session_service=self.service)
+        with pytest.raises(HTTPException) as bad_cursor:
+            await get_conversation_history(self.session.id, limit=4, before="not-a-cursor", service=conversations)
+        assert bad_cursor.value.status_code == 400
+
+        with pytest.raises(HTTPException) as missing:
+            await get_conversation_history(uuid4(), limit=4, before="", service=conversations)
+        assert missing.value.status_code == 404
+
+
+class TestJsonToSqliteMigration:
+    """Test suite for migrating JSON sessions into SQLite."""
+
+    def setup_method(self):
+        """Write a few sessions in the JSON layout."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.project_id = uuid4()
+        json_service = ChatSessionService(data_dir=str(self.temp_dir))
+        self.sessions = []
+        for n in range(2):
+            session = json_service.create_session(ChatSessionCreate(project_id=self.project_id, title=f"S{n}"))
+            for i in range(n + 2):
+                json_service.add_message(session.id, MessageCreate(role="user", content=f"s{n}m{i}"), str(self.project_id))
+            self.sessions.append(session)
+        json_service.close()
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_migration_copies_sessions_once(self):
+        """Every session and message is copied; re-running skips what is already there."""
+        assert migrate_json_to_sqlite(self.temp_dir) == (2, 0)
+        assert migrate_json_to_sqlite(self.temp_dir) == (0, 2)
+
+        service = ChatSessionService(data_dir=str(self.temp_dir), storage_backend="sqlite")
+        try:
+            pid = str(self.project_id)
+            messages = service.get_messages(self.sessions[1].id, project_id=pid)
+            assert [m.content for m in messages] == ["s1m0", "s1m1", "s1m2"]
+            assert {s.title: s.message_count for s in service.list_sessions(self.project_id)} == {"S0": 2, "S1": 3}
+        finally:
+            service.close()
+
+    def test_command_line(self):
+        """The migration can be run as a script against a custom database path."""
+        db_path = self.temp_dir / "custom.db"
+        assert main(["--data-dir", str(self.temp_dir), "--db", str(db_path)]) == 0
+
+        store = SqliteChatSessionStore(db_path)
+        try:
+            assert len(store.list_summaries(str(self.project_id))) == 2
+        finally:
+            store.close()
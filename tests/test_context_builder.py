@@ -0,0 +1,125 @@
+"""
+Unit Tests for the Context Builder
+
+Covers token counting, token-budgeted history assembly and reading the most
+recent messages of a session.
+"""
+
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from backend.models.chat_session import ChatSessionCreate, Message, MessageCreate
+from backend.services.chat_session_service import ChatSessionService
+from backend.services.context_builder import MESSAGE_OVERHEAD, ContextBuilder, TokenCounter
+from backend.services.conversation_service import ConversationService
+
+
+def _message(content: str, role: str = "user", **metadata) -> Message:
+    return Message(session_id=uuid4(), role=role, content=content, metadata=metadata)
+
+
+class TestTokenCounter:
+    """Test suite for TokenCounter."""
+
+    def test_character_fallback(self):
+        """Without tiktoken, tokens are estimated at four characters each."""
+        with patch('backend.services.context_builder.tiktoken', None):
+            counter = TokenCounter()
+        assert counter.name == "chars"
+        assert counter.count("") == 0
+        assert counter.count("abcd") == 1
+        assert counter.count("abcde") == 2
+        assert counter.metadata("abcdefgh") == {"token_count": 2, "token_counter": "chars"}
+
+
+class TestContextBuilder:
+    """Test suite for ContextBuilder."""
+
+    def setup_method(self):
+        """Use the character-count tokenizer so budgets are predictable."""
+        with patch('backend.services.context_builder.tiktoken', None):
+            self.builder = ContextBuilder(TokenCounter())
+
+    def test_fills_from_most_recent(self):
+        """The newest history that fits is kept and order is preserved."""
+        history = [_message("a" * 400, role="user" if i % 2 == 0 else "assistant") for i in range(10)]
+        history.append(_message("latest"))
+        per_message = 100 + MESSAGE_OVERHEAD
+        # Reply reserve, system prompt, user message and the latest message, plus two full messages
+        window = 100 + (1 + MESSAGE_OVERHEAD) + (2 + MESSAGE_OVERHEAD) + (2 + MESSAGE_OVERHEAD) + 2 * per_message
+
+        messages = self.builder.build(
+            history, "question", system_prompt="sys", context_window=window, reserve_tokens=100
+        )
+
+        assert messages[0] == {"role": "system", "content": "sys"}
+        assert messages[-1] == {"role": "user", "content": "question"}
+        assert [m["content"] for m in messages[1:-1]] == ["a" * 400, "a" * 400, "latest"]
+        assert messages[1]["role"] == "user" and messages[2]["role"] == "assistant"
+
+    def test_reserves_reply_tokens(self):
+        """Reserving the reply budget drops history that would not leave room for it."""
+        history = [_message("a" * 400) for _ in range(4)]
+
+        assert len(self.builder.build(history, "q", context_window=1000, reserve_tokens=0)) == 5
+        assert len(self.builder.build(history, "q", context_window=1000, reserve_tokens=800)) == 2
+
+    def test_uses_cached_counts(self):
+        """Counts cached in metadata by the same counter are trusted instead of recounting."""
+        cached = _message("short", token_count=5000, token_counter="chars")
+        other_counter = _message("short", token_count=5000, token_counter="cl100k_base")
+
+        assert self.builder.message_tokens(cached) == 5000 + MESSAGE_OVERHEAD
+        assert self.builder.message_tokens(other_counter) == 2 + MESSAGE_OVERHEAD
+
+        with patch.object(self.builder.counter, 'count', wraps=self.builder.counter.count) as count:
+            uncached = _message("no metadata")
+            self.builder.message_tokens(uncached)
+            self.builder.message_tokens(uncached)
+            assert count.call_count == 1
+
+
+class TestRecentMessages:
+    """Test suite for ChatSessionService.get_recent_messages."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = ChatSessionService(data_dir=str(self.temp_dir))
+        self.project_id = str(uuid4())
+        self.conversations = None
+        self.session = self.service.create_session(ChatSessionCreate(project_id=self.project_id, title="Recent"))
+        for i in range(6):
+            self.service.add_message(self.session.id, MessageCreate(role="user", content=f"Message {i}"), self.project_id)
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        if self.conversations:
+            asyncio.run(self.conversations.close())
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_returns_newest_in_order(self):
+        """The limit counts back from the newest message; results stay oldest first."""
+        recent = self.service.get_recent_messages(self.session.id, limit=2, project_id=self.project_id)
+        assert [m.content for m in recent] == ["Message 4", "Message 5"]
+
+        everything = self.service.get_recent_messages(self.session.id, limit=50, project_id=self.project_id)
+        assert len(everything) == 6
+
+    def test_history_uses_recent_messages(self):
+        """Conversation history in requests comes from the end of the session."""
+        conversations = self.conversations = ConversationService(
+            self.temp_dir, chat_session_service=self.service, ai_provider_service=MagicMock()
+        )
+        conversations.ai_provider_service.get_available_models.return_value = []
+        with patch.object(conversations, '_find_session_project_id', return_value=self.project_id):
+            messages = conversations._prepare_conversation_messages(
+                self.session.id, "Next", max_history_messages=3
+            )
+
+        assert [m["content"] for m in messages] == ["Message 3", "Message 4", "Message 5", "Next"]
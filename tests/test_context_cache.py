@@ -0,0 +1,121 @@
+"""
+Unit Tests for the Conversation Context Cache
+
+Covers LRU eviction and lazy loading in ContextCache, the running totals,
+and lazy context loading in ConversationService.
+"""
+
+import asyncio
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+from backend.models.conversation import ConversationContext
+from backend.services.context_cache import ContextCache, ConversationTotals
+from backend.services.conversation_service import ConversationService
+
+
+class TestContextCache:
+    """Test suite for ContextCache."""
+
+    def setup_method(self):
+        """Back the cache with an in-memory store."""
+        self.stored = {}
+        self.cache = ContextCache(self.stored.get, max_size=2)
+
+    def _context(self, **kwargs):
+        return ConversationContext(session_id=uuid4(), **kwargs)
+
+    def test_evicts_least_recently_used_and_reloads(self):
+        """Only max_size contexts stay in memory; evicted ones are loaded again."""
+        contexts = [self._context(message_count=i) for i in range(3)]
+        for context in contexts:
+            self.stored[context.session_id] = context
+            self.cache[context.session_id] = context
+
+        assert list(self.cache) == [contexts[1].session_id, contexts[2].session_id]
+        assert self.cache[contexts[0].session_id] is contexts[0]
+        assert self.cache.get_stats()["misses"] == 1
+        assert self.cache.get(uuid4()) is None
+
+    def test_totals_follow_assignments_updates_and_deletes(self):
+        """Totals track every known context, including evicted ones."""
+        first = self._context(message_count=2, total_cost=1.0, preferred_model="gpt-4")
+        second = self._context(message_count=4, total_tokens_input=7)
+        for context in (first, second):
+            self.cache[context.session_id] = context
+        self.cache.clear()
+
+        first.message_count = 5
+        self.cache.refresh(first)
+        totals = self.cache.totals.to_dict()
+        assert (totals["conversations"], totals["messages"], totals["tokens_input"]) == (2, 9, 7)
+        assert totals["messages_by_model"] == {"gpt-4": 5}
+
+        self.stored[second.session_id] = second
+        del self.cache[second.session_id]
+        assert self.cache.totals.to_dict()["messages"] == 5
+
+    def test_active_conversations(self):
+        """Conversations count as active by the day of their last message."""
+        now = datetime.now()
+        self.cache[uuid4()] = self._context(last_message_at=now)
+        self.cache[uuid4()] = self._context(last_message_at=now - timedelta(days=45))
+
+        assert self.cache.totals.active(days=30, now=now) == 1
+        assert ConversationTotals(self.cache.totals.to_dict()).active(days=30, now=now) == 1
+
+
+class TestLazyConversationContexts:
+    """Test suite for lazy context loading in ConversationService."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.services = []
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        for service in self.services:
+            asyncio.run(service.close())
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_contexts_load_on_demand_with_persisted_totals(self):
+        """Startup reads only the totals; contexts are loaded when used."""
+        service = ConversationService(self.temp_dir, context_flush_interval=60, context_cache_size=1)
+        session_ids = [uuid4() for _ in range(3)]
+        for session_id in session_ids:
+            context = ConversationContext(session_id=session_id, message_count=2, total_tokens_output=5)
+            service._context_cache[session_id] = context
+            service._mark_context_dirty(context)
+        asyncio.run(service.close())
+
+        reopened = ConversationService(self.temp_dir)
+        self.services.append(reopened)
+        assert len(reopened._context_cache) == 0
+        stats = reopened.get_conversation_stats()
+        assert (stats.total_conversations, stats.total_messages, stats.total_tokens_output) == (3, 6, 15)
+
+        assert reopened._context_cache[session_ids[0]].message_count == 2
+        assert len(reopened._context_cache) == 1
+
+    def test_totals_are_rebuilt_for_existing_data(self):
+        """Context files written before totals were kept are counted once at startup."""
+        conversations_dir = self.temp_dir / "conversations"
+        conversations_dir.mkdir(parents=True)
+        for count in (1, 2):
+            session_id = str(uuid4())
+            (conversations_dir / f"{session_id}.json").write_text(
+                json.dumps({"session_id": session_id, "message_count": count, "total_cost": 0.25})
+            )
+
+        service = ConversationService(self.temp_dir)
+        self.services.append(service)
+        stats = service.get_conversation_stats()
+
+        assert (stats.total_conversations, stats.total_messages, stats.total_cost) == (2, 3, 0.5)
+        assert (conversations_dir / "totals.json").exists()
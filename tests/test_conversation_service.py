@@ -43,6 +43,7 @@ class TestConversationService:
 
     def teardown_method(self):
         """Clean up test fixtures."""
+        asyncio.run(self.service.close())
         # Clean up test directory
         if self.test_dir.exists():
             for file in self.test_dir.rglob("*.json"):
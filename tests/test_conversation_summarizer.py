@@ -0,0 +1,201 @@
+"""
+Unit Tests for Rolling Conversation Summaries
+
+Covers incremental summary updates and how ConversationService feeds
+evicted history into the summary and injects it into requests.
+"""
+
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from backend.models.ai_provider import AIError, AIModel, AIResponse, ProviderType
+from backend.models.chat_session import ChatSessionCreate, Message, MessageCreate
+from backend.models.conversation import ConversationSummary
+from backend.services.chat_session_service import ChatSessionService
+from backend.services.context_builder import TokenCounter
+from backend.services.conversation_service import ConversationService
+from backend.services.conversation_summarizer import ConversationSummarizer
+
+
+def _reply(content: str) -> AIResponse:
+    return AIResponse(id="s", model="gpt-4", content=content, finish_reason="stop", usage={})
+
+
+class TestConversationSummarizer:
+    """Test suite for ConversationSummarizer."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        with patch('backend.services.context_builder.tiktoken', None):
+            self.summarizer = ConversationSummarizer(self.temp_dir, TokenCounter(), chunk_tokens=60)
+        self.session_id = uuid4()
+        self.messages = [Message(session_id=self.session_id, role="user", content="x" * 120) for _ in range(4)]
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    @pytest.mark.asyncio
+    async def test_extends_in_chunks_and_persists(self):
+        """Each chunk folds into the previous summary and the result survives a reload."""
+        service = MagicMock()
+        service.send_request = AsyncMock(side_effect=[_reply("first"), _reply("second")])
+
+        summary = await self.summarizer.extend(self.session_id, self.messages, service, uuid4(), "gpt-4")
+
+        assert summary.content == "second"
+        assert summary.covered_count == 4
+        second_prompt = service.send_request.call_args_list[1].args[1].messages[1]["content"]
+        assert "Existing summary:\nfirst" in second_prompt
+
+        reloaded = ConversationSummarizer(self.temp_dir).get(self.session_id)
+        assert reloaded.content == "second" and reloaded.covered_count == 4
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_progress(self):
+        """A failed request leaves the summary at the last completed chunk."""
+        service = MagicMock()
+        service.send_request = AsyncMock(side_effect=[_reply("first"), AIError(type="request_failed", message="x")])
+
+        summary = await self.summarizer.extend(self.session_id, self.messages, service, uuid4(), "gpt-4")
+
+        assert summary.content == "first"
+        assert summary.covered_count == 2
+
+    @pytest.mark.asyncio
+    async def test_delete_during_extend_stops_saving(self):
+        """A summary deleted while a chunk is in flight is not written back."""
+        service = MagicMock()
+
+        async def reply_after_delete(provider_id, request):
+            self.summarizer.delete(self.session_id)
+            return _reply("stale")
+
+        service.send_request = reply_after_delete
+
+        assert await self.summarizer.extend(self.session_id, self.messages, service, uuid4(), "gpt-4") is None
+        assert not self.summarizer._get_summary_file(self.session_id).exists()
+        assert self.summarizer.get(self.session_id) is None
+        assert not self.summarizer._writers
+
+    def test_cache_is_bounded(self):
+        """Least recently used summaries are evicted from memory but reload from disk."""
+        summarizer = ConversationSummarizer(self.temp_dir, cache_size=2)
+        sessions = [uuid4() for _ in range(3)]
+        for session_id in sessions:
+            summarizer._save(ConversationSummary(session_id=session_id, content=str(session_id)))
+        assert list(summarizer._cache) == sessions[1:]
+
+        summarizer.get(sessions[1])
+        assert summarizer.get(sessions[0]).content == str(sessions[0])
+        assert list(summarizer._cache) == [sessions[1], sessions[0]]
+
+
+class TestConversationServiceSummaries:
+    """Test suite for summarization in ConversationService."""
+
+    def setup_method(self):
+        """Set up a session whose history exceeds a small context window."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.chat_sessions = ChatSessionService(data_dir=str(self.temp_dir))
+        self.project_id = str(uuid4())
+        self.session = self.chat_sessions.create_session(ChatSessionCreate(project_id=self.project_id, title="Long"))
+        for i in range(20):
+            role = "user" if i % 2 == 0 else "assistant"
+            self.chat_sessions.add_message(
+                self.session.id, MessageCreate(role=role, content=f"m{i:02d} " + "y" * 396), self.project_id
+            )
+
+        self.service = ConversationService(
+            self.temp_dir, chat_session_service=self.chat_sessions, ai_provider_service=MagicMock()
+        )
+        with patch('backend.services.context_builder.tiktoken', None):
+            self.service._context_builder.counter = TokenCounter()
+        self.service.ai_provider_service.get_available_models.return_value = [AIModel(
+            id="small", name="small", provider_type=ProviderType.OPENAI, context_window=1000,
+            max_tokens=100, input_pricing=0.0, output_pricing=0.0
+        )]
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        asyncio.run(self.service.close())
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def _prepare(self):
+        with patch.object(self.service, '_find_session_project_id', return_value=self.project_id):
+            return self.service._prepare_conversation_messages(
+                self.session.id, "next", model="small", max_tokens=100
+            )
+
+    @pytest.mark.asyncio
+    async def test_evicted_history_is_summarized_and_injected(self):
+        """Messages outside the window are summarized once and replaced by the summary."""
+        first = self._prepare()
+        history = [m["content"][:3] for m in first[:-1]]
+        assert history == ["m12", "m13", "m14", "m15", "m16", "m17", "m18", "m19"]
+
+        project_id, upto = self.service._summary_backlog[self.session.id]
+        assert upto == 12 + 8 // 2
+
+        self.service.ai_provider_service.send_request = AsyncMock(return_value=_reply("earlier: setup"))
+        await self.service._update_summary(self.session.id, project_id, upto, uuid4(), "small")
+        summarized = self.service.ai_provider_service.send_request.call_args.args[1].messages[1]["content"]
+        assert "m00" in summarized and "m15" in summarized and "m16" not in summarized
+
+        second = self._prepare()
+        assert second[0] == {"role": "system", "content": "Summary of the earlier conversation:\nearlier: setup"}
+        assert [m["content"][:3] for m in second[1:-1]] == ["m16", "m17", "m18", "m19"]
+        assert self.session.id not in self.service._summary_backlog
+
+    def test_summarization_can_be_disabled(self):
+        """With summarization off, no backlog is recorded and no summary is injected."""
+        self.service._settings.enable_summarization = False
+        messages = self._prepare()
+
+        assert all(m["role"] != "system" for m in messages)
+        assert not self.service._summary_backlog
+
+    @pytest.mark.asyncio
+    async def test_deleting_session_drops_summary(self):
+        """The summary of a deleted session is removed from memory and disk."""
+        self._prepare()
+        self.service.ai_provider_service.send_request = AsyncMock(return_value=_reply("earlier: setup"))
+        project_id, upto = self.service._summary_backlog[self.session.id]
+        await self.service._update_summary(self.session.id, project_id, upto, uuid4(), "small")
+        assert self.service._summarizer.get(self.session.id) is not None
+
+        self.chat_sessions.delete_session(self.session.id, force=True, project_id=self.project_id)
+
+        assert self.session.id not in self.service._summarizer._cache
+        assert not self.service._summarizer._get_summary_file(self.session.id).exists()
+
+    @pytest.mark.asyncio
+    async def test_deleting_session_cancels_summary_update(self):
+        """Deleting a session cancels its running summary update before anything is saved."""
+        self._prepare()
+        started = asyncio.Event()
+
+        async def slow_reply(provider_id, request):
+            started.set()
+            await asyncio.sleep(10)
+            return _reply("stale")
+
+        self.service.ai_provider_service.send_request = slow_reply
+        self.service._schedule_summary_update(self.session.id, uuid4(), "small")
+        task = self.service._summary_tasks[self.session.id]
+        await started.wait()
+
+        await asyncio.to_thread(self.chat_sessions.delete_session, self.session.id, True, self.project_id)
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert task.cancelled()
+        assert not self.service._summarizer._get_summary_file(self.session.id).exists()
@@ -0,0 +1,105 @@
+"""
+Unit Tests for Durable File Writes
+
+Covers atomic replacement, group commit batching and the fallback used once
+a group-commit writer has been closed.
+"""
+
+import json
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from backend.services import durable_write
+from backend.services.durable_write import DurableWriter
+
+
+class TestDurableWriter:
+    """Test suite for DurableWriter."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.target = self.temp_dir / "state.json"
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    @pytest.mark.parametrize("mode", ["fsync", "group", "none"])
+    def test_replaces_file_without_leftovers(self, mode):
+        """Every mode replaces the target and leaves no temporary files behind."""
+        writer = DurableWriter(mode)
+        try:
+            self.target.write_text("old")
+            writer.write_text(self.target, "new")
+        finally:
+            writer.close()
+
+        assert self.target.read_text() == "new"
+        assert [p.name for p in self.temp_dir.iterdir()] == ["state.json"]
+
+    def test_group_commit_batches_concurrent_writes(self):
+        """Concurrent writers share commits and the last write to a file wins."""
+        writer = DurableWriter("group", group_commit_interval=0.05)
+        others = [self.temp_dir / f"other{i}.json" for i in range(4)]
+        try:
+            writer.write_text(self.target, "0")
+            threads = [threading.Thread(target=writer.write_text, args=(path, "x")) for path in others]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            writer.close()
+
+        assert all(path.read_text() == "x" for path in others)
+        assert writer.get_stats()["commits"] < 1 + len(others)
+        assert not list(self.temp_dir.glob("*.tmp"))
+
+    def test_group_commit_drops_superseded_versions(self):
+        """Only the newest pending version of a file is committed."""
+        writer = DurableWriter("group", group_commit_interval=0.05)
+        try:
+            threads = []
+            for i in range(5):
+                threads.append(threading.Thread(target=writer.write_text, args=(self.target, str(i))))
+                threads[-1].start()
+                threads[-1].join(0.005)
+            for thread in threads:
+                thread.join()
+        finally:
+            writer.close()
+
+        assert self.target.read_text() == "4"
+        assert not list(self.temp_dir.glob("*.tmp"))
+
+    def test_closed_group_writer_still_writes(self):
+        """Writes after close are committed directly instead of hanging."""
+        writer = DurableWriter("group")
+        writer.close()
+
+        writer.write_text(self.target, "late")
+
+        assert self.target.read_text() == "late"
+
+    def test_invalid_mode(self):
+        """Unknown modes are rejected."""
+        with pytest.raises(ValueError):
+            DurableWriter("sometimes")
+
+    def test_module_writer_is_replaceable(self):
+        """write_json goes through the process-wide writer, which can be swapped."""
+        writer = DurableWriter("none")
+        previous = durable_write.set_writer(writer)
+        try:
+            durable_write.write_json(self.target, {"key": "välue"})
+        finally:
+            durable_write.set_writer(previous)
+
+        assert durable_write.get_writer() is not writer
+        assert json.loads(self.target.read_text(encoding="utf-8")) == {"key": "välue"}
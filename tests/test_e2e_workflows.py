@@ -9,6 +9,7 @@ Comprehensive E2E tests covering complete workflows including:
 - Cross-session isolation
 """
 
+import asyncio
 import pytest
 import tempfile
 import shutil
@@ -45,6 +46,7 @@ class TestE2EWorkflows:
 
     def teardown_method(self):
         """Clean up test environment after each test."""
+        asyncio.run(self.conversation_service.close())
         if self.temp_dir.exists():
             shutil.rmtree(self.temp_dir)
 
@@ -0,0 +1,147 @@
+"""
+Unit Tests for the Facet Bitmap Index
+
+Covers value bitmaps, date ranges and ordinal reuse in FacetIndex, and that
+bitmap filters and facet counts in SearchService agree with per-document
+checks.
+"""
+
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from backend.models.search import SearchFilter, SearchQuery, SearchType
+from backend.services.facet_index import FacetIndex
+from backend.services.search_service import SearchService
+
+DAY = 86400
+
+
+class TestFacetIndex:
+    """Test suite for FacetIndex."""
+
+    def setup_method(self):
+        """Create documents with random values and creation times."""
+        rng = random.Random(5)
+        self.now = time.time()
+        self.documents = {
+            f"doc{i}": (
+                [('type', rng.choice(['note', 'file'])), ('tag', rng.choice(['a', 'b', 'c']))],
+                self.now - rng.random() * 40 * DAY if i % 7 else None,
+            )
+            for i in range(300)
+        }
+
+    def _index(self):
+        return FacetIndex((doc_id, values, ts) for doc_id, (values, ts) in self.documents.items())
+
+    def test_counts_and_date_ranges(self):
+        """Popcounts and date ranges agree with a scan of the documents."""
+        index = self._index()
+        within, _ = index.bitmap_of(list(self.documents)[:150])
+
+        expected = {}
+        for values, _ in list(self.documents.values())[:150]:
+            for facet, value in values:
+                if facet == 'tag':
+                    expected[value] = expected.get(value, 0) + 1
+        assert index.counts('tag', within) == expected
+
+        start, end = self.now - 10.5 * DAY, self.now - 2.25 * DAY
+        expected_ids = sorted(d for d, (_, ts) in self.documents.items() if ts is not None and start <= ts <= end)
+        assert sorted(index.ids(index.created_between(start, end))) == expected_ids
+        assert len(index.ids(index.undated())) == len([d for d, (_, ts) in self.documents.items() if ts is None])
+
+    def test_updates_match_bulk_load(self):
+        """Incremental adds, replacements and removals give the same bitmaps as building from scratch."""
+        index = FacetIndex()
+        for doc_id, (values, ts) in self.documents.items():
+            index.add(doc_id, [('type', 'stale')], ts)
+        for doc_id, (values, ts) in self.documents.items():
+            index.add(doc_id, values, ts)
+        for doc_id in list(self.documents)[::3]:
+            index.discard(doc_id)
+            del self.documents[doc_id]
+
+        fresh = self._index()
+        for facet in ('type', 'tag'):
+            assert index.counts(facet, index.all) == fresh.counts(facet, fresh.all)
+        assert index.value('type', 'stale') == 0
+        assert sorted(index.ids(index.created_between(self.now - 5 * DAY))) == \
+            sorted(fresh.ids(fresh.created_between(self.now - 5 * DAY)))
+
+        # Freed ordinals are reused
+        size = len(index._ids)
+        index.add("new", [('type', 'note')])
+        assert len(index._ids) == size and "new" in index
+
+
+class TestFacetedSearch:
+    """Test suite for bitmap filters and facets in SearchService."""
+
+    @pytest.fixture
+    def search_service(self):
+        """Create search service instance with random documents"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            service = SearchService(base_path=str(Path(temp_dir)))
+            rng = random.Random(9)
+            for i in range(200):
+                doc_type = rng.choice(['conversation', 'file', 'note'])
+                metadata = {
+                    'user_id': rng.choice(['u1', 'u2']),
+                    'project_id': rng.choice(['p1', 'p2', 'p3']),
+                    'tags': rng.sample(['red', 'green', 'blue'], rng.randint(0, 2)),
+                }
+                if doc_type == 'file':
+                    metadata['filename'] = f"report.{rng.choice(['PDF', 'txt', 'md'])}"
+                created = datetime.now() - timedelta(days=rng.random() * 60)
+                service.index_document({
+                    'id': f"doc{i}",
+                    'type': doc_type,
+                    'title': f"doc{i}",
+                    'content': "shared status update",
+                    'tokens': ['shared', 'status', 'update'],
+                    'metadata': metadata,
+                    'created_at': created.isoformat() if i % 10 else None
+                })
+            yield service
+
+    @pytest.mark.parametrize("filters", [
+        SearchFilter(user_id='u1'),
+        SearchFilter(project_id='p2', tags=['red']),
+        SearchFilter(file_types=['pdf', 'md']),
+        SearchFilter(tags=['red', 'blue']),
+        SearchFilter(date_from=datetime.now() - timedelta(days=20), date_to=datetime.now() - timedelta(days=5)),
+    ])
+    def test_bitmap_filters_match_document_checks(self, search_service, filters):
+        """Filtering through bitmaps selects exactly the documents _matches_filters accepts."""
+        expected = sorted(
+            doc_id for doc_id, doc in search_service.document_store.items()
+            if search_service._matches_filters(doc, filters)
+        )
+        results = search_service.search(SearchQuery(query="status", filters=filters, limit=500))
+        assert sorted(r.id for r in results.results) == expected
+        assert results.total_results == len(expected)
+
+    def test_facets_follow_index_changes(self, search_service):
+        """Facet counts cover every candidate and reflect appended metadata and removals."""
+        query = SearchQuery(query="status", search_type=SearchType.EXACT, limit=5)
+        facets = search_service.search(query).facets
+        assert sum(facets['types'].values()) == 200
+        assert sum(facets['date_ranges'].values()) == 180
+        extensions = {}
+        for doc in search_service.document_store.values():
+            if doc['type'] == 'file':
+                ext = doc['metadata']['filename'].rsplit('.', 1)[1].lower()
+                extensions[ext] = extensions.get(ext, 0) + 1
+        assert facets['file_types'] == extensions
+
+        search_service._apply_append("doc1", "more", metadata={'project_id': 'p9'})
+        search_service.remove_document("doc2")
+        facets = search_service.search(query).facets
+        assert facets['projects']['p9'] == 1
+        assert sum(facets['types'].values()) == 199
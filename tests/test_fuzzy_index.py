@@ -0,0 +1,134 @@
+"""
+Unit Tests for the Fuzzy Term Index
+
+Covers bounded edit distance, trigram candidate filtering against a brute
+force scan, and fuzzy search in SearchService.
+"""
+
+import random
+import string
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from backend.models.search import SearchQuery, SearchType
+from backend.services.fuzzy_index import FuzzyTermIndex, levenshtein
+from backend.services.search_service import SearchService
+
+
+def _reference_distance(a, b):
+    """Unbounded Levenshtein distance."""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class TestLevenshtein:
+    """Test suite for the bounded edit distance."""
+
+    @pytest.mark.parametrize("a,b,expected", [
+        ("test", "test", 0),
+        ("test", "tst", 1),
+        ("test", "tests", 1),
+        ("document", "documnet", 2),
+        ("kitten", "sitting", 3),
+    ])
+    def test_known_distances(self, a, b, expected):
+        """Insertions, deletions and substitutions all count; results cap at max + 1."""
+        assert levenshtein(a, b, 2) == min(expected, 3)
+
+    def test_matches_reference(self):
+        """The banded computation agrees with the full table within the bound."""
+        rng = random.Random(7)
+        for _ in range(500):
+            a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+            b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+            assert levenshtein(a, b, 2) == min(_reference_distance(a, b), 3)
+
+
+class TestFuzzyTermIndex:
+    """Test suite for FuzzyTermIndex."""
+
+    def setup_method(self):
+        """Build a random vocabulary."""
+        rng = random.Random(42)
+        self.vocabulary = {
+            "".join(rng.choice(string.ascii_lowercase[:8]) for _ in range(rng.randint(2, 10)))
+            for _ in range(1500)
+        }
+        self.index = FuzzyTermIndex(self.vocabulary)
+        self.queries = rng.sample(sorted(self.vocabulary), 20) + ["abcdefgh", "hhh", "abcabcab"]
+
+    def test_matches_brute_force(self):
+        """Every term within the edit budget is found, and nothing else."""
+        for query in self.queries:
+            for k in (1, 2):
+                expected = {t for t in self.vocabulary if _reference_distance(query, t) <= k}
+                assert {t for t, _ in self.index.search(query, max_edits=k)} == expected
+
+    def test_candidates_are_a_small_part_of_the_vocabulary(self):
+        """Long query terms are verified against a pruned candidate set, not every term."""
+        long_terms = [t for t in self.vocabulary if len(t) >= 9][:20]
+        for query in long_terms:
+            assert len(self.index._candidates(query, 2)) < len(self.vocabulary) / 10
+
+    def test_auto_budget_and_updates(self):
+        """Budgets grow with term length; removed terms are no longer matched."""
+        index = FuzzyTermIndex(["cat", "cart", "document", "docs"])
+        assert index.search("ca") == []
+        assert index.search("cat") == [("cat", 0), ("cart", 1)]
+        assert index.search("documnet") == [("document", 2)]
+
+        index.discard("cart")
+        index.add("coat")
+        assert index.search("cat") == [("cat", 0), ("coat", 1)]
+        assert len(index) == 4
+
+
+class TestFuzzySearch:
+    """Test suite for fuzzy search in SearchService."""
+
+    @pytest.fixture
+    def search_service(self):
+        """Create search service instance with temp directory"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield SearchService(base_path=str(Path(temp_dir)))
+
+    def _add(self, service, doc_id, text):
+        service.index_document({
+            'id': doc_id,
+            'type': 'conversation',
+            'title': doc_id,
+            'content': text,
+            'tokens': service._tokenize(text),
+            'metadata': {},
+            'created_at': datetime.now().isoformat()
+        })
+
+    def test_insertions_and_deletions_match(self, search_service):
+        """Misspellings of different length find the document and score above zero."""
+        self._add(search_service, "doc1", "quarterly planning document")
+
+        for query in ("documnt", "plannning", "quartrly"):
+            results = search_service.search(SearchQuery(query=query, search_type=SearchType.FUZZY))
+            assert [r.id for r in results.results] == ["doc1"]
+            assert results.results[0].relevance_score > 0
+
+    def test_index_follows_vocabulary_changes(self, search_service):
+        """Terms added or removed after the fuzzy index was built are reflected."""
+        self._add(search_service, "doc1", "planning")
+        search_service.search(SearchQuery(query="plannng", search_type=SearchType.FUZZY))
+
+        self._add(search_service, "doc2", "retrospective")
+        search_service.remove_document("doc1")
+
+        found = search_service.search(SearchQuery(query="retrospectve", search_type=SearchType.FUZZY))
+        gone = search_service.search(SearchQuery(query="plannng", search_type=SearchType.FUZZY))
+        assert [r.id for r in found.results] == ["doc2"]
+        assert gone.total_results == 0
@@ -0,0 +1,125 @@
+"""
+Unit Tests for the HTTP Client Pool
+
+Verifies that provider sessions are long-lived, keyed by endpoint and
+configured from provider settings.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend.models.ai_provider import AIProvider, AIProviderCreate, AIRequest, ProviderType
+from backend.services.ai_provider_service import AIProviderService
+from backend.services.http_client_pool import HTTPClientPool
+
+
+def _provider(**overrides) -> AIProvider:
+    data = {"name": "Test", "provider_type": ProviderType.OPENAI, "api_key": "key"}
+    data.update(overrides)
+    return AIProvider(**data)
+
+
+class TestHTTPClientPool:
+    """Test suite for HTTPClientPool."""
+
+    def setup_method(self):
+        """Set up a pool for each test."""
+        self.pool = HTTPClientPool(max_connections=50, max_connections_per_host=10)
+
+    @pytest.mark.asyncio
+    async def test_sessions_shared_per_endpoint(self):
+        """Providers on the same endpoint share one session; other endpoints get their own."""
+        first = await self.pool.get(_provider())
+        same_endpoint = await self.pool.get(_provider(name="Other key"))
+        custom = await self.pool.get(_provider(base_url="http://localhost:8080"))
+        anthropic = await self.pool.get(_provider(provider_type=ProviderType.ANTHROPIC))
+
+        assert first is same_endpoint
+        assert len({id(first), id(custom), id(anthropic)}) == 3
+
+        await self.pool.close()
+        assert first.closed and custom.closed and anthropic.closed
+
+    @pytest.mark.asyncio
+    async def test_connector_configuration(self):
+        """Connector limits, keep-alive and DNS caching come from the pool and provider metadata."""
+        session = await self.pool.get(_provider(metadata={"max_connections_per_host": 4}))
+        connector = session.connector
+
+        assert connector.limit == 50
+        assert connector.limit_per_host == 4
+        assert connector.use_dns_cache
+        assert session.timeout.total == 30
+
+        # A provider on the same endpoint with other limits gets its own connector
+        default = await self.pool.get(_provider())
+        assert default is not session
+        assert default.connector.limit_per_host == 10
+        assert session.connector.limit_per_host == 4
+
+        await self.pool.close()
+
+    @pytest.mark.asyncio
+    async def test_closed_sessions_are_replaced(self):
+        """A closed session is transparently recreated."""
+        provider = _provider()
+        session = await self.pool.get(provider)
+        await session.close()
+
+        replacement = await self.pool.get(provider)
+        assert replacement is not session and not replacement.closed
+        await self.pool.close()
+
+    def test_timeouts(self):
+        """Requests use the provider timeout; streams bound each read with it instead."""
+        provider = _provider(timeout_seconds=12)
+
+        assert HTTPClientPool.timeout_for(provider).total == 12
+        stream_timeout = HTTPClientPool.timeout_for(provider, total=300)
+        assert stream_timeout.total == 300
+        assert stream_timeout.sock_read == 12
+
+
+class TestAIProviderServicePooling:
+    """Test suite for AIProviderService use of the client pool."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = AIProviderService(data_dir=str(self.temp_dir))
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_requests_reuse_session_with_provider_timeout(self, mock_post):
+        """Consecutive requests go through one pooled session with the provider timeout."""
+        provider = self.service.create_provider(AIProviderCreate(
+            name="Pooled", provider_type=ProviderType.OPENAI, api_key="key", timeout_seconds=45
+        ))
+        response = AsyncMock()
+        response.status = 200
+        response.json.return_value = {
+            "id": "r", "model": "gpt-4", "usage": {},
+            "choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+        }
+        mock_post.return_value.__aenter__.return_value = response
+        request = AIRequest(model="gpt-4", messages=[{"role": "user", "content": "Hi"}])
+
+        await self.service.send_request(provider.id, request)
+        session = await self.service._http_pool.get(provider)
+        await self.service.send_request(provider.id, request)
+
+        assert mock_post.call_count == 2
+        assert mock_post.call_args.kwargs["timeout"].total == 45
+        assert await self.service._http_pool.get(provider) is session
+
+        await self.service.close()
+        assert session.closed
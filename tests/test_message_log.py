@@ -0,0 +1,196 @@
+"""
+Unit Tests for the Append-Only Message Log
+
+Covers the JSONL log with offset index, the append storage mode of
+ChatSessionService and the messages.json migration tool.
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from backend.models.chat_session import ChatSessionCreate, MessageCreate
+from backend.services.chat_session_service import ChatSessionService
+from backend.services import durable_write
+from backend.services.durable_write import DurableWriter
+from backend.services.message_log import MessageLog, migrate_messages_json, main
+
+
+class TestMessageLog:
+    """Test suite for MessageLog."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.log = MessageLog(self.temp_dir / "session")
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_append_and_count(self):
+        """Appending returns positions and count comes from the index."""
+        assert not self.log.exists()
+        assert self.log.count() == 0
+
+        for i in range(5):
+            assert self.log.append({"n": i}) == i
+
+        assert self.log.exists()
+        assert self.log.count() == 5
+        assert self.log.index_file.stat().st_size == 5 * 8
+
+    def test_read_slices(self):
+        """Slices are served straight from the offset index."""
+        for i in range(10):
+            self.log.append({"n": i, "content": "é" * i})
+
+        assert [r["n"] for r in self.log.read()] == list(range(10))
+        assert [r["n"] for r in self.log.read(3, 4)] == [3, 4, 5, 6]
+        assert [r["n"] for r in self.log.read(8, 10)] == [8, 9]
+        assert [r["n"] for r in self.log.read(limit=2)] == [0, 1]
+        assert self.log.read(10) == []
+        assert self.log.read(2, 0) == []
+
+    def test_orphaned_tail_is_ignored_and_compacted(self):
+        """A log line without an index entry (interrupted append) is never read."""
+        self.log.append({"n": 0})
+        with open(self.log.log_file, "ab") as f:
+            f.write(b'{"n": "orphan"')
+        self.log.append({"n": 1})
+
+        assert [r["n"] for r in self.log.read()] == [0, 1]
+        assert [r["n"] for r in self.log.read(0, 1)] == [0]
+
+        assert self.log.compact() == 2
+        assert b"orphan" not in self.log.log_file.read_bytes()
+        assert [r["n"] for r in self.log.read()] == [0, 1]
+
+    def test_torn_last_line_is_dropped(self):
+        """A truncated last line the index points at is skipped, not fatal to the whole log."""
+        for i in range(3):
+            self.log.append({"n": i})
+        data = self.log.log_file.read_bytes()
+        self.log.log_file.write_bytes(data[:-5])
+
+        assert self.log.count() == 2
+        assert [r["n"] for r in self.log.read()] == [0, 1]
+
+        assert self.log.append({"n": "new"}) == 2
+        assert [r["n"] for r in self.log.read()] == [0, 1, "new"]
+        assert self.log.index_file.stat().st_size == 3 * 8
+
+    def test_partial_index_entry_is_dropped(self):
+        """A partially written index entry is ignored and overwritten by the next append."""
+        self.log.append({"n": 0})
+        with open(self.log.index_file, "ab") as f:
+            f.write(b"\x01\x02\x03")
+
+        assert self.log.count() == 1
+        assert self.log.append({"n": 1}) == 1
+        assert [r["n"] for r in self.log.read()] == [0, 1]
+
+    @pytest.mark.parametrize("mode,fsyncs", [("fsync", 2), ("group", 2), ("none", 0)])
+    def test_append_syncs_log_then_index(self, mode, fsyncs):
+        """Appends are fsynced through the durable write mode."""
+        writer = DurableWriter(mode)
+        previous = durable_write.set_writer(writer)
+        try:
+            self.log.append({"n": 0})
+        finally:
+            durable_write.set_writer(previous)
+            writer.close()
+        assert writer.fsyncs == fsyncs
+
+    def test_migrate_messages_json(self):
+        """Legacy messages.json files are converted into a log."""
+        session_dir = self.log.session_dir
+        session_dir.mkdir(parents=True)
+        with open(session_dir / "messages.json", "w", encoding="utf-8") as f:
+            json.dump([{"n": 0}, {"n": 1}], f)
+
+        assert migrate_messages_json(session_dir) == 2
+        assert not (session_dir / "messages.json").exists()
+        assert [r["n"] for r in self.log.read()] == [0, 1]
+        assert migrate_messages_json(session_dir) is None
+
+
+class TestChatSessionServiceAppendLog:
+    """Test suite for the append-only storage mode of ChatSessionService."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.project_id = str(uuid4())
+        self.service = ChatSessionService(data_dir=str(self.temp_dir), message_storage="jsonl")
+        self.session = self.service.create_session(
+            ChatSessionCreate(project_id=self.project_id, title="Log Session")
+        )
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def _add(self, count: int, service: ChatSessionService = None):
+        service = service or self.service
+        for i in range(count):
+            service.add_message(
+                self.session.id,
+                MessageCreate(role="user", content=f"Message {i}"),
+                self.project_id
+            )
+
+    def test_invalid_storage_mode(self):
+        """Unknown storage modes are rejected."""
+        with pytest.raises(ValueError, match="Invalid message storage mode"):
+            ChatSessionService(data_dir=str(self.temp_dir), message_storage="xml")
+
+    def test_add_and_get_messages(self):
+        """Messages are appended to the log and paginated from it."""
+        self._add(6)
+
+        session_dir = self.service._get_session_dir(self.session.id, self.project_id)
+        assert (session_dir / "messages.jsonl").exists()
+        assert not (session_dir / "messages.json").exists()
+
+        session = self.service.get_session(self.session.id, self.project_id)
+        assert session.message_count == 6
+
+        page = self.service.get_messages(self.session.id, limit=2, offset=3, project_id=self.project_id)
+        assert [m.content for m in page] == ["Message 3", "Message 4"]
+
+        summaries = self.service.list_sessions(project_id=self.project_id)
+        assert summaries[0].message_count == 6
+        assert summaries[0].last_message_preview == "Message 5"
+
+        with pytest.raises(ValueError, match="6 messages"):
+            self.service.delete_session(self.session.id, project_id=self.project_id)
+
+    def test_legacy_session_upgraded_on_append(self):
+        """Sessions written as messages.json are migrated on their next append."""
+        legacy = ChatSessionService(data_dir=str(self.temp_dir))
+        self._add(2, service=legacy)
+
+        self._add(1)
+
+        messages = self.service.get_messages(self.session.id, project_id=self.project_id)
+        assert [m.content for m in messages] == ["Message 0", "Message 1", "Message 0"]
+        # The legacy-mode service keeps reading the log once it exists
+        assert len(legacy.get_messages(self.session.id, project_id=self.project_id)) == 3
+
+    def test_migration_command(self):
+        """The migration entry point converts every session under a data dir."""
+        legacy = ChatSessionService(data_dir=str(self.temp_dir))
+        self._add(3, service=legacy)
+
+        assert main(["--data-dir", str(self.temp_dir)]) == 0
+
+        session_dir = self.service._get_session_dir(self.session.id, self.project_id)
+        assert not (session_dir / "messages.json").exists()
+        assert len(self.service.get_messages(self.session.id, project_id=self.project_id)) == 3
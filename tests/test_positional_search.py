@@ -0,0 +1,108 @@
+"""
+Unit Tests for Positional Search
+
+Covers phrase and proximity matching over term positions, and advanced search
+evaluating phrase, NEAR and NOT clauses before scoring and pagination.
+"""
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from backend.models.search import AdvancedSearchQuery, ProximityClause
+from backend.services.positional import near_match, phrase_match, term_positions
+from backend.services.search_service import SearchService
+
+
+class TestPositionalMatching:
+    """Test suite for the positional helpers."""
+
+    def test_phrase_match(self):
+        """Terms must be consecutive and in order."""
+        positions = term_positions(["release", "notes", "draft", "release", "plan"])
+        assert phrase_match(positions, ["release", "notes"])
+        assert phrase_match(positions, ["draft", "release", "plan"])
+        assert not phrase_match(positions, ["notes", "release"])
+        assert not phrase_match(positions, ["release", "draft"])
+        assert not phrase_match(positions, ["release", "missing"])
+
+    @pytest.mark.parametrize("terms,distance,expected", [
+        (["alpha", "beta"], 1, False),
+        (["alpha", "beta"], 3, True),
+        (["beta", "alpha"], 3, True),
+        (["alpha", "gamma", "beta"], 3, True),
+        (["alpha", "gamma", "beta"], 2, False),
+        (["alpha", "delta"], 10, False),
+    ])
+    def test_near_match(self, terms, distance, expected):
+        """Every term must fall within one window of the given span, in any order."""
+        positions = term_positions(["alpha", "x", "gamma", "beta", "y", "y", "alpha"])
+        assert near_match(positions, terms, distance) == expected
+
+
+class TestAdvancedSearch:
+    """Test suite for clause evaluation in advanced search."""
+
+    @pytest.fixture
+    def search_service(self):
+        """Create search service instance with temp directory"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield SearchService(base_path=str(Path(temp_dir)))
+
+    def _add(self, service, doc_id, text, title=None):
+        service.index_document({
+            'id': doc_id,
+            'type': 'conversation',
+            'title': title or doc_id,
+            'content': text,
+            'tokens': service._tokenize(text),
+            'metadata': {},
+            'created_at': datetime.now().isoformat()
+        })
+
+    def _ids(self, results):
+        return sorted(r.id for r in results.results)
+
+    def test_phrase_totals_are_exact_across_pages(self, search_service):
+        """Totals count every phrase match, not only those on the returned page."""
+        for i in range(30):
+            self._add(search_service, f"hit{i}", f"entry {i}: " + "filler " * 80 + "budget review meeting")
+            self._add(search_service, f"miss{i}", f"budget meeting and a review {i}")
+
+        query = AdvancedSearchQuery(queries=["budget"], exact_phrases=["budget review"], limit=10)
+        first = search_service.advanced_search(query)
+        second = search_service.advanced_search(query.model_copy(update={'offset': 10}))
+
+        assert first.total_results == second.total_results == 30
+        assert len(first.results) == len(second.results) == 10
+        assert all(r.id.startswith("hit") for r in first.results + second.results)
+        assert not set(self._ids(first)) & set(self._ids(second))
+
+    def test_near_and_not_clauses(self, search_service):
+        """NEAR bounds the span between terms; excluded terms and phrases remove documents."""
+        self._add(search_service, "close", "database migration finished without errors")
+        self._add(search_service, "far", "database " + "step " * 10 + "migration")
+        self._add(search_service, "rollback", "database migration rollback happened")
+        self._add(search_service, "schema", "migration of the database schema")
+
+        near = AdvancedSearchQuery(
+            queries=["database"],
+            near=[ProximityClause(terms=["database", "migration"], distance=2)]
+        )
+        assert self._ids(search_service.advanced_search(near)) == ["close", "rollback", "schema"]
+
+        excluded = near.model_copy(update={'exclude_terms': ["rollback", "database schema"]})
+        results = search_service.advanced_search(excluded)
+        assert self._ids(results) == ["close"]
+        assert results.total_results == 1
+
+    def test_positions_follow_appends(self, search_service):
+        """Text appended to a document extends its positions."""
+        self._add(search_service, "doc", "weekly sync")
+        search_service._apply_append("doc", "notes follow")
+
+        query = AdvancedSearchQuery(queries=["sync"], exact_phrases=["sync notes"])
+        assert self._ids(search_service.advanced_search(query)) == ["doc"]
+        assert search_service.document_store["doc"]['positions']['follow'] == [3]
@@ -0,0 +1,192 @@
+"""
+Unit Tests for Provider Routing
+
+Covers candidate ranking, failover and hedged requests in ProviderRouter,
+and routing in ConversationService.
+"""
+
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from backend.models.ai_provider import AIError, AIModel, AIResponse, ProviderType
+from backend.models.conversation import ConversationContext, ConversationRequest, ConversationResponse
+from backend.models.settings import APIProviderSettings
+from backend.services.conversation_service import ConversationService
+from backend.services.provider_router import ProviderRouter
+
+
+def _response(content: str = "ok") -> AIResponse:
+    return AIResponse(id="r", model="m", content=content, finish_reason="stop",
+                      usage={"prompt_tokens": 1, "completion_tokens": 1})
+
+
+class TestProviderRouter:
+    """Test suite for ProviderRouter."""
+
+    def setup_method(self):
+        """Set up a router for each test."""
+        self.router = ProviderRouter(min_samples=5, default_hedge_delay=0.05)
+        self.a, self.b, self.c = uuid4(), uuid4(), uuid4()
+
+    def test_rank_by_health_priority_and_latency(self):
+        """Healthy beats preferred beats priority beats latency."""
+        for _ in range(3):
+            self.router.record(self.b, 2.0)
+            self.router.record(self.c, 0.5)
+        candidates = [(self.a, "m"), (self.b, "m"), (self.c, "m")]
+
+        ranked = self.router.rank(candidates, {self.a: "unhealthy", self.b: "healthy", self.c: "healthy"}, {})
+        assert [c[0] for c in ranked] == [self.c, self.b, self.a]
+
+        ranked = self.router.rank(candidates, {}, {self.b: 1, self.c: 2})
+        assert [c[0] for c in ranked] == [self.a, self.b, self.c]
+
+        ranked = self.router.rank(candidates, {}, {self.b: 1, self.c: 2}, preferred=self.c)
+        assert ranked[0][0] == self.c
+
+    def test_hedge_delay_from_p95(self):
+        """The hedge delay is the default until enough samples exist, then the p95."""
+        assert self.router.hedge_delay(self.a) == 0.05
+        for latency in [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]:
+            self.router.record(self.a, latency)
+        assert self.router.hedge_delay(self.a) == 1.0
+        assert self.router.percentile(self.a, 0.5) == 0.5
+
+    @pytest.mark.asyncio
+    async def test_failover(self):
+        """Errors move on to the next candidate and the attempts are reported."""
+        calls = []
+
+        async def send(provider_id, model):
+            calls.append((provider_id, model))
+            if provider_id == self.a:
+                return AIError(type="request_failed", message="down")
+            return _response()
+
+        provider_id, result = await self.router.execute([(self.a, "x"), (self.b, "y")], send)
+
+        assert provider_id == self.b
+        assert isinstance(result, AIResponse)
+        assert calls == [(self.a, "x"), (self.b, "y")]
+        assert result.metadata["routing"]["attempted_providers"] == [str(self.a), str(self.b)]
+
+    @pytest.mark.asyncio
+    async def test_hedge_cancels_slow_primary(self):
+        """A slow primary is raced by the backup and cancelled when it loses."""
+        cancelled = asyncio.Event()
+
+        async def send(provider_id, model):
+            if provider_id == self.a:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return _response(str(provider_id))
+
+        provider_id, result = await self.router.execute([(self.a, "m"), (self.b, "m")], send, hedge=True)
+        await asyncio.sleep(0)
+
+        assert provider_id == self.b
+        assert result.metadata["routing"]["hedged"] is True
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        """No backup request is sent when the primary answers within the hedge delay."""
+        send = AsyncMock(return_value=_response())
+
+        provider_id, result = await self.router.execute([(self.a, "m"), (self.b, "m")], send, hedge=True)
+
+        assert provider_id == self.a
+        send.assert_awaited_once_with(self.a, "m")
+        assert "routing" not in result.metadata
+
+
+class TestConversationRouting:
+    """Test suite for provider routing in ConversationService."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = ConversationService(self.temp_dir)
+        self.service.chat_session_service = MagicMock()
+        self.service.ai_provider_service = MagicMock()
+        self.session_id = uuid4()
+        self.service._context_cache[self.session_id] = ConversationContext(session_id=self.session_id)
+
+        self.openai = MagicMock(id=uuid4(), provider_type=ProviderType.OPENAI)
+        self.openai.name = "OpenAI"
+        self.anthropic = MagicMock(id=uuid4(), provider_type=ProviderType.ANTHROPIC)
+        self.anthropic.name = "Anthropic"
+        self.service.ai_provider_service.list_providers.return_value = [self.openai, self.anthropic]
+        models = {
+            ProviderType.OPENAI: [self._model("gpt-4", ProviderType.OPENAI)],
+            ProviderType.ANTHROPIC: [self._model("claude-3-haiku", ProviderType.ANTHROPIC)],
+        }
+        self.service.ai_provider_service.get_available_models.side_effect = lambda t=None: models.get(t, [])
+        self.service.ai_provider_service.get_health_status.side_effect = \
+            lambda provider_id: MagicMock(status="healthy")
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    @staticmethod
+    def _model(model_id, provider_type):
+        return AIModel(id=model_id, name=model_id, provider_type=provider_type, context_window=8000,
+                       max_tokens=1000, input_pricing=0.0, output_pricing=0.0)
+
+    def test_candidates_use_each_providers_model(self):
+        """Fallback providers get one of their own models; named providers are not replaced."""
+        request = ConversationRequest(session_id=self.session_id, message="Hi")
+        candidates = self.service._route_candidates(self.openai.id, "gpt-4", request)
+        assert candidates == [(self.openai.id, "gpt-4"), (self.anthropic.id, "claude-3-haiku")]
+
+        pinned = ConversationRequest(session_id=self.session_id, message="Hi", provider_id=self.openai.id)
+        assert self.service._route_candidates(self.openai.id, "gpt-4", pinned) == [(self.openai.id, "gpt-4")]
+
+        explicit_model = ConversationRequest(session_id=self.session_id, message="Hi", model="gpt-4")
+        assert len(self.service._route_candidates(self.openai.id, "gpt-4", explicit_model)) == 1
+
+    def test_candidates_follow_health_and_priority(self):
+        """An unhealthy selection drops behind healthy providers; disabled providers are skipped."""
+        self.service.ai_provider_service.get_health_status.side_effect = lambda provider_id: MagicMock(
+            status="unhealthy" if provider_id == self.openai.id else "healthy"
+        )
+        request = ConversationRequest(session_id=self.session_id, message="Hi")
+        candidates = self.service._route_candidates(self.openai.id, "gpt-4", request)
+        assert candidates[0][0] == self.anthropic.id
+
+        self.service.settings_service = MagicMock()
+        self.service.settings_service.get_default_settings.return_value.api_providers = [
+            APIProviderSettings(provider_name="anthropic", enabled=False)
+        ]
+        assert self.service._route_candidates(self.openai.id, "gpt-4", request) == [(self.openai.id, "gpt-4")]
+
+    @pytest.mark.asyncio
+    async def test_send_message_fails_over(self):
+        """A failed provider is replaced by the next candidate and the reply is recorded."""
+        async def send_request(provider_id, request):
+            if provider_id == self.openai.id:
+                return AIError(type="request_failed", message="503")
+            assert request.model == "claude-3-haiku"
+            return _response("from anthropic")
+
+        self.service.ai_provider_service.send_request = send_request
+        self.service.chat_session_service.add_message.side_effect = [MagicMock(id=uuid4()), MagicMock(id=uuid4())]
+
+        request = ConversationRequest(session_id=self.session_id, message="Hi")
+        with patch.object(self.service, '_select_provider_and_model', return_value=(self.openai.id, "gpt-4")):
+            result = await self.service.send_message(request)
+
+        assert isinstance(result, ConversationResponse)
+        assert result.provider_id == self.anthropic.id
+        assert result.content == "from anthropic"
@@ -0,0 +1,152 @@
+"""
+Unit Tests for Provider Rate Limiting
+
+Covers the token buckets, FIFO queueing, token reconciliation and the
+AIProviderService integration.
+"""
+
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend.models.ai_provider import AIProviderCreate, AIRequest, AIError, ProviderType
+from backend.services.ai_provider_service import AIProviderService
+from backend.services.rate_limiter import ProviderRateLimiter, TokenBucket, estimate_tokens, usage_tokens
+
+
+class TestTokenBucket:
+    """Test suite for TokenBucket."""
+
+    def test_wait_and_refill(self):
+        """An empty bucket reports the time until enough units have been refilled."""
+        bucket = TokenBucket(capacity=60, per_minute=60)
+        assert bucket.wait_time(60) == 0
+
+        bucket.consume(60)
+        assert bucket.wait_time(1) == pytest.approx(1.0, abs=0.05)
+        assert bucket.wait_time(30) == pytest.approx(30.0, abs=0.05)
+
+        bucket.refund(30)
+        assert bucket.wait_time(30) == 0
+
+    def test_reconfigure_keeps_fill_ratio(self):
+        """Changing limits scales the current level."""
+        bucket = TokenBucket(capacity=100, per_minute=100)
+        bucket.consume(50)
+        bucket.reconfigure(capacity=200, per_minute=200)
+        assert bucket.level == pytest.approx(100, abs=1)
+
+
+class TestProviderRateLimiter:
+    """Test suite for ProviderRateLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_in_order(self):
+        """Queued requests are granted in arrival order once budget refills."""
+        limiter = ProviderRateLimiter(requests_per_minute=600, tokens_per_minute=100000)
+        limiter.requests.consume(600)
+        order = []
+
+        async def request(name):
+            await limiter.acquire(10)
+            order.append(name)
+
+        tasks = [asyncio.create_task(request(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 3
+
+        await asyncio.gather(*tasks)
+        assert order == [0, 1, 2]
+        assert limiter.queue_depth == 0
+
+        metrics = limiter.get_metrics()
+        assert metrics["total_acquired"] == 3
+        assert metrics["max_wait_time"] > 0
+
+    @pytest.mark.asyncio
+    async def test_max_wait_rejects(self):
+        """A request that cannot be granted within max_wait is rejected without consuming budget."""
+        limiter = ProviderRateLimiter(requests_per_minute=60, tokens_per_minute=1000)
+        limiter.tokens.consume(1000)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await limiter.acquire(500, max_wait=1)
+
+        assert limiter.get_metrics()["total_rejected"] == 1
+        assert limiter.requests.wait_time(60) == 0
+
+    def test_reconcile(self):
+        """Over-estimates are refunded and under-estimates charged."""
+        limiter = ProviderRateLimiter(requests_per_minute=60, tokens_per_minute=1000)
+        limiter.tokens.consume(600)
+        limiter.reconcile(estimated_tokens=600, actual_tokens=100)
+        assert limiter.tokens.level == pytest.approx(900, abs=1)
+
+        limiter.reconcile(estimated_tokens=100, actual_tokens=400)
+        assert limiter.tokens.level == pytest.approx(600, abs=1)
+
+    def test_estimates(self):
+        """Token estimates include prompt, per-message overhead and reply budget."""
+        messages = [{"role": "user", "content": "x" * 400}]
+        assert estimate_tokens(messages, 50) == 100 + 4 + 50
+        assert usage_tokens({"input_tokens": 3, "output_tokens": 4}) == 7
+        assert usage_tokens({"total_tokens": 9}) == 9
+        assert usage_tokens({}) is None
+
+
+class TestAIProviderServiceRateLimiting:
+    """Test suite for rate limiting in AIProviderService."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = AIProviderService(data_dir=str(self.temp_dir))
+        self.provider = self.service.create_provider(AIProviderCreate(
+            name="Limited", provider_type=ProviderType.OPENAI, api_key="key",
+            rate_limit_requests=60, rate_limit_tokens=1000
+        ))
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_usage_reconciled_after_request(self, mock_post):
+        """The reply budget reserved up front is returned once usage is known."""
+        response = AsyncMock()
+        response.status = 200
+        response.json.return_value = {
+            "id": "r", "model": "gpt-4",
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            "choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+        }
+        mock_post.return_value.__aenter__.return_value = response
+        request = AIRequest(model="gpt-4", messages=[{"role": "user", "content": "Hi"}], max_tokens=500)
+
+        await self.service.send_request(self.provider.id, request)
+
+        stats = self.service.get_rate_limit_stats(self.provider.id)
+        assert stats["total_acquired"] == 1
+        assert stats["tokens_available"] == pytest.approx(985, abs=1)
+        assert stats["requests_available"] == pytest.approx(59, abs=1)
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_exhausted_budget_returns_error(self, mock_post):
+        """Requests that would wait longer than RATE_LIMIT_MAX_WAIT fail fast with retry_after."""
+        self.service._get_rate_limiter(self.provider).tokens.consume(1000)
+        request = AIRequest(model="gpt-4", messages=[{"role": "user", "content": "Hi"}], max_tokens=900)
+
+        with patch('backend.services.ai_provider_service.settings.RATE_LIMIT_MAX_WAIT', 1.0):
+            result = await self.service.send_request(self.provider.id, request)
+
+        assert isinstance(result, AIError)
+        assert result.type == "rate_limit_exceeded"
+        assert result.retry_after >= 1
+        mock_post.assert_not_called()
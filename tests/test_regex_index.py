@@ -0,0 +1,103 @@
+"""
+Unit Tests for the Regex Trigram Index
+
+Covers trigram query extraction from regexes, that the prefilter never drops
+a matching document, and regex search over full content in SearchService.
+"""
+
+import random
+import re
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from backend.models.search import SearchQuery, SearchType
+from backend.services.regex_index import RegexTrigramIndex, regex_query
+from backend.services.search_service import SearchService
+
+
+class TestRegexQuery:
+    """Test suite for trigram query extraction."""
+
+    @pytest.mark.parametrize("pattern,expected", [
+        ("Hello", ("and", ("ell", "hel", "llo"))),
+        ("abc|xyz", ("or", ("abc", "xyz"))),
+        ("foo.*bar", ("and", ("foo", "bar"))),
+        ("[Tt]est", ("and", ("est", "tes"))),
+        (r"\d+", None),
+        ("ab", None),
+        ("(unclosed", None),
+    ])
+    def test_queries(self, pattern, expected):
+        """Required literals become trigram conjunctions, alternatives disjunctions."""
+        assert regex_query(pattern) == expected
+
+    def test_prefilter_never_drops_a_match(self):
+        """Every document a pattern matches is among the candidates."""
+        rng = random.Random(3)
+        texts = {f"d{i}": "".join(rng.choice("abcd xy\nAB") for _ in range(60)) for i in range(200)}
+        index = RegexTrigramIndex()
+        for doc_id, text in texts.items():
+            index.add(doc_id, text)
+
+        patterns = ["abc", "ab+c", "a.c|dxy", "(ab|cd){2}", "x?yab", "[ab]cd", "^abc", "b[^a]d",
+                    "ab{2,3}", "(?:da|ad)c.a", "ABCD", r"a\sb", "cd(?=ab)a", "a|b", "y*dd"]
+        for pattern in patterns:
+            compiled = re.compile(pattern, re.IGNORECASE)
+            expected = {d for d, t in texts.items() if compiled.search(t)}
+            candidates = index.candidates(regex_query(pattern))
+            assert candidates is None or expected <= candidates, pattern
+
+
+class TestRegexSearch:
+    """Test suite for regex search in SearchService."""
+
+    @pytest.fixture
+    def search_service(self):
+        """Create search service instance with temp directory"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield SearchService(base_path=str(Path(temp_dir)))
+
+    def _add(self, service, doc_id, text):
+        service.index_document({
+            'id': doc_id,
+            'type': 'conversation',
+            'title': doc_id,
+            'content': text,
+            'tokens': service._tokenize(text),
+            'metadata': {},
+            'created_at': datetime.now().isoformat()
+        })
+
+    def _search(self, service, pattern):
+        results = service.search(SearchQuery(query=pattern, search_type=SearchType.REGEX))
+        return sorted(r.id for r in results.results)
+
+    def test_matches_beyond_first_thousand_characters(self, search_service):
+        """Content is stored and searched in full."""
+        self._add(search_service, "long", "filler " * 500 + "ERR-4711 at the end")
+        self._add(search_service, "short", "nothing here")
+
+        assert self._search(search_service, r"err-\d+ at") == ["long"]
+
+    def test_only_candidates_are_verified(self, search_service):
+        """Documents without the required trigrams are never run through the regex."""
+        for i in range(50):
+            self._add(search_service, f"doc{i}", f"routine note {i}")
+        self._add(search_service, "hit", "kernel panic detected")
+
+        assert search_service._regex_candidates("panic|oops") == {"hit"}
+        assert self._search(search_service, "kernel (panic|oops)") == ["hit"]
+
+    def test_index_follows_appends_and_removals(self, search_service):
+        """Appended text is searchable, including across the join; removed documents are not."""
+        self._add(search_service, "doc", "first part")
+        self._search(search_service, "part")
+
+        search_service._apply_append("doc", "second")
+        assert self._search(search_service, "part second") == ["doc"]
+
+        search_service.remove_document("doc")
+        assert self._search(search_service, "part") == []
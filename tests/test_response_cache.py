@@ -0,0 +1,166 @@
+"""
+Unit Tests for the AI Response Cache
+
+Covers request keys, LRU and TTL eviction, the disk tier and caching in
+AIProviderService.send_request.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+from backend.models.ai_provider import AIProviderCreate, AIRequest, AIResponse, ProviderType
+from backend.services.ai_provider_service import AIProviderService
+from backend.services.response_cache import ResponseCache, is_cacheable, request_key
+
+
+def _request(**overrides) -> AIRequest:
+    data = {"model": "gpt-4", "messages": [{"role": "user", "content": "Hi"}], "temperature": 0}
+    data.update(overrides)
+    return AIRequest(**data)
+
+
+def _response(content: str = "ok") -> AIResponse:
+    return AIResponse(id="r", model="gpt-4", content=content, finish_reason="stop",
+                      usage={"prompt_tokens": 1, "completion_tokens": 1})
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_request_key(self):
+        """Keys depend on provider and generation parameters, not on metadata or the cache flag."""
+        provider_id = uuid4()
+        key = request_key(provider_id, _request())
+
+        assert key == request_key(provider_id, _request(metadata={"trace": "x"}, use_cache=True))
+        assert key != request_key(uuid4(), _request())
+        assert key != request_key(provider_id, _request(temperature=0.5))
+        assert key != request_key(provider_id, _request(messages=[{"role": "user", "content": "Hey"}]))
+
+    def test_cacheable(self):
+        """Only temperature-0 requests are cached unless the flag says otherwise."""
+        assert is_cacheable(_request())
+        assert not is_cacheable(_request(temperature=0.7))
+        assert is_cacheable(_request(temperature=0.7, use_cache=True))
+        assert not is_cacheable(_request(use_cache=False))
+
+    def test_lru_and_ttl(self):
+        """The least recently used entry is evicted first and expired entries miss."""
+        cache = ResponseCache(max_entries=2, ttl_seconds=60)
+        cache.put("a", _response("a"))
+        cache.put("b", _response("b"))
+        assert cache.get("a").content == "a"
+        cache.put("c", _response("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+
+        with patch('backend.services.response_cache.time.time', return_value=10 ** 12):
+            assert cache.get("a") is None
+        assert len(cache) == 1
+
+    def test_disk_tier(self):
+        """Entries written to disk are found by a fresh cache."""
+        ResponseCache(disk_dir=self.temp_dir).put("k" * 64, _response("persisted"))
+
+        assert ResponseCache(disk_dir=self.temp_dir).get("k" * 64).content == "persisted"
+        assert ResponseCache().get("k" * 64) is None
+
+    def test_disk_tier_is_bounded(self):
+        """The oldest files are removed beyond max_disk_entries, including those of earlier runs."""
+        cache = ResponseCache(max_entries=1, disk_dir=self.temp_dir, max_disk_entries=2)
+        for key in ("a" * 64, "b" * 64, "c" * 64):
+            cache.put(key, _response(key[0]))
+
+        assert len(list(self.temp_dir.glob("*/*.json"))) == 2
+        assert cache.get("a" * 64) is None
+        assert cache.get("b" * 64).content == "b"
+
+        restarted = ResponseCache(disk_dir=self.temp_dir, max_disk_entries=2)
+        restarted.put("d" * 64, _response("d"))
+        assert sorted(p.stem[0] for p in self.temp_dir.glob("*/*.json")) == ["c", "d"]
+
+    def test_expired_files_are_swept(self):
+        """Expired files are removed by a sweep without being read."""
+        cache = ResponseCache(ttl_seconds=60, disk_dir=self.temp_dir, sweep_interval=0)
+        cache.put("a" * 64, _response("a"))
+
+        with patch('backend.services.response_cache.time.time', return_value=10 ** 12):
+            cache.put("b" * 64, _response("b"))
+        assert [p.stem[0] for p in self.temp_dir.glob("*/*.json")] == ["b"]
+        assert cache.get_stats()["disk_entries"] == 1
+
+        with patch('backend.services.response_cache.time.time', return_value=10 ** 13):
+            assert ResponseCache(disk_dir=self.temp_dir).get_stats()["disk_entries"] == 0
+        assert not list(self.temp_dir.glob("*/*.json"))
+
+
+class TestSendRequestCaching:
+    """Test suite for response caching in AIProviderService."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = AIProviderService(data_dir=str(self.temp_dir))
+        self.provider = self.service.create_provider(AIProviderCreate(
+            name="Cached", provider_type=ProviderType.OPENAI, api_key="key"
+        ))
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def _mock(self, mock_post):
+        response = AsyncMock()
+        response.status = 200
+        response.json.return_value = {
+            "id": "r", "model": "gpt-4", "usage": {"prompt_tokens": 3, "completion_tokens": 2},
+            "choices": [{"message": {"content": "cached answer"}, "finish_reason": "stop"}],
+        }
+        mock_post.return_value.__aenter__.return_value = response
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_repeated_request_served_from_cache(self, mock_post):
+        """An identical deterministic request is answered without an upstream call or tokens."""
+        self._mock(mock_post)
+
+        first = await self.service.send_request(self.provider.id, _request())
+        second = await self.service.send_request(self.provider.id, _request())
+
+        mock_post.assert_called_once()
+        assert second.content == first.content
+        assert second.metadata["cached"] is True
+        stats = self.service.get_usage_stats(self.provider.id)
+        assert (stats.cache_hits, stats.cache_misses) == (1, 1)
+        assert stats.total_requests == 1
+        assert stats.total_tokens_input == 3
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_bypass_and_sampled_requests(self, mock_post):
+        """Bypassed and non-deterministic requests always go upstream."""
+        self._mock(mock_post)
+
+        await self.service.send_request(self.provider.id, _request())
+        await self.service.send_request(self.provider.id, _request(use_cache=False))
+        await self.service.send_request(self.provider.id, _request(temperature=0.7))
+        await self.service.send_request(self.provider.id, _request(temperature=0.7))
+
+        assert mock_post.call_count == 4
+        assert self.service.get_usage_stats(self.provider.id).cache_hits == 0
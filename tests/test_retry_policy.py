@@ -0,0 +1,150 @@
+"""
+Unit Tests for the Provider Retry Policy
+
+Covers error classification, backoff and Retry-After handling, and retries
+in AIProviderService.send_request.
+"""
+
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+import pytest
+
+from backend.models.ai_provider import AIProviderCreate, AIRequest, AIResponse, AIError, ProviderType
+from backend.services.ai_provider_service import AIProviderService
+from backend.services.retry_policy import ProviderHTTPError, RetryPolicy, parse_retry_after
+
+
+def _response(status: int, body: dict, headers: dict = None):
+    response = AsyncMock()
+    response.status = status
+    response.headers = headers or {}
+    response.json.return_value = body
+    return response
+
+
+class TestRetryPolicy:
+    """Test suite for RetryPolicy."""
+
+    def test_classify(self):
+        """Transient failures are retryable; client errors are not."""
+        policy = RetryPolicy()
+        assert policy.classify(ProviderHTTPError("slow down", 429)) == "rate_limited"
+        assert policy.classify(ProviderHTTPError("overloaded", 503)) == "server_error"
+        assert policy.classify(asyncio.TimeoutError()) == "timeout"
+        assert policy.classify(aiohttp.ServerDisconnectedError()) == "connection_error"
+        assert policy.classify(ConnectionResetError()) == "connection_error"
+        assert policy.classify(ProviderHTTPError("bad request", 400)) is None
+        assert policy.classify(KeyError("choices")) is None
+
+    def test_backoff_is_capped_with_jitter(self):
+        """Backoff grows exponentially, stays under the cap and is randomized."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+        for attempt, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (10, 5.0)]:
+            delays = [policy.backoff(attempt) for _ in range(50)]
+            assert all(0 <= d <= ceiling for d in delays)
+            assert len(set(delays)) > 1
+
+    def test_retry_after(self):
+        """Retry-After wins over backoff, and waits beyond the cap give up."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+        assert policy.backoff(1, retry_after=7) == 7
+        assert policy.backoff(1, retry_after=60) is None
+
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+
+class TestSendRequestRetries:
+    """Test suite for retries in AIProviderService.send_request."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = AIProviderService(data_dir=str(self.temp_dir))
+        self.service._retry_policy = RetryPolicy(base_delay=0.0, max_delay=1.0)
+        self.request = AIRequest(model="gpt-4", messages=[{"role": "user", "content": "Hi"}])
+        self.success = {
+            "id": "r", "model": "gpt-4", "usage": {"prompt_tokens": 1, "completion_tokens": 1},
+            "choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+        }
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def _provider(self, retry_attempts: int = 3):
+        return self.service.create_provider(AIProviderCreate(
+            name="Retrying", provider_type=ProviderType.OPENAI, api_key="key", retry_attempts=retry_attempts
+        ))
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_transient_errors_are_retried(self, mock_post):
+        """A 503 and a connection reset are retried until the request succeeds."""
+        provider = self._provider()
+        context = mock_post.return_value.__aenter__
+        context.side_effect = [
+            _response(503, {"error": {"message": "overloaded"}}),
+            aiohttp.ServerDisconnectedError(),
+            _response(200, self.success),
+        ]
+
+        result = await self.service.send_request(provider.id, self.request)
+
+        assert isinstance(result, AIResponse)
+        assert mock_post.call_count == 3
+        attempts = result.metadata["attempts"]
+        assert [a.get("reason") for a in attempts] == ["server_error", "connection_error", None]
+        assert all(a["latency"] >= 0 for a in attempts)
+        assert self.service.get_health_status(provider.id).status == "healthy"
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_retry_after_is_honored(self, mock_post):
+        """A 429 waits for the server's Retry-After before retrying."""
+        provider = self._provider()
+        mock_post.return_value.__aenter__.side_effect = [
+            _response(429, {"error": {"message": "slow down"}}, {"Retry-After": "0.5"}),
+            _response(200, self.success),
+        ]
+
+        with patch('backend.services.ai_provider_service.asyncio.sleep', new=AsyncMock()) as mock_sleep:
+            result = await self.service.send_request(provider.id, self.request)
+
+        assert isinstance(result, AIResponse)
+        mock_sleep.assert_awaited_once_with(0.5)
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_retries_are_bounded(self, mock_post):
+        """Retries stop after retry_attempts and report every attempt."""
+        provider = self._provider(retry_attempts=2)
+        mock_post.return_value.__aenter__.side_effect = asyncio.TimeoutError()
+
+        result = await self.service.send_request(provider.id, self.request)
+
+        assert isinstance(result, AIError)
+        assert mock_post.call_count == 3
+        assert result.metadata["retryable"] is True
+        assert len(result.metadata["attempts"]) == 3
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_client_errors_are_not_retried(self, mock_post):
+        """A 401 fails immediately with its status code."""
+        provider = self._provider()
+        mock_post.return_value.__aenter__.return_value = _response(401, {"error": {"message": "bad key"}})
+
+        result = await self.service.send_request(provider.id, self.request)
+
+        mock_post.assert_called_once()
+        assert result.code == "401"
+        assert result.metadata["retryable"] is False
@@ -0,0 +1,294 @@
+"""
+Unit Tests for the Persistent Search Index
+
+Covers the on-disk index generations, journal replay and the incremental
+index updates driven by chat session and file changes.
+"""
+
+import io
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+from backend.models.chat_session import ChatSessionCreate, ChatSessionUpdate, MessageCreate
+from backend.models.file_management import FileUploadRequest
+from backend.models.search import SearchQuery
+from backend.services.chat_session_service import ChatSessionService
+from backend.services.file_management_service import FileManagementService
+from backend.services.search_index import LazyIndexMap, SearchIndexStore
+from backend.services.search_service import APPEND_FOLD_PARTS, SearchService
+
+
+class TestSearchIndexStore:
+    """Test suite for SearchIndexStore."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.store = SearchIndexStore(self.temp_dir / "index")
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        self.store.close()
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_empty_store(self):
+        """A fresh store loads empty maps."""
+        documents, terms, indices = self.store.load()
+
+        assert len(documents) == 0
+        assert len(terms) == 0
+        assert indices == []
+        terms["new"].add("doc1")
+        assert terms["new"] == {"doc1"}
+
+    def test_generation_round_trip_is_lazy(self):
+        """Written generations reload lazily with the same contents."""
+        documents = {
+            "doc1": {"id": "doc1", "tokens": ["alpha", "beta"]},
+            "doc2": {"id": "doc2", "tokens": ["beta"]},
+        }
+        terms = {"alpha": {"doc1"}, "beta": {"doc1", "doc2"}, "gamma": {"orphan"}}
+        assert self.store.write(documents, terms, [{"id": "idx"}]) == 1
+
+        documents, terms, indices = self.store.load()
+
+        assert isinstance(documents, LazyIndexMap)
+        assert len(documents) == 2 and len(terms) == 3
+        assert dict.__len__(documents) == 0  # Nothing decoded yet
+        assert "doc2" in documents and "missing" not in documents
+        assert documents["doc2"]["tokens"] == ["beta"]
+        assert terms["beta"] == {"doc1", "doc2"}
+        assert terms.get("gamma") == {"orphan"}
+        assert sorted(terms.keys()) == ["alpha", "beta", "gamma"]
+        assert indices == [{"id": "idx"}]
+
+    def test_new_generation_replaces_old(self):
+        """Writing a generation removes the previous generation's files."""
+        self.store.write({"a": {"id": "a"}}, {"x": {"a"}})
+        documents, terms, _ = self.store.load()
+        documents["b"] = {"id": "b"}
+        terms["y"].add("b")
+
+        assert self.store.write(documents, terms) == 2
+
+        names = {p.name for p in self.store.index_path.iterdir()}
+        assert "docs.1.jsonl" not in names and "docs.2.jsonl" in names
+        documents, terms, _ = self.store.load()
+        assert set(documents) == {"a", "b"}
+
+    def test_write_streams_from_segment(self):
+        """Entries still on disk are copied without decoding and the maps are rebound lazily."""
+        documents = {f"doc{i}": {"id": f"doc{i}", "tokens": ["alpha"]} for i in range(5)}
+        self.store.write(documents, {"alpha": set(documents), "beta": {"doc1"}})
+        documents, terms, _ = self.store.load()
+        documents["new"] = {"id": "new"}
+        terms["beta"].add("new")
+
+        with patch.object(LazyIndexMap, "_materialize", side_effect=AssertionError("decoded during write")):
+            assert self.store.write(documents, terms) == 2
+
+        assert dict.__len__(documents) == 0 and dict.__len__(terms) == 0
+        assert documents["doc3"] == {"id": "doc3", "tokens": ["alpha"]}
+        assert documents["new"] == {"id": "new"}
+        assert terms["alpha"] == {f"doc{i}" for i in range(5)}
+        assert terms["beta"] == {"doc1", "new"}
+
+    def test_journal_replay_skips_folded_entries(self):
+        """Only journal entries newer than the generation are replayed."""
+        self.store.load()
+        self.store.record("upsert", doc={"id": "a"})
+        self.store.write({"a": {"id": "a"}}, {})
+        self.store.record("delete", id="a")
+
+        store = SearchIndexStore(self.store.index_path)
+        store.load()
+        replayed = []
+        assert store.replay(replayed.append) == 1
+        assert replayed[0]["op"] == "delete"
+        store.close()
+
+
+class TestSearchServiceIncrementalIndex:
+    """Test suite for incremental SearchService index maintenance."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.project_id = str(uuid4())
+        self.chat_sessions = ChatSessionService(data_dir=str(self.temp_dir / "data"))
+        self.files = FileManagementService(
+            storage_dir=self.temp_dir / "files",
+            temp_dir=self.temp_dir / "tmp"
+        )
+        self.search = self._open_search()
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        self.search.close()
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def _open_search(self) -> SearchService:
+        return SearchService(
+            base_path=str(self.temp_dir / "search"),
+            conversation_service=object(),
+            file_service=self.files,
+            chat_session_service=self.chat_sessions
+        )
+
+    def test_chat_changes_update_index(self):
+        """Sessions and messages are indexed as they are written."""
+        session = self.chat_sessions.create_session(
+            ChatSessionCreate(project_id=self.project_id, title="Planning")
+        )
+        doc_id = f"session_{session.id}"
+        assert doc_id in self.search.document_store
+
+        self.chat_sessions.add_message(
+            session.id, MessageCreate(role="user", content="quarterly roadmap"), self.project_id
+        )
+        assert doc_id in self.search.term_index["roadmap"]
+        assert self.search.document_store[doc_id]["metadata"]["message_count"] == 1
+
+        self.chat_sessions.update_session(session.id, ChatSessionUpdate(title="Strategy"), self.project_id)
+        assert doc_id in self.search.term_index["strategy"]
+        assert "planning" not in self.search.term_index
+        assert doc_id in self.search.term_index["roadmap"]
+
+        self.chat_sessions.delete_session(session.id, force=True, project_id=self.project_id)
+        assert doc_id not in self.search.document_store
+        assert "roadmap" not in self.search.term_index
+
+    def test_session_update_appends_only_new_messages(self):
+        """A session update keeps the indexed content and reads only messages not indexed yet."""
+        session = self.chat_sessions.create_session(
+            ChatSessionCreate(project_id=self.project_id, title="Planning")
+        )
+        doc_id = f"session_{session.id}"
+        self.chat_sessions.add_message(
+            session.id, MessageCreate(role="user", content="quarterly roadmap"), self.project_id
+        )
+        doc = self.search.document_store[doc_id]
+        tokens = doc["tokens"]
+
+        offsets = []
+        get_messages = self.chat_sessions.get_messages
+        self.chat_sessions.get_messages = lambda *args, **kwargs: offsets.append(kwargs.get("offset")) or \
+            get_messages(*args, **kwargs)
+        self.chat_sessions.update_session(session.id, ChatSessionUpdate(is_active=False), self.project_id)
+
+        assert offsets == [1]
+        assert self.search.document_store[doc_id] is doc and doc["tokens"] is tokens
+        assert doc["metadata"]["is_active"] is False
+        assert "quarterly roadmap" in self.search._document_content(doc)
+
+    def test_searches_run_alongside_appends(self):
+        """Searches on one thread never lose text appended concurrently on another."""
+        session = self.chat_sessions.create_session(
+            ChatSessionCreate(project_id=self.project_id, title="Busy")
+        )
+        doc_id = f"session_{session.id}"
+        errors = []
+
+        def append_messages():
+            try:
+                for i in range(200):
+                    self.chat_sessions.add_message(
+                        session.id, MessageCreate(role="user", content=f"token{i} busy"), self.project_id
+                    )
+            except Exception as e:
+                errors.append(e)
+
+        writer = threading.Thread(target=append_messages)
+        writer.start()
+        while writer.is_alive():
+            self.search.search(SearchQuery(query="busy"))
+        writer.join()
+
+        assert not errors
+        content = self.search._document_content(self.search.document_store[doc_id])
+        assert all(f"token{i} busy" in content for i in range(200))
+        # Reading does not fold pending parts into the stored content
+        assert len(self.search.document_store[doc_id]["content_appended"]) == 200 % APPEND_FOLD_PARTS
+
+    def test_compaction_runs_in_background(self):
+        """A full journal is folded on another thread; changes made meanwhile are kept."""
+        store = self.search._index_store
+        store.compact_threshold = 3
+        write_snapshot = store.write_snapshot
+
+        def write_during_change(*args, **kwargs):
+            self.search.index_document(self.search._index_note("late", "Late", "arrived during compaction"))
+            return write_snapshot(*args, **kwargs)
+
+        store.write_snapshot = write_during_change
+        session = self.chat_sessions.create_session(
+            ChatSessionCreate(project_id=self.project_id, title="Compacted")
+        )
+        for content in ("first message", "second message"):
+            self.chat_sessions.add_message(session.id, MessageCreate(role="user", content=content), self.project_id)
+        self.search._compaction.join()
+        store.write_snapshot = write_snapshot
+
+        assert store._meta["generation"] == 1
+        assert store.pending_entries == 1
+        assert "note_late" in self.search.term_index["compaction"]
+        assert "second message" in self.search._document_content(self.search.document_store[f"session_{session.id}"])
+
+        reopened = self._open_search()
+        assert "note_late" in reopened.document_store
+        assert f"session_{session.id}" in reopened.term_index["second"]
+
+    def test_file_changes_update_index(self):
+        """Uploaded files are indexed and removed on deletion."""
+        response = self.files.upload_file(
+            io.BytesIO(b"invoice totals for march"),
+            "invoice.txt",
+            FileUploadRequest(auto_process=False)
+        )
+        doc_id = f"file_{response.file.id}"
+        assert doc_id in self.search.term_index["invoice"]
+
+        self.files.delete_file(response.file.id)
+        assert doc_id not in self.search.document_store
+
+    def test_index_survives_restart(self):
+        """Journaled and saved changes are visible to a new service instance."""
+        session = self.chat_sessions.create_session(
+            ChatSessionCreate(project_id=self.project_id, title="Persistent")
+        )
+        self.chat_sessions.add_message(
+            session.id, MessageCreate(role="user", content="journaled message"), self.project_id
+        )
+
+        # Restart without saving: the journal is replayed
+        reopened = self._open_search()
+        assert f"session_{session.id}" in reopened.term_index["journaled"]
+
+        # Saving folds the journal into a generation
+        reopened.save_index()
+        assert not reopened._index_store.journal_file.exists()
+        again = self._open_search()
+        assert again.document_store[f"session_{session.id}"]["title"] == "Persistent"
+        assert f"session_{session.id}" in again.term_index["journaled"]
+        reopened.close()
+        again.close()
+
+    def test_build_index_covers_all_projects(self):
+        """A full rebuild indexes sessions from every project and drops stale documents."""
+        other_project = str(uuid4())
+        for project_id in (self.project_id, other_project):
+            self.chat_sessions.create_session(ChatSessionCreate(project_id=project_id, title="Session"))
+        self.search.index_document({'id': 'session_stale', 'type': 'conversation', 'tokens': ['stale'],
+                                    'metadata': {}, 'title': '', 'content': ''})
+
+        index = self.search.build_index()
+
+        assert index.total_documents == 2
+        assert "session_stale" not in self.search.document_store
+        assert self.search._index_store.meta_file.exists()
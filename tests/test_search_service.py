@@ -572,4 +572,46 @@ class TestSearchService:
 
         # Should not match tags
         filters = SearchFilter(tags=['missing'])
-        assert not search_service._matches_filters(doc, filters)
\ No newline at end of file
+        assert not search_service._matches_filters(doc, filters)
+
+    def test_bm25_prefers_title_and_term_frequency(self, search_service):
+        """BM25F ranks title matches and repeated terms above passing mentions"""
+        now = datetime.now().isoformat()
+        docs = [
+            search_service._index_note("title", "Budget Review", "notes on the budget meeting"),
+            search_service._index_note("frequent", "Meeting", "budget planning budget review"),
+            search_service._index_note("passing", "Meeting", "budget and many other unrelated words here"),
+        ]
+        for doc in docs:
+            doc['created_at'] = now
+            search_service.index_document(doc)
+
+        results = search_service.search(SearchQuery(query="budget"))
+
+        assert [r.id for r in results.results] == ["note_title", "note_frequent", "note_passing"]
+        assert all(0.0 < r.relevance_score < 1.0 for r in results.results)
+        assert 'term_freqs' in search_service.document_store['note_title']
+
+    def test_title_only_match_is_found(self, search_service):
+        """Terms that only occur in a title are in the postings, and leave them on removal"""
+        search_service.index_document(search_service._index_note("q3", "Quarterly Forecast", "numbers for next year"))
+
+        results = search_service.search(SearchQuery(query="forecast"))
+        assert [r.id for r in results.results] == ["note_q3"]
+
+        search_service.remove_document("note_q3")
+        assert "forecast" not in search_service.term_index
+
+    def test_search_top_k_matches_full_sort(self, search_service):
+        """Heap-selected pages match a full sort of the scored results"""
+        for i in range(20):
+            doc = search_service._index_note(f"n{i}", f"Note {i}", "alpha " * (i % 7 + 1) + "filler " * i)
+            search_service.index_document(doc)
+
+        everything = search_service.search(SearchQuery(query="alpha", limit=100))
+        page = search_service.search(SearchQuery(query="alpha", limit=5, offset=5))
+
+        assert everything.total_results == page.total_results == 20
+        assert [r.id for r in page.results] == [r.id for r in everything.results[5:10]]
+        scores = [r.relevance_score for r in everything.results]
+        assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,92 @@
+"""
+Unit Tests for the Service Registry
+
+Verifies that services are built once, shared between dependents and
+closed on shutdown.
+"""
+
+import pytest
+
+from backend.config.settings import settings
+from backend.services.registry import ServiceRegistry, create_registry
+
+
+class ClosingService:
+    """Minimal service that records how it was closed."""
+
+    def __init__(self, dependency=None):
+        self.dependency = dependency
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class TestServiceRegistry:
+    """Test suite for ServiceRegistry."""
+
+    def setup_method(self):
+        """Set up a registry with two dependent services."""
+        self.builds = []
+        self.registry = ServiceRegistry()
+
+        def build_base(r):
+            self.builds.append("base")
+            return ClosingService()
+
+        def build_dependent(r):
+            self.builds.append("dependent")
+            return ClosingService(dependency=r.get("base"))
+
+        self.registry.register("base", build_base)
+        self.registry.register("dependent", build_dependent)
+
+    def test_services_built_once_and_shared(self):
+        """Repeated lookups return the same instance; dependencies are shared."""
+        dependent = self.registry.get("dependent")
+
+        assert self.registry.get("dependent") is dependent
+        assert dependent.dependency is self.registry.get("base")
+        assert sorted(self.builds) == ["base", "dependent"]
+
+    def test_unknown_service(self):
+        """Looking up an unregistered service raises KeyError."""
+        with pytest.raises(KeyError):
+            self.registry.get("missing")
+
+    def test_startup_builds_everything(self):
+        """Startup eagerly builds every registered service."""
+        self.registry.startup()
+
+        assert self.registry.is_built("base")
+        assert self.registry.is_built("dependent")
+
+    @pytest.mark.asyncio
+    async def test_shutdown_closes_services(self):
+        """Shutdown awaits async close() and forgets built instances."""
+        base = self.registry.get("base")
+        dependent = self.registry.get("dependent")
+
+        await self.registry.shutdown()
+
+        assert base.closed and dependent.closed
+        assert not self.registry.is_built("base")
+        assert self.registry.get("base") is not base
+
+    @pytest.mark.asyncio
+    async def test_application_registry_shares_services(self, tmp_path, monkeypatch):
+        """The app registry wires one AI provider and chat session service everywhere."""
+        # Services default to paths relative to the working directory and home
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("APPDATA", str(tmp_path))
+        monkeypatch.setattr(settings, "CHAT_STORAGE_BACKEND", "json")
+        monkeypatch.setattr(settings, "CHAT_SQLITE_PATH", None)
+        app_registry = create_registry()
+
+        conversations = app_registry.get("conversations")
+
+        assert conversations.ai_provider_service is app_registry.get("ai_providers")
+        assert conversations.chat_session_service is app_registry.get("chat_sessions")
+        assert (tmp_path / "data" / "ai_providers").is_dir()
+        await app_registry.shutdown()
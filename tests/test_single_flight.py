@@ -0,0 +1,143 @@
+"""
+Unit Tests for Single-Flight Request Coalescing
+
+Covers sharing, error propagation and waiter cancellation in SingleFlight,
+and coalescing of identical requests in AIProviderService.send_request.
+"""
+
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend.models.ai_provider import AIProviderCreate, AIRequest, ProviderType
+from backend.services.ai_provider_service import AIProviderService
+from backend.services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight."""
+
+    def setup_method(self):
+        """Set up a fresh coalescer for each test."""
+        self.flight = SingleFlight()
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def _work(self):
+        self.calls += 1
+        await self.release.wait()
+        return "result"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Callers with the same key share one run; the flight is forgotten when it finishes."""
+        tasks = [asyncio.create_task(self.flight.do("k", self._work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        self.release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert self.calls == 1
+        assert [r[0] for r in results] == ["result"] * 3
+        assert [r[1] for r in results] == [False, True, True]
+        assert self.flight.in_flight() == 0
+
+        await self.flight.do("k", self._work)
+        assert self.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        """An exception from the shared call is raised in every caller."""
+        async def fail():
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            self.flight.do("k", fail), self.flight.do("k", fail), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        """Cancelling one caller leaves the shared call running for the rest."""
+        leader = asyncio.create_task(self.flight.do("k", self._work))
+        follower = asyncio.create_task(self.flight.do("k", self._work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        assert leader.cancelled()
+
+        self.release.set()
+        assert await follower == ("result", True)
+
+    @pytest.mark.asyncio
+    async def test_last_waiter_cancels_work(self):
+        """The shared call is cancelled once nobody is waiting for it."""
+        cancelled = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.create_task(self.flight.do("k", slow))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert cancelled.is_set()
+        assert self.flight.in_flight() == 0
+
+
+class TestSendRequestCoalescing:
+    """Test suite for request coalescing in AIProviderService."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = AIProviderService(data_dir=str(self.temp_dir))
+        self.provider = self.service.create_provider(AIProviderCreate(
+            name="Coalesced", provider_type=ProviderType.OPENAI, api_key="key"
+        ))
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_identical_concurrent_requests_share_upstream_call(self, mock_post):
+        """Concurrent identical requests make one upstream call; use_cache=False opts out."""
+        release = asyncio.Event()
+        response = AsyncMock()
+        response.status = 200
+
+        async def body():
+            await release.wait()
+            return {
+                "id": "r", "model": "gpt-4", "usage": {"prompt_tokens": 1, "completion_tokens": 1},
+                "choices": [{"message": {"content": "shared"}, "finish_reason": "stop"}],
+            }
+        response.json.side_effect = body
+        mock_post.return_value.__aenter__.return_value = response
+
+        request = AIRequest(model="gpt-4", messages=[{"role": "user", "content": "Broadcast"}])
+        fresh = AIRequest(model="gpt-4", messages=[{"role": "user", "content": "Broadcast"}], use_cache=False)
+        tasks = [asyncio.create_task(self.service.send_request(self.provider.id, r))
+                 for r in (request, request, request, fresh)]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert mock_post.call_count == 2
+        assert all(r.content == "shared" for r in results)
+        assert sum(1 for r in results if r.metadata.get("coalesced")) == 2
+        assert self.service.get_usage_stats(self.provider.id).coalesced_requests == 2
@@ -0,0 +1,270 @@
+"""
+Unit Tests for Streaming Conversations
+
+Covers incremental SSE parsing, provider streaming and the streaming
+conversation flow that persists the reply once it is complete.
+"""
+
+import asyncio
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from backend.models.ai_provider import (
+    AIProviderCreate, AIRequest, AIResponse, AIError, AIStreamChunk, ProviderType
+)
+from backend.models.conversation import (
+    ConversationContext, ConversationError, ConversationRequest, ConversationResponse
+)
+from backend.services.ai_provider_service import AIProviderService, iter_sse_events
+from backend.services.conversation_service import ConversationService
+
+
+async def _lines(*chunks: str):
+    for chunk in chunks:
+        for line in chunk.splitlines(keepends=True):
+            yield line.encode("utf-8")
+
+
+def _stream_response(body: str, status: int = 200):
+    response = MagicMock()
+    response.status = status
+    response.content = _lines(body)
+    response.json = AsyncMock(return_value={"error": {"message": "Bad request"}})
+    return response
+
+
+class TestSSEParsing:
+    """Test suite for iter_sse_events."""
+
+    @pytest.mark.asyncio
+    async def test_parses_events_incrementally(self):
+        """Named events, multi-line data and comments are handled."""
+        body = (
+            ": keep-alive\n"
+            "event: content_block_delta\n"
+            "data: {\"a\": 1}\n"
+            "\n"
+            "data: line one\n"
+            "data: line two\n"
+            "\n"
+            "data: [DONE]"
+        )
+        events = [event async for event in iter_sse_events(_lines(body))]
+
+        assert events == [
+            ("content_block_delta", "{\"a\": 1}"),
+            ("message", "line one\nline two"),
+            ("message", "[DONE]"),
+        ]
+
+
+class TestProviderStreaming:
+    """Test suite for AIProviderService.stream_request."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = AIProviderService(data_dir=str(self.temp_dir))
+        self.request = AIRequest(model="gpt-4", messages=[{"role": "user", "content": "Hi"}])
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def _provider(self, provider_type: ProviderType):
+        return self.service.create_provider(AIProviderCreate(
+            name=f"Stream {provider_type.value}", provider_type=provider_type, api_key="test-key"
+        ))
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_openai_stream(self, mock_post):
+        """OpenAI chunks are relayed and assembled into a final response."""
+        provider = self._provider(ProviderType.OPENAI)
+        chunks = [
+            {"id": "c1", "model": "gpt-4", "choices": [{"delta": {"content": "Hel"}, "finish_reason": None}]},
+            {"id": "c1", "model": "gpt-4", "choices": [{"delta": {"content": "lo"}, "finish_reason": "stop"}]},
+            {"id": "c1", "model": "gpt-4", "choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 2}},
+        ]
+        body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+        mock_post.return_value.__aenter__.return_value = _stream_response(body)
+
+        items = [item async for item in self.service.stream_request(provider.id, self.request)]
+
+        assert [i.content for i in items[:-1]] == ["Hel", "lo"]
+        assert all(isinstance(i, AIStreamChunk) for i in items[:-1])
+        final = items[-1]
+        assert isinstance(final, AIResponse)
+        assert final.content == "Hello"
+        assert final.finish_reason == "stop"
+        assert final.usage["completion_tokens"] == 2
+        assert mock_post.call_args.kwargs["json"]["stream"] is True
+        assert self.service.get_usage_stats(provider.id).total_requests == 1
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_anthropic_stream(self, mock_post):
+        """Anthropic events are relayed with usage normalized to prompt/completion tokens."""
+        provider = self._provider(ProviderType.ANTHROPIC)
+        events = [
+            ("message_start", {"type": "message_start", "message": {"id": "m1", "model": "claude-3-haiku",
+                                                                   "usage": {"input_tokens": 7}}}),
+            ("content_block_delta", {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Hi"}}),
+            ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+                               "usage": {"output_tokens": 1}}),
+            ("message_stop", {"type": "message_stop"}),
+        ]
+        body = "".join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in events)
+        mock_post.return_value.__aenter__.return_value = _stream_response(body)
+
+        items = [item async for item in self.service.stream_request(provider.id, self.request)]
+
+        assert items[0].content == "Hi"
+        assert items[-1].id == "m1"
+        assert items[-1].finish_reason == "end_turn"
+        assert items[-1].usage == {"prompt_tokens": 7, "completion_tokens": 1, "total_tokens": 8}
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_stream_error(self, mock_post):
+        """Upstream errors end the stream with an AIError."""
+        provider = self._provider(ProviderType.OPENAI)
+        mock_post.return_value.__aenter__.return_value = _stream_response("", status=400)
+
+        items = [item async for item in self.service.stream_request(provider.id, self.request)]
+
+        assert len(items) == 1
+        assert isinstance(items[0], AIError)
+        assert "Bad request" in items[0].message
+
+    @pytest.mark.asyncio
+    @patch('aiohttp.ClientSession.post')
+    async def test_closed_stream_reconciles_rate_limit(self, mock_post):
+        """Closing the stream early (client disconnect) still reconciles the rate limit once."""
+        provider = self._provider(ProviderType.OPENAI)
+        chunks = [
+            {"id": "c1", "model": "gpt-4", "choices": [{"delta": {"content": "Hel"}, "finish_reason": None}]},
+            {"id": "c1", "model": "gpt-4", "choices": [{"delta": {"content": "lo"}, "finish_reason": "stop"}]},
+        ]
+        body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+        mock_post.return_value.__aenter__.return_value = _stream_response(body)
+        self.service._reconcile_rate_limit = MagicMock()
+
+        stream = self.service.stream_request(provider.id, self.request)
+        first = await stream.__anext__()
+        assert first.content == "Hel"
+        await stream.aclose()
+
+        self.service._reconcile_rate_limit.assert_called_once()
+        assert self.service._reconcile_rate_limit.call_args.args[3] is None
+
+
+class TestConversationStreaming:
+    """Test suite for ConversationService.stream_message."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = ConversationService(self.temp_dir)
+        self.service.chat_session_service = MagicMock()
+        self.service.ai_provider_service = MagicMock()
+        self.session_id = uuid4()
+        self.service._context_cache[self.session_id] = ConversationContext(session_id=self.session_id)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        asyncio.run(self.service.close())
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def _stream(self, *items):
+        async def stream(provider_id, request):
+            for item in items:
+                yield item
+        self.service.ai_provider_service.stream_request = stream
+
+    @pytest.mark.asyncio
+    async def test_stream_persists_once_at_end(self):
+        """Deltas are relayed and both messages are stored after the final response."""
+        final = AIResponse(id="r1", model="gpt-4", content="Hello", finish_reason="stop",
+                           usage={"prompt_tokens": 4, "completion_tokens": 2})
+        self._stream(AIStreamChunk(content="Hel"), AIStreamChunk(content="lo", index=1), final)
+        self.service.chat_session_service.add_message.side_effect = [MagicMock(id=uuid4()), MagicMock(id=uuid4())]
+        self.service.ai_provider_service.get_available_models.return_value = []
+
+        request = ConversationRequest(session_id=self.session_id, message="Hi")
+        with patch.object(self.service, '_select_provider_and_model', return_value=(uuid4(), "gpt-4")):
+            items = []
+            async for item in self.service.stream_message(request):
+                items.append(item)
+                if isinstance(item, AIStreamChunk):
+                    self.service.chat_session_service.add_message.assert_not_called()
+
+        assert [i.content for i in items[:2]] == ["Hel", "lo"]
+        assert isinstance(items[-1], ConversationResponse)
+        assert items[-1].content == "Hello"
+        assert self.service.chat_session_service.add_message.call_count == 2
+        assert self.service._context_cache[self.session_id].total_tokens_output == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_error_does_not_persist(self):
+        """A provider error ends the stream without storing messages."""
+        self._stream(AIStreamChunk(content="Par"), AIError(type="request_failed", message="reset"))
+
+        request = ConversationRequest(session_id=self.session_id, message="Hi")
+        with patch.object(self.service, '_select_provider_and_model', return_value=(uuid4(), "gpt-4")):
+            items = [item async for item in self.service.stream_message(request)]
+
+        assert items[-1].type == "request_failed"
+        self.service.chat_session_service.add_message.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failover_closes_abandoned_stream(self):
+        """A provider that fails before any text is closed and the next candidate answers."""
+        failed, backup = uuid4(), uuid4()
+        closed = []
+        final = AIResponse(id="r1", model="gpt-4", content="Hi", finish_reason="stop", usage={})
+
+        async def stream(provider_id, request):
+            try:
+                if provider_id == failed:
+                    yield AIError(type="rate_limited", message="busy")
+                    yield AIStreamChunk(content="never sent")
+                else:
+                    yield AIStreamChunk(content="Hi")
+                    yield final
+            finally:
+                closed.append(provider_id)
+
+        self.service.ai_provider_service.stream_request = stream
+        self.service.chat_session_service.add_message.side_effect = [MagicMock(id=uuid4()), MagicMock(id=uuid4())]
+
+        request = ConversationRequest(session_id=self.session_id, message="Hi")
+        with patch.object(self.service, '_select_provider_and_model', return_value=(failed, "gpt-4")), \
+                patch.object(self.service, '_route_candidates', return_value=[(failed, "gpt-4"), (backup, "gpt-4")]):
+            items = [item async for item in self.service.stream_message(request)]
+
+        assert closed == [failed, backup]
+        assert [i.content for i in items[:-1]] == ["Hi"]
+        assert isinstance(items[-1], ConversationResponse)
+
+    @pytest.mark.asyncio
+    async def test_stream_without_final_response_is_an_error(self):
+        """A stream that ends without a response or error yields a ConversationError."""
+        self._stream(AIStreamChunk(content="Par"))
+
+        request = ConversationRequest(session_id=self.session_id, message="Hi")
+        with patch.object(self.service, '_select_provider_and_model', return_value=(uuid4(), "gpt-4")):
+            items = [item async for item in self.service.stream_message(request)]
+
+        assert items[0].content == "Par"
+        assert isinstance(items[-1], ConversationError)
+        assert items[-1].type == "stream_incomplete"
+        self.service.chat_session_service.add_message.assert_not_called()
@@ -0,0 +1,133 @@
+"""
+Unit Tests for Write-Behind Buffering
+
+Covers batching and flushing in WriteBehindBuffer and write-behind of
+conversation contexts in ConversationService.
+"""
+
+import asyncio
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from backend.models.conversation import ConversationContext
+from backend.services.conversation_service import ConversationService
+from backend.services.write_behind import WriteBehindBuffer
+
+
+class TestWriteBehindBuffer:
+    """Test suite for WriteBehindBuffer."""
+
+    def setup_method(self):
+        """Record writes instead of persisting them."""
+        self.written = []
+
+    def test_updates_are_coalesced_until_flush(self):
+        """Repeated updates to one key cost a single write."""
+        buffer = WriteBehindBuffer(self.written.append, interval=60)
+        for i in range(5):
+            buffer.mark_dirty("a", f"a{i}")
+        buffer.mark_dirty("b", "b0")
+
+        assert self.written == []
+        assert buffer.flush() == 2
+        assert self.written == ["a4", "b0"]
+        buffer.close()
+        assert buffer.get_stats() == {"updates": 6, "writes": 2, "flushes": 1, "pending": 0}
+
+    def test_background_flush_bounds_delay(self):
+        """Pending updates are written by the flush thread within the interval."""
+        flushed = threading.Event()
+        buffer = WriteBehindBuffer(lambda item: flushed.set(), interval=0.01)
+        buffer.mark_dirty("a", "a0")
+
+        assert flushed.wait(2)
+        buffer.close()
+
+    def test_max_pending_triggers_early_flush(self):
+        """Reaching max_pending flushes without waiting for the interval."""
+        flushed = threading.Event()
+        buffer = WriteBehindBuffer(lambda item: flushed.set(), interval=60, max_pending=2)
+        buffer.mark_dirty("a", "a0")
+        buffer.mark_dirty("b", "b0")
+
+        assert flushed.wait(2)
+        buffer.close()
+
+    def test_close_writes_pending_and_later_updates_write_through(self):
+        """Closing flushes what is pending; updates after close are written at once."""
+        buffer = WriteBehindBuffer(self.written.append, interval=60)
+        buffer.mark_dirty("a", "a0")
+        buffer.close()
+        buffer.mark_dirty("b", "b0")
+
+        assert self.written == ["a0", "b0"]
+
+    def test_discard_and_zero_interval(self):
+        """Discarded updates are never written; interval 0 writes immediately."""
+        buffer = WriteBehindBuffer(self.written.append, interval=60)
+        buffer.mark_dirty("a", "a0")
+        buffer.discard("a")
+        buffer.close()
+        assert self.written == []
+
+        WriteBehindBuffer(self.written.append, interval=0).mark_dirty("b", "b0")
+        assert self.written == ["b0"]
+
+    def test_write_errors_are_reported(self, capsys):
+        """A failing write is reported and does not stop the flush."""
+        def write(item):
+            if item == "bad":
+                raise OSError("disk full")
+            self.written.append(item)
+
+        buffer = WriteBehindBuffer(write, interval=60)
+        buffer.mark_dirty("a", "bad")
+        buffer.mark_dirty("b", "good")
+        buffer.close()
+
+        assert self.written == ["good"]
+        assert "disk full" in capsys.readouterr().out
+
+
+class TestConversationContextWriteBehind:
+    """Test suite for buffered conversation context persistence."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = ConversationService(self.temp_dir, context_flush_interval=60)
+        self.session_id = uuid4()
+        self.context = ConversationContext(session_id=self.session_id)
+        self.service._context_cache[self.session_id] = self.context
+
+    def teardown_method(self):
+        """Clean up test environment after each test."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_counters_survive_clean_shutdown(self):
+        """Updates are buffered in memory and written once on close."""
+        for _ in range(3):
+            self.context.total_tokens_input += 10
+            self.context.total_cost += 0.5
+            self.service._mark_context_dirty(self.context)
+        assert not self.service._get_conversation_file(self.session_id).exists()
+
+        asyncio.run(self.service.close())
+
+        reloaded = ConversationService(self.temp_dir)._context_cache[self.session_id]
+        assert (reloaded.total_tokens_input, reloaded.total_cost) == (30, 1.5)
+
+    def test_cleared_context_is_not_rewritten(self):
+        """Clearing a context drops its pending write."""
+        self.service._mark_context_dirty(self.context)
+        assert self.service.clear_conversation_context(self.session_id)
+
+        self.service.flush_contexts()
+        assert not self.service._get_conversation_file(self.session_id).exists()
+        assert self.service.get_conversation_stats().total_conversations == 0